@@ -0,0 +1,60 @@
+"""Diff two JSON baselines written by the benchmarks and the load driver.
+
+    python -m benchmarks.compare benchmarks/results/main.json benchmarks/results/branch.json --threshold 0.1
+
+Exits with 1 when a median got slower by more than the threshold or a benchmark started running more statements.
+"""
+
+import argparse
+import json
+import pathlib
+import sys
+import typing
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Sequence
+
+_SECTIONS = ('repository', 'http', 'startup', 'hydration')
+
+
+def compare(base: dict[str, typing.Any], new: dict[str, typing.Any], threshold: float) -> tuple[list[str], list[str]]:
+    """Report lines and the names of regressed benchmarks."""
+    lines: list[str] = []
+    regressions: list[str] = []
+    for section in _SECTIONS:
+        base_results, new_results = base.get(section, {}), new.get(section, {})
+        for name in sorted(base_results.keys() | new_results.keys()):
+            if name not in base_results or name not in new_results:
+                lines.append(f'{section}/{name}: {"added" if name in new_results else "removed"}')
+                continue
+            before, after = base_results[name], new_results[name]
+            change = after['median'] / before['median'] - 1 if before['median'] else 0
+            regressed = change > threshold or after.get('queries', 0) > before.get('queries', 0)
+            if regressed:
+                regressions.append(f'{section}/{name}')
+            lines.append(
+                f'{section}/{name}: median {before["median"]:.2f} -> {after["median"]:.2f} ms ({change:+.1%}), '
+                f'queries {before.get("queries", 0):g} -> {after.get("queries", 0):g}'
+                f'{"  REGRESSION" if regressed else ""}'
+            )
+    return lines, regressions
+
+
+def main(argv: 'Sequence[str] | None' = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base', type=pathlib.Path)
+    parser.add_argument('new', type=pathlib.Path)
+    parser.add_argument('--threshold', type=float, default=0.1, help='Allowed relative slowdown of a median')
+    args = parser.parse_args(argv)
+
+    base, new = json.loads(args.base.read_text()), json.loads(args.new.read_text())
+    if base.get('dataset') != new.get('dataset'):
+        sys.stderr.write(f'Warning: comparing different datasets {base.get("dataset")} and {new.get("dataset")}\n')
+    lines, regressions = compare(base, new, args.threshold)
+    sys.stdout.write(f'{base.get("commit")} -> {new.get("commit")}\n')
+    sys.stdout.writelines(f'{line}\n' for line in lines)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import pathlib
+import typing
+
+import pytest
+from sqlalchemy import engine as sa_engine
+from sqlalchemy.ext import asyncio as async_sa
+
+from benchmarks import datagen
+from benchmarks.database import ensure_database
+from benchmarks.harness import Benchmark, Stats, write_results
+from src.db.metrics import install_query_tracking
+from src.repositories import OrganizationRepository, OrganizationWriter
+
+if typing.TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+_RESULTS = pytest.StashKey[dict[str, Stats]]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup('benchmarks')
+    group.addoption('--organizations', type=int, default=datagen.DatasetConfig.organizations)
+    group.addoption('--buildings', type=int, default=datagen.DatasetConfig.buildings)
+    group.addoption('--seed', type=int, default=datagen.DatasetConfig.seed)
+    group.addoption('--rounds', type=int, default=50)
+    group.addoption('--warmup', type=int, default=5)
+    group.addoption('--rebuild', action='store_true', help='Regenerate the dataset even if its database exists')
+    group.addoption('--benchmark-json', type=pathlib.Path, help='Write results to this JSON baseline')
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[_RESULTS] = {}
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    path: pathlib.Path | None = session.config.getoption('--benchmark-json')
+    results = session.config.stash[_RESULTS]
+    if path is not None and results:
+        write_results(path, 'repository', results, dataset=dataset_config(session.config).name)
+
+
+def pytest_terminal_summary(terminalreporter: pytest.TerminalReporter, config: pytest.Config) -> None:
+    results = config.stash[_RESULTS]
+    if not results:
+        return
+    width = max(map(len, results))
+    terminalreporter.section('benchmarks (ms)')
+    terminalreporter.write_line(f'{"name":<{width}} {"min":>8} {"median":>8} {"p95":>8} {"queries":>8} {"rows/s":>10}')
+    for name, stats in sorted(results.items()):
+        throughput = f'{stats.throughput:10.0f}' if stats.rows else f'{"":10}'
+        terminalreporter.write_line(
+            f'{name:<{width}} {stats.min:8.2f} {stats.median:8.2f} {stats.p95:8.2f} {stats.queries:8.1f} {throughput}'
+        )
+
+
+def dataset_config(config: pytest.Config) -> datagen.DatasetConfig:
+    return datagen.DatasetConfig(
+        organizations=config.getoption('--organizations'),
+        buildings=config.getoption('--buildings'),
+        seed=config.getoption('--seed'),
+    )
+
+
+@pytest.fixture(scope='session')
+def dataset(request: pytest.FixtureRequest) -> datagen.DatasetConfig:
+    return dataset_config(request.config)
+
+
+@pytest.fixture(scope='session')
+async def db(request: pytest.FixtureRequest, dataset: datagen.DatasetConfig) -> sa_engine.URL:
+    return await ensure_database(dataset, rebuild=request.config.getoption('--rebuild'))
+
+
+@pytest.fixture
+async def engine(db: sa_engine.URL) -> 'AsyncIterator[async_sa.AsyncEngine]':
+    engine = async_sa.create_async_engine(db)
+    install_query_tracking(engine.sync_engine)
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+async def repository(engine: async_sa.AsyncEngine) -> 'AsyncIterator[OrganizationRepository]':
+    sessionmaker = async_sa.async_sessionmaker(engine)
+    async with sessionmaker() as session:
+        yield OrganizationRepository(session=session, sessionmaker=sessionmaker)
+
+
+@pytest.fixture
+async def writer(engine: async_sa.AsyncEngine) -> 'AsyncIterator[OrganizationWriter]':
+    async with async_sa.async_sessionmaker(engine)() as session:
+        yield OrganizationWriter(session)
+
+
+@pytest.fixture
+def benchmark(request: pytest.FixtureRequest) -> 'typing.Iterator[Benchmark]':
+    benchmark = Benchmark(rounds=request.config.getoption('--rounds'), warmup=request.config.getoption('--warmup'))
+    yield benchmark
+    if benchmark.stats is not None:
+        request.config.stash[_RESULTS][request.node.name] = benchmark.stats
@@ -0,0 +1,46 @@
+import typing
+
+import sqlalchemy as sa
+from sqlalchemy import engine as sa_engine
+from sqlalchemy.ext import asyncio as async_sa
+
+from benchmarks import datagen
+from src.db import models
+from src.db.entities import ENTITIES
+from src.settings import settings
+
+
+async def _admin_execute(url: sa_engine.URL, statement: str) -> typing.Any:  # noqa: ANN401
+    admin = async_sa.create_async_engine(url.set(database='postgres'), isolation_level='AUTOCOMMIT')
+    try:
+        async with admin.connect() as conn:
+            return (await conn.execute(sa.text(statement))).scalar()
+    finally:
+        await admin.dispose()
+
+
+async def ensure_database(dataset: datagen.DatasetConfig, *, rebuild: bool = False) -> sa_engine.URL:
+    """Database holding the dataset, kept between runs so it's generated once per dataset."""
+    url = sa_engine.make_url(str(settings.POSTGRES_DSN)).set(database=f'bench_{dataset.name}')
+    exists = await _admin_execute(url, f"SELECT 1 FROM pg_database WHERE datname = '{url.database}'")  # noqa: S608
+    if exists and not rebuild:
+        return url
+    if exists:
+        await _admin_execute(url, f'DROP DATABASE "{url.database}" WITH (FORCE)')
+
+    await _admin_execute(url, f'CREATE DATABASE "{url.database}"')
+    engine = async_sa.create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(sa.text('CREATE EXTENSION IF NOT EXISTS postgis'))
+            await conn.run_sync(models.Base.metadata.create_all)
+            for entity in ENTITIES:
+                await conn.execute(entity.to_sql_statement_create())
+            await datagen.load(conn, dataset)
+    except BaseException:
+        # Don't leave a half-loaded database behind to be reused by the next run
+        await engine.dispose()
+        await _admin_execute(url, f'DROP DATABASE "{url.database}" WITH (FORCE)')
+        raise
+    await engine.dispose()
+    return url
@@ -0,0 +1,227 @@
+"""Deterministic city-scale datasets for benchmarks.
+
+Every part of a dataset is drawn from its own seeded stream, so query parameters like cluster centers or popular
+specializations can be recomputed from the config without regenerating the rest.
+"""
+
+import bisect
+import dataclasses
+import itertools
+import math
+import random
+import typing
+
+import sqlalchemy as sa
+
+from src.db import triggers
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+    from sqlalchemy.ext.asyncio import AsyncConnection
+
+METERS_PER_DEGREE = 111_320
+
+_STREETS = (
+    'Main', 'Oak', 'Pine', 'Maple', 'Cedar', 'Elm', 'Lake', 'Hill', 'Park', 'River',
+    'Church', 'Market', 'Mill', 'Bridge', 'Garden', 'Station', 'Forest', 'Spring', 'Sunset', 'Harbor',
+)  # fmt: skip
+_STREET_KINDS = ('St', 'Ave', 'Blvd', 'Lane', 'Road')
+_WORDS = (
+    'Alpha', 'Blue', 'Bright', 'Central', 'City', 'Delta', 'Eagle', 'First', 'Global', 'Green',
+    'Metro', 'North', 'Prime', 'Royal', 'Silver', 'Smart', 'Star', 'Summit', 'United', 'Vertex',
+)  # fmt: skip
+_KINDS = ('Foods', 'Motors', 'Clinic', 'Labs', 'Studio', 'Supply', 'Services', 'Group', 'Market', 'Works')
+
+# Row triggers following changes into the read model, and from it to spatial indexes; disabled during a load and
+# replaced by one set-based refresh
+_READ_MODEL_TRIGGERS = (
+    triggers.trg_organizations_sync_read_models,
+    triggers.trg_organization_buildings_sync_read_models,
+    triggers.trg_organization_specializations_sync_read_models,
+    triggers.trg_buildings_sync_read_models,
+    triggers.trg_specializations_sync_read_models,
+    # Spatial indexes load the whole table at startup anyway
+    triggers.trg_organization_read_models_notify,
+)
+
+_BATCH_SIZE = 50_000
+
+
+@dataclasses.dataclass(frozen=True)
+class DatasetConfig:
+    organizations: int = 100_000
+    buildings: int = 20_000
+    # Buildings are spread around this many neighbourhood centers, busier neighbourhoods getting more of them
+    clusters: int = 40
+    center: tuple[float, float] = (37.6173, 55.7558)
+    city_radius_m: float = 15_000
+    cluster_radius_m: float = 600
+    # Three-level taxonomy: roots, `fanout` children per root and `fanout` grandchildren per child
+    root_specializations: int = 10
+    fanout: int = 5
+    max_specializations_per_organization: int = 3
+    zipf_exponent: float = 1.1
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        return f'{self.organizations}o_{self.buildings}b_{self.seed}s'
+
+    @property
+    def specializations(self) -> int:
+        return self.root_specializations * (1 + self.fanout + self.fanout**2)
+
+
+def _rng(config: DatasetConfig, stream: str) -> random.Random:
+    return random.Random(f'{config.seed}:{stream}')  # noqa: S311
+
+
+def _zipf_weights(n: int, exponent: float) -> list[float]:
+    return list(itertools.accumulate(1 / rank**exponent for rank in range(1, n + 1)))
+
+
+def offset(center: tuple[float, float], east_m: float, north_m: float) -> tuple[float, float]:
+    lon, lat = center
+    return (
+        lon + east_m / (METERS_PER_DEGREE * math.cos(math.radians(lat))),
+        lat + north_m / METERS_PER_DEGREE,
+    )
+
+
+def cluster_centers(config: DatasetConfig) -> list[tuple[float, float]]:
+    """Neighbourhood centers as (lon, lat), busiest first."""
+    rng = _rng(config, 'clusters')
+    centers: list[tuple[float, float]] = []
+    for _ in range(config.clusters):
+        # sqrt keeps the centers uniform over the disk instead of crowding the middle
+        distance = config.city_radius_m * math.sqrt(rng.random())
+        angle = rng.uniform(0, 2 * math.pi)
+        centers.append(offset(config.center, distance * math.cos(angle), distance * math.sin(angle)))
+    return centers
+
+
+def query_point(config: DatasetConfig, area: str) -> tuple[float, float]:
+    """(lon, lat) in the busiest neighbourhood for a `dense` area, on the city's edge otherwise."""
+    if area == 'dense':
+        return cluster_centers(config)[0]
+    return offset(config.center, config.city_radius_m, 0)
+
+
+def specializations(config: DatasetConfig) -> list[tuple[int, str, int | None]]:
+    """Rows of (id, name, parent_id), parents before children."""
+    rows: list[tuple[int, str, int | None]] = []
+    level: list[int | None] = [None]
+    for depth, width in enumerate((config.root_specializations, config.fanout, config.fanout)):
+        next_level: list[int | None] = []
+        for parent_id in level:
+            for _ in range(width):
+                spec_id = len(rows) + 1
+                rows.append((spec_id, f'Specialization {depth}.{spec_id}', parent_id))
+                next_level.append(spec_id)
+        level = next_level
+    return rows
+
+
+def specialization_popularity(config: DatasetConfig) -> list[int]:
+    """Specialization ids from most to least often assigned."""
+    ids = list(range(1, config.specializations + 1))
+    _rng(config, 'popularity').shuffle(ids)
+    return ids
+
+
+def buildings(config: DatasetConfig) -> 'Iterator[tuple[int, str, float, float]]':
+    """Rows of (id, address, lon, lat)."""
+    rng = _rng(config, 'buildings')
+    centers = cluster_centers(config)
+    weights = _zipf_weights(len(centers), 1.0)
+    for building_id in range(1, config.buildings + 1):
+        center = centers[bisect.bisect(weights, rng.random() * weights[-1])]
+        lon, lat = offset(center, rng.gauss(0, config.cluster_radius_m), rng.gauss(0, config.cluster_radius_m))
+        address = f'{rng.randint(1, 300)} {rng.choice(_STREETS)} {rng.choice(_STREET_KINDS)}'
+        yield building_id, address, lon, lat
+
+
+def organizations(config: DatasetConfig) -> 'Iterator[tuple[int, str, str, int, list[int]]]':
+    """Rows of (id, name, phone, building_id, specialization_ids)."""
+    rng = _rng(config, 'organizations')
+    popularity = specialization_popularity(config)
+    weights = _zipf_weights(len(popularity), config.zipf_exponent)
+    for organization_id in range(1, config.organizations + 1):
+        count = rng.randint(1, config.max_specializations_per_organization)
+        specs = {popularity[bisect.bisect(weights, rng.random() * weights[-1])] for _ in range(count)}
+        yield (
+            organization_id,
+            f'{rng.choice(_WORDS)} {rng.choice(_WORDS)} {rng.choice(_KINDS)}',
+            f'+7-495-{organization_id:07d}',
+            rng.randint(1, config.buildings),
+            sorted(specs),
+        )
+
+
+def _batches[T](rows: 'typing.Iterable[T]') -> 'Iterator[Sequence[T]]':
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, _BATCH_SIZE)):
+        yield batch
+
+
+async def load(conn: 'AsyncConnection', config: DatasetConfig) -> None:
+    """Insert the dataset into an empty schema, in the connection's current transaction."""
+    for trigger in _READ_MODEL_TRIGGERS:
+        await conn.execute(sa.text(f'ALTER TABLE {trigger.on_entity} DISABLE TRIGGER {trigger.signature}'))
+
+    specs = specializations(config)
+    await conn.execute(
+        sa.text(
+            'INSERT INTO specializations (id, name, parent_id) '
+            'SELECT * FROM unnest(CAST(:ids AS integer[]), CAST(:names AS text[]), CAST(:parent_ids AS integer[]))'
+        ),
+        {'ids': [row[0] for row in specs], 'names': [row[1] for row in specs], 'parent_ids': [row[2] for row in specs]},
+    )
+    for batch in _batches(buildings(config)):
+        ids, addresses, lons, lats = map(list, zip(*batch, strict=True))
+        await conn.execute(
+            sa.text(
+                'INSERT INTO buildings (id, address, point) '
+                'SELECT id, address, ST_Point(lon, lat, 4326) FROM unnest('
+                'CAST(:ids AS integer[]), CAST(:addresses AS text[]), '
+                'CAST(:lons AS float8[]), CAST(:lats AS float8[])) AS t(id, address, lon, lat)'
+            ),
+            {'ids': ids, 'addresses': addresses, 'lons': lons, 'lats': lats},
+        )
+    for batch in _batches(organizations(config)):
+        ids = [row[0] for row in batch]
+        await conn.execute(
+            sa.text(
+                'INSERT INTO organizations (id, name, phone) '
+                'SELECT * FROM unnest(CAST(:ids AS integer[]), CAST(:names AS text[]), CAST(:phones AS text[]))'
+            ),
+            {'ids': ids, 'names': [row[1] for row in batch], 'phones': [row[2] for row in batch]},
+        )
+        await conn.execute(
+            sa.text(
+                'INSERT INTO organization_buildings (organization_id, building_id) '
+                'SELECT * FROM unnest(CAST(:ids AS integer[]), CAST(:building_ids AS integer[]))'
+            ),
+            {'ids': ids, 'building_ids': [row[3] for row in batch]},
+        )
+        await conn.execute(
+            sa.text(
+                'INSERT INTO organization_specializations (organization_id, specialization_id) '
+                'SELECT * FROM unnest(CAST(:ids AS integer[]), CAST(:spec_ids AS integer[]))'
+            ),
+            {
+                'ids': [row[0] for row in batch for _ in row[4]],
+                'spec_ids': [spec_id for row in batch for spec_id in row[4]],
+            },
+        )
+
+    for table in ('specializations', 'buildings', 'organizations'):
+        await conn.execute(sa.text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), max(id)) FROM {table}"))  # noqa: S608
+    await conn.execute(sa.text('SELECT refresh_organization_read_models(ARRAY(SELECT id FROM organizations))'))
+    # ALTER TABLE refuses to run while deferred constraint triggers are pending
+    await conn.execute(sa.text('SET CONSTRAINTS ALL IMMEDIATE'))
+    for trigger in _READ_MODEL_TRIGGERS:
+        await conn.execute(sa.text(f'ALTER TABLE {trigger.on_entity} ENABLE TRIGGER {trigger.signature}'))
+    for table in ('specializations', 'buildings', 'organizations', 'organization_read_models'):
+        await conn.execute(sa.text(f'ANALYZE {table}'))
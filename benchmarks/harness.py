@@ -0,0 +1,92 @@
+import dataclasses
+import json
+import pathlib
+import statistics
+import subprocess
+import time
+import typing
+
+from src.db import track_queries
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+_PERCENTILES = 100
+
+
+@dataclasses.dataclass
+class Stats:
+    """Timings of one benchmark, in milliseconds."""
+
+    rounds: int
+    min: float
+    median: float
+    p95: float
+    mean: float
+    # Statements executed per round, to spot a regression coming from an extra query rather than a slower one
+    queries: float = 0
+    # Rows written per round, by write benchmarks
+    rows: int = 0
+
+    @property
+    def throughput(self) -> float:
+        """Rows written per second, at the median."""
+        return self.rows / self.median * 1000 if self.median else 0
+
+    @classmethod
+    def from_timings(cls, timings: list[float], queries: int = 0, rows: int = 0) -> 'Stats':
+        ms = sorted(timing * 1000 for timing in timings)
+        return cls(
+            rounds=len(ms),
+            min=ms[0],
+            median=statistics.median(ms),
+            p95=statistics.quantiles(ms, n=_PERCENTILES)[94] if len(ms) > 1 else ms[0],
+            mean=statistics.fmean(ms),
+            queries=queries / len(ms),
+            rows=rows,
+        )
+
+
+class Benchmark:
+    """Awaits a callable repeatedly and records how long each round took, in the spirit of pytest-benchmark."""
+
+    def __init__(self, *, rounds: int, warmup: int) -> None:
+        self.rounds = rounds
+        self.warmup = warmup
+        # Set by write benchmarks to the rows each call writes, which reports their throughput
+        self.rows = 0
+        self.stats: Stats | None = None
+
+    async def __call__[T](self, fn: 'Callable[..., Awaitable[T]]', *args: typing.Any, **kwargs: typing.Any) -> T:
+        for _ in range(self.warmup):
+            await fn(*args, **kwargs)
+
+        timings: list[float] = []
+        with track_queries() as queries:
+            for _ in range(self.rounds):
+                start = time.perf_counter()
+                result = await fn(*args, **kwargs)
+                timings.append(time.perf_counter() - start)
+        self.stats = Stats.from_timings(timings, queries.queries, self.rows)
+        return result  # pyright: ignore[reportPossiblyUnboundVariable]
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],  # noqa: S607
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: pathlib.Path, section: str, results: dict[str, Stats], **meta: typing.Any) -> None:
+    """Store results under `section` of a JSON baseline, keeping the other sections of an existing file."""
+    baseline = json.loads(path.read_text()) if path.exists() else {}
+    baseline.update(meta, commit=current_commit())
+    baseline[section] = {name: dataclasses.asdict(stats) for name, stats in sorted(results.items())}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(baseline, indent=2) + '\n')
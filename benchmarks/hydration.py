@@ -0,0 +1,125 @@
+"""Turning a page of read model rows into a JSON response: through the API's pydantic models or through records.
+
+The `models` path is what the app did before records: validate every payload into `schemas.Organization`, then let
+FastAPI validate the returned models again before writing them out. The `records` path is the current one. No database
+is needed: rows are generated, as the page query returns them.
+
+    python -m benchmarks.hydration --rows 1000 --rounds 50
+    python -m benchmarks.hydration --rows 1000 --json benchmarks/results/branch.json
+"""
+
+import argparse
+import json
+import pathlib
+import random
+import sys
+import time
+import tracemalloc
+import typing
+
+from benchmarks.harness import Stats, write_results
+from src import schemas
+from src.repositories.records import RECORDS, OrganizationPage, OrganizationRecord
+from src.repositories.taxonomy import Taxonomy
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+type Row = tuple[dict[str, typing.Any], list[int]]
+
+
+def taxonomy(size: int = 60) -> Taxonomy:
+    """Taxonomy of `size` specializations, two levels deep."""
+    return Taxonomy((id_, f'Specialization {id_}', id_ // 10 or None) for id_ in range(1, size + 1))
+
+
+def rows(count: int, taxonomy: Taxonomy, seed: int = 0) -> list[Row]:
+    """Page query rows: payloads without their specializations, and the specializations' ids."""
+    rng = random.Random(seed)  # noqa: S311
+    ids = sorted(taxonomy.nodes)
+    return [
+        (
+            {
+                'id': id_,
+                'name': f'Organization {id_}',
+                'phone': f'+7 900 {id_:07}',
+                'building_id': id_ // 4,
+                'building_address': f'{id_ // 4} Main St',
+                'building_coordinates': [rng.uniform(37, 38), rng.uniform(55, 56)],
+            },
+            sorted(rng.sample(ids, rng.randint(1, 3))),
+        )
+        for id_ in range(1, count + 1)
+    ]
+
+
+def through_models(rows: list[Row], taxonomy: Taxonomy) -> bytes:
+    page = schemas.ListOrganizations(
+        organizations=[
+            schemas.Organization.model_validate(
+                {**payload, 'specializations': taxonomy.specializations(ids)}, from_attributes=True
+            )
+            for payload, ids in rows
+        ],
+        total=len(rows),
+    )
+    # What FastAPI does with a returned model: dump it, validate the dump against the response model, then encode it
+    content = schemas.ListOrganizations.model_validate(page.model_dump()).model_dump(mode='json')
+    return json.dumps(content, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def through_records(rows: list[Row], taxonomy: Taxonomy) -> bytes:
+    page = OrganizationPage(
+        organizations=[
+            OrganizationRecord.from_payload(payload, taxonomy.specializations(ids)) for payload, ids in rows
+        ],
+        total=len(rows),
+    )
+    return RECORDS.dump_json(page)
+
+
+PATHS: dict[str, 'Callable[[list[Row], Taxonomy], bytes]'] = {'models': through_models, 'records': through_records}
+
+
+def measure(
+    path: 'Callable[[list[Row], Taxonomy], bytes]', rows: list[Row], taxonomy: Taxonomy, *, rounds: int
+) -> tuple[Stats, int]:
+    """Time `rounds` conversions of `rows`, and measure the peak bytes allocated by one."""
+    path(rows, taxonomy)
+    timings: list[float] = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        path(rows, taxonomy)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        path(rows, taxonomy)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Stats.from_timings(timings), peak
+
+
+def main(argv: 'Sequence[str] | None' = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000)
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--json', type=pathlib.Path, help='Write results to this JSON baseline')
+    args = parser.parse_args(argv)
+
+    taxonomy_ = taxonomy()
+    rows_ = rows(args.rows, taxonomy_)
+    results: dict[str, Stats] = {}
+    for name, path in PATHS.items():
+        stats, peak = measure(path, rows_, taxonomy_, rounds=args.rounds)
+        results[f'{name} {args.rows} rows'] = stats
+        sys.stdout.write(
+            f'{name:<8} median {stats.median:8.2f} ms  p95 {stats.p95:8.2f} ms  peak {peak / 1024:8.0f} KiB\n'
+        )
+    if args.json is not None:
+        write_results(args.json, 'hydration', results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Cold start of a worker: how long importing the app takes, measured with `python -X importtime`.
+
+Every run is a fresh interpreter, so nothing is cached in memory; the bytecode cache on disk is used as in production.
+
+    python -m benchmarks.importtime --runs 20
+    python -m benchmarks.importtime --runs 20 --json benchmarks/results/branch.json
+"""
+
+import argparse
+import collections
+import dataclasses
+import pathlib
+import statistics
+import subprocess
+import sys
+import typing
+
+from benchmarks.harness import Stats, write_results
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Sequence
+
+MODULE = 'src.app'
+
+
+@dataclasses.dataclass
+class ImportTime:
+    """One module of an `-X importtime` report, in microseconds."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse(report: str) -> list[ImportTime]:
+    """Modules of an `-X importtime` report, in the order they finished importing."""
+    times: list[ImportTime] = []
+    for line in report.splitlines():
+        prefix, _, rest = line.partition(':')
+        if prefix != 'import time':
+            continue
+        self_us, cumulative_us, module = (part.strip() for part in rest.split('|'))
+        # The header line
+        if not self_us.isdigit():
+            continue
+        times.append(ImportTime(module=module, self_us=int(self_us), cumulative_us=int(cumulative_us)))
+    return times
+
+
+def measure(module: str = MODULE) -> tuple[list[ImportTime], set[str]]:
+    """Import times of `module` in a fresh interpreter, and all the modules it left loaded."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, '-X', 'importtime', '-c', f'import sys, {module}; print(*sys.modules, sep="\\n")'],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return parse(result.stderr), set(result.stdout.split())
+
+
+def total_s(times: list[ImportTime], module: str = MODULE) -> float:
+    return next(time.cumulative_us for time in times if time.module == module) / 1_000_000
+
+
+def main(argv: 'Sequence[str] | None' = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default=MODULE)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--top', type=int, default=15, help='Number of slowest modules to list')
+    parser.add_argument('--json', type=pathlib.Path, help='Write results to this JSON baseline')
+    args = parser.parse_args(argv)
+
+    # The first run warms the bytecode cache
+    measure(args.module)
+    totals: list[float] = []
+    self_us: dict[str, list[int]] = collections.defaultdict(list)
+    for _ in range(args.runs):
+        times, _ = measure(args.module)
+        totals.append(total_s(times, args.module))
+        for time in times:
+            self_us[time.module].append(time.self_us)
+
+    stats = Stats.from_timings(totals)
+    sys.stdout.write(f'import {args.module}: median {stats.median:.1f} ms  p95 {stats.p95:.1f} ms\n')
+    slowest = sorted(self_us.items(), key=lambda item: statistics.median(item[1]), reverse=True)[: args.top]
+    width = max((len(module) for module, _ in slowest), default=0)
+    for module, timings in slowest:
+        sys.stdout.write(f'  {module:<{width}} {statistics.median(timings) / 1000:8.2f} ms\n')
+    if args.json is not None:
+        write_results(args.json, 'startup', {f'import {args.module}': stats})
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""HTTP load driver for the organizations API.
+
+Point the app at a database loaded with the same dataset (see `benchmarks/conftest.py`), then run either against a
+live server or in-process through the ASGI app:
+
+    python -m benchmarks.load --url http://localhost:8000 --duration 30 --concurrency 32
+    python -m benchmarks.load --duration 30 --json benchmarks/results/baseline.json
+"""
+
+import argparse
+import asyncio
+import collections
+import pathlib
+import random
+import sys
+import time
+import typing
+
+import httpx
+
+from benchmarks import datagen
+from benchmarks.harness import Stats, write_results
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Sequence
+
+_PREFIX = '/api/v1/organizations'
+
+
+def requests(dataset: datagen.DatasetConfig) -> list[tuple[str, str, dict[str, typing.Any]]]:
+    """(route, path, query params) of the request mix; timings are grouped by route."""
+    lon, lat = datagen.query_point(dataset, 'dense')
+    edge_lon, edge_lat = datagen.query_point(dataset, 'sparse')
+    ll_lon, ll_lat = datagen.offset((lon, lat), -1_000, -1_000)
+    ur_lon, ur_lat = datagen.offset((lon, lat), 1_000, 1_000)
+    ranked = datagen.specialization_popularity(dataset)
+    return [
+        ('/{organization_id}', f'{_PREFIX}/{dataset.organizations // 2}', {}),
+        ('/building/{building_id}', f'{_PREFIX}/building/1', {}),
+        ('/building', f'{_PREFIX}/building', {'address': 'Main St'}),
+        ('?name', _PREFIX, {'name': 'Alpha'}),
+        ('/specs', f'{_PREFIX}/specs', {'specs': ranked[:2]}),
+        ('/specs', f'{_PREFIX}/specs', {'specs': ranked[-2:], 'match': 'any'}),
+        ('/radius', f'{_PREFIX}/radius', {'lon': lon, 'lat': lat, 'radius_m': 1_000}),
+        ('/radius', f'{_PREFIX}/radius', {'lon': edge_lon, 'lat': edge_lat, 'radius_m': 5_000, 'total': 'estimate'}),
+        ('/radius', f'{_PREFIX}/radius', {'lon': lon, 'lat': lat, 'radius_m': 5_000, 'facets': 'estimate'}),
+        ('/box', f'{_PREFIX}/box', {'ll_lon': ll_lon, 'll_lat': ll_lat, 'ur_lon': ur_lon, 'ur_lat': ur_lat}),
+        ('/radius?mode=cells', f'{_PREFIX}/radius', {'lon': lon, 'lat': lat, 'radius_m': 1_000, 'mode': 'cells'}),
+    ]
+
+
+async def run(
+    client: httpx.AsyncClient,
+    mix: 'Sequence[tuple[str, str, dict[str, typing.Any]]]',
+    duration: float,
+    concurrency: int,
+) -> tuple[dict[str, list[float]], int]:
+    timings: dict[str, list[float]] = collections.defaultdict(list)
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(seed: int) -> None:
+        nonlocal errors
+        rng = random.Random(seed)  # noqa: S311
+        while time.perf_counter() < deadline:
+            route, path, params = rng.choice(mix)
+            start = time.perf_counter()
+            response = await client.get(path, params=params)
+            timings[route].append(time.perf_counter() - start)
+            if response.is_error:
+                errors += 1
+
+    await asyncio.gather(*(worker(seed) for seed in range(concurrency)))
+    return timings, errors
+
+
+async def main(argv: 'Sequence[str] | None' = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Base URL of a running server; the app is driven in-process when omitted')
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--organizations', type=int, default=datagen.DatasetConfig.organizations)
+    parser.add_argument('--buildings', type=int, default=datagen.DatasetConfig.buildings)
+    parser.add_argument('--seed', type=int, default=datagen.DatasetConfig.seed)
+    parser.add_argument('--json', type=pathlib.Path, help='Write results to this JSON baseline')
+    args = parser.parse_args(argv)
+
+    dataset = datagen.DatasetConfig(organizations=args.organizations, buildings=args.buildings, seed=args.seed)
+    if args.url is None:
+        from src.app import app  # noqa: PLC0415
+
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url='http://bench')
+    else:
+        client = httpx.AsyncClient(base_url=args.url, limits=httpx.Limits(max_connections=args.concurrency))
+
+    async with client:
+        timings, errors = await run(client, requests(dataset), args.duration, args.concurrency)
+
+    results = {route: Stats.from_timings(route_timings) for route, route_timings in timings.items()}
+    count = sum(stats.rounds for stats in results.values())
+    width = max(map(len, results), default=0)
+    sys.stdout.write(f'{count / args.duration:.1f} req/s, {errors} errors\n')
+    for route, stats in sorted(results.items()):
+        sys.stdout.write(f'{route:<{width}} median {stats.median:8.2f} ms  p95 {stats.p95:8.2f} ms\n')
+    if args.json is not None:
+        write_results(
+            args.json,
+            'http',
+            results,
+            dataset=dataset.name,
+            requests_per_second=count / args.duration,
+            concurrency=args.concurrency,
+        )
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,182 @@
+"""Query plan snapshots of every repository method over a matrix of parameters.
+
+Runs each case against the benchmark database, captures the statements it executes and stores their normalised
+`EXPLAIN (FORMAT JSON)` plans. A later run fails when a plan's node types change or its estimated cost grows by more
+than the threshold; rerun with `--update` to accept the new plans.
+
+    python -m benchmarks.plans --organizations 1000000 --buildings 100000
+    python -m benchmarks.plans --organizations 1000000 --buildings 100000 --update
+"""
+
+import argparse
+import asyncio
+import json
+import pathlib
+import sys
+import typing
+
+from sqlalchemy import event
+from sqlalchemy.ext import asyncio as async_sa
+
+from benchmarks import datagen
+from benchmarks.database import ensure_database
+from src import schemas
+from src.repositories import OrganizationRepository
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Sequence
+
+SNAPSHOTS = pathlib.Path(__file__).parent / 'plans'
+
+# What makes up a plan's shape; costs and row estimates are compared separately
+_SHAPE_KEYS = ('Node Type', 'Strategy', 'Join Type', 'Relation Name', 'Index Name', 'Parent Relationship')
+
+type Plan = dict[str, typing.Any]
+
+
+def cases(dataset: datagen.DatasetConfig) -> dict[str, tuple[str, dict[str, typing.Any]]]:
+    """Repository method and its arguments, by case name."""
+    ranked = datagen.specialization_popularity(dataset)
+    matrix: dict[str, tuple[str, dict[str, typing.Any]]] = {
+        'id': ('get_by_id', {'organization_id': dataset.organizations // 2}),
+        'building_id': ('get_by_building_id', {'building_id': 1}),
+        'address/short': ('get_by_building_address', {'address': 'Main'}),
+        'address/long': ('get_by_building_address', {'address': '42 Main St'}),
+        'name/short': ('get_by_name', {'name': 'Alpha'}),
+        'name/long': ('get_by_name', {'name': 'Alpha Blue Foods'}),
+    }
+    for popularity, specs in (('common', ranked[:2]), ('rare', ranked[-2:])):
+        for match in schemas.SpecializationsMatch:
+            matrix[f'specs/{popularity}/{match}'] = ('get_by_specializations', {'specs': specs, 'match': match})
+    for area in ('dense', 'sparse'):
+        lon, lat = datagen.query_point(dataset, area)
+        for size, radius_m in (('small', 250), ('large', 5_000)):
+            matrix[f'radius/{size}/{area}'] = (
+                'get_by_building_location_radius',
+                {'latitude': lat, 'longitude': lon, 'radius_m': radius_m},
+            )
+            (ll_lon, ll_lat), (ur_lon, ur_lat) = (
+                datagen.offset((lon, lat), -radius_m, -radius_m),
+                datagen.offset((lon, lat), radius_m, radius_m),
+            )
+            matrix[f'box/{size}/{area}'] = (
+                'get_by_building_location_box',
+                {'ll_latitude': ll_lat, 'll_longitude': ll_lon, 'ur_latitude': ur_lat, 'ur_longitude': ur_lon},
+            )
+    # Without a cell cache, so the cells' query runs every time
+    for case in ('radius/small/dense', 'box/small/dense'):
+        method, kwargs = matrix[case]
+        matrix[f'{case}/cells'] = (method, {**kwargs, 'mode': schemas.SpatialMode.CELLS})
+    method, kwargs = matrix['radius/large/dense']
+    for mode in schemas.CountMode:
+        matrix[f'radius/large/dense/facets_{mode}'] = (method, {**kwargs, 'facets': mode})
+        matrix[f'radius/large/dense/total_{mode}'] = (method, {**kwargs, 'total': mode})
+    return matrix
+
+
+def normalize(plan: Plan) -> Plan:
+    """Plan tree reduced to the node attributes that define its shape."""
+    node = {key: plan[key] for key in _SHAPE_KEYS if key in plan}
+    if children := plan.get('Plans'):
+        node['Plans'] = [normalize(child) for child in children]
+    return node
+
+
+def render(plan: Plan) -> str:
+    """One-line outline of a normalised plan, e.g. `Limit(Index Scan[ix_name])`."""
+    label = plan['Node Type']
+    if target := plan.get('Index Name') or plan.get('Relation Name'):
+        label += f'[{target}]'
+    if children := plan.get('Plans'):
+        label += f'({", ".join(map(render, children))})'
+    return label
+
+
+async def explain_case(
+    engine: async_sa.AsyncEngine, method: str, kwargs: dict[str, typing.Any]
+) -> list[dict[str, typing.Any]]:
+    """Snapshots of the plans of the statements a repository call executes, in order."""
+    statements: list[tuple[str, typing.Any]] = []
+
+    def record(_conn: object, _cursor: object, statement: str, parameters: typing.Any, *_: typing.Any) -> None:  # noqa: ANN401
+        # The repository's own planner estimates aren't plans worth snapshotting
+        if not statement.lstrip().upper().startswith('EXPLAIN'):
+            statements.append((statement, parameters))
+
+    async with async_sa.async_sessionmaker(engine)() as session:
+        event.listen(engine.sync_engine, 'before_cursor_execute', record)
+        try:
+            await getattr(OrganizationRepository(session=session), method)(**kwargs)
+        finally:
+            event.remove(engine.sync_engine, 'before_cursor_execute', record)
+
+        conn = await session.connection()
+        snapshots: list[dict[str, typing.Any]] = []
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters)
+            plan = result.scalar_one()
+            root: Plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]['Plan']
+            snapshots.append(
+                {
+                    'statement': statement,
+                    'cost': root['Total Cost'],
+                    'rows': root['Plan Rows'],
+                    'plan': normalize(root),
+                }
+            )
+    return snapshots
+
+
+def compare(
+    base: dict[str, list[dict[str, typing.Any]]], new: dict[str, list[dict[str, typing.Any]]], threshold: float
+) -> list[str]:
+    """Regressions of `new` against the `base` snapshots."""
+    regressions: list[str] = []
+    for name in sorted(base.keys() & new.keys()):
+        before, after = base[name], new[name]
+        if len(before) != len(after):
+            regressions.append(f'{name}: runs {len(after)} statements instead of {len(before)}')
+            continue
+        for index, (old, current) in enumerate(zip(before, after, strict=True)):
+            if old['plan'] != current['plan']:
+                regressions.append(
+                    f'{name}[{index}]: plan changed\n    - {render(old["plan"])}\n    + {render(current["plan"])}'
+                )
+            elif current['cost'] > old['cost'] * (1 + threshold):
+                regressions.append(f'{name}[{index}]: estimated cost {old["cost"]:.1f} -> {current["cost"]:.1f}')
+    regressions.extend(f'{name}: no longer covered' for name in sorted(base.keys() - new.keys()))
+    return regressions
+
+
+async def main(argv: 'Sequence[str] | None' = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--organizations', type=int, default=datagen.DatasetConfig.organizations)
+    parser.add_argument('--buildings', type=int, default=datagen.DatasetConfig.buildings)
+    parser.add_argument('--seed', type=int, default=datagen.DatasetConfig.seed)
+    parser.add_argument('--rebuild', action='store_true', help='Regenerate the dataset even if its database exists')
+    parser.add_argument('--update', action='store_true', help='Overwrite the snapshots with the current plans')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed relative growth of estimated costs')
+    args = parser.parse_args(argv)
+
+    dataset = datagen.DatasetConfig(organizations=args.organizations, buildings=args.buildings, seed=args.seed)
+    engine = async_sa.create_async_engine(await ensure_database(dataset, rebuild=args.rebuild))
+    try:
+        current = {name: await explain_case(engine, *case) for name, case in cases(dataset).items()}
+    finally:
+        await engine.dispose()
+
+    path = SNAPSHOTS / f'{dataset.name}.json'
+    if args.update or not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(current, indent=2) + '\n')
+        sys.stdout.write(f'Wrote {len(current)} plan snapshots to {path}\n')
+        return 0
+
+    regressions = compare(json.loads(path.read_text()), current, args.threshold)
+    sys.stdout.writelines(f'{regression}\n' for regression in regressions)
+    sys.stdout.write(f'{len(current)} cases, {len(regressions)} regressions\n')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,87 @@
+import pytest
+
+from benchmarks import datagen
+from benchmarks.harness import Benchmark
+from src import schemas
+from src.repositories import OrganizationRepository
+
+
+async def test_get_by_id(benchmark: Benchmark, repository: OrganizationRepository, dataset: datagen.DatasetConfig):
+    await benchmark(repository.get_by_id, organization_id=dataset.organizations // 2)
+
+
+async def test_get_by_building_id(benchmark: Benchmark, repository: OrganizationRepository):
+    await benchmark(repository.get_by_building_id, building_id=1)
+
+
+@pytest.mark.parametrize('address', ['Main', 'Main St', '42 Main St'])
+async def test_get_by_building_address(benchmark: Benchmark, repository: OrganizationRepository, address: str):
+    await benchmark(repository.get_by_building_address, address=address)
+
+
+@pytest.mark.parametrize('name', ['Alpha', 'Alpha Foods'])
+async def test_get_by_name(benchmark: Benchmark, repository: OrganizationRepository, name: str):
+    await benchmark(repository.get_by_name, name=name)
+
+
+@pytest.mark.parametrize('match', list(schemas.SpecializationsMatch))
+@pytest.mark.parametrize('popularity', ['popular', 'rare', 'mixed'])
+async def test_get_by_specializations(
+    benchmark: Benchmark,
+    repository: OrganizationRepository,
+    dataset: datagen.DatasetConfig,
+    popularity: str,
+    match: schemas.SpecializationsMatch,
+):
+    ranked = datagen.specialization_popularity(dataset)
+    specs = {'popular': ranked[:2], 'rare': ranked[-2:], 'mixed': [ranked[0], ranked[-1]]}[popularity]
+    await benchmark(repository.get_by_specializations, specs=specs, match=match)
+
+
+@pytest.mark.parametrize('radius_m', [250, 1_000, 5_000])
+@pytest.mark.parametrize('area', ['dense', 'sparse'])
+async def test_get_by_building_location_radius(
+    benchmark: Benchmark, repository: OrganizationRepository, dataset: datagen.DatasetConfig, area: str, radius_m: int
+):
+    lon, lat = datagen.query_point(dataset, area)
+    await benchmark(repository.get_by_building_location_radius, latitude=lat, longitude=lon, radius_m=radius_m)
+
+
+@pytest.mark.parametrize('half_side_m', [250, 2_500])
+@pytest.mark.parametrize('area', ['dense', 'sparse'])
+async def test_get_by_building_location_box(
+    benchmark: Benchmark,
+    repository: OrganizationRepository,
+    dataset: datagen.DatasetConfig,
+    area: str,
+    half_side_m: int,
+):
+    ll_lon, ll_lat = datagen.offset(datagen.query_point(dataset, area), -half_side_m, -half_side_m)
+    ur_lon, ur_lat = datagen.offset(datagen.query_point(dataset, area), half_side_m, half_side_m)
+    await benchmark(
+        repository.get_by_building_location_box,
+        ll_latitude=ll_lat,
+        ll_longitude=ll_lon,
+        ur_latitude=ur_lat,
+        ur_longitude=ur_lon,
+    )
+
+
+@pytest.mark.parametrize('total', [None, *schemas.CountMode])
+@pytest.mark.parametrize('facets', [None, *schemas.CountMode])
+async def test_counts(
+    benchmark: Benchmark,
+    repository: OrganizationRepository,
+    dataset: datagen.DatasetConfig,
+    facets: schemas.CountMode | None,
+    total: schemas.CountMode | None,
+):
+    lon, lat = datagen.query_point(dataset, 'dense')
+    await benchmark(
+        repository.get_by_building_location_radius,
+        latitude=lat,
+        longitude=lon,
+        radius_m=5_000,
+        facets=facets,
+        total=total,
+    )
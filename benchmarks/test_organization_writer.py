@@ -0,0 +1,49 @@
+import itertools
+
+import pytest
+
+from benchmarks import datagen
+from benchmarks.harness import Benchmark
+from src import schemas
+from src.repositories import OrganizationWriter
+
+
+def organizations(dataset: datagen.DatasetConfig, count: int) -> list[schemas.OrganizationWrite]:
+    """Return the dataset's first `count` organizations, as they were generated."""
+    return [
+        schemas.OrganizationWrite(
+            id=id_, name=name, phone=phone, building_id=building_id, specialization_ids=specialization_ids
+        )
+        for id_, name, phone, building_id, specialization_ids in itertools.islice(datagen.organizations(dataset), count)
+    ]
+
+
+def renamed(batch: list[schemas.OrganizationWrite]) -> list[schemas.OrganizationWrite]:
+    return [organization.model_copy(update={'name': f'{organization.name} (renamed)'}) for organization in batch]
+
+
+@pytest.mark.parametrize('batch_size', [1, 100, 1_000])
+async def test_upsert_unchanged(
+    benchmark: Benchmark, writer: OrganizationWriter, dataset: datagen.DatasetConfig, batch_size: int
+):
+    """Upserts of organizations as they already are, which skip their rows."""
+    benchmark.rows = batch_size
+    await benchmark(writer.upsert, organizations(dataset, batch_size))
+
+
+@pytest.mark.parametrize('batch_size', [1, 100, 1_000])
+async def test_upsert_changed(
+    benchmark: Benchmark, writer: OrganizationWriter, dataset: datagen.DatasetConfig, batch_size: int
+):
+    """Upserts renaming every organization of the batch, each round undoing the previous one."""
+    batches = itertools.cycle([renamed(organizations(dataset, batch_size)), organizations(dataset, batch_size)])
+
+    async def upsert() -> None:
+        await writer.upsert(next(batches))
+
+    benchmark.rows = batch_size
+    try:
+        await benchmark(upsert)
+    finally:
+        # Leaves the dataset as generated for later runs
+        await writer.upsert(organizations(dataset, batch_size))
@@ -6,21 +6,16 @@ from sqlalchemy import pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
+# Registers the reflection of PostGIS columns; the models use a lighter type of their own
+import geoalchemy2  # noqa: F401
 from alembic_utils.replaceable_entity import register_entities
 from alembic import context
 
-from src.db import models, functions, triggers
+from src.db import models
+from src.db.entities import ENTITIES
 from src.settings import settings
 
 target_metadata = models.Base.metadata
-ENTITIES = (
-    functions.check_specialization_depth,
-    triggers.trg_specialization_depth_check,
-    functions.ensure_org_has_building,
-    triggers.trg_ensure_org_has_building,
-    triggers.trg_building_update_search_vector,
-    triggers.trg_organizations_update_search_vector,
-)
 ENTITIES_NAMES = {entity.to_variable_name() for entity in ENTITIES}
 ENTITIES_TYPES = {'trigger', 'function'}
 ALWAYS_ALLOWED = {'column', 'index'}
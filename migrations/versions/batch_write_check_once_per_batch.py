@@ -0,0 +1,66 @@
+"""Check batch writes of organizations once per batch
+
+Revision ID: batch_write
+Revises: change_log
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+from alembic_utils.pg_function import PGFunction
+
+# revision identifiers, used by Alembic.
+revision: str = 'batch_write'
+down_revision: str | Sequence[str] | None = 'change_log'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    public_ensure_orgs_have_buildings = PGFunction(
+        schema='public',
+        signature='ensure_orgs_have_buildings(organization_ids integer[])',
+        definition="RETURNS void AS $$\n        DECLARE\n            missing integer;\n        BEGIN\n            SELECT o.id INTO missing\n            FROM organizations o\n            WHERE o.id = ANY(organization_ids)\n                AND NOT EXISTS (SELECT 1 FROM organization_buildings ob WHERE ob.organization_id = o.id)\n            LIMIT 1;\n            IF FOUND THEN\n                RAISE EXCEPTION 'Organization (id=%) must have at least one building', missing;\n            END IF;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.create_entity(public_ensure_orgs_have_buildings)
+
+    public_ensure_org_has_building = PGFunction(
+        schema='public',
+        signature='ensure_org_has_building()',
+        definition="RETURNS TRIGGER AS $$\n        BEGIN\n            -- Batch writes check their organizations at once with ensure_orgs_have_buildings()\n            IF current_setting('catalogue.batch_write', true) = 'on' THEN\n                RETURN NEW;\n            END IF;\n            IF NOT EXISTS (\n                SELECT 1\n                FROM organization_buildings ob\n                WHERE ob.organization_id = NEW.id\n            ) THEN\n                RAISE EXCEPTION 'Organization (id=%) must have at least one building', NEW.id;\n            END IF;\n            RETURN NEW;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.replace_entity(public_ensure_org_has_building)
+
+    public_sync_organization_read_models = PGFunction(
+        schema='public',
+        signature='sync_organization_read_models()',
+        definition="RETURNS TRIGGER AS $$\n        DECLARE\n            row_ids integer[];\n        BEGIN\n            -- Batch writes refresh the read models of their organizations at once\n            IF current_setting('catalogue.batch_write', true) = 'on' THEN\n                RETURN NULL;\n            END IF;\n\n            -- Ids of the changed rows, both before and after the change\n            row_ids := ARRAY(\n                SELECT DISTINCT (r ->> CASE\n                    WHEN TG_TABLE_NAME IN ('organization_buildings', 'organization_specializations')\n                        THEN 'organization_id'\n                    ELSE 'id'\n                END)::integer\n                FROM unnest(ARRAY[to_jsonb(NEW), to_jsonb(OLD)]) r\n                WHERE r IS NOT NULL\n            );\n\n            PERFORM refresh_organization_read_models(\n                CASE TG_TABLE_NAME\n                    WHEN 'buildings' THEN ARRAY(\n                        SELECT organization_id FROM organization_buildings WHERE building_id = ANY(row_ids)\n                    )\n                    WHEN 'specializations' THEN ARRAY(\n                        SELECT organization_id FROM organization_specializations WHERE specialization_id = ANY(row_ids)\n                    )\n                    ELSE row_ids\n                END\n            );\n            RETURN NULL;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.replace_entity(public_sync_organization_read_models)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    public_sync_organization_read_models = PGFunction(
+        schema='public',
+        signature='sync_organization_read_models()',
+        definition="RETURNS TRIGGER AS $$\n        DECLARE\n            row_ids integer[];\n        BEGIN\n            -- Ids of the changed rows, both before and after the change\n            row_ids := ARRAY(\n                SELECT DISTINCT (r ->> CASE\n                    WHEN TG_TABLE_NAME IN ('organization_buildings', 'organization_specializations')\n                        THEN 'organization_id'\n                    ELSE 'id'\n                END)::integer\n                FROM unnest(ARRAY[to_jsonb(NEW), to_jsonb(OLD)]) r\n                WHERE r IS NOT NULL\n            );\n\n            PERFORM refresh_organization_read_models(\n                CASE TG_TABLE_NAME\n                    WHEN 'buildings' THEN ARRAY(\n                        SELECT organization_id FROM organization_buildings WHERE building_id = ANY(row_ids)\n                    )\n                    WHEN 'specializations' THEN ARRAY(\n                        SELECT organization_id FROM organization_specializations WHERE specialization_id = ANY(row_ids)\n                    )\n                    ELSE row_ids\n                END\n            );\n            RETURN NULL;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.replace_entity(public_sync_organization_read_models)
+
+    public_ensure_org_has_building = PGFunction(
+        schema='public',
+        signature='ensure_org_has_building()',
+        definition="RETURNS TRIGGER AS $$\n        BEGIN\n            IF NOT EXISTS (\n                SELECT 1\n                FROM organization_buildings ob\n                WHERE ob.organization_id = NEW.id\n            ) THEN\n                RAISE EXCEPTION 'Organization (id=%) must have at least one building', NEW.id;\n            END IF;\n            RETURN NEW;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.replace_entity(public_ensure_org_has_building)
+
+    public_ensure_orgs_have_buildings = PGFunction(
+        schema='public',
+        signature='ensure_orgs_have_buildings(organization_ids integer[])',
+        definition="RETURNS void AS $$\n        DECLARE\n            missing integer;\n        BEGIN\n            SELECT o.id INTO missing\n            FROM organizations o\n            WHERE o.id = ANY(organization_ids)\n                AND NOT EXISTS (SELECT 1 FROM organization_buildings ob WHERE ob.organization_id = o.id)\n            LIMIT 1;\n            IF FOUND THEN\n                RAISE EXCEPTION 'Organization (id=%) must have at least one building', missing;\n            END IF;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.drop_entity(public_ensure_orgs_have_buildings)
@@ -0,0 +1,52 @@
+"""Mark batch writes with a temporary table rather than a setting
+
+Revision ID: batch_write_marker
+Revises: batch_write
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+from alembic_utils.pg_function import PGFunction
+
+# revision identifiers, used by Alembic.
+revision: str = 'batch_write_marker'
+down_revision: str | Sequence[str] | None = 'batch_write'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    public_ensure_org_has_building = PGFunction(
+        schema='public',
+        signature='ensure_org_has_building()',
+        definition="RETURNS TRIGGER AS $$\n        BEGIN\n            -- Batch writes check their organizations at once with ensure_orgs_have_buildings(). The table marking\n            -- them is created by OrganizationWriter in its transaction and dropped on commit, so nothing left on a\n            -- session can switch the check off\n            IF to_regclass('pg_temp.batch_write') IS NOT NULL THEN\n                RETURN NEW;\n            END IF;\n            IF NOT EXISTS (\n                SELECT 1\n                FROM organization_buildings ob\n                WHERE ob.organization_id = NEW.id\n            ) THEN\n                RAISE EXCEPTION 'Organization (id=%) must have at least one building', NEW.id;\n            END IF;\n            RETURN NEW;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.replace_entity(public_ensure_org_has_building)
+
+    public_sync_organization_read_models = PGFunction(
+        schema='public',
+        signature='sync_organization_read_models()',
+        definition="RETURNS TRIGGER AS $$\n        DECLARE\n            row_ids integer[];\n        BEGIN\n            -- Batch writes refresh the read models of their organizations at once; see ensure_org_has_building()\n            IF to_regclass('pg_temp.batch_write') IS NOT NULL THEN\n                RETURN NULL;\n            END IF;\n\n            -- Ids of the changed rows, both before and after the change\n            row_ids := ARRAY(\n                SELECT DISTINCT (r ->> CASE\n                    WHEN TG_TABLE_NAME IN ('organization_buildings', 'organization_specializations')\n                        THEN 'organization_id'\n                    ELSE 'id'\n                END)::integer\n                FROM unnest(ARRAY[to_jsonb(NEW), to_jsonb(OLD)]) r\n                WHERE r IS NOT NULL\n            );\n\n            PERFORM refresh_organization_read_models(\n                CASE TG_TABLE_NAME\n                    WHEN 'buildings' THEN ARRAY(\n                        SELECT organization_id FROM organization_buildings WHERE building_id = ANY(row_ids)\n                    )\n                    WHEN 'specializations' THEN ARRAY(\n                        SELECT organization_id FROM organization_specializations WHERE specialization_id = ANY(row_ids)\n                    )\n                    ELSE row_ids\n                END\n            );\n            RETURN NULL;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.replace_entity(public_sync_organization_read_models)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    public_sync_organization_read_models = PGFunction(
+        schema='public',
+        signature='sync_organization_read_models()',
+        definition="RETURNS TRIGGER AS $$\n        DECLARE\n            row_ids integer[];\n        BEGIN\n            -- Batch writes refresh the read models of their organizations at once\n            IF current_setting('catalogue.batch_write', true) = 'on' THEN\n                RETURN NULL;\n            END IF;\n\n            -- Ids of the changed rows, both before and after the change\n            row_ids := ARRAY(\n                SELECT DISTINCT (r ->> CASE\n                    WHEN TG_TABLE_NAME IN ('organization_buildings', 'organization_specializations')\n                        THEN 'organization_id'\n                    ELSE 'id'\n                END)::integer\n                FROM unnest(ARRAY[to_jsonb(NEW), to_jsonb(OLD)]) r\n                WHERE r IS NOT NULL\n            );\n\n            PERFORM refresh_organization_read_models(\n                CASE TG_TABLE_NAME\n                    WHEN 'buildings' THEN ARRAY(\n                        SELECT organization_id FROM organization_buildings WHERE building_id = ANY(row_ids)\n                    )\n                    WHEN 'specializations' THEN ARRAY(\n                        SELECT organization_id FROM organization_specializations WHERE specialization_id = ANY(row_ids)\n                    )\n                    ELSE row_ids\n                END\n            );\n            RETURN NULL;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.replace_entity(public_sync_organization_read_models)
+
+    public_ensure_org_has_building = PGFunction(
+        schema='public',
+        signature='ensure_org_has_building()',
+        definition="RETURNS TRIGGER AS $$\n        BEGIN\n            -- Batch writes check their organizations at once with ensure_orgs_have_buildings()\n            IF current_setting('catalogue.batch_write', true) = 'on' THEN\n                RETURN NEW;\n            END IF;\n            IF NOT EXISTS (\n                SELECT 1\n                FROM organization_buildings ob\n                WHERE ob.organization_id = NEW.id\n            ) THEN\n                RAISE EXCEPTION 'Organization (id=%) must have at least one building', NEW.id;\n            END IF;\n            RETURN NEW;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.replace_entity(public_ensure_org_has_building)
@@ -0,0 +1,170 @@
+"""Log changes of the catalogue tables
+
+Revision ID: change_log
+Revises: export_changes
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from alembic_utils.pg_function import PGFunction
+from alembic_utils.pg_trigger import PGTrigger
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'change_log'
+down_revision: str | Sequence[str] | None = 'export_changes'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'change_log',
+        sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+        sa.Column('seq', sa.BigInteger(), nullable=True),
+        sa.Column(
+            'xid', sa.BigInteger(), server_default=sa.text('pg_current_xact_id()::text::bigint'), nullable=False
+        ),
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('operation', sa.String(), nullable=False),
+        sa.Column('key', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('seq'),
+    )
+    op.create_index(
+        'ix_change_log_unpublished',
+        'change_log',
+        ['xid', 'id'],
+        unique=False,
+        postgresql_where=sa.text('seq IS NULL'),
+    )
+
+    public_log_change = PGFunction(
+        schema='public',
+        signature='log_change()',
+        definition="RETURNS TRIGGER AS $$\n        DECLARE\n            r jsonb := coalesce(to_jsonb(NEW), to_jsonb(OLD));\n        BEGIN\n            INSERT INTO change_log (table_name, operation, key)\n            VALUES (\n                TG_TABLE_NAME,\n                lower(TG_OP),\n                CASE TG_TABLE_NAME\n                    WHEN 'organization_buildings'\n                        THEN jsonb_build_object(\n                            'organization_id', r -> 'organization_id', 'building_id', r -> 'building_id'\n                        )\n                    WHEN 'organization_specializations'\n                        THEN jsonb_build_object(\n                            'organization_id', r -> 'organization_id', 'specialization_id', r -> 'specialization_id'\n                        )\n                    ELSE jsonb_build_object('id', r -> 'id')\n                END\n            );\n            -- Wakes long-polling consumers; sent on commit, once per transaction\n            PERFORM pg_notify('change_log', '');\n            RETURN NULL;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.create_entity(public_log_change)
+
+    public_publish_changes = PGFunction(
+        schema='public',
+        signature='publish_changes()',
+        definition="RETURNS bigint AS $$\n        DECLARE\n            published bigint;\n        BEGIN\n            -- One call numbers changes at a time, until its transaction ends, so no later call hands out a lower seq;\n            -- calls finding another one at work leave the changes to it\n            IF NOT pg_try_advisory_xact_lock(hashtext('publish_changes')) THEN\n                RETURN 0;\n            END IF;\n\n            WITH last AS (\n                SELECT coalesce(max(seq), 0) AS seq FROM change_log\n            ),\n            pending AS (\n                SELECT id, row_number() OVER (ORDER BY xid, id) AS n\n                FROM change_log\n                -- Transactions older than the snapshot's xmin are over, so they won't log anything more\n                WHERE seq IS NULL AND xid < pg_snapshot_xmin(pg_current_snapshot())::text::bigint\n            )\n            UPDATE change_log c\n            SET seq = last.seq + pending.n\n            FROM pending, last\n            WHERE c.id = pending.id;\n\n            GET DIAGNOSTICS published = ROW_COUNT;\n            RETURN published;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.create_entity(public_publish_changes)
+
+    public_organizations_trg_organizations_log_change = PGTrigger(
+        schema='public',
+        signature='trg_organizations_log_change',
+        on_entity='public.organizations',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON organizations\n        FOR EACH ROW\n        EXECUTE FUNCTION log_change()',
+    )
+    op.create_entity(public_organizations_trg_organizations_log_change)
+
+    public_buildings_trg_buildings_log_change = PGTrigger(
+        schema='public',
+        signature='trg_buildings_log_change',
+        on_entity='public.buildings',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON buildings\n        FOR EACH ROW\n        EXECUTE FUNCTION log_change()',
+    )
+    op.create_entity(public_buildings_trg_buildings_log_change)
+
+    public_specializations_trg_specializations_log_change = PGTrigger(
+        schema='public',
+        signature='trg_specializations_log_change',
+        on_entity='public.specializations',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON specializations\n        FOR EACH ROW\n        EXECUTE FUNCTION log_change()',
+    )
+    op.create_entity(public_specializations_trg_specializations_log_change)
+
+    public_organization_buildings_trg_organization_buildings_log_change = PGTrigger(
+        schema='public',
+        signature='trg_organization_buildings_log_change',
+        on_entity='public.organization_buildings',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON organization_buildings\n        FOR EACH ROW\n        EXECUTE FUNCTION log_change()',
+    )
+    op.create_entity(public_organization_buildings_trg_organization_buildings_log_change)
+
+    public_organization_specializations_trg_organization_specializations_log_change = PGTrigger(
+        schema='public',
+        signature='trg_organization_specializations_log_change',
+        on_entity='public.organization_specializations',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON organization_specializations\n        FOR EACH ROW\n        EXECUTE FUNCTION log_change()',
+    )
+    op.create_entity(public_organization_specializations_trg_organization_specializations_log_change)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    public_organization_specializations_trg_organization_specializations_log_change = PGTrigger(
+        schema='public',
+        signature='trg_organization_specializations_log_change',
+        on_entity='public.organization_specializations',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON organization_specializations\n        FOR EACH ROW\n        EXECUTE FUNCTION log_change()',
+    )
+    op.drop_entity(public_organization_specializations_trg_organization_specializations_log_change)
+
+    public_organization_buildings_trg_organization_buildings_log_change = PGTrigger(
+        schema='public',
+        signature='trg_organization_buildings_log_change',
+        on_entity='public.organization_buildings',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON organization_buildings\n        FOR EACH ROW\n        EXECUTE FUNCTION log_change()',
+    )
+    op.drop_entity(public_organization_buildings_trg_organization_buildings_log_change)
+
+    public_specializations_trg_specializations_log_change = PGTrigger(
+        schema='public',
+        signature='trg_specializations_log_change',
+        on_entity='public.specializations',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON specializations\n        FOR EACH ROW\n        EXECUTE FUNCTION log_change()',
+    )
+    op.drop_entity(public_specializations_trg_specializations_log_change)
+
+    public_buildings_trg_buildings_log_change = PGTrigger(
+        schema='public',
+        signature='trg_buildings_log_change',
+        on_entity='public.buildings',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON buildings\n        FOR EACH ROW\n        EXECUTE FUNCTION log_change()',
+    )
+    op.drop_entity(public_buildings_trg_buildings_log_change)
+
+    public_organizations_trg_organizations_log_change = PGTrigger(
+        schema='public',
+        signature='trg_organizations_log_change',
+        on_entity='public.organizations',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON organizations\n        FOR EACH ROW\n        EXECUTE FUNCTION log_change()',
+    )
+    op.drop_entity(public_organizations_trg_organizations_log_change)
+
+    public_publish_changes = PGFunction(
+        schema='public',
+        signature='publish_changes()',
+        definition="RETURNS bigint AS $$\n        DECLARE\n            published bigint;\n        BEGIN\n            -- One call numbers changes at a time, until its transaction ends, so no later call hands out a lower seq;\n            -- calls finding another one at work leave the changes to it\n            IF NOT pg_try_advisory_xact_lock(hashtext('publish_changes')) THEN\n                RETURN 0;\n            END IF;\n\n            WITH last AS (\n                SELECT coalesce(max(seq), 0) AS seq FROM change_log\n            ),\n            pending AS (\n                SELECT id, row_number() OVER (ORDER BY xid, id) AS n\n                FROM change_log\n                -- Transactions older than the snapshot's xmin are over, so they won't log anything more\n                WHERE seq IS NULL AND xid < pg_snapshot_xmin(pg_current_snapshot())::text::bigint\n            )\n            UPDATE change_log c\n            SET seq = last.seq + pending.n\n            FROM pending, last\n            WHERE c.id = pending.id;\n\n            GET DIAGNOSTICS published = ROW_COUNT;\n            RETURN published;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.drop_entity(public_publish_changes)
+
+    public_log_change = PGFunction(
+        schema='public',
+        signature='log_change()',
+        definition="RETURNS TRIGGER AS $$\n        DECLARE\n            r jsonb := coalesce(to_jsonb(NEW), to_jsonb(OLD));\n        BEGIN\n            INSERT INTO change_log (table_name, operation, key)\n            VALUES (\n                TG_TABLE_NAME,\n                lower(TG_OP),\n                CASE TG_TABLE_NAME\n                    WHEN 'organization_buildings'\n                        THEN jsonb_build_object(\n                            'organization_id', r -> 'organization_id', 'building_id', r -> 'building_id'\n                        )\n                    WHEN 'organization_specializations'\n                        THEN jsonb_build_object(\n                            'organization_id', r -> 'organization_id', 'specialization_id', r -> 'specialization_id'\n                        )\n                    ELSE jsonb_build_object('id', r -> 'id')\n                END\n            );\n            -- Wakes long-polling consumers; sent on commit, once per transaction\n            PERFORM pg_notify('change_log', '');\n            RETURN NULL;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.drop_entity(public_log_change)
+
+    op.drop_index('ix_change_log_unpublished', table_name='change_log', postgresql_where=sa.text('seq IS NULL'))
+    op.drop_table('change_log')
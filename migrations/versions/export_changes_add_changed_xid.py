@@ -0,0 +1,88 @@
+"""Add the last writing transaction of buildings and organization read models
+
+The column is added without a default, which only changes the catalog, and the default is set in a second step, which
+applies to new rows only; a volatile default on `ADD COLUMN` would rewrite both tables under an ACCESS EXCLUSIVE lock.
+Existing rows are left NULL rather than backfilled: they were last written before any incremental export, which only
+looks for rows written since the previous one.
+
+Revision ID: export_changes
+Revises: read_model_notify
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from alembic_utils.pg_function import PGFunction
+from alembic_utils.pg_trigger import PGTrigger
+
+# revision identifiers, used by Alembic.
+revision: str = 'export_changes'
+down_revision: str | Sequence[str] | None = 'read_model_notify'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('buildings', 'organization_read_models'):
+        op.add_column(table, sa.Column('changed_xid', sa.BigInteger(), nullable=True))
+        op.alter_column(table, 'changed_xid', server_default=sa.text('pg_current_xact_id()::text::bigint'))
+
+    public_touch_changed_xid = PGFunction(
+        schema='public',
+        signature='touch_changed_xid()',
+        definition='RETURNS TRIGGER AS $$\n        BEGIN\n            -- The 64-bit id, which never wraps around, so it compares with the xmin of later snapshots\n            NEW.changed_xid := pg_current_xact_id()::text::bigint;\n            RETURN NEW;\n        END;\n        $$ LANGUAGE plpgsql',
+    )
+    op.create_entity(public_touch_changed_xid)
+
+    public_buildings_trg_buildings_touch = PGTrigger(
+        schema='public',
+        signature='trg_buildings_touch',
+        on_entity='public.buildings',
+        is_constraint=False,
+        definition='BEFORE UPDATE ON buildings\n        FOR EACH ROW\n        EXECUTE FUNCTION touch_changed_xid()',
+    )
+    op.create_entity(public_buildings_trg_buildings_touch)
+
+    public_organization_read_models_trg_organization_read_models_touch = PGTrigger(
+        schema='public',
+        signature='trg_organization_read_models_touch',
+        on_entity='public.organization_read_models',
+        is_constraint=False,
+        definition='BEFORE UPDATE ON organization_read_models\n        FOR EACH ROW\n        EXECUTE FUNCTION touch_changed_xid()',
+    )
+    op.create_entity(public_organization_read_models_trg_organization_read_models_touch)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    public_organization_read_models_trg_organization_read_models_touch = PGTrigger(
+        schema='public',
+        signature='trg_organization_read_models_touch',
+        on_entity='public.organization_read_models',
+        is_constraint=False,
+        definition='BEFORE UPDATE ON organization_read_models\n        FOR EACH ROW\n        EXECUTE FUNCTION touch_changed_xid()',
+    )
+    op.drop_entity(public_organization_read_models_trg_organization_read_models_touch)
+
+    public_buildings_trg_buildings_touch = PGTrigger(
+        schema='public',
+        signature='trg_buildings_touch',
+        on_entity='public.buildings',
+        is_constraint=False,
+        definition='BEFORE UPDATE ON buildings\n        FOR EACH ROW\n        EXECUTE FUNCTION touch_changed_xid()',
+    )
+    op.drop_entity(public_buildings_trg_buildings_touch)
+
+    public_touch_changed_xid = PGFunction(
+        schema='public',
+        signature='touch_changed_xid()',
+        definition='RETURNS TRIGGER AS $$\n        BEGIN\n            -- The 64-bit id, which never wraps around, so it compares with the xmin of later snapshots\n            NEW.changed_xid := pg_current_xact_id()::text::bigint;\n            RETURN NEW;\n        END;\n        $$ LANGUAGE plpgsql',
+    )
+    op.drop_entity(public_touch_changed_xid)
+
+    op.drop_column('organization_read_models', 'changed_xid')
+    op.drop_column('buildings', 'changed_xid')
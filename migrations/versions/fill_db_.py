@@ -1,7 +1,7 @@
 """empty message
 
 Revision ID: fill_db
-Revises: search_vector
+Revises: batch_write_marker
 Create Date: 2025-10-28 14:08:05.763128
 
 """
@@ -11,12 +11,13 @@ from alembic import op
 
 # revision identifiers, used by Alembic.
 revision: str = 'fill_db'
-down_revision: str | Sequence[str] | None = 'search_vector'
+down_revision: str | Sequence[str] | None = 'batch_write_marker'
 branch_labels: str | Sequence[str] | None = ('dev',)
 depends_on: str | Sequence[str] | None = None
 
 
 def upgrade() -> None:
+    # Databases migrated before the schema revisions were moved below this one already have the rows
     op.execute("""
 -- Insert buildings
 INSERT INTO buildings (id, address, point) VALUES
@@ -31,7 +32,8 @@ INSERT INTO buildings (id, address, point) VALUES
     (9, '234 7th Ave', ST_POINT(-73.995669, 40.743825, 4326)),
     (10, '876 2nd Ave', ST_POINT(-73.969748, 40.750709, 4326)),
     (11, '543 8th Ave', ST_POINT(-73.992960, 40.754672, 4326)),
-    (12, '901 1st Ave', ST_POINT(-73.963894, 40.759832, 4326));
+    (12, '901 1st Ave', ST_POINT(-73.963894, 40.759832, 4326))
+ON CONFLICT DO NOTHING;
 """)
 
     op.execute("""
@@ -46,7 +48,8 @@ INSERT INTO organizations (id, name, phone) VALUES
     (7, 'Legal Consultancy Firm', '+1-555-0129'),
     (8, 'Research & Development Lab', '+1-555-0130'),
     (9, 'Digital Marketing Agency', '+1-555-0131'),
-    (10, 'Construction Solutions', '+1-555-0132');
+    (10, 'Construction Solutions', '+1-555-0132')
+ON CONFLICT DO NOTHING;
 """)
 
 
@@ -86,7 +89,8 @@ INSERT INTO specializations (id, name, parent_id) VALUES
     (22, 'Investment Management', 21),
     (23, 'Risk Assessment', NULL),
     (24, 'Corporate Finance', 21),
-    (25, 'Market Analysis', 23);
+    (25, 'Market Analysis', 23)
+ON CONFLICT DO NOTHING;
 """)
     op.execute("""
 -- Connect organizations with buildings (many-to-many)
@@ -110,7 +114,8 @@ INSERT INTO organization_buildings (organization_id, building_id) VALUES
     -- Digital Marketing Agency
     (9, 12),
     -- Construction Solutions 
-    (10, 1);
+    (10, 1)
+ON CONFLICT DO NOTHING;
 
 """)
 
@@ -136,7 +141,8 @@ INSERT INTO organization_specializations (organization_id, specialization_id) VA
     -- Digital Marketing Agency
     (9, 2), -- They do web development
     -- Construction Solutions
-    (10, 19), (10, 20); -- They do construction management and infrastructure
+    (10, 19), (10, 20) -- They do construction management and infrastructure
+ON CONFLICT DO NOTHING;
 """)
 
 
@@ -0,0 +1,90 @@
+"""Add geohash cells of buildings and organization read models
+
+Revision ID: geohash_cells
+Revises: spec_ids_gin
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from alembic_utils.pg_function import PGFunction
+from alembic_utils.pg_trigger import PGTrigger
+
+# revision identifiers, used by Alembic.
+revision: str = 'geohash_cells'
+down_revision: str | Sequence[str] | None = 'spec_ids_gin'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('buildings', sa.Column('geohash', sa.String(length=9, collation='C'), nullable=True))
+    op.add_column('organization_read_models', sa.Column('geohash', sa.String(length=9, collation='C'), nullable=True))
+
+    public_set_building_geohash = PGFunction(
+        schema='public',
+        signature='set_building_geohash()',
+        definition='RETURNS TRIGGER AS $$\n        BEGIN\n            NEW.geohash := ST_GeoHash(NEW.point::geometry, 9);\n            RETURN NEW;\n        END;\n        $$ LANGUAGE plpgsql',
+    )
+    op.create_entity(public_set_building_geohash)
+
+    public_buildings_trg_buildings_set_geohash = PGTrigger(
+        schema='public',
+        signature='trg_buildings_set_geohash',
+        on_entity='public.buildings',
+        is_constraint=False,
+        definition='BEFORE INSERT OR UPDATE OF point ON buildings\n        FOR EACH ROW\n        EXECUTE FUNCTION set_building_geohash()',
+    )
+    op.create_entity(public_buildings_trg_buildings_set_geohash)
+
+    public_refresh_organization_read_models = PGFunction(
+        schema='public',
+        signature='refresh_organization_read_models(organization_ids integer[])',
+        definition="RETURNS void AS $$\n            DELETE FROM organization_read_models rm\n            WHERE rm.organization_id = ANY(organization_ids)\n                AND NOT EXISTS (\n                    SELECT 1\n                    FROM organizations o\n                    JOIN organization_buildings ob ON ob.organization_id = o.id\n                    WHERE o.id = rm.organization_id\n                );\n\n            INSERT INTO organization_read_models (\n                organization_id, name, phone, building_id, address, point, lon, lat, geohash,\n                specialization_ids, payload, name_search_vector, address_search_vector\n            )\n            SELECT\n                o.id, o.name, o.phone, b.id, b.address, b.point, ST_X(b.point::geometry), ST_Y(b.point::geometry),\n                b.geohash, coalesce(s.ids, '{}'),\n                jsonb_build_object(\n                    'id', o.id,\n                    'name', o.name,\n                    'phone', o.phone,\n                    'building_id', b.id,\n                    'building_address', b.address,\n                    'building_coordinates', jsonb_build_array(ST_X(b.point::geometry), ST_Y(b.point::geometry)),\n                    'specializations', coalesce(s.items, '[]')\n                ),\n                o.search_vector,\n                b.search_vector\n            FROM organizations o\n            JOIN organization_buildings ob ON ob.organization_id = o.id\n            JOIN buildings b ON b.id = ob.building_id\n            LEFT JOIN LATERAL (\n                SELECT\n                    array_agg(sp.id ORDER BY sp.id) AS ids,\n                    jsonb_agg(\n                        jsonb_build_object('id', sp.id, 'name', sp.name, 'parent_id', sp.parent_id) ORDER BY sp.id\n                    ) AS items\n                FROM specializations sp\n                WHERE sp.id IN (\n                    SELECT os.specialization_id FROM organization_specializations os WHERE os.organization_id = o.id\n                )\n            ) s ON true\n            WHERE o.id = ANY(organization_ids)\n            ON CONFLICT (organization_id) DO UPDATE SET\n                name = EXCLUDED.name,\n                phone = EXCLUDED.phone,\n                building_id = EXCLUDED.building_id,\n                address = EXCLUDED.address,\n                point = EXCLUDED.point,\n                lon = EXCLUDED.lon,\n                lat = EXCLUDED.lat,\n                geohash = EXCLUDED.geohash,\n                specialization_ids = EXCLUDED.specialization_ids,\n                payload = EXCLUDED.payload,\n                name_search_vector = EXCLUDED.name_search_vector,\n                address_search_vector = EXCLUDED.address_search_vector;\n        $$ LANGUAGE sql",
+    )
+    op.replace_entity(public_refresh_organization_read_models)
+
+    # One set-based refresh instead of one per building from trg_buildings_sync_read_models
+    op.execute('ALTER TABLE buildings DISABLE TRIGGER trg_buildings_sync_read_models')
+    op.execute('UPDATE buildings SET geohash = ST_GeoHash(point::geometry, 9)')
+    op.execute('ALTER TABLE buildings ENABLE TRIGGER trg_buildings_sync_read_models')
+    op.execute('SELECT refresh_organization_read_models(ARRAY(SELECT id FROM organizations))')
+
+    op.alter_column('buildings', 'geohash', nullable=False)
+    op.alter_column('organization_read_models', 'geohash', nullable=False)
+    op.create_index('ix_organization_read_models_geohash', 'organization_read_models', ['geohash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_organization_read_models_geohash', table_name='organization_read_models')
+
+    public_refresh_organization_read_models = PGFunction(
+        schema='public',
+        signature='refresh_organization_read_models(organization_ids integer[])',
+        definition="RETURNS void AS $$\n            DELETE FROM organization_read_models rm\n            WHERE rm.organization_id = ANY(organization_ids)\n                AND NOT EXISTS (\n                    SELECT 1\n                    FROM organizations o\n                    JOIN organization_buildings ob ON ob.organization_id = o.id\n                    WHERE o.id = rm.organization_id\n                );\n\n            INSERT INTO organization_read_models (\n                organization_id, name, phone, building_id, address, point, lon, lat,\n                specialization_ids, payload, name_search_vector, address_search_vector\n            )\n            SELECT\n                o.id, o.name, o.phone, b.id, b.address, b.point, ST_X(b.point::geometry), ST_Y(b.point::geometry),\n                coalesce(s.ids, '{}'),\n                jsonb_build_object(\n                    'id', o.id,\n                    'name', o.name,\n                    'phone', o.phone,\n                    'building_id', b.id,\n                    'building_address', b.address,\n                    'building_coordinates', jsonb_build_array(ST_X(b.point::geometry), ST_Y(b.point::geometry)),\n                    'specializations', coalesce(s.items, '[]')\n                ),\n                o.search_vector,\n                b.search_vector\n            FROM organizations o\n            JOIN organization_buildings ob ON ob.organization_id = o.id\n            JOIN buildings b ON b.id = ob.building_id\n            LEFT JOIN LATERAL (\n                SELECT\n                    array_agg(sp.id ORDER BY sp.id) AS ids,\n                    jsonb_agg(\n                        jsonb_build_object('id', sp.id, 'name', sp.name, 'parent_id', sp.parent_id) ORDER BY sp.id\n                    ) AS items\n                FROM specializations sp\n                WHERE sp.id IN (\n                    SELECT os.specialization_id FROM organization_specializations os WHERE os.organization_id = o.id\n                )\n            ) s ON true\n            WHERE o.id = ANY(organization_ids)\n            ON CONFLICT (organization_id) DO UPDATE SET\n                name = EXCLUDED.name,\n                phone = EXCLUDED.phone,\n                building_id = EXCLUDED.building_id,\n                address = EXCLUDED.address,\n                point = EXCLUDED.point,\n                lon = EXCLUDED.lon,\n                lat = EXCLUDED.lat,\n                specialization_ids = EXCLUDED.specialization_ids,\n                payload = EXCLUDED.payload,\n                name_search_vector = EXCLUDED.name_search_vector,\n                address_search_vector = EXCLUDED.address_search_vector;\n        $$ LANGUAGE sql",
+    )
+    op.replace_entity(public_refresh_organization_read_models)
+
+    public_buildings_trg_buildings_set_geohash = PGTrigger(
+        schema='public',
+        signature='trg_buildings_set_geohash',
+        on_entity='public.buildings',
+        is_constraint=False,
+        definition='BEFORE INSERT OR UPDATE OF point ON buildings\n        FOR EACH ROW\n        EXECUTE FUNCTION set_building_geohash()',
+    )
+    op.drop_entity(public_buildings_trg_buildings_set_geohash)
+
+    public_set_building_geohash = PGFunction(
+        schema='public',
+        signature='set_building_geohash()',
+        definition='RETURNS TRIGGER AS $$\n        BEGIN\n            NEW.geohash := ST_GeoHash(NEW.point::geometry, 9);\n            RETURN NEW;\n        END;\n        $$ LANGUAGE plpgsql',
+    )
+    op.drop_entity(public_set_building_geohash)
+
+    op.drop_column('organization_read_models', 'geohash')
+    op.drop_column('buildings', 'geohash')
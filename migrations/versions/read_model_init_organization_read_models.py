@@ -0,0 +1,198 @@
+"""Init organization read models
+
+Revision ID: read_model
+Revises: search_vector
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import geoalchemy2
+import sqlalchemy as sa
+from alembic import op
+from alembic_utils.pg_function import PGFunction
+from alembic_utils.pg_trigger import PGTrigger
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'read_model'
+down_revision: str | Sequence[str] | None = 'search_vector'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'organization_read_models',
+        sa.Column('organization_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('phone', sa.String(), nullable=False),
+        sa.Column('building_id', sa.Integer(), nullable=False),
+        sa.Column('address', sa.String(), nullable=False),
+        sa.Column(
+            'point',
+            geoalchemy2.types.Geography(
+                geometry_type='POINT',
+                srid=4326,
+                dimension=2,
+                from_text='ST_GeogFromText',
+                name='geography',
+                nullable=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column('lon', sa.Float(), nullable=False),
+        sa.Column('lat', sa.Float(), nullable=False),
+        sa.Column('specialization_ids', postgresql.ARRAY(sa.Integer()), server_default='{}', nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('name_search_vector', postgresql.TSVECTOR(), nullable=True),
+        sa.Column('address_search_vector', postgresql.TSVECTOR(), nullable=True),
+        sa.PrimaryKeyConstraint('organization_id'),
+    )
+    op.create_index(
+        'ix_organization_read_models_address_search_vector',
+        'organization_read_models',
+        ['address_search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+    op.create_index(
+        'ix_organization_read_models_building_id', 'organization_read_models', ['building_id'], unique=False
+    )
+    op.create_index(
+        'ix_organization_read_models_name_search_vector',
+        'organization_read_models',
+        ['name_search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+    public_refresh_organization_read_models = PGFunction(
+        schema='public',
+        signature='refresh_organization_read_models(organization_ids integer[])',
+        definition="RETURNS void AS $$\n            DELETE FROM organization_read_models rm\n            WHERE rm.organization_id = ANY(organization_ids)\n                AND NOT EXISTS (\n                    SELECT 1\n                    FROM organizations o\n                    JOIN organization_buildings ob ON ob.organization_id = o.id\n                    WHERE o.id = rm.organization_id\n                );\n\n            INSERT INTO organization_read_models (\n                organization_id, name, phone, building_id, address, point, lon, lat,\n                specialization_ids, payload, name_search_vector, address_search_vector\n            )\n            SELECT\n                o.id, o.name, o.phone, b.id, b.address, b.point, ST_X(b.point::geometry), ST_Y(b.point::geometry),\n                coalesce(s.ids, '{}'),\n                jsonb_build_object(\n                    'id', o.id,\n                    'name', o.name,\n                    'phone', o.phone,\n                    'building_id', b.id,\n                    'building_address', b.address,\n                    'building_coordinates', jsonb_build_array(ST_X(b.point::geometry), ST_Y(b.point::geometry)),\n                    'specializations', coalesce(s.items, '[]')\n                ),\n                o.search_vector,\n                b.search_vector\n            FROM organizations o\n            JOIN organization_buildings ob ON ob.organization_id = o.id\n            JOIN buildings b ON b.id = ob.building_id\n            LEFT JOIN LATERAL (\n                SELECT\n                    array_agg(sp.id ORDER BY sp.id) AS ids,\n                    jsonb_agg(\n                        jsonb_build_object('id', sp.id, 'name', sp.name, 'parent_id', sp.parent_id) ORDER BY sp.id\n                    ) AS items\n                FROM specializations sp\n                WHERE sp.id IN (\n                    SELECT os.specialization_id FROM organization_specializations os WHERE os.organization_id = o.id\n                )\n            ) s ON true\n            WHERE o.id = ANY(organization_ids)\n            ON CONFLICT (organization_id) DO UPDATE SET\n                name = EXCLUDED.name,\n                phone = EXCLUDED.phone,\n                building_id = EXCLUDED.building_id,\n                address = EXCLUDED.address,\n                point = EXCLUDED.point,\n                lon = EXCLUDED.lon,\n                lat = EXCLUDED.lat,\n                specialization_ids = EXCLUDED.specialization_ids,\n                payload = EXCLUDED.payload,\n                name_search_vector = EXCLUDED.name_search_vector,\n                address_search_vector = EXCLUDED.address_search_vector;\n        $$ LANGUAGE sql",
+    )
+    op.create_entity(public_refresh_organization_read_models)
+
+    public_sync_organization_read_models = PGFunction(
+        schema='public',
+        signature='sync_organization_read_models()',
+        definition="RETURNS TRIGGER AS $$\n        DECLARE\n            row_ids integer[];\n        BEGIN\n            -- Ids of the changed rows, both before and after the change\n            row_ids := ARRAY(\n                SELECT DISTINCT (r ->> CASE\n                    WHEN TG_TABLE_NAME IN ('organization_buildings', 'organization_specializations')\n                        THEN 'organization_id'\n                    ELSE 'id'\n                END)::integer\n                FROM unnest(ARRAY[to_jsonb(NEW), to_jsonb(OLD)]) r\n                WHERE r IS NOT NULL\n            );\n\n            PERFORM refresh_organization_read_models(\n                CASE TG_TABLE_NAME\n                    WHEN 'buildings' THEN ARRAY(\n                        SELECT organization_id FROM organization_buildings WHERE building_id = ANY(row_ids)\n                    )\n                    WHEN 'specializations' THEN ARRAY(\n                        SELECT organization_id FROM organization_specializations WHERE specialization_id = ANY(row_ids)\n                    )\n                    ELSE row_ids\n                END\n            );\n            RETURN NULL;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.create_entity(public_sync_organization_read_models)
+
+    public_organizations_trg_organizations_sync_read_models = PGTrigger(
+        schema='public',
+        signature='trg_organizations_sync_read_models',
+        on_entity='public.organizations',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON organizations\n        FOR EACH ROW\n        EXECUTE FUNCTION sync_organization_read_models()',
+    )
+    op.create_entity(public_organizations_trg_organizations_sync_read_models)
+
+    public_organization_buildings_trg_organization_buildings_sync_read_models = PGTrigger(
+        schema='public',
+        signature='trg_organization_buildings_sync_read_models',
+        on_entity='public.organization_buildings',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON organization_buildings\n        FOR EACH ROW\n        EXECUTE FUNCTION sync_organization_read_models()',
+    )
+    op.create_entity(public_organization_buildings_trg_organization_buildings_sync_read_models)
+
+    public_organization_specializations_trg_organization_specializations_sync_read_models = PGTrigger(
+        schema='public',
+        signature='trg_organization_specializations_sync_read_models',
+        on_entity='public.organization_specializations',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON organization_specializations\n        FOR EACH ROW\n        EXECUTE FUNCTION sync_organization_read_models()',
+    )
+    op.create_entity(public_organization_specializations_trg_organization_specializations_sync_read_models)
+
+    public_buildings_trg_buildings_sync_read_models = PGTrigger(
+        schema='public',
+        signature='trg_buildings_sync_read_models',
+        on_entity='public.buildings',
+        is_constraint=False,
+        definition='AFTER UPDATE OR DELETE ON buildings\n        FOR EACH ROW\n        EXECUTE FUNCTION sync_organization_read_models()',
+    )
+    op.create_entity(public_buildings_trg_buildings_sync_read_models)
+
+    public_specializations_trg_specializations_sync_read_models = PGTrigger(
+        schema='public',
+        signature='trg_specializations_sync_read_models',
+        on_entity='public.specializations',
+        is_constraint=False,
+        definition='AFTER UPDATE OR DELETE ON specializations\n        FOR EACH ROW\n        EXECUTE FUNCTION sync_organization_read_models()',
+    )
+    op.create_entity(public_specializations_trg_specializations_sync_read_models)
+
+    op.execute('SELECT refresh_organization_read_models(ARRAY(SELECT id FROM organizations))')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    public_specializations_trg_specializations_sync_read_models = PGTrigger(
+        schema='public',
+        signature='trg_specializations_sync_read_models',
+        on_entity='public.specializations',
+        is_constraint=False,
+        definition='AFTER UPDATE OR DELETE ON specializations\n        FOR EACH ROW\n        EXECUTE FUNCTION sync_organization_read_models()',
+    )
+    op.drop_entity(public_specializations_trg_specializations_sync_read_models)
+
+    public_buildings_trg_buildings_sync_read_models = PGTrigger(
+        schema='public',
+        signature='trg_buildings_sync_read_models',
+        on_entity='public.buildings',
+        is_constraint=False,
+        definition='AFTER UPDATE OR DELETE ON buildings\n        FOR EACH ROW\n        EXECUTE FUNCTION sync_organization_read_models()',
+    )
+    op.drop_entity(public_buildings_trg_buildings_sync_read_models)
+
+    public_organization_specializations_trg_organization_specializations_sync_read_models = PGTrigger(
+        schema='public',
+        signature='trg_organization_specializations_sync_read_models',
+        on_entity='public.organization_specializations',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON organization_specializations\n        FOR EACH ROW\n        EXECUTE FUNCTION sync_organization_read_models()',
+    )
+    op.drop_entity(public_organization_specializations_trg_organization_specializations_sync_read_models)
+
+    public_organization_buildings_trg_organization_buildings_sync_read_models = PGTrigger(
+        schema='public',
+        signature='trg_organization_buildings_sync_read_models',
+        on_entity='public.organization_buildings',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON organization_buildings\n        FOR EACH ROW\n        EXECUTE FUNCTION sync_organization_read_models()',
+    )
+    op.drop_entity(public_organization_buildings_trg_organization_buildings_sync_read_models)
+
+    public_organizations_trg_organizations_sync_read_models = PGTrigger(
+        schema='public',
+        signature='trg_organizations_sync_read_models',
+        on_entity='public.organizations',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON organizations\n        FOR EACH ROW\n        EXECUTE FUNCTION sync_organization_read_models()',
+    )
+    op.drop_entity(public_organizations_trg_organizations_sync_read_models)
+
+    public_sync_organization_read_models = PGFunction(
+        schema='public',
+        signature='sync_organization_read_models()',
+        definition="RETURNS TRIGGER AS $$\n        DECLARE\n            row_ids integer[];\n        BEGIN\n            -- Ids of the changed rows, both before and after the change\n            row_ids := ARRAY(\n                SELECT DISTINCT (r ->> CASE\n                    WHEN TG_TABLE_NAME IN ('organization_buildings', 'organization_specializations')\n                        THEN 'organization_id'\n                    ELSE 'id'\n                END)::integer\n                FROM unnest(ARRAY[to_jsonb(NEW), to_jsonb(OLD)]) r\n                WHERE r IS NOT NULL\n            );\n\n            PERFORM refresh_organization_read_models(\n                CASE TG_TABLE_NAME\n                    WHEN 'buildings' THEN ARRAY(\n                        SELECT organization_id FROM organization_buildings WHERE building_id = ANY(row_ids)\n                    )\n                    WHEN 'specializations' THEN ARRAY(\n                        SELECT organization_id FROM organization_specializations WHERE specialization_id = ANY(row_ids)\n                    )\n                    ELSE row_ids\n                END\n            );\n            RETURN NULL;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.drop_entity(public_sync_organization_read_models)
+
+    public_refresh_organization_read_models = PGFunction(
+        schema='public',
+        signature='refresh_organization_read_models(organization_ids integer[])',
+        definition="RETURNS void AS $$\n            DELETE FROM organization_read_models rm\n            WHERE rm.organization_id = ANY(organization_ids)\n                AND NOT EXISTS (\n                    SELECT 1\n                    FROM organizations o\n                    JOIN organization_buildings ob ON ob.organization_id = o.id\n                    WHERE o.id = rm.organization_id\n                );\n\n            INSERT INTO organization_read_models (\n                organization_id, name, phone, building_id, address, point, lon, lat,\n                specialization_ids, payload, name_search_vector, address_search_vector\n            )\n            SELECT\n                o.id, o.name, o.phone, b.id, b.address, b.point, ST_X(b.point::geometry), ST_Y(b.point::geometry),\n                coalesce(s.ids, '{}'),\n                jsonb_build_object(\n                    'id', o.id,\n                    'name', o.name,\n                    'phone', o.phone,\n                    'building_id', b.id,\n                    'building_address', b.address,\n                    'building_coordinates', jsonb_build_array(ST_X(b.point::geometry), ST_Y(b.point::geometry)),\n                    'specializations', coalesce(s.items, '[]')\n                ),\n                o.search_vector,\n                b.search_vector\n            FROM organizations o\n            JOIN organization_buildings ob ON ob.organization_id = o.id\n            JOIN buildings b ON b.id = ob.building_id\n            LEFT JOIN LATERAL (\n                SELECT\n                    array_agg(sp.id ORDER BY sp.id) AS ids,\n                    jsonb_agg(\n                        jsonb_build_object('id', sp.id, 'name', sp.name, 'parent_id', sp.parent_id) ORDER BY sp.id\n                    ) AS items\n                FROM specializations sp\n                WHERE sp.id IN (\n                    SELECT os.specialization_id FROM organization_specializations os WHERE os.organization_id = o.id\n                )\n            ) s ON true\n            WHERE o.id = ANY(organization_ids)\n            ON CONFLICT (organization_id) DO UPDATE SET\n                name = EXCLUDED.name,\n                phone = EXCLUDED.phone,\n                building_id = EXCLUDED.building_id,\n                address = EXCLUDED.address,\n                point = EXCLUDED.point,\n                lon = EXCLUDED.lon,\n                lat = EXCLUDED.lat,\n                specialization_ids = EXCLUDED.specialization_ids,\n                payload = EXCLUDED.payload,\n                name_search_vector = EXCLUDED.name_search_vector,\n                address_search_vector = EXCLUDED.address_search_vector;\n        $$ LANGUAGE sql",
+    )
+    op.drop_entity(public_refresh_organization_read_models)
+
+    op.drop_index('ix_organization_read_models_name_search_vector', table_name='organization_read_models')
+    op.drop_index('ix_organization_read_models_building_id', table_name='organization_read_models')
+    op.drop_index('ix_organization_read_models_address_search_vector', table_name='organization_read_models')
+    op.drop_table('organization_read_models')
@@ -0,0 +1,57 @@
+"""Notify changes of organization read models
+
+Revision ID: read_model_notify
+Revises: geohash_cells
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+from alembic_utils.pg_function import PGFunction
+from alembic_utils.pg_trigger import PGTrigger
+
+# revision identifiers, used by Alembic.
+revision: str = 'read_model_notify'
+down_revision: str | Sequence[str] | None = 'geohash_cells'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    public_notify_organization_read_models = PGFunction(
+        schema='public',
+        signature='notify_organization_read_models()',
+        definition="RETURNS TRIGGER AS $$\n        BEGIN\n            -- Sent on commit, once per organization however many times the transaction changed it\n            PERFORM pg_notify('organization_read_models', coalesce(NEW.organization_id, OLD.organization_id)::text);\n            RETURN NULL;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.create_entity(public_notify_organization_read_models)
+
+    public_organization_read_models_trg_organization_read_models_notify = PGTrigger(
+        schema='public',
+        signature='trg_organization_read_models_notify',
+        on_entity='public.organization_read_models',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON organization_read_models\n        FOR EACH ROW\n        EXECUTE FUNCTION notify_organization_read_models()',
+    )
+    op.create_entity(public_organization_read_models_trg_organization_read_models_notify)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    public_organization_read_models_trg_organization_read_models_notify = PGTrigger(
+        schema='public',
+        signature='trg_organization_read_models_notify',
+        on_entity='public.organization_read_models',
+        is_constraint=False,
+        definition='AFTER INSERT OR UPDATE OR DELETE ON organization_read_models\n        FOR EACH ROW\n        EXECUTE FUNCTION notify_organization_read_models()',
+    )
+    op.drop_entity(public_organization_read_models_trg_organization_read_models_notify)
+
+    public_notify_organization_read_models = PGFunction(
+        schema='public',
+        signature='notify_organization_read_models()',
+        definition="RETURNS TRIGGER AS $$\n        BEGIN\n            -- Sent on commit, once per organization however many times the transaction changed it\n            PERFORM pg_notify('organization_read_models', coalesce(NEW.organization_id, OLD.organization_id)::text);\n            RETURN NULL;\n        END;\n        $$ LANGUAGE plpgsql",
+    )
+    op.drop_entity(public_notify_organization_read_models)
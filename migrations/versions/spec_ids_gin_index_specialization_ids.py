@@ -0,0 +1,37 @@
+"""Index specialization ids of organization read models
+
+Revision ID: spec_ids_gin
+Revises: read_model
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'spec_ids_gin'
+down_revision: str | Sequence[str] | None = 'read_model'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_organization_read_models_specialization_ids',
+        'organization_read_models',
+        ['specialization_ids'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'ix_organization_read_models_specialization_ids',
+        table_name='organization_read_models',
+        postgresql_using='gin',
+    )
@@ -1,7 +1,161 @@
+import asyncio
+import contextlib
+import typing
+
 import fastapi
+from fastapi import responses
+
+from src.cache import create_cache
+from src.db.deps import engine, pool_size, request_concurrency, sessionmaker
+from src.deadline import DeadlineExceededError
+from src.middlewares import (
+    CancelOnDisconnectMiddleware,
+    CompressionMiddleware,
+    ConcurrencyLimitMiddleware,
+    QueryBudgetMiddleware,
+    TimingMiddleware,
+)
+from src.repositories.taxonomy import taxonomy_cache
+from src.routers import metrics_router, root_router
+from src.settings import settings
+
+if typing.TYPE_CHECKING:
+    import pathlib
+    from collections.abc import AsyncIterator
+
+
+@contextlib.asynccontextmanager
+async def spatial_index(app: fastapi.FastAPI) -> 'AsyncIterator[None]':
+    """Load the spatial index before serving and keep it up to date until shutdown."""
+    # numpy and shapely stay unloaded unless the index is on
+    from src.repositories.spatial_index import SpatialIndex, SpatialIndexRefresher  # noqa: PLC0415
+
+    index = SpatialIndex(rebuild_after=settings.SPATIAL_INDEX_REBUILD_AFTER)
+    refresher = SpatialIndexRefresher(index, str(settings.POSTGRES_DSN), sessionmaker)
+    task = asyncio.create_task(refresher.run())
+    loaded = asyncio.create_task(refresher.loaded.wait())
+    try:
+        # A refresher that crashes rather than retries fails startup instead of leaving it waiting forever
+        await asyncio.wait({task, loaded}, return_when=asyncio.FIRST_COMPLETED)
+        if not loaded.done():
+            await task
+        app.state.spatial_index = index
+        yield
+    finally:
+        loaded.cancel()
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+@contextlib.asynccontextmanager
+async def cell_cache(app: fastapi.FastAPI) -> 'AsyncIterator[None]':
+    """Cache the organizations of geohash cells, dropping the cells of changed organizations until shutdown."""
+    from src.repositories.cell_cache import CellCache, CellCacheInvalidator  # noqa: PLC0415
+
+    cache = CellCache(size=settings.SPATIAL_CELL_CACHE_SIZE, ttl=settings.SPATIAL_CELL_CACHE_TTL_S)
+    # The taxonomy cache's listener too, as the renames of specializations come through the read model
+    invalidator = CellCacheInvalidator(cache, str(settings.POSTGRES_DSN), sessionmaker, taxonomy_cache=taxonomy_cache)
+    task = asyncio.create_task(invalidator.run())
+    try:
+        app.state.cell_cache = cache
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+@contextlib.asynccontextmanager
+async def change_notifier(app: fastapi.FastAPI) -> 'AsyncIterator[None]':
+    """Wake long polls of `/changes` on notifications of new changes until shutdown."""
+    from src.repositories.change_notifier import ChangeNotifier  # noqa: PLC0415
 
-from src.routers import root_router
+    notifier = ChangeNotifier(str(settings.POSTGRES_DSN))
+    task = asyncio.create_task(notifier.run())
+    try:
+        app.state.change_notifier = notifier
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
 
-app = fastapi.FastAPI()
+
+@contextlib.asynccontextmanager
+async def snapshot(app: fastapi.FastAPI, path: 'pathlib.Path') -> 'AsyncIterator[None]':
+    """Serve lookups from the catalogue snapshot at `path`, once it exists, and follow the changes made since."""
+    # numpy stays unloaded unless the snapshot is on
+    from src.snapshot import SnapshotReader  # noqa: PLC0415
+
+    reader = SnapshotReader(path, check_interval=settings.SNAPSHOT_CHECK_INTERVAL_S)
+    task = asyncio.create_task(reader.follow(sessionmaker))
+    try:
+        app.state.snapshot = reader
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: fastapi.FastAPI) -> 'AsyncIterator[None]':
+    async with contextlib.AsyncExitStack() as stack:
+        if settings.SPATIAL_INDEX:
+            await stack.enter_async_context(spatial_index(app))
+        if settings.SPATIAL_CELL_CACHE_SIZE > 0:
+            await stack.enter_async_context(cell_cache(app))
+        if settings.SNAPSHOT_PATH is not None:
+            await stack.enter_async_context(snapshot(app, settings.SNAPSHOT_PATH))
+        if settings.CHANGES_LISTEN:
+            await stack.enter_async_context(change_notifier(app))
+        cache = create_cache()
+        if cache is not None:
+            app.state.cache = cache
+            stack.push_async_callback(cache.close)
+        yield
+    # Close pooled connections once the worker has drained rather than leave Postgres to find them dead
+    await engine.dispose()
+
+
+app = fastapi.FastAPI(lifespan=lifespan)
+
+_ORGANIZATIONS = '/api/v1/organizations'
+
+if settings.ADMISSION_CONTROL:
+    app.add_middleware(
+        ConcurrencyLimitMiddleware,
+        # Requests mostly wait on the DB, so more of them at once than the pool has connections for only queue on it,
+        # and requests holding some of their sessions while waiting for the rest could wait out the pool timeout
+        max_concurrency=request_concurrency(pool_size),
+        max_queue=settings.ADMISSION_MAX_QUEUE,
+        max_queue_per_client=settings.ADMISSION_MAX_QUEUE_PER_CLIENT,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_S,
+        lifo=settings.ADMISSION_LIFO,
+        retry_after=settings.ADMISSION_RETRY_AFTER_S,
+        prefix=_ORGANIZATIONS,
+    )
+# Outside admission control, so requests abandoned while queued leave the queue too
+app.add_middleware(CancelOnDisconnectMiddleware, prefix=_ORGANIZATIONS)
+if settings.COMPRESSION:
+    # Outside admission control, so cached responses don't queue for a connection they don't need
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE, cache_prefix=_ORGANIZATIONS)
+app.add_middleware(TimingMiddleware)
+if settings.DEV_MAX_QUERIES_PER_REQUEST is not None or settings.DEV_MAX_ROWS_PER_REQUEST is not None:
+    app.add_middleware(
+        QueryBudgetMiddleware,
+        max_queries=settings.DEV_MAX_QUERIES_PER_REQUEST,
+        max_rows=settings.DEV_MAX_ROWS_PER_REQUEST,
+    )
 
 app.include_router(root_router)
+app.include_router(metrics_router)
+
+
+@app.exception_handler(DeadlineExceededError)
+async def deadline_exceeded(_request: fastapi.Request, _exc: DeadlineExceededError) -> responses.JSONResponse:
+    return responses.JSONResponse(
+        {'detail': 'Request took longer than its time budget'},
+        status_code=fastapi.status.HTTP_504_GATEWAY_TIMEOUT,
+    )
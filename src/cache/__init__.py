@@ -0,0 +1,5 @@
+from .backends import CacheBackend, CacheBackendError, MemoryBackend
+from .cache import Cache
+from .deps import CacheDep, create_cache, get_cache
+
+__all__ = ('Cache', 'CacheBackend', 'CacheBackendError', 'CacheDep', 'MemoryBackend', 'create_cache', 'get_cache')
@@ -0,0 +1,62 @@
+import abc
+import collections
+import time
+
+
+class CacheBackendError(Exception):
+    """The backend couldn't be reached or didn't answer in time."""
+
+
+class CacheBackend(abc.ABC):
+    """Store of byte values under string keys, each expiring after its own TTL, and of counters that don't expire.
+
+    Methods raise `CacheBackendError` when the store fails, which the cache then does without.
+    """
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    @abc.abstractmethod
+    async def incr(self, key: str) -> int:
+        """Increment the counter at `key`, starting from 0, and return its new value."""
+
+    async def close(self) -> None:
+        return None
+
+
+class MemoryBackend(CacheBackend):
+    """Values in the worker's memory, up to `size` of them, least recently used out first.
+
+    Nothing is shared with other workers or survives a restart; it stands in for Redis in development.
+    """
+
+    def __init__(self, *, size: int) -> None:
+        self.size = size
+        self._values: collections.OrderedDict[str, tuple[float, bytes]] = collections.OrderedDict()
+        self._counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        # Counters read back as Redis returns them
+        if key in self._counters:
+            return str(self._counters[key]).encode()
+        cached = self._values.get(key)
+        if cached is None:
+            return None
+        if cached[0] <= time.monotonic():
+            del self._values[key]
+            return None
+        self._values.move_to_end(key)
+        return cached[1]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._values[key] = (time.monotonic() + ttl, value)
+        self._values.move_to_end(key)
+        while len(self._values) > self.size:
+            self._values.popitem(last=False)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
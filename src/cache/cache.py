@@ -0,0 +1,128 @@
+import logging
+import math
+import random
+import time
+import typing
+
+import msgpack
+import prometheus_client
+
+from src.cache.backends import CacheBackend, CacheBackendError
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+CACHE_REQUESTS = prometheus_client.Counter(
+    'cache_requests',
+    'Lookups in the cache backend',
+    # `early` is a hit that recomputed its value before expiry, `error` a failure of the backend, read or write
+    ['result'],
+)
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the layout of cached values changes, so a deploy never decodes what the previous one wrote
+FORMAT_VERSION = 1
+
+
+class Cache:
+    """Values loaded on a miss and kept in `backend` for `ttl` seconds, msgpack-encoded.
+
+    Keys carry `FORMAT_VERSION` and a generation counter kept in the backend itself: `invalidate` bumps it, which
+    orphans every key at once, for all workers, and lets the backend expire them. Workers read the generation at most
+    once per `generation_check` seconds.
+
+    Stampedes on expiry are avoided by probabilistic early expiry (XFetch): each value is stored with how long it took
+    to load, and a lookup recomputes it early with a probability that rises as expiry nears, the sooner the slower it
+    is to load and the larger `beta`. One request then reloads a hot key ahead of the crowd instead of all of them at
+    once after it expired.
+
+    When the backend fails, values are loaded as if there were no cache, and invalidations are lost: values cached
+    before an outage can be served until they expire.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        *,
+        prefix: str,
+        ttl: float,
+        beta: float = 1,
+        generation_check: float = 1,
+        random_: 'Callable[[], float]' = random.random,
+    ) -> None:
+        self.backend = backend
+        self.prefix = prefix
+        self.ttl = ttl
+        self.beta = beta
+        self.generation_check = generation_check
+        self._random = random_
+        self._generation: int | None = None
+        self._generation_checked_at = -math.inf
+
+    async def get_or_load[T](
+        self,
+        key: str,
+        load: 'Callable[[], Awaitable[T | None]]',
+        *,
+        encode: 'Callable[[T], object]',
+        decode: 'Callable[[typing.Any], T]',
+    ) -> T | None:
+        """Return the value cached under `key`, or the one `load` returns, cached unless it is `None`."""
+        try:
+            full_key = f'{self.prefix}:v{FORMAT_VERSION}:{await self._get_generation()}:{key}'
+            cached = await self.backend.get(full_key)
+        except CacheBackendError as error:
+            _backend_failed(error)
+            return await load()
+        if cached is not None:
+            value, delta, expires_at = msgpack.unpackb(cached)
+            # 1 - random() is in (0, 1], so the log is finite and never positive
+            if time.time() - delta * self.beta * math.log(1 - self._random()) < expires_at:
+                CACHE_REQUESTS.labels('hit').inc()
+                return decode(value)
+            CACHE_REQUESTS.labels('early').inc()
+        else:
+            CACHE_REQUESTS.labels('miss').inc()
+
+        start = time.perf_counter()
+        loaded = await load()
+        delta = time.perf_counter() - start
+        if loaded is not None:
+            value = typing.cast('bytes', msgpack.packb([encode(loaded), delta, time.time() + self.ttl]))
+            try:
+                await self.backend.set(full_key, value, self.ttl)
+            except CacheBackendError as error:
+                _backend_failed(error)
+        return loaded
+
+    async def invalidate(self) -> None:
+        """Orphan every cached value, in all workers."""
+        try:
+            self._generation = await self.backend.incr(self._generation_key)
+        except CacheBackendError as error:
+            _backend_failed(error)
+            # Read again by the next lookup, from a backend that may be back by then
+            self._generation = None
+            return
+        self._generation_checked_at = time.monotonic()
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    @property
+    def _generation_key(self) -> str:
+        return f'{self.prefix}:generation'
+
+    async def _get_generation(self) -> int:
+        now = time.monotonic()
+        if self._generation is None or now - self._generation_checked_at >= self.generation_check:
+            generation = await self.backend.get(self._generation_key)
+            self._generation = int(generation) if generation is not None else 0
+            self._generation_checked_at = now
+        return self._generation
+
+
+def _backend_failed(error: CacheBackendError) -> None:
+    CACHE_REQUESTS.labels('error').inc()
+    logger.warning('Cache backend failed, doing without it: %s', error)
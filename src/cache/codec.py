@@ -0,0 +1,59 @@
+"""Records as the plain lists and dicts msgpack encodes, one field after the other without their names."""
+
+import typing
+
+from src import schemas
+from src.repositories.records import OrganizationPage, OrganizationRecord, SpecializationRecord
+
+type Packed = list[typing.Any]
+
+
+def pack_organization(organization: OrganizationRecord) -> Packed:
+    return [
+        organization.id,
+        organization.name,
+        organization.phone,
+        organization.building_id,
+        organization.building_address,
+        *organization.building_coordinates,
+        [[s.id, s.name, s.parent_id] for s in organization.specializations],
+    ]
+
+
+def unpack_organization(
+    packed: Packed, specializations: dict[int, SpecializationRecord] | None = None
+) -> OrganizationRecord:
+    """Build an organization back, sharing specialization records through `specializations`, if given."""
+    id_, name, phone, building_id, building_address, longitude, latitude, packed_specializations = packed
+    if specializations is None:
+        specializations = {}
+    for specialization_id, specialization_name, parent_id in packed_specializations:
+        if specialization_id not in specializations:
+            specializations[specialization_id] = SpecializationRecord(specialization_id, specialization_name, parent_id)
+    return OrganizationRecord(
+        id=id_,
+        name=name,
+        phone=phone,
+        building_id=building_id,
+        building_address=building_address,
+        building_coordinates=(longitude, latitude),
+        specializations=[specializations[specialization[0]] for specialization in packed_specializations],
+    )
+
+
+def pack_page(page: OrganizationPage) -> Packed:
+    return [
+        [pack_organization(organization) for organization in page.organizations],
+        page.facets.model_dump() if page.facets is not None else None,
+        page.total,
+    ]
+
+
+def unpack_page(packed: Packed) -> OrganizationPage:
+    organizations, facets, total = packed
+    specializations: dict[int, SpecializationRecord] = {}
+    return OrganizationPage(
+        organizations=[unpack_organization(organization, specializations) for organization in organizations],
+        facets=schemas.Facets.model_validate(facets) if facets is not None else None,
+        total=total,
+    )
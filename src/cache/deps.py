@@ -0,0 +1,30 @@
+import typing
+
+import fastapi
+
+from src.cache.backends import CacheBackend, MemoryBackend
+from src.cache.cache import Cache
+from src.settings import settings
+
+
+def create_cache() -> Cache | None:
+    """Cache of the configured `CACHE_BACKEND`, if any."""
+    backend: CacheBackend
+    if settings.CACHE_BACKEND == 'memory':
+        backend = MemoryBackend(size=settings.CACHE_MEMORY_SIZE)
+    elif settings.CACHE_BACKEND == 'redis':
+        # redis-py is only imported when it's used
+        from src.cache.redis_backend import RedisBackend  # noqa: PLC0415
+
+        backend = RedisBackend.from_url(settings.CACHE_REDIS_URL, timeout=settings.CACHE_REDIS_TIMEOUT_S)
+    else:
+        return None
+    return Cache(backend, prefix=settings.CACHE_PREFIX, ttl=settings.CACHE_TTL_S, beta=settings.CACHE_XFETCH_BETA)
+
+
+def get_cache(request: fastapi.Request) -> Cache | None:
+    return getattr(request.app.state, 'cache', None)
+
+
+# Created by the app's lifespan when `CACHE_BACKEND` is set
+CacheDep = typing.Annotated[Cache | None, fastapi.Depends(get_cache)]
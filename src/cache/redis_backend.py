@@ -0,0 +1,44 @@
+import contextlib
+import typing
+
+import redis.asyncio as redis
+
+from src.cache.backends import CacheBackend, CacheBackendError
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@contextlib.contextmanager
+def _backend_errors() -> 'Iterator[None]':
+    try:
+        yield
+    except (redis.RedisError, OSError) as error:
+        raise CacheBackendError(str(error)) from error
+
+
+class RedisBackend(CacheBackend):
+    """Values in Redis, or any server speaking its protocol, shared by every worker and pod and kept across deploys."""
+
+    def __init__(self, client: redis.Redis) -> None:
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str, *, timeout: float) -> 'RedisBackend':
+        """Connect to `url`, giving up on connecting or on any command after `timeout` seconds."""
+        return cls(redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout))
+
+    async def get(self, key: str) -> bytes | None:
+        with _backend_errors():
+            return typing.cast('bytes | None', await self.client.get(key))
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        with _backend_errors():
+            await self.client.set(key, value, px=max(1, round(ttl * 1000)))
+
+    async def incr(self, key: str) -> int:
+        with _backend_errors():
+            return await self.client.incr(key)
+
+    async def close(self) -> None:
+        await self.client.aclose()
@@ -1,9 +1,24 @@
-from . import functions, models, triggers
-from .deps import SessionDep
+# `functions`, `triggers` and `entities` are alembic_utils objects used by migrations and tests only, so they are
+# imported from their modules rather than loaded with the package
+from . import models
+from .deps import SessionDep, SessionmakerDep, slow_query_recorder, statement_cache_stats
+from .explain import Explain, plan_rows
+from .metrics import QueryBudgetExceededError, QueryStats, StatementCacheStats, query_budget, track_queries
+from .slow_queries import SlowQuery, SlowQueryRecorder
 
 __all__ = (
+    'Explain',
+    'QueryBudgetExceededError',
+    'QueryStats',
     'SessionDep',
-    'functions',
+    'SessionmakerDep',
+    'SlowQuery',
+    'SlowQueryRecorder',
+    'StatementCacheStats',
     'models',
-    'triggers',
+    'plan_rows',
+    'query_budget',
+    'slow_query_recorder',
+    'statement_cache_stats',
+    'track_queries',
 )
@@ -1,12 +1,72 @@
 import typing
 
 import fastapi
+import prometheus_client
 import sqlalchemy.ext.asyncio as sa_async
 
+from src.db.metrics import StatementCacheStats, install_query_tracking
+from src.db.slow_queries import SlowQueryRecorder
 from src.settings import settings
 
-engine = sa_async.create_async_engine(str(settings.POSTGRES_DSN))
+
+def worker_pool_size(max_connections: int, reserved: int, workers: int, unpooled: int = 0) -> int:
+    """Split the connections left after `reserved` evenly between the workers, less the `unpooled` ones each opens.
+
+    Raises:
+        ValueError: A worker would be left without a pooled connection
+
+    """
+    size = (max_connections - reserved) // workers - unpooled
+    if size < 1:
+        msg = (
+            f'{max_connections - reserved} connections are too few for {workers} workers '
+            f'with {unpooled} connections outside their pools each'
+        )
+        raise ValueError(msg)
+    return size
+
+
+# Sessions a request holds at once: its own and those of the facet and estimated total queries run beside it
+SESSIONS_PER_REQUEST = 3
+
+
+def request_concurrency(pool_size: int) -> int:
+    """Count the requests that can hold all their sessions at once without waiting on the pool for one another's."""
+    return pool_size // SESSIONS_PER_REQUEST if pool_size >= SESSIONS_PER_REQUEST else pool_size
+
+
+# Connections each worker opens outside its pool: the LISTEN ones of the spatial index, the cell cache and the change
+# notifier, and the one slow queries are explained on
+unpooled_connections = sum(
+    (
+        settings.SPATIAL_INDEX,
+        settings.SPATIAL_CELL_CACHE_SIZE > 0,
+        settings.CHANGES_LISTEN,
+        settings.SLOW_QUERY_THRESHOLD_MS is not None,
+    ),
+)
+pool_size = worker_pool_size(
+    settings.DB_MAX_CONNECTIONS,
+    settings.DB_RESERVED_CONNECTIONS,
+    settings.DB_POOL_PROCESSES,
+    unpooled_connections,
+)
+# No overflow: a worker waits for a connection rather than pushing the server past `max_connections`
+engine = sa_async.create_async_engine(str(settings.POSTGRES_DSN), pool_size=pool_size, max_overflow=0)
 sessionmaker = sa_async.async_sessionmaker(engine)
+statement_cache_stats = StatementCacheStats()
+statement_cache_stats.install(engine.sync_engine)
+prometheus_client.REGISTRY.register(statement_cache_stats)
+install_query_tracking(engine.sync_engine)
+
+slow_query_recorder: SlowQueryRecorder | None = None
+if settings.SLOW_QUERY_THRESHOLD_MS is not None:
+    slow_query_recorder = SlowQueryRecorder(
+        settings.SLOW_QUERY_THRESHOLD_MS,
+        size=settings.SLOW_QUERY_LOG_SIZE,
+        explain_interval=settings.SLOW_QUERY_EXPLAIN_INTERVAL_S,
+    )
+    slow_query_recorder.install(engine)
 
 
 async def get_session():
@@ -15,4 +75,14 @@ async def get_session():
         await session.commit()
 
 
+def get_sessionmaker() -> sa_async.async_sessionmaker[sa_async.AsyncSession] | None:
+    # A request can't wait on a pool too small for its side sessions; they share its session then
+    return sessionmaker if pool_size >= SESSIONS_PER_REQUEST else None
+
+
 SessionDep = typing.Annotated[sa_async.AsyncSession, fastapi.Depends(get_session)]
+# Lets repositories open extra sessions for queries that run concurrently with the main one
+SessionmakerDep = typing.Annotated[
+    sa_async.async_sessionmaker[sa_async.AsyncSession] | None,
+    fastapi.Depends(get_sessionmaker),
+]
@@ -0,0 +1,33 @@
+from . import functions, triggers
+
+# Database objects managed through alembic_utils. Functions go before the triggers executing them.
+ENTITIES = (
+    functions.check_specialization_depth,
+    triggers.trg_specialization_depth_check,
+    functions.ensure_org_has_building,
+    functions.ensure_orgs_have_buildings,
+    triggers.trg_ensure_org_has_building,
+    triggers.trg_building_update_search_vector,
+    triggers.trg_organizations_update_search_vector,
+    functions.set_building_geohash,
+    triggers.trg_buildings_set_geohash,
+    functions.refresh_organization_read_models,
+    functions.sync_organization_read_models,
+    triggers.trg_organizations_sync_read_models,
+    triggers.trg_organization_buildings_sync_read_models,
+    triggers.trg_organization_specializations_sync_read_models,
+    triggers.trg_buildings_sync_read_models,
+    triggers.trg_specializations_sync_read_models,
+    functions.notify_organization_read_models,
+    triggers.trg_organization_read_models_notify,
+    functions.touch_changed_xid,
+    triggers.trg_buildings_touch,
+    triggers.trg_organization_read_models_touch,
+    functions.log_change,
+    functions.publish_changes,
+    triggers.trg_organizations_log_change,
+    triggers.trg_buildings_log_change,
+    triggers.trg_specializations_log_change,
+    triggers.trg_organization_buildings_log_change,
+    triggers.trg_organization_specializations_log_change,
+)
@@ -0,0 +1,44 @@
+import json
+import typing
+
+import sqlalchemy as sa
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import expression
+from sqlalchemy.sql.visitors import InternalTraversal
+
+if typing.TYPE_CHECKING:
+    from sqlalchemy.sql.compiler import SQLCompiler
+
+
+class Explain(expression.Executable, expression.ClauseElement):
+    """`EXPLAIN (FORMAT JSON, ...)` of a statement, executed with the statement's own parameters."""
+
+    inherit_cache = True
+    _traverse_internals = [  # noqa: RUF012  # pyright: ignore[reportIncompatibleVariableOverride]
+        ('statement', InternalTraversal.dp_clauseelement),
+        ('analyze', InternalTraversal.dp_boolean),
+        ('buffers', InternalTraversal.dp_boolean),
+    ]
+
+    def __init__(self, statement: sa.Select[typing.Any], *, analyze: bool = False, buffers: bool = False) -> None:
+        self.statement = statement
+        self.analyze = analyze
+        self.buffers = buffers
+
+
+@compiles(Explain, 'postgresql')
+def _compile_explain(  # pyright: ignore[reportUnusedFunction]
+    element: Explain, compiler: 'SQLCompiler', **kw: typing.Any
+) -> str:
+    options = ['FORMAT JSON']
+    if element.analyze:
+        options.append('ANALYZE')
+    if element.buffers:
+        options.append('BUFFERS')
+    return f'EXPLAIN ({", ".join(options)}) {compiler.process(element.statement, **kw)}'
+
+
+def plan_rows(plan: str | list[dict[str, typing.Any]]) -> int:
+    """Planner's row estimate for the top node of an `EXPLAIN (FORMAT JSON)` result."""
+    nodes: list[dict[str, typing.Any]] = json.loads(plan) if isinstance(plan, str) else plan
+    return int(nodes[0]['Plan']['Plan Rows'])
@@ -6,6 +6,12 @@ ensure_org_has_building = pg_function.PGFunction(
     definition="""
         RETURNS TRIGGER AS $$
         BEGIN
+            -- Batch writes check their organizations at once with ensure_orgs_have_buildings(). The table marking
+            -- them is created by OrganizationWriter in its transaction and dropped on commit, so nothing left on a
+            -- session can switch the check off
+            IF to_regclass('pg_temp.batch_write') IS NOT NULL THEN
+                RETURN NEW;
+            END IF;
             IF NOT EXISTS (
                 SELECT 1
                 FROM organization_buildings ob
@@ -19,6 +25,27 @@ ensure_org_has_building = pg_function.PGFunction(
     """,
 )
 
+ensure_orgs_have_buildings = pg_function.PGFunction(
+    schema='public',
+    signature='ensure_orgs_have_buildings(organization_ids integer[])',
+    definition="""
+        RETURNS void AS $$
+        DECLARE
+            missing integer;
+        BEGIN
+            SELECT o.id INTO missing
+            FROM organizations o
+            WHERE o.id = ANY(organization_ids)
+                AND NOT EXISTS (SELECT 1 FROM organization_buildings ob WHERE ob.organization_id = o.id)
+            LIMIT 1;
+            IF FOUND THEN
+                RAISE EXCEPTION 'Organization (id=%) must have at least one building', missing;
+            END IF;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+)
+
 check_specialization_depth = pg_function.PGFunction(
     schema='public',
     signature='check_specialization_depth()',
@@ -44,3 +71,216 @@ check_specialization_depth = pg_function.PGFunction(
         $$ LANGUAGE plpgsql;
 """,
 )
+
+set_building_geohash = pg_function.PGFunction(
+    schema='public',
+    signature='set_building_geohash()',
+    definition="""
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.geohash := ST_GeoHash(NEW.point::geometry, 9);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+)
+
+refresh_organization_read_models = pg_function.PGFunction(
+    schema='public',
+    signature='refresh_organization_read_models(organization_ids integer[])',
+    definition="""
+        RETURNS void AS $$
+            DELETE FROM organization_read_models rm
+            WHERE rm.organization_id = ANY(organization_ids)
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM organizations o
+                    JOIN organization_buildings ob ON ob.organization_id = o.id
+                    WHERE o.id = rm.organization_id
+                );
+
+            INSERT INTO organization_read_models (
+                organization_id, name, phone, building_id, address, point, lon, lat, geohash,
+                specialization_ids, payload, name_search_vector, address_search_vector
+            )
+            SELECT
+                o.id, o.name, o.phone, b.id, b.address, b.point, ST_X(b.point::geometry), ST_Y(b.point::geometry),
+                b.geohash, coalesce(s.ids, '{}'),
+                jsonb_build_object(
+                    'id', o.id,
+                    'name', o.name,
+                    'phone', o.phone,
+                    'building_id', b.id,
+                    'building_address', b.address,
+                    'building_coordinates', jsonb_build_array(ST_X(b.point::geometry), ST_Y(b.point::geometry)),
+                    'specializations', coalesce(s.items, '[]')
+                ),
+                o.search_vector,
+                b.search_vector
+            FROM organizations o
+            JOIN organization_buildings ob ON ob.organization_id = o.id
+            JOIN buildings b ON b.id = ob.building_id
+            LEFT JOIN LATERAL (
+                SELECT
+                    array_agg(sp.id ORDER BY sp.id) AS ids,
+                    jsonb_agg(
+                        jsonb_build_object('id', sp.id, 'name', sp.name, 'parent_id', sp.parent_id) ORDER BY sp.id
+                    ) AS items
+                FROM specializations sp
+                WHERE sp.id IN (
+                    SELECT os.specialization_id FROM organization_specializations os WHERE os.organization_id = o.id
+                )
+            ) s ON true
+            WHERE o.id = ANY(organization_ids)
+            ON CONFLICT (organization_id) DO UPDATE SET
+                name = EXCLUDED.name,
+                phone = EXCLUDED.phone,
+                building_id = EXCLUDED.building_id,
+                address = EXCLUDED.address,
+                point = EXCLUDED.point,
+                lon = EXCLUDED.lon,
+                lat = EXCLUDED.lat,
+                geohash = EXCLUDED.geohash,
+                specialization_ids = EXCLUDED.specialization_ids,
+                payload = EXCLUDED.payload,
+                name_search_vector = EXCLUDED.name_search_vector,
+                address_search_vector = EXCLUDED.address_search_vector;
+        $$ LANGUAGE sql;
+    """,
+)
+
+sync_organization_read_models = pg_function.PGFunction(
+    schema='public',
+    signature='sync_organization_read_models()',
+    definition="""
+        RETURNS TRIGGER AS $$
+        DECLARE
+            row_ids integer[];
+        BEGIN
+            -- Batch writes refresh the read models of their organizations at once; see ensure_org_has_building()
+            IF to_regclass('pg_temp.batch_write') IS NOT NULL THEN
+                RETURN NULL;
+            END IF;
+
+            -- Ids of the changed rows, both before and after the change
+            row_ids := ARRAY(
+                SELECT DISTINCT (r ->> CASE
+                    WHEN TG_TABLE_NAME IN ('organization_buildings', 'organization_specializations')
+                        THEN 'organization_id'
+                    ELSE 'id'
+                END)::integer
+                FROM unnest(ARRAY[to_jsonb(NEW), to_jsonb(OLD)]) r
+                WHERE r IS NOT NULL
+            );
+
+            PERFORM refresh_organization_read_models(
+                CASE TG_TABLE_NAME
+                    WHEN 'buildings' THEN ARRAY(
+                        SELECT organization_id FROM organization_buildings WHERE building_id = ANY(row_ids)
+                    )
+                    WHEN 'specializations' THEN ARRAY(
+                        SELECT organization_id FROM organization_specializations WHERE specialization_id = ANY(row_ids)
+                    )
+                    ELSE row_ids
+                END
+            );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+)
+
+notify_organization_read_models = pg_function.PGFunction(
+    schema='public',
+    signature='notify_organization_read_models()',
+    definition="""
+        RETURNS TRIGGER AS $$
+        BEGIN
+            -- Sent on commit, once per organization however many times the transaction changed it
+            PERFORM pg_notify('organization_read_models', coalesce(NEW.organization_id, OLD.organization_id)::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+)
+
+touch_changed_xid = pg_function.PGFunction(
+    schema='public',
+    signature='touch_changed_xid()',
+    definition="""
+        RETURNS TRIGGER AS $$
+        BEGIN
+            -- The 64-bit id, which never wraps around, so it compares with the xmin of later snapshots
+            NEW.changed_xid := pg_current_xact_id()::text::bigint;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+)
+
+log_change = pg_function.PGFunction(
+    schema='public',
+    signature='log_change()',
+    definition="""
+        RETURNS TRIGGER AS $$
+        DECLARE
+            r jsonb := coalesce(to_jsonb(NEW), to_jsonb(OLD));
+        BEGIN
+            INSERT INTO change_log (table_name, operation, key)
+            VALUES (
+                TG_TABLE_NAME,
+                lower(TG_OP),
+                CASE TG_TABLE_NAME
+                    WHEN 'organization_buildings'
+                        THEN jsonb_build_object(
+                            'organization_id', r -> 'organization_id', 'building_id', r -> 'building_id'
+                        )
+                    WHEN 'organization_specializations'
+                        THEN jsonb_build_object(
+                            'organization_id', r -> 'organization_id', 'specialization_id', r -> 'specialization_id'
+                        )
+                    ELSE jsonb_build_object('id', r -> 'id')
+                END
+            );
+            -- Wakes long-polling consumers; sent on commit, once per transaction
+            PERFORM pg_notify('change_log', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+)
+
+publish_changes = pg_function.PGFunction(
+    schema='public',
+    signature='publish_changes()',
+    definition="""
+        RETURNS bigint AS $$
+        DECLARE
+            published bigint;
+        BEGIN
+            -- One call numbers changes at a time, until its transaction ends, so no later call hands out a lower seq;
+            -- calls finding another one at work leave the changes to it
+            IF NOT pg_try_advisory_xact_lock(hashtext('publish_changes')) THEN
+                RETURN 0;
+            END IF;
+
+            WITH last AS (
+                SELECT coalesce(max(seq), 0) AS seq FROM change_log
+            ),
+            pending AS (
+                SELECT id, row_number() OVER (ORDER BY xid, id) AS n
+                FROM change_log
+                -- Transactions older than the snapshot's xmin are over, so they won't log anything more
+                WHERE seq IS NULL AND xid < pg_snapshot_xmin(pg_current_snapshot())::text::bigint
+            )
+            UPDATE change_log c
+            SET seq = last.seq + pending.n
+            FROM pending, last
+            WHERE c.id = pending.id;
+
+            GET DIAGNOSTICS published = ROW_COUNT;
+            RETURN published;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+)
@@ -0,0 +1,167 @@
+import contextlib
+import contextvars
+import dataclasses
+import time
+import typing
+
+import prometheus_client
+import sqlalchemy as sa
+from prometheus_client.core import CounterMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.engine import default
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from prometheus_client import Metric
+    from sqlalchemy.engine.interfaces import DBAPICursor, ExceptionContext, ExecutionContext
+
+DB_STATEMENT_DURATION = prometheus_client.Histogram(
+    'db_statement_duration_seconds',
+    'Time spent executing single database statements',
+    # `error` for statements that failed, were cancelled or ran past `statement_timeout`
+    ['outcome'],
+)
+
+
+def _rate(hits: int, misses: int) -> float | None:
+    return hits / (hits + misses) if hits + misses else None
+
+
+@dataclasses.dataclass(eq=False)
+class StatementCacheStats(Collector):
+    """Hit counters of SQLAlchemy's compiled cache and the driver's prepared statement cache."""
+
+    compiled_hits: int = 0
+    compiled_misses: int = 0
+    prepared_hits: int = 0
+    prepared_misses: int = 0
+
+    @property
+    def compiled_hit_rate(self) -> float | None:
+        return _rate(self.compiled_hits, self.compiled_misses)
+
+    @property
+    def prepared_hit_rate(self) -> float | None:
+        return _rate(self.prepared_hits, self.prepared_misses)
+
+    def install(self, engine: sa.Engine) -> None:
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+
+    def collect(self) -> 'Iterator[Metric]':
+        hits = CounterMetricFamily('db_statement_cache_hits', 'Statement cache hits', labels=['cache'])
+        hits.add_metric(['compiled'], self.compiled_hits)
+        hits.add_metric(['prepared'], self.prepared_hits)
+        misses = CounterMetricFamily('db_statement_cache_misses', 'Statement cache misses', labels=['cache'])
+        misses.add_metric(['compiled'], self.compiled_misses)
+        misses.add_metric(['prepared'], self.prepared_misses)
+        yield hits
+        yield misses
+
+    def _before_cursor_execute(
+        self,
+        conn: sa.Connection,
+        cursor: 'DBAPICursor',  # noqa: ARG002
+        statement: str,
+        parameters: typing.Any,  # noqa: ANN401, ARG002
+        context: 'ExecutionContext | None',
+        executemany: bool,  # noqa: ARG002, FBT001
+    ) -> None:
+        cache_hit = getattr(context, 'cache_hit', None)
+        if cache_hit is default.CACHE_HIT:
+            self.compiled_hits += 1
+        elif cache_hit is default.CACHE_MISS:
+            self.compiled_misses += 1
+
+        # asyncpg's adapter keeps prepared statements per connection, keyed by the SQL text
+        prepared = getattr(conn.connection.dbapi_connection, '_prepared_statement_cache', None)
+        if prepared is None:
+            return
+        if statement in prepared:
+            self.prepared_hits += 1
+        else:
+            self.prepared_misses += 1
+
+
+class QueryBudgetExceededError(AssertionError):
+    pass
+
+
+@dataclasses.dataclass
+class QueryStats:
+    """Statements executed while tracking, the seconds spent in them and the rows they returned or changed."""
+
+    queries: int = 0
+    duration: float = 0.0
+    rows: int = 0
+    # Of `queries`, the ones that raised
+    errors: int = 0
+
+    def check_budget(self, *, max_queries: int | None = None, max_rows: int | None = None) -> None:
+        if max_queries is not None and self.queries > max_queries:
+            msg = f'{self.queries} statements executed, expected at most {max_queries}'
+            raise QueryBudgetExceededError(msg)
+        if max_rows is not None and self.rows > max_rows:
+            msg = f'{self.rows} rows fetched, expected at most {max_rows}'
+            raise QueryBudgetExceededError(msg)
+
+
+# Nested tracking blocks all see the statements of the innermost one
+_query_stats: contextvars.ContextVar[tuple[QueryStats, ...]] = contextvars.ContextVar('query_stats', default=())
+
+
+@contextlib.contextmanager
+def track_queries() -> 'Iterator[QueryStats]':
+    """Count the statements executed in the current context, e.g. while handling one request."""
+    stats = QueryStats()
+    token = _query_stats.set((*_query_stats.get(), stats))
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+@contextlib.contextmanager
+def query_budget(*, max_queries: int | None = None, max_rows: int | None = None) -> 'Iterator[QueryStats]':
+    """Fail if the block runs more statements or fetches more rows than allowed, to catch N+1s and row explosions.
+
+    Raises:
+        QueryBudgetExceededError: The block went over budget
+
+    """
+    with track_queries() as stats:
+        yield stats
+    stats.check_budget(max_queries=max_queries, max_rows=max_rows)
+
+
+def install_query_tracking(engine: sa.Engine) -> None:
+    event.listen(engine, 'before_cursor_execute', _start_query)
+    event.listen(engine, 'after_cursor_execute', _finish_query)
+    event.listen(engine, 'handle_error', _fail_query)
+
+
+def _start_query(conn: sa.Connection, *_: typing.Any) -> None:
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _finish_query(conn: sa.Connection, cursor: 'DBAPICursor', *_: typing.Any) -> None:
+    duration = time.perf_counter() - conn.info['query_start_time'].pop()
+    # asyncpg's adapter reports rows for SELECTs too; -1 means the driver doesn't know
+    _record_query(duration, rows=max(cursor.rowcount, 0), failed=False)
+
+
+def _fail_query(context: 'ExceptionContext') -> None:
+    # Also called for errors outside of statements, such as failing to connect, which have no start time
+    started = context.connection.info.get('query_start_time') if context.connection is not None else None
+    if started:
+        _record_query(time.perf_counter() - started.pop(), rows=0, failed=True)
+
+
+def _record_query(duration: float, *, rows: int, failed: bool) -> None:
+    DB_STATEMENT_DURATION.labels('error' if failed else 'ok').observe(duration)
+    for stats in _query_stats.get():
+        stats.queries += 1
+        stats.duration += duration
+        stats.rows += rows
+        stats.errors += failed
@@ -1,14 +1,18 @@
 from .base import Base
 from .building import Building
+from .change_log import ChangeLog
 from .m2m import OrganizationBuilding, OrganizationSpecializations
 from .organization import Organization
+from .organization_read_model import OrganizationReadModel
 from .specialization import Specialization
 
 __all__ = (
     'Base',
     'Building',
+    'ChangeLog',
     'Organization',
     'OrganizationBuilding',
+    'OrganizationReadModel',
     'OrganizationSpecializations',
     'Specialization',
 )
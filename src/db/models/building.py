@@ -1,7 +1,10 @@
-import geoalchemy2 as geosa
+import sqlalchemy as sa
 import sqlalchemy.dialects.postgresql as psql
 from sqlalchemy import orm
 
+from src.db.types import Geography
+from src.geohash import STORED_PRECISION
+
 from .base import Base
 
 
@@ -10,5 +13,16 @@ class Building(Base):
 
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     address: orm.Mapped[str]
-    point: orm.Mapped[geosa.WKBElement] = orm.mapped_column(geosa.Geography('POINT', srid=4326))
+    point: orm.Mapped[str] = orm.mapped_column(Geography('POINT', srid=4326))
     search_vector: orm.Mapped[str] = orm.mapped_column(psql.TSVECTOR, nullable=True)
+    # Set from `point` by trg_buildings_set_geohash
+    geohash: orm.Mapped[str] = orm.mapped_column(
+        sa.String(STORED_PRECISION, collation='C'), server_default=sa.FetchedValue(), server_onupdate=sa.FetchedValue()
+    )
+    # Id of the last transaction writing the row, kept by trg_buildings_touch for incremental exports; NULL for rows
+    # not written since the column was added, before any export
+    changed_xid: orm.Mapped[int | None] = orm.mapped_column(
+        sa.BigInteger, server_default=sa.text('pg_current_xact_id()::text::bigint'), server_onupdate=sa.FetchedValue()
+    )
+
+    __table_args__ = (sa.Index('idx_buildings_point', point, postgresql_using='gist'),)
@@ -0,0 +1,34 @@
+import datetime
+
+import sqlalchemy as sa
+import sqlalchemy.dialects.postgresql as psql
+from sqlalchemy import orm
+
+from .base import Base
+
+
+class ChangeLog(Base):
+    """Changed rows of the catalogue tables, logged by `log_change` triggers and numbered by `publish_changes()`.
+
+    Changes get their `seq` in the order of the transactions that made them, once no transaction still running could
+    log one before them, so a consumer reading past the last `seq` it saw never skips a change committed late.
+    """
+
+    __tablename__ = 'change_log'
+
+    id: orm.Mapped[int] = orm.mapped_column(sa.BigInteger, sa.Identity(), primary_key=True)
+    # Unset until published
+    seq: orm.Mapped[int | None] = orm.mapped_column(sa.BigInteger, unique=True)
+    xid: orm.Mapped[int] = orm.mapped_column(
+        sa.BigInteger, server_default=sa.text('pg_current_xact_id()::text::bigint')
+    )
+    table_name: orm.Mapped[str]
+    # `insert`, `update` or `delete`
+    operation: orm.Mapped[str]
+    # Primary key of the changed row
+    key: orm.Mapped[dict[str, int]] = orm.mapped_column(psql.JSONB)
+    changed_at: orm.Mapped[datetime.datetime] = orm.mapped_column(
+        sa.DateTime(timezone=True), server_default=sa.func.now()
+    )
+
+    __table_args__ = (sa.Index('ix_change_log_unpublished', xid, id, postgresql_where=seq.is_(None)),)
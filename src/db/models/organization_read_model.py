@@ -0,0 +1,49 @@
+import typing
+
+import sqlalchemy as sa
+import sqlalchemy.dialects.postgresql as psql
+from sqlalchemy import orm
+
+from src.db.types import Geography
+from src.geohash import STORED_PRECISION
+
+from .base import Base
+
+
+class OrganizationReadModel(Base):
+    """Denormalized organization with its building and specializations, one row per organization.
+
+    Kept up to date by `sync_organization_read_models` triggers on the source tables.
+    """
+
+    __tablename__ = 'organization_read_models'
+
+    organization_id: orm.Mapped[int] = orm.mapped_column(primary_key=True, autoincrement=False)
+    name: orm.Mapped[str]
+    phone: orm.Mapped[str]
+    building_id: orm.Mapped[int] = orm.mapped_column(index=True)
+    address: orm.Mapped[str]
+    point: orm.Mapped[str] = orm.mapped_column(Geography('POINT', srid=4326))
+    lon: orm.Mapped[float]
+    lat: orm.Mapped[float]
+    # Byte-wise collation, so the hashes of a cell are the range `[cell, cell || '~')` of the index below
+    geohash: orm.Mapped[str] = orm.mapped_column(sa.String(STORED_PRECISION, collation='C'))
+    specialization_ids: orm.Mapped[list[int]] = orm.mapped_column(psql.ARRAY(sa.Integer), server_default='{}')
+    # Rendered `schemas.Organization`
+    payload: orm.Mapped[dict[str, typing.Any]] = orm.mapped_column(psql.JSONB)
+    name_search_vector: orm.Mapped[str] = orm.mapped_column(psql.TSVECTOR, nullable=True)
+    address_search_vector: orm.Mapped[str] = orm.mapped_column(psql.TSVECTOR, nullable=True)
+    # Id of the last transaction writing the row, kept by trg_organization_read_models_touch for incremental exports;
+    # NULL for rows not written since the column was added, before any export
+    changed_xid: orm.Mapped[int | None] = orm.mapped_column(
+        sa.BigInteger, server_default=sa.text('pg_current_xact_id()::text::bigint'), server_onupdate=sa.FetchedValue()
+    )
+
+    __table_args__ = (
+        sa.Index('idx_organization_read_models_point', point, postgresql_using='gist'),
+        sa.Index('ix_organization_read_models_geohash', geohash),
+        sa.Index('ix_organization_read_models_name_search_vector', name_search_vector, postgresql_using='gin'),
+        sa.Index('ix_organization_read_models_address_search_vector', address_search_vector, postgresql_using='gin'),
+        # Serves `@>` (has all of) and `&&` (has any of) lookups
+        sa.Index('ix_organization_read_models_specialization_ids', specialization_ids, postgresql_using='gin'),
+    )
@@ -0,0 +1,152 @@
+import asyncio
+import collections
+import dataclasses
+import datetime
+import json
+import logging
+import math
+import re
+import time
+import typing
+
+import sqlalchemy as sa
+import sqlalchemy.ext.asyncio as sa_async
+from sqlalchemy import event, exc, pool
+
+if typing.TYPE_CHECKING:
+    from sqlalchemy.engine.interfaces import DBAPICursor, ExceptionContext
+
+logger = logging.getLogger(__name__)
+
+_EXPLAINABLE = ('select', 'with')
+# Writes, which a `WITH` may hold as well, and `FOR UPDATE` row locks
+_WRITES = re.compile(r'\b(insert|update|delete|merge)\b', re.IGNORECASE)
+
+
+@dataclasses.dataclass
+class SlowQuery:
+    statement: str
+    parameters: typing.Any
+    duration_ms: float
+    recorded_at: datetime.datetime
+    plan: list[dict[str, typing.Any]] | None = None
+    # Name of the exception the statement raised, e.g. when cancelled by `statement_timeout`
+    error: str | None = None
+
+
+class SlowQueryRecorder:
+    """Keeps the latest statements slower than a threshold, with a sampled `EXPLAIN (ANALYZE, BUFFERS)` plan.
+
+    A statement gets explained at most once per `explain_interval` seconds and only one capture runs at a time,
+    on a connection of its own, outside the pool, in a read-only transaction that is rolled back. A capture runs the
+    statement again, so it is cancelled after `explain_timeout_ms`, ten times the threshold by default. Statements that
+    fail after the threshold, such as those cancelled by `statement_timeout` or a request's deadline, are kept too,
+    without a plan.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        *,
+        size: int = 100,
+        explain_interval: float = 60.0,
+        explain_timeout_ms: float | None = None,
+    ) -> None:
+        self.threshold_ms = threshold_ms
+        self.explain_interval = explain_interval
+        if explain_timeout_ms is None:
+            explain_timeout_ms = threshold_ms * 10
+        # `0` would disable the timeout altogether
+        self.explain_timeout_ms = max(1, math.floor(explain_timeout_ms))
+        self.queries: collections.deque[SlowQuery] = collections.deque(maxlen=size)
+        self._explained_at: dict[str, float] = {}
+        self._explaining: asyncio.Task[None] | None = None
+        self._engine: sa_async.AsyncEngine | None = None
+
+    def install(self, engine: sa_async.AsyncEngine) -> None:
+        # Captures don't take a connection requests wait for; the engine has no listeners, so they aren't recorded
+        self._engine = sa_async.create_async_engine(engine.url, poolclass=pool.NullPool)
+        event.listen(engine.sync_engine, 'before_cursor_execute', self._start)
+        event.listen(engine.sync_engine, 'after_cursor_execute', self._finish)
+        event.listen(engine.sync_engine, 'handle_error', self._fail)
+
+    def _start(self, conn: sa.Connection, *_: typing.Any) -> None:
+        conn.info.setdefault('slow_query_start_time', []).append(time.perf_counter())
+
+    def _finish(
+        self,
+        conn: sa.Connection,
+        cursor: 'DBAPICursor',  # noqa: ARG002
+        statement: str,
+        parameters: typing.Any,  # noqa: ANN401
+        *_: typing.Any,
+    ) -> None:
+        duration_ms = (time.perf_counter() - conn.info['slow_query_start_time'].pop()) * 1000
+        self._record(statement, parameters, duration_ms)
+
+    def _fail(self, context: 'ExceptionContext') -> None:
+        conn = context.connection
+        # Also called for errors outside of statements, such as failing to connect, which have no start time
+        started = conn.info.get('slow_query_start_time') if conn is not None else None
+        if conn is None or not started or context.statement is None:
+            return
+        duration_ms = (time.perf_counter() - started.pop()) * 1000
+        error = type(context.original_exception).__name__
+        self._record(context.statement, context.parameters, duration_ms, error=error)
+
+    def _record(
+        self,
+        statement: str,
+        parameters: typing.Any,  # noqa: ANN401
+        duration_ms: float,
+        *,
+        error: str | None = None,
+    ) -> None:
+        if duration_ms < self.threshold_ms:
+            return
+
+        query = SlowQuery(
+            statement=statement,
+            parameters=parameters,
+            duration_ms=duration_ms,
+            recorded_at=datetime.datetime.now(datetime.UTC),
+            error=error,
+        )
+        self.queries.append(query)
+        # A failed statement isn't run again: one cancelled for taking too long would likely take as long
+        if error is not None:
+            logger.warning('Slow query failed with %s (%.1f ms): %s %r', error, duration_ms, statement, parameters)
+            return
+        logger.warning('Slow query (%.1f ms): %s %r', duration_ms, statement, parameters)
+        if self._should_explain(statement):
+            # Cursor events run inside the event loop's thread, so the capture can be scheduled from here
+            self._explaining = asyncio.get_running_loop().create_task(self._explain(query))
+
+    def _should_explain(self, statement: str) -> bool:
+        if self._engine is None or (self._explaining is not None and not self._explaining.done()):
+            return False
+        # EXPLAIN ANALYZE executes the statement, so leave out anything that writes or locks rows
+        if not statement.lstrip().lower().startswith(_EXPLAINABLE) or _WRITES.search(statement):
+            return False
+        now = time.monotonic()
+        if now - self._explained_at.get(statement, -self.explain_interval) < self.explain_interval:
+            return False
+        self._explained_at[statement] = now
+        return True
+
+    async def _explain(self, query: SlowQuery) -> None:
+        engine = typing.cast('sa_async.AsyncEngine', self._engine)
+        try:
+            async with engine.connect() as conn, conn.begin() as transaction:
+                # Refuses writes the checks above can't see, such as those of functions the query calls
+                await conn.exec_driver_sql('SET TRANSACTION READ ONLY')
+                await conn.exec_driver_sql(f"SET LOCAL statement_timeout = '{self.explain_timeout_ms}ms'")
+                result = await conn.exec_driver_sql(
+                    f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query.statement}', query.parameters
+                )
+                plan = result.scalar_one()
+                await transaction.rollback()
+        except exc.SQLAlchemyError:
+            logger.exception('Failed to explain slow query: %s', query.statement)
+            return
+        query.plan = json.loads(plan) if isinstance(plan, str) else plan
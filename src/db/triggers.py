@@ -45,3 +45,157 @@ trg_building_update_search_vector = pg_trigger.PGTrigger(
         EXECUTE FUNCTION tsvector_update_trigger(search_vector, 'pg_catalog.english', address);
     """,
 )
+
+trg_buildings_set_geohash = pg_trigger.PGTrigger(
+    schema='public',
+    signature='trg_buildings_set_geohash',
+    on_entity='public.buildings',
+    definition="""
+        BEFORE INSERT OR UPDATE OF point ON buildings
+        FOR EACH ROW
+        EXECUTE FUNCTION set_building_geohash();
+    """,
+)
+
+trg_organizations_sync_read_models = pg_trigger.PGTrigger(
+    schema='public',
+    signature='trg_organizations_sync_read_models',
+    on_entity='public.organizations',
+    definition="""
+        AFTER INSERT OR UPDATE OR DELETE ON organizations
+        FOR EACH ROW
+        EXECUTE FUNCTION sync_organization_read_models();
+    """,
+)
+
+trg_organization_buildings_sync_read_models = pg_trigger.PGTrigger(
+    schema='public',
+    signature='trg_organization_buildings_sync_read_models',
+    on_entity='public.organization_buildings',
+    definition="""
+        AFTER INSERT OR UPDATE OR DELETE ON organization_buildings
+        FOR EACH ROW
+        EXECUTE FUNCTION sync_organization_read_models();
+    """,
+)
+
+trg_organization_specializations_sync_read_models = pg_trigger.PGTrigger(
+    schema='public',
+    signature='trg_organization_specializations_sync_read_models',
+    on_entity='public.organization_specializations',
+    definition="""
+        AFTER INSERT OR UPDATE OR DELETE ON organization_specializations
+        FOR EACH ROW
+        EXECUTE FUNCTION sync_organization_read_models();
+    """,
+)
+
+trg_buildings_sync_read_models = pg_trigger.PGTrigger(
+    schema='public',
+    signature='trg_buildings_sync_read_models',
+    on_entity='public.buildings',
+    definition="""
+        AFTER UPDATE OR DELETE ON buildings
+        FOR EACH ROW
+        EXECUTE FUNCTION sync_organization_read_models();
+    """,
+)
+
+trg_specializations_sync_read_models = pg_trigger.PGTrigger(
+    schema='public',
+    signature='trg_specializations_sync_read_models',
+    on_entity='public.specializations',
+    definition="""
+        AFTER UPDATE OR DELETE ON specializations
+        FOR EACH ROW
+        EXECUTE FUNCTION sync_organization_read_models();
+    """,
+)
+
+trg_organization_read_models_notify = pg_trigger.PGTrigger(
+    schema='public',
+    signature='trg_organization_read_models_notify',
+    on_entity='public.organization_read_models',
+    definition="""
+        AFTER INSERT OR UPDATE OR DELETE ON organization_read_models
+        FOR EACH ROW
+        EXECUTE FUNCTION notify_organization_read_models();
+    """,
+)
+
+trg_buildings_touch = pg_trigger.PGTrigger(
+    schema='public',
+    signature='trg_buildings_touch',
+    on_entity='public.buildings',
+    definition="""
+        BEFORE UPDATE ON buildings
+        FOR EACH ROW
+        EXECUTE FUNCTION touch_changed_xid();
+    """,
+)
+
+trg_organization_read_models_touch = pg_trigger.PGTrigger(
+    schema='public',
+    signature='trg_organization_read_models_touch',
+    on_entity='public.organization_read_models',
+    definition="""
+        BEFORE UPDATE ON organization_read_models
+        FOR EACH ROW
+        EXECUTE FUNCTION touch_changed_xid();
+    """,
+)
+
+trg_organizations_log_change = pg_trigger.PGTrigger(
+    schema='public',
+    signature='trg_organizations_log_change',
+    on_entity='public.organizations',
+    definition="""
+        AFTER INSERT OR UPDATE OR DELETE ON organizations
+        FOR EACH ROW
+        EXECUTE FUNCTION log_change();
+    """,
+)
+
+trg_buildings_log_change = pg_trigger.PGTrigger(
+    schema='public',
+    signature='trg_buildings_log_change',
+    on_entity='public.buildings',
+    definition="""
+        AFTER INSERT OR UPDATE OR DELETE ON buildings
+        FOR EACH ROW
+        EXECUTE FUNCTION log_change();
+    """,
+)
+
+trg_specializations_log_change = pg_trigger.PGTrigger(
+    schema='public',
+    signature='trg_specializations_log_change',
+    on_entity='public.specializations',
+    definition="""
+        AFTER INSERT OR UPDATE OR DELETE ON specializations
+        FOR EACH ROW
+        EXECUTE FUNCTION log_change();
+    """,
+)
+
+trg_organization_buildings_log_change = pg_trigger.PGTrigger(
+    schema='public',
+    signature='trg_organization_buildings_log_change',
+    on_entity='public.organization_buildings',
+    definition="""
+        AFTER INSERT OR UPDATE OR DELETE ON organization_buildings
+        FOR EACH ROW
+        EXECUTE FUNCTION log_change();
+    """,
+)
+
+trg_organization_specializations_log_change = pg_trigger.PGTrigger(
+    schema='public',
+    signature='trg_organization_specializations_log_change',
+    on_entity='public.organization_specializations',
+    definition="""
+        AFTER INSERT OR UPDATE OR DELETE ON organization_specializations
+        FOR EACH ROW
+        EXECUTE FUNCTION log_change();
+    """,
+)
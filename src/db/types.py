@@ -0,0 +1,31 @@
+import typing
+
+import sqlalchemy as sa
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class Geography(sa.types.UserDefinedType[str]):
+    """PostGIS `geography` column type.
+
+    Stands in for GeoAlchemy2's type on the serving path: importing GeoAlchemy2 loads Shapely and numpy, while the app
+    only ever filters on geography columns in SQL and reads coordinates back from the read model. Values are bound as
+    WKT/EWKT or hex (E)WKB text, which PostGIS parses itself, and GeoAlchemy2 elements are accepted as they are.
+    """
+
+    cache_ok = True
+
+    def __init__(self, geometry_type: str = 'GEOMETRY', srid: int = 4326) -> None:
+        self.geometry_type = geometry_type.upper()
+        self.srid = srid
+
+    def get_col_spec(self, **_: typing.Any) -> str:
+        return f'geography({self.geometry_type},{self.srid})'
+
+    def bind_processor(self, dialect: sa.Dialect) -> 'Callable[..., str | None]':  # noqa: ARG002
+        def process(value: typing.Any) -> str | None:  # noqa: ANN401
+            # `WKBElement`/`WKTElement` describe themselves as hex WKB/WKT
+            return getattr(value, 'desc', value)
+
+        return process
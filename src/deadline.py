@@ -0,0 +1,32 @@
+import dataclasses
+import math
+import time
+import typing
+
+
+class DeadlineExceededError(Exception):
+    """A request ran out of its time budget."""
+
+
+@dataclasses.dataclass(frozen=True)
+class Deadline:
+    """Point in time by which a request must be answered, passed from the router down to the queries it runs."""
+
+    # On the `time.monotonic` clock
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> typing.Self:
+        return cls(time.monotonic() + seconds)
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def statement_timeout(self) -> str:
+        """Time left as a Postgres `statement_timeout` value; raises once there is none left."""
+        remaining_ms = math.floor(self.remaining * 1000)
+        # `0` would disable the timeout altogether
+        if remaining_ms < 1:
+            raise DeadlineExceededError
+        return f'{remaining_ms}ms'
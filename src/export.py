@@ -0,0 +1,316 @@
+"""Export of the catalogue to Parquet files partitioned by geohash cell, for bulk consumers.
+
+    python -m src.export /data/catalogue          # rewrites the partitions changed since the last export
+    python -m src.export /data/catalogue --full   # rewrites everything
+
+The layout is Hive-style, so Arrow, DuckDB or Spark read the cell back as a column:
+
+    organizations/cell=ucf/part.parquet
+    buildings/cell=ucf/part.parquet
+    specializations.parquet
+    manifest.json
+
+Rows come from a server-side cursor per dataset, ordered by geohash, and are written `--batch-size` at a time, so
+memory holds one batch however large the catalogue. All of it is read in one snapshot, whose xmin `manifest.json`
+keeps with the row count of every partition: the next export only rewrites the partitions holding a row written by a
+transaction that snapshot didn't see (`changed_xid`), or whose count changed, which is how deletions show, and removes
+the ones left empty.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import itertools
+import json
+import pathlib
+import shutil
+import sys
+import typing
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import sqlalchemy as sa
+import sqlalchemy.dialects.postgresql as psql
+import sqlalchemy.ext.asyncio as sa_async
+from sqlalchemy import pool
+
+from src.db import models
+from src.settings import settings
+
+if typing.TYPE_CHECKING:
+    from collections.abc import AsyncIterable, Iterable, Sequence
+
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 1
+# 3 characters make cells of about 156 x 156 km
+DEFAULT_PRECISION = 3
+DEFAULT_BATCH_SIZE = 10_000
+
+# Rows of a dataset's columns, with the row's cell last
+type Row = Sequence[typing.Any]
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Dataset:
+    name: str
+    query: sa.Select[typing.Any]
+    geohash: sa.ColumnElement[str]
+    # NULL for rows no export can have missed, which the comparison with a watermark leaves out
+    changed_xid: sa.ColumnElement[int | None]
+    schema: pa.Schema
+
+
+_ORGANIZATION = models.OrganizationReadModel
+_BUILDING = models.Building
+
+DATASETS = (
+    Dataset(
+        name='organizations',
+        query=sa.select(
+            _ORGANIZATION.organization_id,
+            _ORGANIZATION.name,
+            _ORGANIZATION.phone,
+            _ORGANIZATION.building_id,
+            _ORGANIZATION.lon,
+            _ORGANIZATION.lat,
+            _ORGANIZATION.geohash,
+            _ORGANIZATION.specialization_ids,
+        ),
+        geohash=_ORGANIZATION.geohash.expression,
+        changed_xid=_ORGANIZATION.changed_xid.expression,
+        schema=pa.schema(
+            [
+                pa.field('id', pa.int64(), nullable=False),
+                pa.field('name', pa.string(), nullable=False),
+                pa.field('phone', pa.string(), nullable=False),
+                pa.field('building_id', pa.int64(), nullable=False),
+                pa.field('lon', pa.float64(), nullable=False),
+                pa.field('lat', pa.float64(), nullable=False),
+                pa.field('geohash', pa.string(), nullable=False),
+                pa.field('specialization_ids', pa.list_(pa.int64()), nullable=False),
+            ]
+        ),
+    ),
+    Dataset(
+        name='buildings',
+        query=sa.select(
+            _BUILDING.id,
+            _BUILDING.address,
+            sa.func.ST_X(sa.func.geometry(_BUILDING.point)),
+            sa.func.ST_Y(sa.func.geometry(_BUILDING.point)),
+            _BUILDING.geohash,
+        ),
+        geohash=_BUILDING.geohash.expression,
+        changed_xid=_BUILDING.changed_xid.expression,
+        schema=pa.schema(
+            [
+                pa.field('id', pa.int64(), nullable=False),
+                pa.field('address', pa.string(), nullable=False),
+                pa.field('lon', pa.float64(), nullable=False),
+                pa.field('lat', pa.float64(), nullable=False),
+                pa.field('geohash', pa.string(), nullable=False),
+            ]
+        ),
+    ),
+)
+
+_SPECIALIZATIONS = sa.select(models.Specialization.id, models.Specialization.name, models.Specialization.parent_id)
+_SPECIALIZATIONS_SCHEMA = pa.schema(
+    [
+        pa.field('id', pa.int64(), nullable=False),
+        pa.field('name', pa.string(), nullable=False),
+        pa.field('parent_id', pa.int64()),
+    ]
+)
+
+# Every transaction older than the snapshot's xmin is visible to it, or was rolled back
+_SNAPSHOT_XMIN = sa.cast(sa.cast(sa.func.pg_snapshot_xmin(sa.func.pg_current_snapshot()), sa.Text), sa.BigInteger)
+
+
+@dataclasses.dataclass(slots=True)
+class Manifest:
+    precision: int
+    # Snapshot xmin of the export
+    watermark: int
+    # Rows of each partition, by dataset and cell
+    partitions: dict[str, dict[str, int]]
+
+    @classmethod
+    def load(cls, root: pathlib.Path) -> 'Manifest | None':
+        try:
+            content = json.loads((root / MANIFEST).read_text())
+        except FileNotFoundError:
+            return None
+        if content.get('version') != FORMAT_VERSION:
+            return None
+        return cls(content['precision'], content['watermark'], content['partitions'])
+
+    def dump(self, root: pathlib.Path) -> None:
+        content = {'version': FORMAT_VERSION, **dataclasses.asdict(self)}
+        temporary = root / f'{MANIFEST}.tmp'
+        temporary.write_text(json.dumps(content, indent=2, sort_keys=True))
+        temporary.replace(root / MANIFEST)
+
+
+def plan(
+    previous: dict[str, int] | None, counts: dict[str, int], changed: 'Iterable[str]'
+) -> tuple[set[str], set[str]]:
+    """Return the partitions to rewrite and the ones to remove, from the row counts of the last export and now."""
+    if previous is None:
+        return set(counts), set()
+    rewrite = {cell for cell, count in counts.items() if previous.get(cell) != count}
+    rewrite.update(cell for cell in changed if cell in counts)
+    return rewrite, set(previous) - set(counts)
+
+
+def _columns(rows: 'Sequence[Row]', width: int) -> list[list[typing.Any]]:
+    return [list(column) for column in zip(*rows, strict=True)] if rows else [[] for _ in range(width)]
+
+
+def partition_path(root: pathlib.Path, dataset: str, cell: str) -> pathlib.Path:
+    return root / dataset / f'cell={cell}' / 'part.parquet'
+
+
+async def write_partitions(batches: 'AsyncIterable[Sequence[Row]]', root: pathlib.Path, dataset: Dataset) -> int:
+    """Write rows ordered by cell into one file per cell, replacing each once complete. Return the files written."""
+    writer: pq.ParquetWriter | None = None
+    current: pathlib.Path | None = None
+    written = 0
+
+    def finish() -> None:
+        nonlocal writer
+        if writer is not None and current is not None:
+            writer.close()
+            current.with_suffix('.tmp').replace(current)
+            writer = None
+
+    try:
+        async for batch in batches:
+            for cell, rows in itertools.groupby(batch, key=lambda row: row[-1]):
+                path = partition_path(root, dataset.name, cell)
+                if path != current:
+                    finish()
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    current = path
+                    writer = pq.ParquetWriter(path.with_suffix('.tmp'), dataset.schema, compression='zstd')
+                    written += 1
+                assert writer is not None
+                columns = _columns([row[:-1] for row in rows], len(dataset.schema))
+                writer.write_batch(pa.record_batch(columns, schema=dataset.schema))
+        finish()
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+
+async def _export_dataset(
+    connection: sa_async.AsyncConnection,
+    root: pathlib.Path,
+    dataset: Dataset,
+    previous: Manifest | None,
+    *,
+    precision: int,
+    batch_size: int,
+) -> dict[str, int]:
+    cell = sa.func.left(dataset.geohash, precision)
+    counts = dict((await connection.execute(sa.select(cell, sa.func.count()).group_by(cell))).tuples().all())
+    changed: Sequence[str] = []
+    if previous is not None:
+        changed = (
+            await connection.scalars(sa.select(cell).where(dataset.changed_xid >= previous.watermark).distinct())
+        ).all()
+    rewrite, remove = plan(previous.partitions.get(dataset.name) if previous is not None else None, counts, changed)
+
+    written = 0
+    if previous is None:
+        # Partitions of another precision, or left by an export this one can't follow up on
+        shutil.rmtree(root / dataset.name, ignore_errors=True)
+    if rewrite:
+        query = dataset.query.add_columns(cell).order_by(dataset.geohash)
+        if previous is not None:
+            query = query.where(cell == sa.any_(sa.literal(sorted(rewrite), psql.ARRAY(sa.Text))))
+        result = await connection.stream(query, execution_options={'yield_per': batch_size})
+        written = await write_partitions(result.partitions(batch_size), root, dataset)
+    for cell_ in remove:
+        shutil.rmtree(partition_path(root, dataset.name, cell_).parent, ignore_errors=True)
+
+    sys.stdout.write(f'{dataset.name}: {written} of {len(counts)} partitions written, {len(remove)} removed\n')
+    return counts
+
+
+async def export(
+    connection: sa_async.AsyncConnection,
+    root: pathlib.Path,
+    *,
+    precision: int = DEFAULT_PRECISION,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    full: bool = False,
+) -> Manifest:
+    """Export the catalogue as the connection's transaction sees it, incrementally unless `full`."""
+    previous = None if full else Manifest.load(root)
+    if previous is not None and previous.precision != precision:
+        previous = None
+    watermark = await connection.scalar(sa.select(_SNAPSHOT_XMIN))
+    assert watermark is not None
+
+    partitions: dict[str, dict[str, int]] = {}
+    for dataset in DATASETS:
+        partitions[dataset.name] = await _export_dataset(
+            connection, root, dataset, previous, precision=precision, batch_size=batch_size
+        )
+
+    # Small, and rewritten every time
+    specializations = (await connection.execute(_SPECIALIZATIONS)).tuples().all()
+    temporary = root / 'specializations.parquet.tmp'
+    columns = _columns(specializations, len(_SPECIALIZATIONS_SCHEMA))
+    pq.write_table(pa.table(columns, schema=_SPECIALIZATIONS_SCHEMA), temporary, compression='zstd')
+    temporary.replace(root / 'specializations.parquet')
+
+    manifest = Manifest(precision, watermark, partitions)
+    # Last, so an interrupted export is redone from the previous watermark
+    manifest.dump(root)
+    return manifest
+
+
+async def export_from(
+    dsn: str,
+    root: pathlib.Path,
+    *,
+    precision: int = DEFAULT_PRECISION,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    full: bool = False,
+) -> Manifest:
+    engine = sa_async.create_async_engine(dsn, poolclass=pool.NullPool)
+    try:
+        async with engine.connect() as connection:
+            # One consistent view of every table, the one the watermark is the xmin of
+            await connection.execution_options(isolation_level='REPEATABLE READ', postgresql_readonly=True)
+            async with connection.begin():
+                return await export(connection, root, precision=precision, batch_size=batch_size, full=full)
+    finally:
+        await engine.dispose()
+
+
+def main(argv: 'Sequence[str] | None' = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', type=pathlib.Path)
+    parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION, help='Geohash length of partition cells')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows fetched and written at once')
+    parser.add_argument('--full', action='store_true', help='Rewrite every partition')
+    args = parser.parse_args(argv)
+    args.path.mkdir(parents=True, exist_ok=True)
+    asyncio.run(
+        export_from(
+            str(settings.POSTGRES_DSN),
+            args.path,
+            precision=args.precision,
+            batch_size=args.batch_size,
+            full=args.full,
+        )
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
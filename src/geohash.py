@@ -0,0 +1,100 @@
+"""Geohash cells: the lon/lat grid `ST_GeoHash` encodes points with, and the cells covering an area.
+
+Every character of a geohash adds 5 bits, alternately splitting longitude and latitude, so the cells of one precision
+tile the globe in a regular grid and a cell's hash is the prefix of every point's hash inside it.
+"""
+
+import math
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Mean Earth radius, which `ST_DWithin` on geography approximates within 0.5%
+EARTH_RADIUS_M = 6_371_008.8
+# Length of a degree of latitude
+M_PER_DEGREE_LAT = 110_574
+# Precision of the hashes stored in `buildings.geohash`; prefixes of them name coarser cells
+STORED_PRECISION = 9
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """Width and height in degrees of the cells of `precision`."""
+    bits = 5 * precision
+    return 360 / 2 ** math.ceil(bits / 2), 180 / 2 ** (bits // 2)
+
+
+def encode(longitude: float, latitude: float, precision: int = STORED_PRECISION) -> str:
+    """Geohash of the cell of `precision` holding a point, as `ST_GeoHash` computes it."""
+    lon_range = [-180.0, 180.0]
+    lat_range = [-90.0, 90.0]
+    chars: list[str] = []
+    bits = 0
+    for bit in range(5 * precision):
+        # Even bits split longitude, odd ones latitude
+        value, range_ = (longitude, lon_range) if bit % 2 == 0 else (latitude, lat_range)
+        mid = (range_[0] + range_[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            range_[0] = mid
+        else:
+            range_[1] = mid
+        if bit % 5 == 4:  # noqa: PLR2004
+            chars.append(_BASE32[bits])
+            bits = 0
+    return ''.join(chars)
+
+
+def _spans(west: float, south: float, east: float, north: float, precision: int) -> tuple[range, range]:
+    """Columns and rows of the cells of `precision` intersecting a lon/lat box, clamped to the grid."""
+    width, height = cell_size(precision)
+
+    def index(value: float, origin: float, size: float, count: int) -> int:
+        # A box edge on the antimeridian or a pole falls in the last cell, not one past the grid
+        return min(count - 1, max(0, math.floor((value - origin) / size)))
+
+    columns, rows = round(360 / width), round(180 / height)
+    return (
+        range(index(west, -180, width, columns), index(east, -180, width, columns) + 1),
+        range(index(south, -90, height, rows), index(north, -90, height, rows) + 1),
+    )
+
+
+def cover(west: float, south: float, east: float, north: float, precision: int) -> list[str]:
+    """Cells of `precision` intersecting a lon/lat box, row by row from the south-west corner."""
+    width, height = cell_size(precision)
+    columns, rows = _spans(west, south, east, north, precision)
+    # The center of a cell is well inside it, away from any rounding at its edges
+    return [
+        encode(-180 + (column + 0.5) * width, -90 + (row + 0.5) * height, precision)
+        for row in rows
+        for column in columns
+    ]
+
+
+def cover_count(west: float, south: float, east: float, north: float, precision: int) -> int:
+    """Count the cells `cover` returns, without computing them."""
+    columns, rows = _spans(west, south, east, north, precision)
+    return len(columns) * len(rows)
+
+
+def radius_box(longitude: float, latitude: float, radius_m: float) -> tuple[float, float, float, float]:
+    """West, south, east and north bounds of the circle of `radius_m` around a point."""
+    d_lat = radius_m / M_PER_DEGREE_LAT
+    # Near a pole the circle spans every longitude
+    cos_lat = math.cos(math.radians(min(89.0, abs(latitude) + d_lat)))
+    d_lon = min(180.0, radius_m / (M_PER_DEGREE_LAT * cos_lat))
+    return (
+        max(-180.0, longitude - d_lon),
+        max(-90.0, latitude - d_lat),
+        min(180.0, longitude + d_lon),
+        min(90.0, latitude + d_lat),
+    )
+
+
+def distance_m(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """Great-circle distance between two points, by the haversine formula."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
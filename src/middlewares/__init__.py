@@ -0,0 +1,13 @@
+from .compression import CompressionMiddleware
+from .concurrency import ConcurrencyLimitMiddleware
+from .disconnect import CancelOnDisconnectMiddleware
+from .query_budget import QueryBudgetMiddleware
+from .timing import TimingMiddleware
+
+__all__ = (
+    'CancelOnDisconnectMiddleware',
+    'CompressionMiddleware',
+    'ConcurrencyLimitMiddleware',
+    'QueryBudgetMiddleware',
+    'TimingMiddleware',
+)
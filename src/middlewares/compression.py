@@ -0,0 +1,161 @@
+import dataclasses
+import gzip
+import http
+import typing
+
+import brotli
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+
+from src import negotiation
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+    from src.cache import Cache
+
+
+def _brotli(body: bytes) -> bytes:
+    return typing.cast('bytes', brotli.compress(body, quality=5))
+
+
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+# Supported codings, the ones compressing best for the CPU they take first. Levels are the ones tuned for responses
+# built on the fly rather than for archives: brotli's default 11 would take longer than the query
+ENCODINGS: dict[str, 'Callable[[bytes], bytes]'] = {
+    'zstd': zstandard.ZstdCompressor(level=3).compress,
+    'br': _brotli,
+    'gzip': _gzip,
+}
+
+_COMPRESSIBLE = ('application/json', 'application/msgpack', 'application/vnd.apache.arrow.stream', 'text/')
+# Sent as it is produced; buffering it to compress it whole would hold every event until the stream ends
+_STREAMED = 'text/event-stream'
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Return the supported coding the `Accept-Encoding` header prefers, if it accepts any."""
+    weights = negotiation.weights(accept_encoding)
+    wildcard = weights.get('*', 0)
+    # `max` keeps the first of equally weighted codings, so ties go to the order of `ENCODINGS`
+    coding = max(ENCODINGS, key=lambda coding: weights.get(coding, wildcard))
+    return coding if weights.get(coding, wildcard) > 0 else None
+
+
+def _compressible(headers: Headers) -> bool:
+    content_type = headers.get('content-type', '')
+    return (
+        'content-encoding' not in headers
+        and content_type.startswith(_COMPRESSIBLE)
+        and not content_type.startswith(_STREAMED)
+    )
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class CompressedResponse:
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+    def encode(self) -> list[typing.Any]:
+        return [self.status, [list(header) for header in self.headers], self.body]
+
+    @classmethod
+    def decode(cls, value: list[typing.Any]) -> 'CompressedResponse':
+        status, headers, body = value
+        return cls(status, [(name, value) for name, value in headers], body)
+
+    async def send(self, send: 'Send') -> None:
+        await send({'type': 'http.response.start', 'status': self.status, 'headers': self.headers})
+        await send({'type': 'http.response.body', 'body': self.body})
+
+
+class _CompressingSend:
+    """Send wrapper buffering a compressible response and sending it compressed once it is at least `minimum_size`."""
+
+    def __init__(self, send: 'Send', encoding: str, minimum_size: int) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Message | None = None
+        self.body = bytearray()
+        self.passthrough = False
+        # What was sent, when it was compressed
+        self.compressed: CompressedResponse | None = None
+
+    async def __call__(self, message: 'Message') -> None:
+        if message['type'] == 'http.response.start':
+            if _compressible(Headers(raw=message['headers'])):
+                self.start = message
+                return
+            self.passthrough = True
+        if self.passthrough or message['type'] != 'http.response.body' or self.start is None:
+            await self.send(message)
+            return
+
+        self.body += message.get('body', b'')
+        if message.get('more_body', False):
+            return
+        headers = MutableHeaders(scope=self.start)
+        headers.add_vary_header('Accept-Encoding')
+        body = bytes(self.body)
+        if len(body) >= self.minimum_size:
+            body = ENCODINGS[self.encoding](body)
+            headers['Content-Encoding'] = self.encoding
+            headers['Content-Length'] = str(len(body))
+            self.compressed = CompressedResponse(self.start['status'], headers.raw, body)
+        await self.send(self.start)
+        await self.send({'type': 'http.response.body', 'body': body})
+
+
+class CompressionMiddleware:
+    """Compress responses of at least `minimum_size` bytes in the coding the client prefers.
+
+    With the app's cache set, successful GET responses under `cache_prefix` are cached the way they were sent, one
+    entry per coding, so a hit costs neither the query nor the compression. Responses too small to compress aren't
+    cached here, the cache of their service still has them.
+    """
+
+    def __init__(self, app: 'ASGIApp', *, minimum_size: int, cache_prefix: str | None = None) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache_prefix = cache_prefix
+
+    async def __call__(self, scope: 'Scope', receive: 'Receive', send: 'Send') -> None:
+        encoding = negotiate(Headers(scope=scope).get('accept-encoding', '')) if scope['type'] == 'http' else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        cache = self._cache(scope)
+        if cache is None:
+            await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size))
+            return
+
+        loaded = False
+
+        async def load() -> CompressedResponse | None:
+            nonlocal loaded
+            loaded = True
+            compressing_send = _CompressingSend(send, encoding, self.minimum_size)
+            await self.app(scope, receive, compressing_send)
+            compressed = compressing_send.compressed
+            return compressed if compressed is not None and compressed.status == http.HTTPStatus.OK else None
+
+        # One entry per format as well, which `Accept` picks
+        accept = Headers(scope=scope).get('accept', '')
+        key = f'response:{encoding}:{accept}:{scope["path"]}?{scope["query_string"].decode("latin-1")}'
+        cached = await cache.get_or_load(key, load, encode=CompressedResponse.encode, decode=CompressedResponse.decode)
+        if not loaded:
+            assert cached is not None
+            await cached.send(send)
+
+    def _cache(self, scope: 'Scope') -> 'Cache | None':
+        if self.cache_prefix is None or scope['method'] != 'GET' or not scope['path'].startswith(self.cache_prefix):
+            return None
+        return getattr(scope['app'].state, 'cache', None)
@@ -0,0 +1,219 @@
+import asyncio
+import collections
+import math
+import time
+import typing
+
+import prometheus_client
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+if typing.TYPE_CHECKING:
+    from starlette.types import ASGIApp, Receive, Scope, Send
+
+ADMISSION_LIMIT = prometheus_client.Gauge('http_admission_limit', 'Requests allowed to run concurrently')
+ADMISSION_IN_FLIGHT = prometheus_client.Gauge('http_admission_in_flight', 'Requests running')
+ADMISSION_QUEUED = prometheus_client.Gauge('http_admission_queued', 'Requests waiting for a slot')
+ADMISSION_REJECTED = prometheus_client.Counter(
+    'http_admission_rejected',
+    'Requests turned away with a 503',
+    ['reason'],
+)
+
+
+def _granted(waiter: 'asyncio.Future[None]') -> bool:
+    return waiter.done() and not waiter.cancelled()
+
+
+class AdaptiveLimit:
+    """Concurrency limit following latency, after the gradient algorithm of Netflix' concurrency-limits.
+
+    A short-term average latency rising above the long-term one means requests started queueing somewhere downstream
+    (for the DB pool, in Postgres), so the limit shrinks in proportion; otherwise it grows by a small headroom.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int,
+        min_limit: int = 1,
+        max_limit: int,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+        long_window: int = 600,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.long_window = long_window
+        self._limit = float(initial)
+        self._short: float | None = None
+        self._long: float | None = None
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def update(self, latency: float, in_flight: int) -> None:
+        """Account for a request that took `latency` seconds while `in_flight` requests were running."""
+        if self._short is None or self._long is None:
+            self._short = self._long = latency
+            return
+        self._short += (latency - self._short) / 10
+        self._long += (latency - self._long) / self.long_window
+        # Recovering from a spike: let the long-term average follow the short one down faster
+        if self._long > 2 * self._short:
+            self._long *= 0.95
+        # Too few requests to tell anything about the limit
+        if in_flight < self._limit / 2:
+            return
+
+        gradient = max(0.5, min(1.0, self.tolerance * self._long / self._short))
+        target = self._limit * gradient + math.sqrt(self._limit)
+        limit = self._limit * (1 - self.smoothing) + target * self.smoothing
+        self._limit = max(self.min_limit, min(self.max_limit, limit))
+
+
+class ConcurrencyLimiter:
+    """Admits up to `limit` requests at a time and queues the rest per client, served round-robin.
+
+    Serving clients in turn keeps one client's burst from delaying everyone else. With `lifo`, a client's newest
+    requests go first while the queue is over half full: under overload the oldest ones are the likeliest to have been
+    given up on by their clients already.
+    """
+
+    def __init__(
+        self,
+        limit: AdaptiveLimit,
+        *,
+        max_queue: int,
+        max_queue_per_client: int,
+        queue_timeout: float,
+        lifo: bool = False,
+    ) -> None:
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client
+        self.queue_timeout = queue_timeout
+        self.lifo = lifo
+        self.in_flight = 0
+        self.queued = 0
+        # In the order clients get their turn
+        self._queues: dict[str, collections.deque[asyncio.Future[None]]] = {}
+
+    async def acquire(self, client: str) -> str | None:
+        """Wait for a slot; the reason the request was turned away if it doesn't get one."""
+        if self.in_flight < self.limit.limit and not self.queued:
+            self.in_flight += 1
+            return None
+        queue = self._queues.get(client)
+        if self.queued >= self.max_queue or (queue is not None and len(queue) >= self.max_queue_per_client):
+            return 'queue_full'
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(client, collections.deque()).append(waiter)
+        self.queued += 1
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await waiter
+        except TimeoutError:
+            # Unless granted the slot just as the wait ended
+            if not _granted(waiter):
+                self._discard(client, waiter)
+                return 'queue_timeout'
+        except asyncio.CancelledError:
+            if _granted(waiter):
+                self.release()
+            else:
+                self._discard(client, waiter)
+            raise
+        return None
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        while self.queued and self.in_flight < self.limit.limit:
+            client, queue = next(iter(self._queues.items()))
+            waiter = queue.pop() if self.lifo and self.queued > self.max_queue // 2 else queue.popleft()
+            self.queued -= 1
+            # The client's turn is over; back of the line if it has more requests waiting
+            del self._queues[client]
+            if queue:
+                self._queues[client] = queue
+            # Cancelled by the timeout or a disconnect, its request is leaving
+            if waiter.cancelled():
+                continue
+            waiter.set_result(None)
+            self.in_flight += 1
+
+    def _discard(self, client: str, waiter: 'asyncio.Future[None]') -> None:
+        queue = self._queues.get(client)
+        # Already dropped by `release`
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        self.queued -= 1
+        if not queue:
+            del self._queues[client]
+
+
+class ConcurrencyLimitMiddleware:
+    """Admission control for requests under `prefix`, answering `503` with `Retry-After` when saturated.
+
+    Rejecting early is cheaper for everyone than letting requests pile up on the DB pool until they time out.
+    Clients are told apart by their `X-API-Key` header, or their address when they don't send one.
+    """
+
+    def __init__(
+        self,
+        app: 'ASGIApp',
+        *,
+        max_concurrency: int,
+        max_queue: int,
+        max_queue_per_client: int,
+        queue_timeout: float,
+        lifo: bool = False,
+        retry_after: int = 1,
+        prefix: str = '',
+    ) -> None:
+        self.app = app
+        self.limiter = ConcurrencyLimiter(
+            AdaptiveLimit(initial=max_concurrency, max_limit=max_concurrency),
+            max_queue=max_queue,
+            max_queue_per_client=max_queue_per_client,
+            queue_timeout=queue_timeout,
+            lifo=lifo,
+        )
+        self.retry_after = retry_after
+        self.prefix = prefix
+
+    async def __call__(self, scope: 'Scope', receive: 'Receive', send: 'Send') -> None:
+        if scope['type'] != 'http' or not scope['path'].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        client = Headers(scope=scope).get('x-api-key') or (scope.get('client') or ('unknown',))[0]
+        rejected = await self.limiter.acquire(client)
+        self._observe()
+        if rejected is not None:
+            ADMISSION_REJECTED.labels(rejected).inc()
+            response = JSONResponse(
+                {'detail': 'Server is overloaded, retry later'},
+                status_code=503,
+                headers={'Retry-After': str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.limit.update(time.perf_counter() - start, self.limiter.in_flight)
+            self.limiter.release()
+            self._observe()
+
+    def _observe(self) -> None:
+        ADMISSION_LIMIT.set(self.limiter.limit.limit)
+        ADMISSION_IN_FLIGHT.set(self.limiter.in_flight)
+        ADMISSION_QUEUED.set(self.limiter.queued)
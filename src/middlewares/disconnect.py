@@ -0,0 +1,50 @@
+import asyncio
+import typing
+
+if typing.TYPE_CHECKING:
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class CancelOnDisconnectMiddleware:
+    """Cancel requests under `prefix` whose client went away, which cancels the query they're awaiting with it.
+
+    Nobody reads the answer of a disconnected request, so there is no point in holding a pooled connection for it:
+    asyncpg sends Postgres a cancel request when the coroutine awaiting a query is cancelled.
+    """
+
+    def __init__(self, app: 'ASGIApp', *, prefix: str = '') -> None:
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope: 'Scope', receive: 'Receive', send: 'Send') -> None:
+        if scope['type'] != 'http' or not scope['path'].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        task = asyncio.current_task()
+        assert task is not None
+        # The listener owns `receive`; the app reads what it forwards
+        messages: asyncio.Queue[Message] = asyncio.Queue()
+        disconnected = False
+
+        async def listen() -> None:
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message['type'] == 'http.disconnect':
+                    disconnected = True
+                    task.cancel()
+                    return
+
+        listener = asyncio.create_task(listen())
+        try:
+            await self.app(scope, messages.get, send)
+        except asyncio.CancelledError:
+            if not disconnected:
+                raise
+        finally:
+            listener.cancel()
+            # The disconnect raced the end of the request; don't let the cancellation hit the server's own code
+            if disconnected and task.cancelling():
+                task.uncancel()
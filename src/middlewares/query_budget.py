@@ -0,0 +1,42 @@
+import typing
+
+from starlette.responses import JSONResponse
+
+from src.db import QueryBudgetExceededError, track_queries
+
+if typing.TYPE_CHECKING:
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class QueryBudgetMiddleware:
+    """Fail requests that run too many statements or fetch too many rows, for catching N+1s in development."""
+
+    def __init__(self, app: 'ASGIApp', *, max_queries: int | None = None, max_rows: int | None = None) -> None:
+        self.app = app
+        self.max_queries = max_queries
+        self.max_rows = max_rows
+
+    async def __call__(self, scope: 'Scope', receive: 'Receive', send: 'Send') -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        error: QueryBudgetExceededError | None = None
+        with track_queries() as queries:
+
+            async def send_checked(message: 'Message') -> None:
+                nonlocal error
+                if message['type'] == 'http.response.start':
+                    try:
+                        queries.check_budget(max_queries=self.max_queries, max_rows=self.max_rows)
+                    except QueryBudgetExceededError as exceeded:
+                        error = exceeded
+                # The app's response is dropped for the budget error's
+                if error is None:
+                    await send(message)
+
+            await self.app(scope, receive, send_checked)
+
+        if error is not None:
+            response = JSONResponse({'detail': str(error)}, status_code=500)
+            await response(scope, receive, send)
@@ -0,0 +1,78 @@
+import time
+import typing
+
+import prometheus_client
+from starlette.datastructures import MutableHeaders
+
+from src.db import QueryStats, track_queries
+
+if typing.TYPE_CHECKING:
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_DURATION = prometheus_client.Histogram(
+    'http_request_duration_seconds',
+    'Time from receiving a request to sending its last body chunk',
+    ['method', 'route', 'status'],
+)
+REQUEST_DB_QUERIES = prometheus_client.Histogram(
+    'http_request_db_queries',
+    'Statements executed per request',
+    ['route'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34),
+)
+REQUEST_DB_DURATION = prometheus_client.Histogram(
+    'http_request_db_duration_seconds',
+    'Time spent executing statements per request',
+    ['route'],
+)
+REQUEST_DB_ROWS = prometheus_client.Histogram(
+    'http_request_db_rows',
+    'Rows returned or changed by the statements of a request',
+    ['route'],
+    buckets=(0, 1, 10, 100, 1_000, 10_000, 100_000),
+)
+
+
+def _server_timing(elapsed: float, queries: QueryStats) -> str:
+    db_ms = queries.duration * 1000
+    total_ms = elapsed * 1000
+    return (
+        f'db;dur={db_ms:.1f};desc="{queries.queries} queries, {queries.rows} rows", '
+        f'app;dur={total_ms - db_ms:.1f}, '
+        f'total;dur={total_ms:.1f}'
+    )
+
+
+class TimingMiddleware:
+    """Per-route latency and DB usage histograms, plus a `Server-Timing` header splitting DB time from the rest."""
+
+    def __init__(self, app: 'ASGIApp') -> None:
+        self.app = app
+
+    async def __call__(self, scope: 'Scope', receive: 'Receive', send: 'Send') -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        with track_queries() as queries:
+
+            async def send_with_timing(message: 'Message') -> None:
+                nonlocal status
+                if message['type'] == 'http.response.start':
+                    status = message['status']
+                    headers = MutableHeaders(scope=message)
+                    headers.append('Server-Timing', _server_timing(time.perf_counter() - start, queries))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                # Label by route template rather than path, so path parameters don't blow up cardinality
+                route = getattr(scope.get('route'), 'path', 'unmatched')
+                REQUEST_DURATION.labels(scope['method'], route, status).observe(time.perf_counter() - start)
+                REQUEST_DB_QUERIES.labels(route).observe(queries.queries)
+                REQUEST_DB_DURATION.labels(route).observe(queries.duration)
+                REQUEST_DB_ROWS.labels(route).observe(queries.rows)
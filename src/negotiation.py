@@ -0,0 +1,16 @@
+def weights(header: str) -> dict[str, float]:
+    """Return the weight (`q`) of each item of an `Accept` or `Accept-Encoding` header, by lowercased item."""
+    result: dict[str, float] = {}
+    for element in header.split(','):
+        item, *params = (part.strip() for part in element.split(';'))
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0
+        if item:
+            result[item.lower()] = weight
+    return result
@@ -1,6 +1,15 @@
+from .change_repository import ChangeRepository, ChangeRepositoryDep
 from .organization_repository import OrganizationRepository, OrganizationRepositoryDep
+from .organization_writer import OrganizationWriter, OrganizationWriterDep
+from .specialization_repository import SpecializationRepository, SpecializationRepositoryDep
 
 __all__ = (
+    'ChangeRepository',
+    'ChangeRepositoryDep',
     'OrganizationRepository',
     'OrganizationRepositoryDep',
+    'OrganizationWriter',
+    'OrganizationWriterDep',
+    'SpecializationRepository',
+    'SpecializationRepositoryDep',
 )
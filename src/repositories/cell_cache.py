@@ -0,0 +1,210 @@
+import asyncio
+import collections
+import dataclasses
+import logging
+import time
+import typing
+
+import asyncpg
+import fastapi
+import prometheus_client
+import sqlalchemy as sa
+import sqlalchemy.dialects.postgresql as psql
+from sqlalchemy import engine as sa_engine
+from sqlalchemy import exc
+
+from src.db import models
+from src.repositories.records import SpecializationRecord
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Collection, Iterable
+
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    from src.repositories.records import OrganizationRecord
+    from src.repositories.taxonomy import TaxonomyCache
+
+logger = logging.getLogger(__name__)
+
+# Channel trg_organization_read_models_notify sends changed organization ids on
+CHANNEL = 'organization_read_models'
+
+CELL_CACHE_REQUESTS = prometheus_client.Counter(
+    'spatial_cell_cache_requests',
+    'Geohash cells looked up in the cell cache',
+    ['result'],
+)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class CellEntry:
+    """Organization located in a cell, with its coordinates for filtering it exactly."""
+
+    organization: 'OrganizationRecord'
+    longitude: float
+    latitude: float
+
+
+# Cells with more organizations than the repository loads are kept as `None`, so the requests covering them go
+# straight to PostGIS
+type CellEntries = tuple[CellEntry, ...] | None
+
+
+def _rows(entries: CellEntries) -> int:
+    """Rows `entries` count for in the cache's size; empty and dense cells count for one, as the cell takes memory."""
+    return len(entries or ()) or 1
+
+
+class CellCache:
+    """Organizations of geohash cells, for up to `ttl` seconds and `size` organizations, least recent cells out first.
+
+    Cells are dropped as the read model changes by `invalidate`, which `CellCacheInvalidator` calls on every worker.
+    """
+
+    def __init__(self, *, size: int, ttl: float) -> None:
+        self.size = size
+        self.ttl = ttl
+        self.rows = 0
+        # Bumped by every invalidation, so cells read before one aren't put after it
+        self.generation = 0
+        self._cells: collections.OrderedDict[str, tuple[float, CellEntries]] = collections.OrderedDict()
+
+    def get_many(self, cells: 'Iterable[str]') -> tuple[dict[str, CellEntries], list[str]]:
+        """Entries of the cells found in the cache, and the cells that weren't."""
+        now = time.monotonic()
+        found: dict[str, CellEntries] = {}
+        missing: list[str] = []
+        for cell in cells:
+            cached = self._cells.get(cell)
+            if cached is None or cached[0] <= now:
+                missing.append(cell)
+                continue
+            self._cells.move_to_end(cell)
+            found[cell] = cached[1]
+        CELL_CACHE_REQUESTS.labels('hit').inc(len(found))
+        CELL_CACHE_REQUESTS.labels('miss').inc(len(missing))
+        return found, missing
+
+    def put(self, cell: str, entries: CellEntries, *, generation: int | None = None) -> None:
+        """Cache `entries`, unless the cache was invalidated since `generation`, read before reading them."""
+        if generation is not None and generation != self.generation:
+            return
+        replaced = self._cells.pop(cell, None)
+        if replaced is not None:
+            self.rows -= _rows(replaced[1])
+        self._cells[cell] = (time.monotonic() + self.ttl, entries)
+        self.rows += _rows(entries)
+        while self.rows > self.size:
+            _, (_, evicted) = self._cells.popitem(last=False)
+            self.rows -= _rows(evicted)
+
+    def invalidate(self, organization_ids: 'Collection[int]', geohashes: 'Iterable[str]') -> None:
+        """Drop the cells listing any of `organization_ids`, and those containing any of `geohashes`."""
+        self.generation += 1
+        # The cells containing a point are the prefixes of its geohash
+        containing = {geohash[:length] for geohash in geohashes for length in range(1, len(geohash) + 1)}
+        for cell, (_, entries) in list(self._cells.items()):
+            if cell in containing or any(entry.organization.id in organization_ids for entry in entries or ()):
+                del self._cells[cell]
+                self.rows -= _rows(entries)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._cells.clear()
+        self.rows = 0
+
+
+_CHANGED = sa.select(
+    models.OrganizationReadModel.geohash, models.OrganizationReadModel.payload['specializations']
+).where(
+    models.OrganizationReadModel.organization_id
+    == sa.any_(sa.bindparam('organization_ids', type_=psql.ARRAY(sa.Integer)))
+)
+
+
+class CellCacheInvalidator:
+    """Drops the cells of the organizations Postgres notifies changes of on `CHANNEL` from `cache`.
+
+    An organization's cells are the ones listing it, where it was, and the ones containing where it is now, read from
+    the read model. Notifications aren't queued for a disconnected listener, hence clearing the whole cache after
+    every reconnection.
+
+    Renaming or moving a specialization refreshes the read models of its organizations, so their notifications also
+    drop a `taxonomy_cache` holding it as it was.
+    """
+
+    def __init__(
+        self,
+        cache: CellCache,
+        dsn: str,
+        sessionmaker: 'async_sessionmaker[AsyncSession]',
+        *,
+        taxonomy_cache: 'TaxonomyCache | None' = None,
+        batch_delay: float = 0.05,
+        retry_delay: float = 1,
+    ) -> None:
+        self.cache = cache
+        self.taxonomy_cache = taxonomy_cache
+        # asyncpg's own DSN, without SQLAlchemy's driver suffix
+        self.dsn = sa_engine.make_url(dsn).set(drivername='postgresql').render_as_string(hide_password=False)
+        self.sessionmaker = sessionmaker
+        self.batch_delay = batch_delay
+        self.retry_delay = retry_delay
+        self._pending: set[int] = set()
+        self._notified = asyncio.Event()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError, exc.SQLAlchemyError):
+                logger.exception('Cell cache listener failed, reconnecting in %s s', self.retry_delay)
+            await asyncio.sleep(self.retry_delay)
+
+    async def _listen(self) -> None:
+        connection = await asyncpg.connect(self.dsn)
+        try:
+            await connection.add_listener(CHANNEL, self._on_notification)
+            self._pending.clear()
+            # Changes made before listening weren't heard of
+            self.cache.clear()
+            if self.taxonomy_cache is not None:
+                self.taxonomy_cache.clear()
+            while not connection.is_closed():
+                try:
+                    await asyncio.wait_for(self._notified.wait(), timeout=self.retry_delay)
+                except TimeoutError:
+                    continue
+                # Let a burst of changes gather into one query
+                await asyncio.sleep(self.batch_delay)
+                await self._apply()
+            raise asyncpg.InterfaceError('Listener connection closed')  # noqa: EM101, TRY003
+        finally:
+            await connection.close()
+
+    def _on_notification(self, _connection: object, _pid: int, _channel: str, payload: str) -> None:
+        self._pending.add(int(payload))
+        self._notified.set()
+
+    async def _apply(self) -> None:
+        organization_ids = set(self._pending)
+        self._pending.clear()
+        self._notified.clear()
+        async with self.sessionmaker() as session:
+            rows = (await session.execute(_CHANGED, {'organization_ids': list(organization_ids)})).tuples().all()
+        self.cache.invalidate(organization_ids, [geohash for geohash, _ in rows])
+        if self.taxonomy_cache is not None:
+            self.taxonomy_cache.discard_stale(
+                SpecializationRecord(**specialization)
+                for _, specializations in rows
+                for specialization in specializations
+            )
+
+
+def get_cell_cache(request: fastapi.Request) -> CellCache | None:
+    return getattr(request.app.state, 'cell_cache', None)
+
+
+# Shared by the requests of a worker, started by the app's lifespan unless `SPATIAL_CELL_CACHE_SIZE` is 0;
+# repositories without one read every cell from the database
+CellCacheDep = typing.Annotated[CellCache | None, fastapi.Depends(get_cell_cache)]
@@ -0,0 +1,58 @@
+import asyncio
+import logging
+import typing
+
+import asyncpg
+import fastapi
+from sqlalchemy import engine as sa_engine
+
+logger = logging.getLogger(__name__)
+
+# Channel log_change() notifies on when a transaction logging changes commits
+CHANNEL = 'change_log'
+
+
+class ChangeNotifier:
+    """Wakes the worker's long polls of `/changes` when Postgres notifies logged changes on `CHANNEL`."""
+
+    def __init__(self, dsn: str, *, retry_delay: float = 1) -> None:
+        # asyncpg's own DSN, without SQLAlchemy's driver suffix
+        self.dsn = sa_engine.make_url(dsn).set(drivername='postgresql').render_as_string(hide_password=False)
+        self.retry_delay = retry_delay
+        self._changed = asyncio.Event()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                logger.exception('Change listener failed, reconnecting in %s s', self.retry_delay)
+            await asyncio.sleep(self.retry_delay)
+
+    async def changed(self) -> None:
+        """Wait for the next notification."""
+        await self._changed.wait()
+
+    async def _listen(self) -> None:
+        connection = await asyncpg.connect(self.dsn)
+        closed = asyncio.Event()
+        try:
+            connection.add_termination_listener(lambda _connection: closed.set())  # pyright: ignore[reportUnknownLambdaType]
+            await connection.add_listener(CHANNEL, self._on_notification)
+            await closed.wait()
+            raise asyncpg.InterfaceError('Listener connection closed')  # noqa: EM101, TRY003
+        finally:
+            await connection.close()
+
+    def _on_notification(self, _connection: object, _pid: int, _channel: str, _payload: str) -> None:
+        # Wakes every current waiter at once; later ones wait for the next notification
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+def get_change_notifier(request: fastapi.Request) -> ChangeNotifier | None:
+    return getattr(request.app.state, 'change_notifier', None)
+
+
+# Started by the app's lifespan when `CHANGES_LISTEN` is on
+ChangeNotifierDep = typing.Annotated[ChangeNotifier | None, fastapi.Depends(get_change_notifier)]
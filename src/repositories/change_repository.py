@@ -0,0 +1,35 @@
+import typing
+
+import fastapi
+import sqlalchemy as sa
+
+from src import schemas
+from src.db import SessionDep, models
+
+_CHANGES = sa.select(
+    models.ChangeLog.seq,
+    models.ChangeLog.table_name,
+    models.ChangeLog.operation,
+    models.ChangeLog.key,
+    models.ChangeLog.changed_at,
+)
+
+
+class ChangeRepository:
+    def __init__(self, session: SessionDep):
+        self._session = session
+
+    async def get_since(self, seq: int, limit: int) -> list[schemas.Change]:
+        """Return up to `limit` changes after `seq`, numbering the ones whose transactions are all over first."""
+        await self._session.execute(sa.select(sa.func.publish_changes()))
+        rows = await self._session.execute(
+            _CHANGES.where(models.ChangeLog.seq > seq).order_by(models.ChangeLog.seq).limit(limit)
+        )
+        changes = [schemas.Change.model_validate(row) for row in rows]
+        # Changes numbered here must be committed before anyone reads them; ending the transaction also returns the
+        # connection to the pool while a long poll waits
+        await self._session.commit()
+        return changes
+
+
+ChangeRepositoryDep = typing.Annotated[ChangeRepository, fastapi.Depends(ChangeRepository)]
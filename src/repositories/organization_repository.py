@@ -1,119 +1,472 @@
+import asyncio
+import contextlib
+import dataclasses
 import typing
 
 import fastapi
 import sqlalchemy as sa
-from geoalchemy2 import Geography
-from geoalchemy2.shape import to_shape
-from sqlalchemy import orm
+import sqlalchemy.dialects.postgresql as psql
+from sqlalchemy import exc, orm
 
-from src import schemas
-from src.db import SessionDep, models
+from src import geohash, schemas
+from src.db import Explain, SessionDep, SessionmakerDep, models, plan_rows
+from src.db.types import Geography
+from src.deadline import Deadline, DeadlineExceededError
+from src.repositories.cell_cache import CellCacheDep, CellEntry
+from src.repositories.records import OrganizationPage, OrganizationRecord
+from src.repositories.taxonomy import TaxonomyCache, TaxonomyCacheDep
+from src.settings import settings
 
 if typing.TYPE_CHECKING:
-    from shapely import Point
+    from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Mapping, Sequence
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from src.repositories.spatial_index import IndexedOrganization, SpatialIndex
+
+# Values of `grouping(building_id, root_specialization_id)` for each grouping set of the facets query
+_FACET_TOTAL = 0b11
+_FACET_BUILDING = 0b01
+_FACET_SPECIALIZATION = 0b10
+
+# Postgres' `query_canceled`, raised when a statement runs past `statement_timeout`
+_QUERY_CANCELED = '57014'
+
+_LIMIT = sa.bindparam('limit', type_=sa.Integer)
+_OFFSET = sa.bindparam('offset', type_=sa.Integer)
+_SAMPLE_SIZE = sa.bindparam('sample_size', type_=sa.Integer)
+
+# Payload without its rendered specializations, which are hydrated from the taxonomy by `specialization_ids` instead
+_PAYLOAD = models.OrganizationReadModel.payload.op('-', return_type=psql.JSONB)(
+    sa.literal_column("'specializations'", sa.Text)
+).label('payload')
+_SPECIALIZATION_IDS = models.OrganizationReadModel.specialization_ids
+
+type _Hydratable = tuple[dict[str, typing.Any], list[int]]
+
+
+def _facets_query(matched: sa.Subquery) -> sa.Select[tuple[int, int | None, int | None, int]]:
+    """Total, per-building and per-top-level-specialization counts of the matched organizations."""
+    spec = orm.aliased(models.Specialization)
+    parent = orm.aliased(models.Specialization)
+    grandparent = orm.aliased(models.Specialization)
+    facts = (
+        sa.select(
+            models.OrganizationReadModel.organization_id,
+            models.OrganizationReadModel.building_id,
+            # trg_specialization_depth_check keeps the taxonomy at most 3 levels deep
+            sa.func.coalesce(grandparent.id, parent.id, spec.id).label('root_specialization_id'),
+        )
+        .select_from(matched)
+        .join(
+            models.OrganizationReadModel,
+            models.OrganizationReadModel.organization_id == matched.c.organization_id,
+        )
+        .outerjoin(spec, spec.id == sa.any_(models.OrganizationReadModel.specialization_ids))
+        .outerjoin(parent, parent.id == spec.parent_id)
+        .outerjoin(grandparent, grandparent.id == parent.parent_id)
+        .cte('facts')
+    )
+    return sa.select(
+        sa.func.grouping(facts.c.building_id, facts.c.root_specialization_id),
+        facts.c.building_id,
+        facts.c.root_specialization_id,
+        sa.func.count(sa.distinct(facts.c.organization_id)),
+    ).group_by(sa.func.grouping_sets(sa.tuple_(), facts.c.building_id, facts.c.root_specialization_id))
+
+
+class _Filter:
+    """Every statement a listing needs for one way of filtering organizations, built once per process.
+
+    Filter values stay bind parameters supplied at execution time, so each statement has a single SQL text:
+    SQLAlchemy's compiled cache and asyncpg's prepared statement cache hit on every call after the first.
+    """
+
+    def __init__(self, where: sa.ColumnElement[bool], *, order_by: tuple[sa.ColumnElement[typing.Any], ...] = ()):
+        page_order = (*order_by, models.OrganizationReadModel.organization_id)
+        match = sa.select(models.OrganizationReadModel.organization_id).where(where)
+        self.page = (
+            sa.select(_PAYLOAD, _SPECIALIZATION_IDS).where(where).order_by(*page_order).limit(_LIMIT).offset(_OFFSET)
+        )
+        # The window is evaluated before LIMIT/OFFSET, so every row carries the full match count
+        self.page_with_total = self.page.add_columns(sa.func.count().over().label('total'))
+        self.count = sa.select(sa.func.count()).select_from(match.subquery())
+        self.estimate = Explain(match)
+        self.facets = _facets_query(match.subquery())
+        # The first matches in the page's order, so the same request samples the same organizations every time
+        self.sampled_facets = _facets_query(match.order_by(*page_order).limit(_SAMPLE_SIZE).subquery())
+
+
+_CENTER = sa.func.ST_Point(
+    sa.bindparam('longitude', type_=sa.Float),
+    sa.bindparam('latitude', type_=sa.Float),
+    4326,
+).cast(Geography('POINT'))
+
+_BY_ID = sa.select(_PAYLOAD, _SPECIALIZATION_IDS).where(
+    models.OrganizationReadModel.organization_id == sa.bindparam('organization_id', type_=sa.Integer)
+)
+_BY_ADDRESS = _Filter(
+    models.OrganizationReadModel.address_search_vector.op('@@')(
+        sa.func.plainto_tsquery('english', sa.bindparam('address', type_=sa.String))
+    )
+)
+_BY_BUILDING = _Filter(models.OrganizationReadModel.building_id == sa.bindparam('building_id', type_=sa.Integer))
+# One array parameter regardless of how many specializations are asked for
+_BY_ALL_SPECIALIZATIONS = _Filter(
+    models.OrganizationReadModel.specialization_ids.contains(sa.bindparam('specs', type_=psql.ARRAY(sa.Integer)))
+)
+_BY_ANY_SPECIALIZATION = _Filter(
+    models.OrganizationReadModel.specialization_ids.overlap(sa.bindparam('specs', type_=psql.ARRAY(sa.Integer)))
+)
+_BY_RADIUS = _Filter(
+    sa.func.ST_DWithin(models.OrganizationReadModel.point, _CENTER, sa.bindparam('radius_m', type_=sa.Integer)),
+    # `<->` on geography is served by the GiST index, ordering by distance
+    order_by=(models.OrganizationReadModel.point.op('<->')(_CENTER),),
+)
+_BY_BOX = _Filter(
+    sa.func.ST_DWithin(
+        models.OrganizationReadModel.point,
+        sa.func.ST_MakeEnvelope(
+            sa.bindparam('ll_longitude', type_=sa.Float),
+            sa.bindparam('ll_latitude', type_=sa.Float),
+            sa.bindparam('ur_longitude', type_=sa.Float),
+            sa.bindparam('ur_latitude', type_=sa.Float),
+            4326,
+        ).cast(Geography('POLYGON')),
+        0,
+    )
+)
+_BY_NAME = _Filter(
+    models.OrganizationReadModel.name_search_vector.op('@@')(
+        sa.func.plainto_tsquery('english', sa.bindparam('name', type_=sa.String))
+    )
+)
+
+# Up to `cell_rows` organizations of each of the geohash cells in `cells`, with the cell they're in: the hashes in a
+# cell are the ones it prefixes, which sort between the cell itself and the cell followed by `~`, after every geohash
+# character
+_CELLS = sa.func.unnest(sa.bindparam('cells', type_=psql.ARRAY(sa.String))).table_valued(sa.column('cell', sa.String))
+_CELL_ORGANIZATIONS = (
+    sa.select(
+        models.OrganizationReadModel.lon,
+        models.OrganizationReadModel.lat,
+        _PAYLOAD,
+        _SPECIALIZATION_IDS,
+    )
+    .where(
+        models.OrganizationReadModel.geohash >= _CELLS.c.cell,
+        models.OrganizationReadModel.geohash < _CELLS.c.cell + '~',
+    )
+    .limit(sa.bindparam('cell_rows', type_=sa.Integer))
+    .lateral()
+)
+_BY_CELLS = sa.select(_CELLS.c.cell, _CELL_ORGANIZATIONS).select_from(_CELLS).join(_CELL_ORGANIZATIONS, sa.true())
+
+
+def _covering_cells(west: float, south: float, east: float, north: float) -> list[str] | None:
+    """Cells of the finest precision covering a box with at most `SPATIAL_MAX_CELLS`, if any does."""
+    for precision in sorted(settings.SPATIAL_CELL_PRECISIONS, reverse=True):
+        if geohash.cover_count(west, south, east, north, precision) <= settings.SPATIAL_MAX_CELLS:
+            return geohash.cover(west, south, east, north, precision)
+    return None
+
+
+# `SET LOCAL statement_timeout`, as a function so the value can be a bind parameter and the statement stays prepared
+_STATEMENT_TIMEOUT = sa.select(
+    sa.func.set_config('statement_timeout', sa.bindparam('timeout', type_=sa.String), sa.true())
+)
+
+
+async def _nothing() -> None:
+    return None
+
+
+async def _apply_deadline(session: 'AsyncSession', deadline: Deadline | None) -> None:
+    """Limit the statements of the session's transaction to the time left before `deadline`."""
+    if deadline is not None:
+        await session.execute(_STATEMENT_TIMEOUT, {'timeout': deadline.statement_timeout()})
+
+
+@contextlib.contextmanager
+def _deadline_errors() -> 'Iterator[None]':
+    try:
+        yield
+    except exc.DBAPIError as e:
+        if getattr(e.orig, 'pgcode', None) == _QUERY_CANCELED:
+            raise DeadlineExceededError from e
+        raise
+
+
+def get_spatial_index(request: fastapi.Request) -> 'SpatialIndex | None':
+    return getattr(request.app.state, 'spatial_index', None)
+
+
+# Loaded by the app's lifespan when `SPATIAL_INDEX` is on
+SpatialIndexDep = typing.Annotated['SpatialIndex | None', fastapi.Depends(get_spatial_index)]
 
 
 class OrganizationRepository:
-    def __init__(self, session: SessionDep):
+    def __init__(
+        self,
+        session: SessionDep,
+        sessionmaker: SessionmakerDep = None,
+        cell_cache: CellCacheDep = None,
+        spatial_index: SpatialIndexDep = None,
+        taxonomy_cache: TaxonomyCacheDep = None,
+    ):
         self._session = session
+        self._sessionmaker = sessionmaker
+        self._cell_cache = cell_cache
+        self._spatial_index = spatial_index
+        self._taxonomy_cache = taxonomy_cache if taxonomy_cache is not None else TaxonomyCache(ttl=0)
+
+    @contextlib.asynccontextmanager
+    async def _side_session(self, deadline: Deadline | None) -> 'AsyncIterator[AsyncSession]':
+        """Session for a query that runs concurrently with the page query."""
+        if self._sessionmaker is None:
+            yield self._session
+            return
+        async with self._sessionmaker() as session:
+            await _apply_deadline(session, deadline)
+            yield session
+
+    async def _gather[T1, T2, T3](
+        self, first: 'Awaitable[T1]', second: 'Awaitable[T2]', third: 'Awaitable[T3]'
+    ) -> tuple[T1, T2, T3]:
+        if self._sessionmaker is None:
+            # Every query shares one session, which can't run statements concurrently
+            return await first, await second, await third
+        return await asyncio.gather(first, second, third)
+
+    async def _list(
+        self,
+        filter_: _Filter,
+        params: 'Mapping[str, typing.Any]',
+        *,
+        limit: int,
+        offset: int,
+        facets: schemas.CountMode | None,
+        total: schemas.CountMode | None,
+        deadline: Deadline | None,
+    ) -> OrganizationPage:
+        # Sampled facets estimate the count anyway, which then serves as the estimated total too
+        estimate_apart = total is schemas.CountMode.ESTIMATE and facets is not schemas.CountMode.ESTIMATE
+        with _deadline_errors():
+            await _apply_deadline(self._session, deadline)
+            (organizations, total_), facets_and_estimate, estimated_total = await self._gather(
+                self._fetch_page(filter_, {**params, 'limit': limit, 'offset': offset}, total),
+                self._fetch_facets(filter_, params, facets, deadline) if facets is not None else _nothing(),
+                self._estimate_count(filter_, params, deadline) if estimate_apart else _nothing(),
+            )
+            facets_ = None
+            if facets_and_estimate is not None:
+                facets_, facets_estimate = facets_and_estimate
+                estimated_total = estimated_total if estimate_apart else facets_estimate
+            if total is schemas.CountMode.ESTIMATE:
+                total_ = estimated_total
+            elif total is schemas.CountMode.EXACT and total_ is None:
+                # No rows to read the window from: either nothing matched or the offset is past the end
+                total_ = 0 if offset == 0 else await self._session.scalar(filter_.count, params)
+        return OrganizationPage(organizations=organizations, facets=facets_, total=total_)
 
-    @staticmethod
-    def _model_to_schema(model: models.Organization) -> schemas.Organization:
-        coords = typing.cast('Point', to_shape(model.building.point))
-        return schemas.Organization(
-            id=model.id,
-            name=model.name,
-            phone=model.phone,
-            building_id=model.building.id,
-            building_address=model.building.address,
-            building_coordinates=(coords.x, coords.y),
-            specializations=[
-                schemas.Specialization(id=spec.id, name=spec.name, parent_id=spec.parent_id)
-                for spec in model.specializations
+    async def _list_cells(
+        self,
+        cells: list[str],
+        distance: 'Callable[[CellEntry], float | None]',
+        *,
+        limit: int,
+        offset: int,
+        total: schemas.CountMode | None,
+        deadline: Deadline | None,
+    ) -> OrganizationPage | None:
+        """List the organizations of `cells` for which `distance` gives a sort key, nearest first.
+
+        Cells missing from the cache are read in a single query. All their organizations are kept, so the cells serve
+        any later request they cover; the ones outside of this request's area are only filtered out here. Cells of more
+        than `SPATIAL_MAX_CELL_ROWS` organizations aren't loaded; with any of them, nothing is listed and the area is
+        left to PostGIS.
+        """
+        found, missing = self._cell_cache.get_many(cells) if self._cell_cache is not None else ({}, cells)
+        generation = self._cell_cache.generation if self._cell_cache is not None else None
+        if missing and None not in found.values():
+            max_rows = settings.SPATIAL_MAX_CELL_ROWS
+            with _deadline_errors():
+                await _apply_deadline(self._session, deadline)
+                rows = (await self._session.execute(_BY_CELLS, {'cells': missing, 'cell_rows': max_rows + 1})).all()
+            by_cell: dict[str, list[sa.Row[typing.Any]]] = {cell: [] for cell in missing}
+            for row in rows:
+                by_cell[row.cell].append(row)
+            # Only the cells within the cap are hydrated; the dense ones are remembered as such
+            kept = [row for cell_rows in by_cell.values() if len(cell_rows) <= max_rows for row in cell_rows]
+            organizations = iter(await self._hydrate([(payload, ids) for *_, payload, ids in kept]))
+            for cell, cell_rows in by_cell.items():
+                found[cell] = None
+                if len(cell_rows) <= max_rows:
+                    found[cell] = tuple(
+                        CellEntry(next(organizations), longitude, latitude) for _, longitude, latitude, *_ in cell_rows
+                    )
+                if self._cell_cache is not None:
+                    self._cell_cache.put(cell, found[cell], generation=generation)
+        if None in found.values():
+            return None
+
+        matches = [
+            (key, entry.organization.id, entry.organization)
+            for entries in found.values()
+            for entry in entries or ()
+            if (key := distance(entry)) is not None
+        ]
+        matches.sort(key=lambda match: match[:2])
+        return OrganizationPage(
+            organizations=[organization for *_, organization in matches[offset : offset + limit]],
+            # Every match is at hand, so the count is exact whichever mode was asked for
+            total=len(matches) if total is not None else None,
+        )
+
+    async def _hydrate(self, rows: 'Sequence[_Hydratable]') -> list[OrganizationRecord]:
+        """Build organizations from their payloads and the ids of their specializations."""
+        if not rows:
+            return []
+        taxonomy = await self._taxonomy_cache.get(self._session, {id_ for _, ids in rows for id_ in ids})
+        return [OrganizationRecord.from_payload(payload, taxonomy.specializations(ids)) for payload, ids in rows]
+
+    async def _indexed(
+        self, organizations: 'list[IndexedOrganization]', total: int, mode: schemas.CountMode | None
+    ) -> OrganizationPage:
+        """Build the listing of a page found in the spatial index, whose total is always exact."""
+        ids = {id_ for organization in organizations for id_ in organization.specialization_ids}
+        taxonomy = await self._taxonomy_cache.get(self._session, ids)
+        return OrganizationPage(
+            organizations=[
+                dataclasses.replace(
+                    organization.record, specializations=taxonomy.specializations(organization.specialization_ids)
+                )
+                for organization in organizations
             ],
+            total=total if mode is not None else None,
         )
 
-    async def get_by_id(self, organization_id: int) -> schemas.Organization | None:
-        query = (
-            sa.select(models.Organization)
-            .options(
-                orm.joinedload(models.Organization.building),
-                orm.joinedload(models.Organization.specializations),
-            )
-            .where(models.Organization.id == organization_id)
-            .limit(1)
+    async def _fetch_page(
+        self, filter_: _Filter, params: 'Mapping[str, typing.Any]', total: schemas.CountMode | None
+    ) -> tuple[list[OrganizationRecord], int | None]:
+        """Fetch a page, with the exact count of all matches read off its rows when `total` is exact."""
+        if total is not schemas.CountMode.EXACT:
+            rows = (await self._session.execute(filter_.page, params)).all()
+            return await self._hydrate([(row[0], row[1]) for row in rows]), None
+        rows = (await self._session.execute(filter_.page_with_total, params)).all()
+        return await self._hydrate([(row[0], row[1]) for row in rows]), rows[0].total if rows else None
+
+    async def _estimate_count(
+        self, filter_: _Filter, params: 'Mapping[str, typing.Any]', deadline: Deadline | None
+    ) -> int:
+        async with self._side_session(deadline) as session:
+            return plan_rows(await session.scalar(filter_.estimate, params))
+
+    async def _fetch_facets(
+        self,
+        filter_: _Filter,
+        params: 'Mapping[str, typing.Any]',
+        mode: schemas.CountMode,
+        deadline: Deadline | None,
+    ) -> tuple[schemas.Facets, int | None]:
+        """Count facets, and return them with the planner's estimate of the matches when they're sampled."""
+        estimated_total = None
+        async with self._side_session(deadline) as session:
+            if mode is schemas.CountMode.ESTIMATE:
+                estimated_total = plan_rows(await session.scalar(filter_.estimate, params))
+                sample_params = {**params, 'sample_size': settings.FACETS_SAMPLE_SIZE}
+                rows = (await session.execute(filter_.sampled_facets, sample_params)).all()
+            else:
+                rows = (await session.execute(filter_.facets, params)).all()
+
+        total = 0
+        specializations: list[schemas.FacetCount] = []
+        buildings: list[schemas.FacetCount] = []
+        for grouping, building_id, specialization_id, count in rows:
+            if grouping == _FACET_TOTAL:
+                total = count
+            elif grouping == _FACET_BUILDING and building_id is not None:
+                buildings.append(schemas.FacetCount(id=building_id, count=count))
+            elif grouping == _FACET_SPECIALIZATION and specialization_id is not None:
+                specializations.append(schemas.FacetCount(id=specialization_id, count=count))
+
+        # The sample covers every match unless it got truncated, so counts are exact in that case
+        estimated = estimated_total is not None and total >= settings.FACETS_SAMPLE_SIZE
+        if estimated and total:
+            scale = max(typing.cast('int', estimated_total), total) / total
+            total = round(total * scale)
+            for facet in (*specializations, *buildings):
+                facet.count = round(facet.count * scale)
+
+        def key(facet: schemas.FacetCount) -> tuple[int, int]:
+            return -facet.count, facet.id
+
+        facets = schemas.Facets(
+            total=total,
+            estimated=estimated,
+            specializations=sorted(specializations, key=key),
+            buildings=sorted(buildings, key=key),
         )
-        result = await self._session.scalar(query)
-        if result is None:
+        return facets, estimated_total
+
+    async def get_by_id(self, organization_id: int, *, deadline: Deadline | None = None) -> OrganizationRecord | None:
+        with _deadline_errors():
+            await _apply_deadline(self._session, deadline)
+            row = (await self._session.execute(_BY_ID, {'organization_id': organization_id})).one_or_none()
+        if row is None:
             return None
-        return self._model_to_schema(result)
+        return (await self._hydrate([(row[0], row[1])]))[0]
 
     async def get_by_building_address(
         self,
         address: str,
         limit: int = 10,
         offset: int = 0,
-    ) -> schemas.ListOrganizations:
-        query = (
-            sa.select(models.Organization)
-            .join(models.OrganizationBuilding)
-            .join(models.Building)
-            .options(
-                orm.joinedload(models.Organization.building),
-                orm.joinedload(models.Organization.specializations),
-            )
-            .where(models.Building.search_vector.op('@@')(sa.func.plainto_tsquery('english', address)))
-            .limit(limit)
-            .offset(offset)
+        *,
+        facets: schemas.CountMode | None = None,
+        total: schemas.CountMode | None = None,
+        deadline: Deadline | None = None,
+    ) -> OrganizationPage:
+        return await self._list(
+            _BY_ADDRESS, {'address': address}, limit=limit, offset=offset, facets=facets, total=total, deadline=deadline
         )
-        result = await self._session.scalars(query)
-        organizations = result.unique().all()
-        return schemas.ListOrganizations(organizations=list(map(self._model_to_schema, organizations)))
 
     async def get_by_building_id(
         self,
         building_id: int,
         limit: int = 10,
         offset: int = 0,
-    ) -> schemas.ListOrganizations:
-        query = (
-            sa.select(models.Organization)
-            .options(
-                orm.joinedload(models.Organization.building),
-                orm.joinedload(models.Organization.specializations),
-            )
-            .where(models.Building.id == building_id)
-            .limit(limit)
-            .offset(offset)
+        *,
+        facets: schemas.CountMode | None = None,
+        total: schemas.CountMode | None = None,
+        deadline: Deadline | None = None,
+    ) -> OrganizationPage:
+        return await self._list(
+            _BY_BUILDING,
+            {'building_id': building_id},
+            limit=limit,
+            offset=offset,
+            facets=facets,
+            total=total,
+            deadline=deadline,
         )
-        result = await self._session.scalars(query)
-        organizations = result.unique().all()
-        return schemas.ListOrganizations(organizations=list(map(self._model_to_schema, organizations)))
 
     async def get_by_specializations(
         self,
         specs: list[int],
         limit: int = 10,
         offset: int = 0,
-    ) -> schemas.ListOrganizations:
-        query = (
-            sa.select(models.Organization)
-            .join(models.OrganizationSpecializations)
-            .where(models.OrganizationSpecializations.specialization_id.in_(specs))
-            .group_by(models.Organization.id)
-            # Having count(distinct specialization_id) = len(spec_ids) ensures
-            # the organization has ALL requested specializations
-            .having(sa.func.count(sa.distinct(models.OrganizationSpecializations.specialization_id)) == len(specs))
-            .options(
-                orm.joinedload(models.Organization.building),
-                orm.joinedload(models.Organization.specializations),
-            )
-            .limit(limit)
-            .offset(offset)
+        *,
+        match: schemas.SpecializationsMatch = schemas.SpecializationsMatch.ALL,
+        facets: schemas.CountMode | None = None,
+        total: schemas.CountMode | None = None,
+        deadline: Deadline | None = None,
+    ) -> OrganizationPage:
+        filter_ = _BY_ALL_SPECIALIZATIONS if match is schemas.SpecializationsMatch.ALL else _BY_ANY_SPECIALIZATION
+        return await self._list(
+            filter_, {'specs': specs}, limit=limit, offset=offset, facets=facets, total=total, deadline=deadline
         )
-        result = await self._session.scalars(query)
-        organizations = result.all()
-        return schemas.ListOrganizations(organizations=list(map(self._model_to_schema, organizations)))
 
     async def get_by_building_location_radius(
         self,
@@ -123,8 +476,12 @@ class OrganizationRepository:
         *,
         limit: int = 10,
         offset: int = 0,
-    ) -> schemas.ListOrganizations:
-        """Find organizations within a radius of a point using Haversine formula.
+        facets: schemas.CountMode | None = None,
+        total: schemas.CountMode | None = None,
+        mode: schemas.SpatialMode = schemas.SpatialMode.EXACT,
+        deadline: Deadline | None = None,
+    ) -> OrganizationPage:
+        """Find organizations within a radius of a point, nearest first.
 
         Args:
             latitude: Center point latitude
@@ -132,32 +489,42 @@ class OrganizationRepository:
             radius_m: Search radius in meters
             limit: Max results to return
             offset: Number of results to skip
+            facets: Compute facet counts over all matches, exactly or from a sample
+            total: Count all matches, exactly or from the planner's estimate
+            mode: Filter in PostGIS, from the cached organizations of the covering geohash cells, or in the in-memory
+                index; facet requests, areas too large for `SPATIAL_MAX_CELLS` cells or with cells of more than
+                `SPATIAL_MAX_CELL_ROWS` organizations in `cells` mode and any request in `index` mode without an index
+                are filtered in PostGIS
+            deadline: Time by which the queries must finish, enforced as their statement timeout
 
         Returns:
             ListOrganizations: Organizations within the specified radius
 
         """
-        query = (
-            sa.select(models.Organization)
-            .join(models.OrganizationBuilding)
-            .join(models.Building)
-            .where(
-                sa.func.ST_DWithin(
-                    models.Building.point,
-                    sa.func.ST_Point(longitude, latitude, 4326).cast(Geography('POINT')),
-                    radius_m,
-                )
-            )
-            .options(
-                orm.joinedload(models.Organization.building),
-                orm.joinedload(models.Organization.specializations),
-            )
-            .limit(limit)
-            .offset(offset)
+        if mode is schemas.SpatialMode.INDEX and facets is None and self._spatial_index is not None:
+            found, total_ = self._spatial_index.radius(longitude, latitude, radius_m, limit=limit, offset=offset)
+            return await self._indexed(found, total_, total)
+        cells = None
+        if mode is schemas.SpatialMode.CELLS and facets is None:
+            cells = _covering_cells(*geohash.radius_box(longitude, latitude, radius_m))
+        if cells is not None:
+
+            def distance(entry: CellEntry) -> float | None:
+                distance_m = geohash.distance_m(longitude, latitude, entry.longitude, entry.latitude)
+                return distance_m if distance_m <= radius_m else None
+
+            page = await self._list_cells(cells, distance, limit=limit, offset=offset, total=total, deadline=deadline)
+            if page is not None:
+                return page
+        return await self._list(
+            _BY_RADIUS,
+            {'latitude': latitude, 'longitude': longitude, 'radius_m': radius_m},
+            limit=limit,
+            offset=offset,
+            facets=facets,
+            total=total,
+            deadline=deadline,
         )
-        result = await self._session.scalars(query)
-        organizations = result.unique().all()
-        return schemas.ListOrganizations(organizations=list(map(self._model_to_schema, organizations)))
 
     async def get_by_building_location_box(
         self,
@@ -168,7 +535,11 @@ class OrganizationRepository:
         *,
         limit: int = 10,
         offset: int = 0,
-    ) -> schemas.ListOrganizations:
+        facets: schemas.CountMode | None = None,
+        total: schemas.CountMode | None = None,
+        mode: schemas.SpatialMode = schemas.SpatialMode.EXACT,
+        deadline: Deadline | None = None,
+    ) -> OrganizationPage:
         """Find organizations within a rectangular bounding box around a point.
 
         Args:
@@ -178,53 +549,63 @@ class OrganizationRepository:
             ur_longitude: Upper right point longitude
             limit: Max results to return
             offset: Number of results to skip
+            facets: Compute facet counts over all matches, exactly or from a sample
+            total: Count all matches, exactly or from the planner's estimate
+            mode: Filter in PostGIS, from the cached organizations of the covering geohash cells, or in the in-memory
+                index; facet requests, areas too large for `SPATIAL_MAX_CELLS` cells or with cells of more than
+                `SPATIAL_MAX_CELL_ROWS` organizations in `cells` mode and any request in `index` mode without an index
+                are filtered in PostGIS
+            deadline: Time by which the queries must finish, enforced as their statement timeout
 
         Returns:
             ListOrganizations: Organizations within the bounding box
 
         """
-        query = (
-            sa.select(models.Organization)
-            .join(models.OrganizationBuilding)
-            .join(models.Building)
-            .where(
-                sa.func.ST_DWithin(
-                    models.Building.point,
-                    sa.func.ST_MakeEnvelope(
-                        ll_longitude,
-                        ll_latitude,
-                        ur_longitude,
-                        ur_latitude,
-                        4326,
-                    ).cast(Geography('polygon')),
-                    0,
-                )
-            )
-            .options(
-                orm.joinedload(models.Organization.building),
-                orm.joinedload(models.Organization.specializations),
-            )
-            .limit(limit)
-            .offset(offset)
+        west, east = sorted((ll_longitude, ur_longitude))
+        south, north = sorted((ll_latitude, ur_latitude))
+        if mode is schemas.SpatialMode.INDEX and facets is None and self._spatial_index is not None:
+            found, total_ = self._spatial_index.box(west, south, east, north, limit=limit, offset=offset)
+            return await self._indexed(found, total_, total)
+        cells = None
+        if mode is schemas.SpatialMode.CELLS and facets is None:
+            cells = _covering_cells(west, south, east, north)
+        if cells is not None:
+
+            def inside(entry: CellEntry) -> float | None:
+                # Unordered, like the PostGIS query: every match sorts the same, then by id
+                return 0.0 if west <= entry.longitude <= east and south <= entry.latitude <= north else None
+
+            page = await self._list_cells(cells, inside, limit=limit, offset=offset, total=total, deadline=deadline)
+            if page is not None:
+                return page
+        return await self._list(
+            _BY_BOX,
+            {
+                'll_latitude': ll_latitude,
+                'll_longitude': ll_longitude,
+                'ur_latitude': ur_latitude,
+                'ur_longitude': ur_longitude,
+            },
+            limit=limit,
+            offset=offset,
+            facets=facets,
+            total=total,
+            deadline=deadline,
         )
-        result = await self._session.scalars(query)
-        organizations = result.unique().all()
-        return schemas.ListOrganizations(organizations=list(map(self._model_to_schema, organizations)))
-
-    async def get_by_name(self, name: str, *, limit: int = 10, offset: int = 0) -> schemas.ListOrganizations:
-        query = (
-            sa.select(models.Organization)
-            .where(models.Organization.search_vector.op('@@')(sa.func.plainto_tsquery('english', name)))
-            .options(
-                orm.joinedload(models.Organization.building),
-                orm.joinedload(models.Organization.specializations),
-            )
-            .limit(limit)
-            .offset(offset)
+
+    async def get_by_name(
+        self,
+        name: str,
+        *,
+        limit: int = 10,
+        offset: int = 0,
+        facets: schemas.CountMode | None = None,
+        total: schemas.CountMode | None = None,
+        deadline: Deadline | None = None,
+    ) -> OrganizationPage:
+        return await self._list(
+            _BY_NAME, {'name': name}, limit=limit, offset=offset, facets=facets, total=total, deadline=deadline
         )
-        result = await self._session.scalars(query)
-        organizations = result.unique().all()
-        return schemas.ListOrganizations(organizations=list(map(self._model_to_schema, organizations)))
 
 
 OrganizationRepositoryDep = typing.Annotated[OrganizationRepository, fastapi.Depends(OrganizationRepository)]
@@ -0,0 +1,119 @@
+import typing
+
+import fastapi
+import sqlalchemy as sa
+import sqlalchemy.dialects.postgresql as psql
+
+from src.db import SessionDep, models
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from src import schemas
+
+_ORGANIZATION = models.Organization
+_BUILDING_LINK = models.OrganizationBuilding
+_SPECIALIZATION_LINK = models.OrganizationSpecializations
+
+
+def _ids(ids: list[int]) -> 'sa.BindParameter[Sequence[int]]':
+    return sa.literal(ids, psql.ARRAY(sa.Integer))
+
+
+class OrganizationWriter:
+    """Writes of organizations with their building and specializations, in one transaction per batch.
+
+    Each table takes one multi-row statement for the whole batch. The row triggers checking that an organization has
+    a building and refreshing its read model are skipped for the batch's statements, marked by a temporary table, and
+    the batch does both once for all of its organizations instead.
+    """
+
+    def __init__(self, session: SessionDep) -> None:
+        self._session = session
+
+    async def create(self, organizations: 'Sequence[schemas.OrganizationWrite]') -> None:
+        """Insert new organizations, failing with an `IntegrityError` if one exists."""
+        await self._write(organizations, overwrite=False)
+
+    async def upsert(self, organizations: 'Sequence[schemas.OrganizationWrite]') -> None:
+        """Insert new organizations and overwrite existing ones."""
+        await self._write(organizations, overwrite=True)
+
+    async def update(self, organizations: 'Sequence[schemas.OrganizationWrite]') -> list[int]:
+        """Overwrite existing organizations. Return the ids of the ones not found, writing nothing if there are any."""
+        ids = [organization.id for organization in organizations]
+        # Locked, so none is deleted before it is overwritten, which would insert it again
+        found = await self._session.scalars(
+            sa.select(_ORGANIZATION.id).where(_ORGANIZATION.id == sa.any_(_ids(ids))).with_for_update()
+        )
+        missing = sorted(set(ids) - set(found))
+        if missing:
+            await self._session.rollback()
+            return missing
+        await self._write(organizations, overwrite=True)
+        return []
+
+    async def _write(self, organizations: 'Sequence[schemas.OrganizationWrite]', *, overwrite: bool) -> None:
+        ids = _ids([organization.id for organization in organizations])
+        # Marks the batch's statements for the triggers. Only this session sees it, and a rollback drops it too
+        await self._session.execute(sa.text('CREATE TEMP TABLE batch_write () ON COMMIT DROP'))
+
+        insert = psql.insert(_ORGANIZATION).values(
+            [{'id': item.id, 'name': item.name, 'phone': item.phone} for item in organizations]
+        )
+        if overwrite:
+            insert = insert.on_conflict_do_update(
+                index_elements=[_ORGANIZATION.id],
+                set_={'name': insert.excluded.name, 'phone': insert.excluded.phone},
+                # Unchanged rows are left alone, so they fire no triggers and log no changes
+                where=sa.tuple_(_ORGANIZATION.name, _ORGANIZATION.phone).is_distinct_from(
+                    sa.tuple_(insert.excluded.name, insert.excluded.phone)
+                ),
+            )
+        await self._session.execute(insert)
+
+        links = psql.insert(_BUILDING_LINK).values(
+            [{'organization_id': item.id, 'building_id': item.building_id} for item in organizations]
+        )
+        await self._session.execute(
+            links.on_conflict_do_update(
+                index_elements=[_BUILDING_LINK.organization_id],
+                set_={'building_id': links.excluded.building_id},
+                where=_BUILDING_LINK.building_id != links.excluded.building_id,
+            )
+        )
+
+        # Passed as two arrays rather than VALUES: an organization has any number of specializations, and a batch
+        # could take more pairs than a statement takes parameters
+        pairs = (
+            sa.func.unnest(
+                _ids([item.id for item in organizations for _ in item.specialization_ids]),
+                _ids([spec_id for item in organizations for spec_id in item.specialization_ids]),
+            )
+            .table_valued('organization_id', 'specialization_id')
+            .render_derived(name='pairs')
+        )
+        current = sa.select(_SPECIALIZATION_LINK.organization_id, _SPECIALIZATION_LINK.specialization_id).where(
+            _SPECIALIZATION_LINK.organization_id == sa.any_(ids)
+        )
+        wanted = sa.select(pairs.c.organization_id, pairs.c.specialization_id)
+        await self._session.execute(
+            sa.delete(_SPECIALIZATION_LINK).where(
+                _SPECIALIZATION_LINK.organization_id == sa.any_(ids),
+                sa.tuple_(_SPECIALIZATION_LINK.organization_id, _SPECIALIZATION_LINK.specialization_id).not_in(wanted),
+            )
+        )
+        await self._session.execute(
+            sa.insert(_SPECIALIZATION_LINK).from_select(
+                ['organization_id', 'specialization_id'], wanted.except_(current)
+            )
+        )
+
+        # What the skipped triggers would have done row by row
+        await self._session.execute(sa.select(sa.func.ensure_orgs_have_buildings(ids)))
+        await self._session.execute(sa.select(sa.func.refresh_organization_read_models(ids)))
+        await self._session.execute(sa.text('DROP TABLE batch_write'))
+        await self._session.commit()
+
+
+OrganizationWriterDep = typing.Annotated[OrganizationWriter, fastapi.Depends(OrganizationWriter)]
@@ -0,0 +1,60 @@
+"""What repositories return: slotted dataclasses shaped like `schemas`, built without validating anything.
+
+Rows come from the read model, whose payloads the database renders itself, so checking them again for every row only
+allocates. Field names match the API schemas, so `RECORDS` writes records out as the same JSON, once per response.
+"""
+
+import dataclasses
+import typing
+
+import pydantic as pd
+
+from src import schemas
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class SpecializationRecord:
+    id: int
+    name: str
+    parent_id: int | None
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class OrganizationRecord:
+    id: int
+    name: str
+    phone: str
+    building_id: int
+    building_address: str
+    building_coordinates: tuple[float, float]
+    # Shared with every other organization of the same specialization where the taxonomy is cached
+    specializations: list[SpecializationRecord]
+
+    @classmethod
+    def from_payload(
+        cls, payload: dict[str, typing.Any], specializations: list[SpecializationRecord] | None = None
+    ) -> 'OrganizationRecord':
+        """Build the record of a read model payload, with `specializations` instead of the payload's own, if given."""
+        if specializations is None:
+            specializations = [SpecializationRecord(**specialization) for specialization in payload['specializations']]
+        longitude, latitude = payload['building_coordinates']
+        return cls(
+            id=payload['id'],
+            name=payload['name'],
+            phone=payload['phone'],
+            building_id=payload['building_id'],
+            building_address=payload['building_address'],
+            building_coordinates=(longitude, latitude),
+            specializations=specializations,
+        )
+
+
+@dataclasses.dataclass(slots=True)
+class OrganizationPage:
+    organizations: list[OrganizationRecord]
+    facets: schemas.Facets | None = None
+    total: int | None = None
+
+
+# Renders records as `schemas.Organization` and `schemas.ListOrganizations` JSON
+RECORDS: pd.TypeAdapter[OrganizationPage | OrganizationRecord] = pd.TypeAdapter(OrganizationPage | OrganizationRecord)
@@ -0,0 +1,371 @@
+"""In-process index of where organizations are, answering radius and box searches without the database.
+
+Loaded from `organization_read_models` when a worker starts and kept in step with it through the notifications of
+trg_organization_read_models_notify. numpy and shapely are imported with this module only, which the app loads when
+`SPATIAL_INDEX` is on.
+"""
+
+import asyncio
+import dataclasses
+import logging
+import typing
+
+import asyncpg
+import numpy as np
+import shapely
+import sqlalchemy as sa
+import sqlalchemy.dialects.postgresql as psql
+from sqlalchemy import engine as sa_engine
+from sqlalchemy import exc
+
+from src import geohash
+from src.db import models
+from src.repositories.records import OrganizationRecord
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from numpy.typing import NDArray
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# Channel trg_organization_read_models_notify sends changed organization ids on
+CHANNEL = 'organization_read_models'
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class IndexedOrganization:
+    """Organization decoded once, as it's indexed; its specializations are hydrated from the taxonomy by their ids."""
+
+    # With no specializations of its own
+    record: OrganizationRecord
+    specialization_ids: tuple[int, ...]
+
+
+# Organization id, building id, longitude, latitude and the organization
+type Row = tuple[int, int, float, float, IndexedOrganization]
+
+_ROWS = sa.select(
+    models.OrganizationReadModel.organization_id,
+    models.OrganizationReadModel.building_id,
+    models.OrganizationReadModel.lon,
+    models.OrganizationReadModel.lat,
+    models.OrganizationReadModel.payload,
+    models.OrganizationReadModel.specialization_ids,
+)
+_ROWS_BY_IDS = _ROWS.where(
+    models.OrganizationReadModel.organization_id
+    == sa.any_(sa.bindparam('organization_ids', type_=psql.ARRAY(sa.Integer)))
+)
+
+
+async def read_rows(session: 'AsyncSession', organization_ids: list[int] | None = None) -> list[Row]:
+    """Read model rows of `organization_ids`, or of every organization."""
+    if organization_ids is None:
+        result = await session.execute(_ROWS)
+    else:
+        result = await session.execute(_ROWS_BY_IDS, {'organization_ids': organization_ids})
+    return [
+        (id_, building_id, lon, lat, IndexedOrganization(OrganizationRecord.from_payload(payload, []), tuple(ids)))
+        for id_, building_id, lon, lat, payload, ids in result
+    ]
+
+
+@dataclasses.dataclass(slots=True)
+class _Building:
+    longitude: float
+    latitude: float
+    organizations: dict[int, IndexedOrganization]
+
+
+class SpatialIndex:
+    """Buildings' coordinates in numpy arrays and an `STRtree`, with the organizations of each building.
+
+    The tree can't change once built: buildings added or moved since are kept aside and scanned on every search, and
+    the tree's entries for moved or removed ones are skipped, until more than `rebuild_after` buildings changed and
+    the tree is rebuilt.
+    """
+
+    def __init__(self, *, rebuild_after: int = 1_000) -> None:
+        self.rebuild_after = rebuild_after
+        self._buildings: dict[int, _Building] = {}
+        self._organization_buildings: dict[int, int] = {}
+        self._tree = shapely.STRtree([])
+        self._tree_ids: NDArray[np.int64] = np.empty(0, np.int64)
+        self._tree_lon: NDArray[np.float64] = np.empty(0)
+        self._tree_lat: NDArray[np.float64] = np.empty(0)
+        # Buildings whose tree entry, if any, is out of date
+        self._changed: set[int] = set()
+
+    def __len__(self) -> int:
+        """Count the organizations in the index."""
+        return len(self._organization_buildings)
+
+    def load(self, rows: 'Iterable[Row]') -> None:
+        """Replace the whole index with `rows`."""
+        index = SpatialIndex(rebuild_after=self.rebuild_after)
+        index.upsert(rows)
+        index.rebuild()
+        # One swap, so searches never see a half-loaded index
+        self._buildings = index._buildings
+        self._organization_buildings = index._organization_buildings
+        self._tree, self._tree_ids, self._tree_lon, self._tree_lat = (
+            index._tree,
+            index._tree_ids,
+            index._tree_lon,
+            index._tree_lat,
+        )
+        self._changed = index._changed
+
+    def upsert(self, rows: 'Iterable[Row]') -> None:
+        for organization_id, building_id, longitude, latitude, organization in rows:
+            self._detach(organization_id, keep_building=building_id)
+            building = self._buildings.get(building_id)
+            if building is None or (building.longitude, building.latitude) != (longitude, latitude):
+                organizations = building.organizations if building is not None else {}
+                building = self._buildings[building_id] = _Building(longitude, latitude, organizations)
+                self._changed.add(building_id)
+            building.organizations[organization_id] = organization
+            self._organization_buildings[organization_id] = building_id
+        self._maybe_rebuild()
+
+    def remove(self, organization_ids: 'Iterable[int]') -> None:
+        for organization_id in organization_ids:
+            self._detach(organization_id)
+        self._maybe_rebuild()
+
+    def rebuild(self) -> None:
+        ids = np.fromiter(self._buildings, np.int64, len(self._buildings))
+        self._tree_lon = np.fromiter((b.longitude for b in self._buildings.values()), np.float64, len(ids))
+        self._tree_lat = np.fromiter((b.latitude for b in self._buildings.values()), np.float64, len(ids))
+        self._tree_ids = ids
+        points = typing.cast('NDArray[np.object_]', shapely.points(self._tree_lon, self._tree_lat))
+        self._tree = shapely.STRtree(points)
+        self._changed = set()
+
+    def radius(
+        self, longitude: float, latitude: float, radius_m: float, *, limit: int, offset: int
+    ) -> tuple[list[IndexedOrganization], int]:
+        """Page of the organizations within `radius_m` of a point, nearest first then by id, and their total.
+
+        Organizations are ordered by their distance on a sphere, as `<->` on geography orders them in PostGIS, but kept
+        by their distance on the spheroid, as `ST_DWithin` keeps them: the two differ by up to 0.5%, so the buildings
+        near the edge of the radius are measured again.
+        """
+        ids, lon, lat = self._candidates(*geohash.radius_box(longitude, latitude, radius_m))
+        distances = _distance_m(longitude, latitude, lon, lat)
+        within = distances <= radius_m
+        boundary = np.abs(distances - radius_m) <= radius_m * _SPHERE_ERROR
+        within[boundary] = _spheroid_distance_m(longitude, latitude, lon[boundary], lat[boundary]) <= radius_m
+        return self._page(ids[within], distances[within], limit=limit, offset=offset)
+
+    def box(
+        self, west: float, south: float, east: float, north: float, *, limit: int, offset: int
+    ) -> tuple[list[IndexedOrganization], int]:
+        """Page of the organizations within a lon/lat box by id, and their total."""
+        ids, _, _ = self._candidates(west, south, east, north)
+        return self._page(ids, np.zeros(len(ids)), limit=limit, offset=offset)
+
+    def _detach(self, organization_id: int, keep_building: int | None = None) -> None:
+        building_id = self._organization_buildings.pop(organization_id, None)
+        if building_id is None or building_id == keep_building:
+            return
+        building = self._buildings[building_id]
+        del building.organizations[organization_id]
+        if not building.organizations:
+            del self._buildings[building_id]
+            self._changed.add(building_id)
+
+    def _maybe_rebuild(self) -> None:
+        if len(self._changed) > self.rebuild_after:
+            self.rebuild()
+
+    def _candidates(
+        self, west: float, south: float, east: float, north: float
+    ) -> 'tuple[NDArray[np.int64], NDArray[np.float64], NDArray[np.float64]]':
+        """Ids and coordinates of the buildings in a box."""
+        hits = self._tree.query(shapely.box(west, south, east, north))
+        ids, lon, lat = self._tree_ids[hits], self._tree_lon[hits], self._tree_lat[hits]
+        if self._changed:
+            current = ~np.isin(ids, np.fromiter(self._changed, np.int64, len(self._changed)))
+            ids, lon, lat = ids[current], lon[current], lat[current]
+            changed = [
+                (building_id, building.longitude, building.latitude)
+                for building_id in self._changed
+                if (building := self._buildings.get(building_id)) is not None
+                and west <= building.longitude <= east
+                and south <= building.latitude <= north
+            ]
+            if changed:
+                extra_ids, extra_lon, extra_lat = map(np.array, zip(*changed, strict=True))
+                ids = np.concatenate([ids, extra_ids])
+                lon = np.concatenate([lon, extra_lon])
+                lat = np.concatenate([lat, extra_lat])
+        return ids, lon, lat
+
+    def _page(
+        self, ids: 'NDArray[np.int64]', keys: 'NDArray[np.float64]', *, limit: int, offset: int
+    ) -> tuple[list[IndexedOrganization], int]:
+        """Page of the organizations of buildings `ids`, ordered by the buildings' `keys` then by organization id."""
+        order = np.argsort(keys, kind='stable')
+        page: list[IndexedOrganization] = []
+        total = 0
+        start = 0
+        while start < len(order):
+            # Organizations of buildings with equal keys sort together by id
+            end = start + 1
+            while end < len(order) and keys[order[end]] == keys[order[start]]:
+                end += 1
+            buildings = [self._buildings[int(ids[position])] for position in order[start:end]]
+            count = sum(len(building.organizations) for building in buildings)
+            # Only the groups the page overlaps need sorting; the others are just counted
+            if total < offset + limit and total + count > offset:
+                group = sorted(item for building in buildings for item in building.organizations.items())
+                page.extend(organization for _, organization in group[max(0, offset - total) : offset + limit - total])
+            total += count
+            start = end
+        return page, total
+
+
+def _distance_m(
+    longitude: float, latitude: float, lon: 'NDArray[np.float64]', lat: 'NDArray[np.float64]'
+) -> 'NDArray[np.float64]':
+    """Haversine distances from a point to each of `lon`, `lat`, as `geohash.distance_m` computes them."""
+    phi1, phi2 = np.radians(latitude), np.radians(lat)
+    d_lambda = np.radians(lon - longitude)
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+    return 2 * geohash.EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+# Above the largest relative difference between haversine and spheroidal distances
+_SPHERE_ERROR = 0.01
+# WGS 84, the spheroid PostGIS measures geography on
+_WGS84_A = 6_378_137.0
+_WGS84_F = 1 / 298.257223563
+
+
+def _spheroid_distance_m(
+    longitude: float, latitude: float, lon: 'NDArray[np.float64]', lat: 'NDArray[np.float64]'
+) -> 'NDArray[np.float64]':
+    """Distances on the WGS 84 spheroid from a point to each of `lon`, `lat`, by Vincenty's inverse formula.
+
+    Within a millimetre of the geodesics PostGIS computes, short of nearly antipodal points, which searches capped by
+    `MAX_RADIUS_M` never reach.
+    """
+    a, f = _WGS84_A, _WGS84_F
+    b = (1 - f) * a
+    big_l = np.radians(lon - longitude)
+    u1 = np.arctan((1 - f) * np.tan(np.radians(latitude)))
+    u2 = np.arctan((1 - f) * np.tan(np.radians(lat)))
+    sin_u1, cos_u1, sin_u2, cos_u2 = np.sin(u1), np.cos(u1), np.sin(u2), np.cos(u2)
+    lambda_ = big_l
+    sin_sigma = cos_sigma = sigma = cos2_alpha = cos_2sigma_m = np.zeros_like(big_l)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for _ in range(100):
+            sin_lambda, cos_lambda = np.sin(lambda_), np.cos(lambda_)
+            sin_sigma = np.hypot(cos_u2 * sin_lambda, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lambda)
+            cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lambda
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            # Coincident points have no direction between them
+            sin_alpha = np.where(sin_sigma > 0, cos_u1 * cos_u2 * sin_lambda / sin_sigma, 0.0)
+            cos2_alpha = 1 - sin_alpha**2
+            # Both points on the equator
+            cos_2sigma_m = np.where(cos2_alpha > 0, cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha, 0.0)
+            c = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+            previous, lambda_ = (
+                lambda_,
+                big_l
+                + (1 - c)
+                * f
+                * sin_alpha
+                * (sigma + c * sin_sigma * (cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m**2))),
+            )
+            if np.all(np.abs(lambda_ - previous) < 1e-12):  # noqa: PLR2004
+                break
+    u_squared = cos2_alpha * (a**2 - b**2) / b**2
+    big_a = 1 + u_squared / 16384 * (4096 + u_squared * (-768 + u_squared * (320 - 175 * u_squared)))
+    big_b = u_squared / 1024 * (256 + u_squared * (-128 + u_squared * (74 - 47 * u_squared)))
+    delta_sigma = (
+        big_b
+        * sin_sigma
+        * (
+            cos_2sigma_m
+            + big_b
+            / 4
+            * (
+                cos_sigma * (-1 + 2 * cos_2sigma_m**2)
+                - big_b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma**2) * (-3 + 4 * cos_2sigma_m**2)
+            )
+        )
+    )
+    return b * big_a * (sigma - delta_sigma)
+
+
+class SpatialIndexRefresher:
+    """Loads `index` and applies the changes Postgres notifies on `CHANNEL` to it.
+
+    Changes are listened for before loading, so none made during the load is missed. Notifications aren't queued for
+    a disconnected listener, hence a full reload after every reconnection.
+    """
+
+    def __init__(
+        self,
+        index: SpatialIndex,
+        dsn: str,
+        sessionmaker: 'async_sessionmaker[AsyncSession]',
+        *,
+        batch_delay: float = 0.05,
+        retry_delay: float = 1,
+    ) -> None:
+        self.index = index
+        # asyncpg's own DSN, without SQLAlchemy's driver suffix
+        self.dsn = sa_engine.make_url(dsn).set(drivername='postgresql').render_as_string(hide_password=False)
+        self.sessionmaker = sessionmaker
+        self.batch_delay = batch_delay
+        self.retry_delay = retry_delay
+        self.loaded = asyncio.Event()
+        self._pending: set[int] = set()
+        self._notified = asyncio.Event()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            # The load and the reads of changes go through SQLAlchemy, the listener through asyncpg directly
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError, exc.SQLAlchemyError):
+                logger.exception('Spatial index listener failed, reloading in %s s', self.retry_delay)
+            await asyncio.sleep(self.retry_delay)
+
+    async def _listen(self) -> None:
+        connection = await asyncpg.connect(self.dsn)
+        try:
+            await connection.add_listener(CHANNEL, self._on_notification)
+            self._pending.clear()
+            async with self.sessionmaker() as session:
+                self.index.load(await read_rows(session))
+            self.loaded.set()
+            while not connection.is_closed():
+                try:
+                    await asyncio.wait_for(self._notified.wait(), timeout=self.retry_delay)
+                except TimeoutError:
+                    continue
+                # Let a burst of changes gather into one query
+                await asyncio.sleep(self.batch_delay)
+                await self._apply()
+            raise asyncpg.InterfaceError('Listener connection closed')  # noqa: EM101, TRY003
+        finally:
+            await connection.close()
+
+    def _on_notification(self, _connection: object, _pid: int, _channel: str, payload: str) -> None:
+        self._pending.add(int(payload))
+        self._notified.set()
+
+    async def _apply(self) -> None:
+        organization_ids = list(self._pending)
+        self._pending.clear()
+        self._notified.clear()
+        async with self.sessionmaker() as session:
+            rows = await read_rows(session, organization_ids)
+        self.index.upsert(rows)
+        self.index.remove(set(organization_ids) - {row[0] for row in rows})
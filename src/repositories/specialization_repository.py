@@ -0,0 +1,18 @@
+import typing
+
+import fastapi
+
+from src.db import SessionDep
+from src.repositories.taxonomy import Taxonomy, TaxonomyCache, TaxonomyCacheDep
+
+
+class SpecializationRepository:
+    def __init__(self, session: SessionDep, taxonomy_cache: TaxonomyCacheDep = None):
+        self._session = session
+        self._taxonomy_cache = taxonomy_cache if taxonomy_cache is not None else TaxonomyCache(ttl=0)
+
+    async def get_taxonomy(self) -> Taxonomy:
+        return await self._taxonomy_cache.get(self._session)
+
+
+SpecializationRepositoryDep = typing.Annotated[SpecializationRepository, fastapi.Depends(SpecializationRepository)]
@@ -0,0 +1,136 @@
+import asyncio
+import dataclasses
+import functools
+import hashlib
+import time
+import typing
+
+import fastapi
+import sqlalchemy as sa
+
+from src import schemas
+from src.db import models
+from src.repositories.records import SpecializationRecord
+from src.settings import settings
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Collection, Iterable
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+_SPECIALIZATIONS = sa.select(
+    models.Specialization.id, models.Specialization.name, models.Specialization.parent_id
+).order_by(models.Specialization.id)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class TaxonomyNode:
+    specialization: SpecializationRecord
+    # Nearest first
+    ancestors: tuple[int, ...]
+    # Depth first, each subtree by id
+    descendants: tuple[int, ...]
+
+
+class Taxonomy:
+    """Every specialization with its place in the tree, stamped with a version that changes with any of them."""
+
+    def __init__(self, rows: 'Iterable[tuple[int, str, int | None]]') -> None:
+        specializations = [
+            SpecializationRecord(id=id_, name=name, parent_id=parent_id) for id_, name, parent_id in sorted(rows)
+        ]
+        self.version = hashlib.blake2b(repr(specializations).encode(), digest_size=8).hexdigest()
+        children: dict[int | None, list[int]] = {}
+        for specialization in specializations:
+            children.setdefault(specialization.parent_id, []).append(specialization.id)
+        by_id = {specialization.id: specialization for specialization in specializations}
+
+        def descendants(id_: int) -> tuple[int, ...]:
+            return tuple(descendant for child in children.get(id_, ()) for descendant in (child, *descendants(child)))
+
+        def ancestors(id_: int) -> tuple[int, ...]:
+            parent_id = by_id[id_].parent_id
+            return (parent_id, *ancestors(parent_id)) if parent_id is not None else ()
+
+        self.nodes = {
+            id_: TaxonomyNode(specialization, ancestors(id_), descendants(id_)) for id_, specialization in by_id.items()
+        }
+        self._children = children
+
+    def __contains__(self, specialization_id: object) -> bool:
+        """Tell whether a specialization id is in the taxonomy."""
+        return specialization_id in self.nodes
+
+    def specializations(self, ids: 'Iterable[int]') -> list[SpecializationRecord]:
+        # Skipping any deleted since the ids were read
+        return [self.nodes[id_].specialization for id_ in ids if id_ in self.nodes]
+
+    @functools.cached_property
+    def tree(self) -> schemas.Taxonomy:
+        def subtrees(parent_id: int | None) -> list[schemas.SpecializationTree]:
+            return [
+                schemas.SpecializationTree(id=id_, name=self.nodes[id_].specialization.name, children=subtrees(id_))
+                for id_ in self._children.get(parent_id, ())
+            ]
+
+        return schemas.Taxonomy(version=self.version, specializations=subtrees(None))
+
+
+class TaxonomyCache:
+    """Taxonomy read at most once per `ttl` seconds by the whole process.
+
+    Renamed or moved specializations show up once the cached taxonomy expires, or as soon as `discard_stale` sees
+    them; ids it doesn't know of yet make `get` read it again at once.
+    """
+
+    def __init__(self, *, ttl: float) -> None:
+        self.ttl = ttl
+        self._taxonomy: Taxonomy | None = None
+        self._expires_at = 0.0
+        # Bumped by every clear, so a taxonomy read before one isn't cached after it
+        self._generation = 0
+        # Requests finding it expired wait for a single read
+        self._lock = asyncio.Lock()
+
+    async def get(self, session: 'AsyncSession', ids: 'Collection[int]' = ()) -> Taxonomy:
+        """Return the cached taxonomy, read again if it expired or lacks any of `ids`."""
+        taxonomy = self._taxonomy
+        if self._is_fresh(taxonomy, ids):
+            return typing.cast('Taxonomy', taxonomy)
+        async with self._lock:
+            # Read while this request was waiting
+            if self._taxonomy is not taxonomy and self._is_fresh(self._taxonomy, ids):
+                return typing.cast('Taxonomy', self._taxonomy)
+            generation = self._generation
+            read = Taxonomy((await session.execute(_SPECIALIZATIONS)).tuples().all())
+            if generation == self._generation:
+                self._taxonomy = read
+                self._expires_at = time.monotonic() + self.ttl
+            return read
+
+    def discard_stale(self, specializations: 'Iterable[SpecializationRecord]') -> None:
+        """Clear the cache if it holds any of `specializations` with another name or parent."""
+        taxonomy = self._taxonomy
+        if taxonomy is not None and any(
+            specialization.id in taxonomy and taxonomy.nodes[specialization.id].specialization != specialization
+            for specialization in specializations
+        ):
+            self.clear()
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._taxonomy = None
+
+    def _is_fresh(self, taxonomy: Taxonomy | None, ids: 'Collection[int]') -> bool:
+        return taxonomy is not None and time.monotonic() < self._expires_at and all(id_ in taxonomy for id_ in ids)
+
+
+taxonomy_cache = TaxonomyCache(ttl=settings.TAXONOMY_CACHE_TTL_S)
+
+
+def get_taxonomy_cache() -> TaxonomyCache | None:
+    return taxonomy_cache
+
+
+# Shared by the requests of a worker; repositories without one read the taxonomy on every request
+TaxonomyCacheDep = typing.Annotated[TaxonomyCache | None, fastapi.Depends(get_taxonomy_cache)]
@@ -1,7 +1,12 @@
 import fastapi
 
-from . import organizations
+from . import admin, changes, metrics, organizations, specializations
 
 root_router = fastapi.APIRouter(prefix='/api/v1')
 
 root_router.include_router(organizations.router, prefix='/organizations')
+root_router.include_router(specializations.router, prefix='/specializations')
+root_router.include_router(changes.router, prefix='/changes')
+root_router.include_router(admin.router, prefix='/admin')
+
+metrics_router = metrics.router
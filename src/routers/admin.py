@@ -0,0 +1,28 @@
+import secrets
+import typing
+
+import fastapi
+
+from src import schemas
+from src.db import slow_query_recorder
+from src.settings import settings
+
+
+def require_admin_token(x_admin_token: typing.Annotated[str | None, fastapi.Header()] = None) -> None:
+    if settings.ADMIN_TOKEN is None:
+        raise fastapi.HTTPException(status_code=fastapi.status.HTTP_404_NOT_FOUND)
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN.get_secret_value()):
+        raise fastapi.HTTPException(status_code=fastapi.status.HTTP_403_FORBIDDEN)
+
+
+router = fastapi.APIRouter(dependencies=[fastapi.Depends(require_admin_token)], include_in_schema=False)
+
+
+@router.get('/slow-queries')
+async def get_slow_queries() -> list[schemas.SlowQuery]:
+    """Latest slow statements, newest first."""
+    if slow_query_recorder is None:
+        raise fastapi.HTTPException(
+            status_code=fastapi.status.HTTP_404_NOT_FOUND, detail='Slow query recorder is disabled'
+        )
+    return [schemas.SlowQuery.model_validate(query) for query in reversed(slow_query_recorder.queries)]
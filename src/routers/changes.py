@@ -0,0 +1,28 @@
+import typing
+
+import fastapi
+
+from src import schemas
+from src.services import ChangeServiceDep
+from src.settings import settings
+
+router = fastapi.APIRouter()
+
+
+@router.get('')
+async def get_changes(
+    service: ChangeServiceDep,
+    since: typing.Annotated[int, fastapi.Query(ge=0, description='`next` of the previous response')] = 0,
+    limit: typing.Annotated[int, fastapi.Query(ge=1, le=settings.CHANGES_MAX_PAGE_SIZE)] = 100,
+    wait_s: typing.Annotated[
+        float,
+        fastapi.Query(
+            ge=0, le=settings.CHANGES_MAX_WAIT_S, description='Seconds to wait for changes if there are none'
+        ),
+    ] = 0,
+) -> schemas.Changes:
+    """Return the changes of organizations, buildings, specializations and their links, oldest first.
+
+    Each change names the table and primary key of the row; consumers read the rows they need again.
+    """
+    return await service.get_since(since, limit=limit, wait=wait_s)
@@ -0,0 +1,113 @@
+"""Responses of records in the format the client asks for with `Accept`: JSON, MessagePack or Arrow.
+
+None of them builds the API models: JSON and MessagePack are rendered by `RECORDS`, Arrow columns are read straight
+off the records.
+"""
+
+import typing
+
+import fastapi
+import msgpack
+from fastapi import responses
+
+from src import negotiation
+from src.repositories.records import RECORDS, OrganizationPage
+
+MSGPACK = 'application/msgpack'
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+
+
+class RecordResponse(responses.JSONResponse):
+    """Repository records written straight out as JSON; the API models they match only document the routes."""
+
+    def render(self, content: typing.Any) -> bytes:  # noqa: ANN401
+        return RECORDS.dump_json(content)
+
+
+class MsgpackResponse(responses.Response):
+    """Records as MessagePack, shaped like their JSON."""
+
+    media_type = MSGPACK
+
+    def render(self, content: typing.Any) -> bytes:  # noqa: ANN401
+        return typing.cast('bytes', msgpack.packb(RECORDS.dump_python(content, mode='json')))
+
+
+class ArrowResponse(responses.Response):
+    """A page of organizations as an Arrow IPC stream, one row per organization.
+
+    `total` and `facets`, when asked for, are in the schema's metadata, the latter as JSON.
+    """
+
+    media_type = ARROW_STREAM
+
+    def render(self, content: OrganizationPage) -> bytes:  # pyright: ignore[reportIncompatibleMethodOverride]
+        # pyarrow takes a while to import and only bulk consumers ask for it
+        import pyarrow as pa  # noqa: PLC0415
+
+        organizations = content.organizations
+        metadata: dict[str, str] = {}
+        if content.total is not None:
+            metadata['total'] = str(content.total)
+        if content.facets is not None:
+            metadata['facets'] = content.facets.model_dump_json()
+        batch = pa.record_batch(
+            [
+                [organization.id for organization in organizations],
+                [organization.name for organization in organizations],
+                [organization.building_coordinates[0] for organization in organizations],
+                [organization.building_coordinates[1] for organization in organizations],
+                [organization.building_id for organization in organizations],
+                [
+                    [specialization.id for specialization in organization.specializations]
+                    for organization in organizations
+                ],
+            ],
+            schema=pa.schema(
+                [
+                    pa.field('id', pa.int64(), nullable=False),
+                    pa.field('name', pa.string(), nullable=False),
+                    pa.field('lon', pa.float64(), nullable=False),
+                    pa.field('lat', pa.float64(), nullable=False),
+                    pa.field('building_id', pa.int64(), nullable=False),
+                    pa.field('specialization_ids', pa.list_(pa.int64()), nullable=False),
+                ],
+                metadata=metadata,
+            ),
+        )
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+        return sink.getvalue().to_pybytes()
+
+
+_PAGE_RESPONSES: dict[str, type[responses.Response]] = {
+    'application/json': RecordResponse,
+    MSGPACK: MsgpackResponse,
+    'application/x-msgpack': MsgpackResponse,
+    ARROW_STREAM: ArrowResponse,
+}
+
+# Documents the formats of list routes besides JSON
+PAGE_FORMATS: dict[int | str, dict[str, typing.Any]] = {
+    200: {'content': {MSGPACK: {}, ARROW_STREAM: {'schema': {'type': 'string', 'format': 'binary'}}}}
+}
+
+
+def negotiate(accept: str) -> type[responses.Response]:
+    """Return the response class of the format `accept` prefers, JSON unless it prefers a supported other one."""
+    best, best_weight = RecordResponse, 0.0
+    for media_type, weight in negotiation.weights(accept).items():
+        response_class = _PAGE_RESPONSES.get(media_type)
+        if response_class is not None and weight > best_weight:
+            best, best_weight = response_class, weight
+    return best
+
+
+def get_page_response(
+    accept: typing.Annotated[str, fastapi.Header(include_in_schema=False)] = '',
+) -> type[responses.Response]:
+    return negotiate(accept)
+
+
+PageResponseDep = typing.Annotated[type[responses.Response], fastapi.Depends(get_page_response)]
@@ -0,0 +1,9 @@
+import fastapi
+import prometheus_client
+
+router = fastapi.APIRouter()
+
+
+@router.get('/metrics', include_in_schema=False)
+async def metrics() -> fastapi.Response:
+    return fastapi.Response(prometheus_client.generate_latest(), media_type=prometheus_client.CONTENT_TYPE_LATEST)
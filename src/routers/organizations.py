@@ -1,89 +1,230 @@
 import typing
 
 import fastapi
+from fastapi import responses
 
 from src import schemas
-from src.services import OrganizationServiceDep
+from src.deadline import Deadline
+from src.routers.admin import require_admin_token
+from src.routers.formats import PAGE_FORMATS, PageResponseDep, RecordResponse
+from src.services import OrganizationServiceDep, OrganizationWriteServiceDep
+from src.settings import settings
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Callable
 
 router = fastapi.APIRouter()
 
 
-@router.get('/building/{building_id:int}')
+def _deadline(budget_s: float) -> 'Callable[[], Deadline]':
+    def deadline() -> Deadline:
+        return Deadline.after(budget_s)
+
+    return deadline
+
+
+LookupDeadline = typing.Annotated[Deadline, fastapi.Depends(_deadline(settings.DEADLINE_LOOKUP_S))]
+SearchDeadline = typing.Annotated[Deadline, fastapi.Depends(_deadline(settings.DEADLINE_SEARCH_S))]
+GeoDeadline = typing.Annotated[Deadline, fastapi.Depends(_deadline(settings.DEADLINE_GEO_S))]
+
+LimitQuery = typing.Annotated[int, fastapi.Query(ge=1, le=settings.MAX_PAGE_SIZE)]
+OffsetQuery = typing.Annotated[int, fastapi.Query(ge=0)]
+
+FacetsQuery = typing.Annotated[
+    schemas.CountMode | None,
+    fastapi.Query(description='Count matches per building and top-level specialization, exactly or from a sample'),
+]
+TotalQuery = typing.Annotated[
+    schemas.CountMode | None,
+    fastapi.Query(description="Count all matches, exactly or from the query planner's estimate"),
+]
+SpatialModeQuery = typing.Annotated[
+    schemas.SpatialMode,
+    fastapi.Query(
+        description='Filter in the database, from cached organizations of the covering geohash cells, which may lag '
+        "behind changes by up to the cache TTL, or in the worker's in-memory index. Facet requests, and large areas "
+        'in `cells` mode, are always filtered in the database',
+    ),
+]
+_SPATIAL_MODE = schemas.SpatialMode(settings.SPATIAL_MODE)
+
+
+@router.get('/building/{building_id:int}', response_model=schemas.ListOrganizations, responses=PAGE_FORMATS)
 async def get_by_building(
     building_id: int,
     service: OrganizationServiceDep,
-    limit: int = 10,
-    offset: int = 0,
-) -> schemas.ListOrganizations:
-    return await service.get_by_building(building_id=building_id, limit=limit, offset=offset)
+    deadline: LookupDeadline,
+    respond: PageResponseDep,
+    limit: LimitQuery = 10,
+    offset: OffsetQuery = 0,
+    facets: FacetsQuery = None,
+    total: TotalQuery = None,
+) -> responses.Response:
+    return respond(
+        await service.get_by_building(
+            building_id=building_id, limit=limit, offset=offset, facets=facets, total=total, deadline=deadline
+        )
+    )
 
 
-@router.get('/building')
+@router.get('/building', response_model=schemas.ListOrganizations, responses=PAGE_FORMATS)
 async def get_by_building_address(
     address: str,
     service: OrganizationServiceDep,
-    limit: int = 10,
-    offset: int = 0,
-) -> schemas.ListOrganizations:
-    return await service.get_by_building_address(address=address, limit=limit, offset=offset)
+    deadline: SearchDeadline,
+    respond: PageResponseDep,
+    limit: LimitQuery = 10,
+    offset: OffsetQuery = 0,
+    facets: FacetsQuery = None,
+    total: TotalQuery = None,
+) -> responses.Response:
+    return respond(
+        await service.get_by_building_address(
+            address=address, limit=limit, offset=offset, facets=facets, total=total, deadline=deadline
+        )
+    )
 
 
-@router.get('/radius')
-async def get_by_building_location_radius(
+@router.get('/radius', response_model=schemas.ListOrganizations, responses=PAGE_FORMATS)
+async def get_by_building_location_radius(  # noqa: PLR0913
     lon: typing.Annotated[float, fastapi.Query(description='Longitude')],
     lat: typing.Annotated[float, fastapi.Query(description='Latitude')],
-    radius_m: typing.Annotated[int, fastapi.Query(description='Radius of search in meters')],
+    radius_m: typing.Annotated[
+        int, fastapi.Query(gt=0, le=settings.MAX_RADIUS_M, description='Radius of search in meters')
+    ],
     service: OrganizationServiceDep,
-    limit: int = 10,
-    offset: int = 0,
-) -> schemas.ListOrganizations:
+    deadline: GeoDeadline,
+    respond: PageResponseDep,
+    limit: LimitQuery = 10,
+    offset: OffsetQuery = 0,
+    facets: FacetsQuery = None,
+    total: TotalQuery = None,
+    mode: SpatialModeQuery = _SPATIAL_MODE,
+) -> responses.Response:
     """Get organizations by its location in area."""
-    return await service.get_by_building_location_radius(
-        latitude=lat, longitude=lon, radius_m=radius_m, limit=limit, offset=offset
+    return respond(
+        await service.get_by_building_location_radius(
+            latitude=lat,
+            longitude=lon,
+            radius_m=radius_m,
+            limit=limit,
+            offset=offset,
+            facets=facets,
+            total=total,
+            mode=mode,
+            deadline=deadline,
+        )
     )
 
 
-@router.get('/box')
-async def get_by_building_location_box(
+@router.get('/box', response_model=schemas.ListOrganizations, responses=PAGE_FORMATS)
+async def get_by_building_location_box(  # noqa: PLR0913
     ll_lon: typing.Annotated[float, fastapi.Query(description='Low left longitude')],
     ll_lat: typing.Annotated[float, fastapi.Query(description='Low left latitude')],
     ur_lon: typing.Annotated[float, fastapi.Query(description='Upper right longitude')],
     ur_lat: typing.Annotated[float, fastapi.Query(description='Upper right latitude')],
     service: OrganizationServiceDep,
-    limit: int = 10,
-    offset: int = 0,
-) -> schemas.ListOrganizations:
+    deadline: GeoDeadline,
+    respond: PageResponseDep,
+    limit: LimitQuery = 10,
+    offset: OffsetQuery = 0,
+    facets: FacetsQuery = None,
+    total: TotalQuery = None,
+    mode: SpatialModeQuery = _SPATIAL_MODE,
+) -> responses.Response:
     """Get organizations by its location in box area."""
-    return await service.get_by_building_location_box(
-        ll_longitude=ll_lon,
-        ll_latitude=ll_lat,
-        ur_longitude=ur_lon,
-        ur_latitude=ur_lat,
-        limit=limit,
-        offset=offset,
+    return respond(
+        await service.get_by_building_location_box(
+            ll_longitude=ll_lon,
+            ll_latitude=ll_lat,
+            ur_longitude=ur_lon,
+            ur_latitude=ur_lat,
+            limit=limit,
+            offset=offset,
+            facets=facets,
+            total=total,
+            mode=mode,
+            deadline=deadline,
+        )
     )
 
 
-@router.get('/specs', operation_id='get_by_specializations')
+@router.get(
+    '/specs', operation_id='get_by_specializations', response_model=schemas.ListOrganizations, responses=PAGE_FORMATS
+)
 async def get_by_specializations(
-    specs: typing.Annotated[list[int], fastapi.Query(description='Ids of specializations')],
+    specs: typing.Annotated[
+        list[int],
+        fastapi.Query(min_length=1, max_length=settings.MAX_SPECIALIZATIONS, description='Ids of specializations'),
+    ],
     service: OrganizationServiceDep,
-    limit: int = 10,
-    offset: int = 0,
-) -> schemas.ListOrganizations:
-    return await service.get_by_specializations(specs=specs, limit=limit, offset=offset)
+    deadline: SearchDeadline,
+    respond: PageResponseDep,
+    match: typing.Annotated[
+        schemas.SpecializationsMatch,
+        fastapi.Query(description='Require all of the specializations or any of them'),
+    ] = schemas.SpecializationsMatch.ALL,
+    limit: LimitQuery = 10,
+    offset: OffsetQuery = 0,
+    facets: FacetsQuery = None,
+    total: TotalQuery = None,
+) -> responses.Response:
+    return respond(
+        await service.get_by_specializations(
+            specs=specs, match=match, limit=limit, offset=offset, facets=facets, total=total, deadline=deadline
+        )
+    )
 
 
-@router.get('/{organization_id:int}')
-async def get_organization(organization_id: int, service: OrganizationServiceDep) -> schemas.Organization:
-    return await service.get_by_id(organization_id=organization_id)
+@router.get('/{organization_id:int}', response_model=schemas.Organization)
+async def get_organization(
+    organization_id: int, service: OrganizationServiceDep, deadline: LookupDeadline
+) -> RecordResponse:
+    return RecordResponse(await service.get_by_id(organization_id=organization_id, deadline=deadline))
 
 
-@router.get('')
+@router.get('', response_model=schemas.ListOrganizations, responses=PAGE_FORMATS)
 async def get_by_name(
     name: str,
     service: OrganizationServiceDep,
-    limit: int = 10,
-    offset: int = 0,
-) -> schemas.ListOrganizations:
-    return await service.get_by_name(name=name, limit=limit, offset=offset)
+    deadline: SearchDeadline,
+    respond: PageResponseDep,
+    limit: LimitQuery = 10,
+    offset: OffsetQuery = 0,
+    facets: FacetsQuery = None,
+    total: TotalQuery = None,
+) -> responses.Response:
+    return respond(
+        await service.get_by_name(name=name, limit=limit, offset=offset, facets=facets, total=total, deadline=deadline)
+    )
+
+
+# Up to `WRITE_MAX_BATCH_SIZE` organizations, each with its building and all of its specializations
+BatchBody = typing.Annotated[
+    list[schemas.OrganizationWrite], fastapi.Body(min_length=1, max_length=settings.WRITE_MAX_BATCH_SIZE)
+]
+_ADMIN = [fastapi.Depends(require_admin_token)]
+
+
+@router.post('/batch', status_code=fastapi.status.HTTP_201_CREATED, dependencies=_ADMIN)
+async def create_organizations(
+    organizations: BatchBody, service: OrganizationWriteServiceDep
+) -> schemas.OrganizationsWritten:
+    """Create organizations, none of which may exist yet. Requires the `X-Admin-Token` header."""
+    return await service.create(organizations)
+
+
+@router.put('/batch', dependencies=_ADMIN)
+async def upsert_organizations(
+    organizations: BatchBody, service: OrganizationWriteServiceDep
+) -> schemas.OrganizationsWritten:
+    """Create organizations, or replace the ones that exist. Requires the `X-Admin-Token` header."""
+    return await service.upsert(organizations)
+
+
+@router.patch('/batch', dependencies=_ADMIN)
+async def update_organizations(
+    organizations: BatchBody, service: OrganizationWriteServiceDep
+) -> schemas.OrganizationsWritten:
+    """Replace organizations, all of which must exist. Requires the `X-Admin-Token` header."""
+    return await service.update(organizations)
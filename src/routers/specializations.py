@@ -0,0 +1,24 @@
+import typing
+
+import fastapi
+
+from src import schemas
+from src.services import SpecializationServiceDep
+
+router = fastapi.APIRouter()
+
+
+@router.get('', response_model=schemas.Taxonomy)
+async def get_tree(
+    service: SpecializationServiceDep,
+    response: fastapi.Response,
+    if_none_match: typing.Annotated[str | None, fastapi.Header()] = None,
+) -> schemas.Taxonomy | fastapi.Response:
+    """Specialization tree, top-level specializations first and each one's children by id."""
+    taxonomy = await service.get_tree()
+    etag = f'"{taxonomy.version}"'
+    # Clients holding the current version get an empty response
+    if if_none_match == etag:
+        return fastapi.Response(status_code=fastapi.status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    response.headers['ETag'] = etag
+    return taxonomy
@@ -1,8 +1,24 @@
-from .organization import ListOrganizations, Organization
-from .specialization import Specialization
+from .change import Change, Changes
+from .facets import CountMode, FacetCount, Facets
+from .organization import ListOrganizations, Organization, OrganizationsWritten, OrganizationWrite
+from .slow_query import SlowQuery
+from .spatial import SpatialMode
+from .specialization import Specialization, SpecializationsMatch, SpecializationTree, Taxonomy
 
 __all__ = (
+    'Change',
+    'Changes',
+    'CountMode',
+    'FacetCount',
+    'Facets',
     'ListOrganizations',
     'Organization',
+    'OrganizationWrite',
+    'OrganizationsWritten',
+    'SlowQuery',
+    'SpatialMode',
     'Specialization',
+    'SpecializationTree',
+    'SpecializationsMatch',
+    'Taxonomy',
 )
@@ -0,0 +1,21 @@
+import datetime
+import typing
+
+import pydantic as pd
+
+
+class Change(pd.BaseModel):
+    model_config = pd.ConfigDict(from_attributes=True)
+
+    seq: int
+    table_name: str
+    operation: typing.Literal['insert', 'update', 'delete']
+    # Primary key of the changed row
+    key: dict[str, int]
+    changed_at: datetime.datetime
+
+
+class Changes(pd.BaseModel):
+    changes: list[Change]
+    # `since` of the next request
+    next: int
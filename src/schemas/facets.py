@@ -0,0 +1,20 @@
+import enum
+
+import pydantic as pd
+
+
+class CountMode(enum.StrEnum):
+    EXACT = 'exact'
+    ESTIMATE = 'estimate'
+
+
+class FacetCount(pd.BaseModel):
+    id: int
+    count: int
+
+
+class Facets(pd.BaseModel):
+    total: int
+    estimated: bool
+    specializations: list[FacetCount]
+    buildings: list[FacetCount]
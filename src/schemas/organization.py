@@ -1,5 +1,6 @@
 import pydantic as pd
 
+from .facets import Facets
 from .specialization import Specialization
 
 
@@ -13,5 +14,19 @@ class Organization(pd.BaseModel):
     specializations: list[Specialization]
 
 
+class OrganizationWrite(pd.BaseModel):
+    id: int = pd.Field(gt=0)
+    name: str = pd.Field(min_length=1)
+    phone: str = pd.Field(min_length=1)
+    building_id: int
+    specialization_ids: list[int] = []
+
+
+class OrganizationsWritten(pd.BaseModel):
+    ids: list[int]
+
+
 class ListOrganizations(pd.BaseModel):
     organizations: list[Organization]
+    facets: Facets | None = None
+    total: int | None = None
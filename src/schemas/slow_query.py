@@ -0,0 +1,15 @@
+import datetime
+import typing
+
+import pydantic as pd
+
+
+class SlowQuery(pd.BaseModel):
+    model_config = pd.ConfigDict(from_attributes=True)
+
+    statement: str
+    parameters: typing.Any
+    duration_ms: float
+    recorded_at: datetime.datetime
+    plan: list[dict[str, typing.Any]] | None
+    error: str | None = None
@@ -0,0 +1,10 @@
+import enum
+
+
+class SpatialMode(enum.StrEnum):
+    # PostGIS filters and orders the matches
+    EXACT = 'exact'
+    # Matches come from cached organizations of the geohash cells covering the area, filtered in the app
+    CELLS = 'cells'
+    # Matches come from the worker's in-memory index of organizations' locations, when `SPATIAL_INDEX` is on
+    INDEX = 'index'
@@ -1,3 +1,5 @@
+import enum
+
 import pydantic as pd
 
 
@@ -5,3 +7,20 @@ class Specialization(pd.BaseModel):
     id: int
     name: str
     parent_id: int | None
+
+
+class SpecializationsMatch(enum.StrEnum):
+    ALL = 'all'
+    ANY = 'any'
+
+
+class SpecializationTree(pd.BaseModel):
+    id: int
+    name: str
+    children: list['SpecializationTree']
+
+
+class Taxonomy(pd.BaseModel):
+    # Changes whenever any specialization does
+    version: str
+    specializations: list[SpecializationTree]
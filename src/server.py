@@ -0,0 +1,67 @@
+"""Production server: gunicorn supervising uvicorn workers, configured from `AppSettings`.
+
+    gunicorn -c python:src.server src.app:app
+
+The app is imported once in the master and the workers are forked from it, sharing its memory pages copy-on-write.
+With `SNAPSHOT_PATH` set, the master also builds the catalogue snapshot the workers then map (see `src/snapshot.py`).
+`main.py` stays the development server.
+"""
+
+import asyncio
+import gc
+import os
+import typing
+
+from uvicorn_worker import UvicornWorker
+
+from src.settings import settings
+
+if typing.TYPE_CHECKING:
+    from gunicorn.arbiter import Arbiter
+    from gunicorn.workers.base import Worker as BaseWorker
+
+
+class Worker(UvicornWorker):
+    CONFIG_KWARGS: dict[str, typing.Any] = {  # noqa: RUF012
+        'loop': 'uvloop',
+        'http': 'httptools',
+        'timeout_graceful_shutdown': settings.WEB_GRACEFUL_TIMEOUT_S,
+    }
+
+
+bind = [settings.WEB_BIND]
+workers = settings.WEB_WORKERS or os.process_cpu_count() or 1
+# Only the workers split the connections; this config is loaded before the preloaded app creates the engine
+settings.DB_POOL_PROCESSES = workers
+worker_class = 'src.server.Worker'
+preload_app = True
+backlog = settings.WEB_BACKLOG
+keepalive = settings.WEB_KEEPALIVE_S
+# Past uvicorn's own drain timeout, so a worker closes its connections before the master kills it
+graceful_timeout = settings.WEB_GRACEFUL_TIMEOUT_S + 5
+# Heartbeat files on tmpfs; a disk-backed /tmp in a container can stall them and get healthy workers killed
+worker_tmp_dir = '/dev/shm'  # noqa: S108
+
+# Collections in the master would free objects on pages the workers share and copy them; see `gc.freeze`
+gc.disable()
+
+
+def on_starting(_server: 'Arbiter') -> None:
+    if settings.SNAPSHOT_PATH is not None:
+        # Built once, before any worker exists; the workers map the file rather than each reading the catalogue
+        from src.snapshot import build_from  # noqa: PLC0415
+
+        asyncio.run(build_from(str(settings.POSTGRES_DSN), settings.SNAPSHOT_PATH))
+
+
+def when_ready(_server: 'Arbiter') -> None:
+    # Everything the preloaded app allocated is left out of the workers' collections
+    gc.freeze()
+
+
+def post_fork(_server: 'Arbiter', _worker: 'BaseWorker') -> None:
+    from src.db.deps import engine  # noqa: PLC0415
+
+    gc.enable()
+    # A worker must not reuse connections opened before the fork; the master doesn't open any, this makes sure
+    engine.sync_engine.dispose(close=False)
@@ -1,6 +1,15 @@
+from .change_service import ChangeService, ChangeServiceDep
 from .organization_service import OrganizationService, OrganizationServiceDep
+from .organization_write_service import OrganizationWriteService, OrganizationWriteServiceDep
+from .specialization_service import SpecializationService, SpecializationServiceDep
 
 __all__ = (
+    'ChangeService',
+    'ChangeServiceDep',
     'OrganizationService',
     'OrganizationServiceDep',
+    'OrganizationWriteService',
+    'OrganizationWriteServiceDep',
+    'SpecializationService',
+    'SpecializationServiceDep',
 )
@@ -0,0 +1,38 @@
+import asyncio
+import contextlib
+import typing
+
+import fastapi
+
+from src import schemas
+from src.repositories import ChangeRepositoryDep
+from src.repositories.change_notifier import ChangeNotifierDep
+from src.settings import settings
+
+
+class ChangeService:
+    def __init__(self, repo: ChangeRepositoryDep, notifier: ChangeNotifierDep = None) -> None:
+        self._repo = repo
+        self._notifier = notifier
+
+    async def get_since(self, seq: int, *, limit: int, wait: float) -> schemas.Changes:
+        """Return the changes after `seq`, waiting up to `wait` seconds for some when there are none yet."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        while True:
+            changes = await self._repo.get_since(seq, limit)
+            remaining = deadline - loop.time()
+            if changes or remaining <= 0:
+                return schemas.Changes(changes=changes, next=changes[-1].seq if changes else seq)
+            # Notifications come on commit, but a change is only numbered once older transactions are over too, so
+            # look again every poll interval even when notified of nothing
+            delay = min(remaining, settings.CHANGES_POLL_INTERVAL_S)
+            if self._notifier is None:
+                await asyncio.sleep(delay)
+                continue
+            with contextlib.suppress(TimeoutError):
+                async with asyncio.timeout(delay):
+                    await self._notifier.changed()
+
+
+ChangeServiceDep = typing.Annotated[ChangeService, fastapi.Depends(ChangeService)]
@@ -1,27 +1,141 @@
+import functools
+import math
 import typing
 
 import fastapi
 
 from src import schemas
+from src.cache import CacheDep
+from src.cache.codec import pack_organization, pack_page, unpack_organization, unpack_page
+from src.deadline import Deadline
 from src.repositories import OrganizationRepositoryDep
+from src.repositories.records import OrganizationPage, OrganizationRecord
+from src.settings import settings
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from src.snapshot import SnapshotReader
+
+# Length of a degree of latitude, and of longitude at the equator
+_M_PER_DEGREE_LAT = 110_574
+_M_PER_DEGREE_LON = 111_320
+
+
+def _box_area_km2(ll_longitude: float, ll_latitude: float, ur_longitude: float, ur_latitude: float) -> float:
+    """Approximate area of a lon/lat box, good enough for rejecting oversized ones."""
+    mid_latitude = math.radians((ll_latitude + ur_latitude) / 2)
+    width_m = abs(ur_longitude - ll_longitude) * _M_PER_DEGREE_LON * math.cos(mid_latitude)
+    height_m = abs(ur_latitude - ll_latitude) * _M_PER_DEGREE_LAT
+    return width_m * height_m / 1_000_000
+
+
+def get_snapshot(request: fastapi.Request) -> 'SnapshotReader | None':
+    return getattr(request.app.state, 'snapshot', None)
+
+
+# Attached by the app's lifespan when `SNAPSHOT_PATH` is set
+SnapshotDep = typing.Annotated['SnapshotReader | None', fastapi.Depends(get_snapshot)]
+
+
+def _key(*parts: object) -> str:
+    return ':'.join(str(part) for part in parts)
 
 
 class OrganizationService:
-    def __init__(self, repo: OrganizationRepositoryDep) -> None:
+    """Organization lookups, answered from the catalogue snapshot when there is one and it has an up to date answer.
+
+    Otherwise they're answered from the cache, when there is one, and from the repository on a cache miss.
+    """
+
+    def __init__(self, repo: OrganizationRepositoryDep, snapshot: SnapshotDep = None, cache: CacheDep = None) -> None:
         self._repo = repo
+        self._snapshot = snapshot
+        self._cache = cache
 
-    async def get_by_building(self, building_id: int, *, limit: int = 10, offset: int = 0) -> schemas.ListOrganizations:
-        return await self._repo.get_by_building_id(building_id=building_id, limit=limit, offset=offset)
+    async def _cached_page(self, key: str, load: 'Callable[[], Awaitable[OrganizationPage]]') -> OrganizationPage:
+        if self._cache is None:
+            return await load()
+        page = await self._cache.get_or_load(key, load, encode=pack_page, decode=unpack_page)
+        # Loaded pages are never `None`
+        return typing.cast('OrganizationPage', page)
+
+    async def get_by_building(
+        self,
+        building_id: int,
+        *,
+        limit: int = 10,
+        offset: int = 0,
+        facets: schemas.CountMode | None = None,
+        total: schemas.CountMode | None = None,
+        deadline: Deadline | None = None,
+    ) -> OrganizationPage:
+        # Facets are only counted by the database; buildings newer than the snapshot or changed since are only in it too
+        if facets is None and self._snapshot is not None:
+            found = self._snapshot.by_building(building_id, limit=limit, offset=offset)
+            if found is not None:
+                organizations, total_ = found
+                return OrganizationPage(organizations=organizations, total=total_ if total is not None else None)
+        return await self._cached_page(
+            _key('building', building_id, limit, offset, facets, total),
+            functools.partial(
+                self._repo.get_by_building_id,
+                building_id=building_id,
+                limit=limit,
+                offset=offset,
+                facets=facets,
+                total=total,
+                deadline=deadline,
+            ),
+        )
 
     async def get_by_building_address(
-        self, address: str, *, limit: int = 10, offset: int = 0
-    ) -> schemas.ListOrganizations:
-        return await self._repo.get_by_building_address(address=address, limit=limit, offset=offset)
+        self,
+        address: str,
+        *,
+        limit: int = 10,
+        offset: int = 0,
+        facets: schemas.CountMode | None = None,
+        total: schemas.CountMode | None = None,
+        deadline: Deadline | None = None,
+    ) -> OrganizationPage:
+        return await self._cached_page(
+            _key('address', limit, offset, facets, total, address),
+            functools.partial(
+                self._repo.get_by_building_address,
+                address=address,
+                limit=limit,
+                offset=offset,
+                facets=facets,
+                total=total,
+                deadline=deadline,
+            ),
+        )
 
     async def get_by_specializations(
-        self, specs: list[int], *, limit: int = 10, offset: int = 0
-    ) -> schemas.ListOrganizations:
-        return await self._repo.get_by_specializations(specs=specs, limit=limit, offset=offset)
+        self,
+        specs: list[int],
+        *,
+        match: schemas.SpecializationsMatch = schemas.SpecializationsMatch.ALL,
+        limit: int = 10,
+        offset: int = 0,
+        facets: schemas.CountMode | None = None,
+        total: schemas.CountMode | None = None,
+        deadline: Deadline | None = None,
+    ) -> OrganizationPage:
+        return await self._cached_page(
+            _key('specs', match, limit, offset, facets, total, ','.join(map(str, sorted(set(specs))))),
+            functools.partial(
+                self._repo.get_by_specializations,
+                specs=specs,
+                match=match,
+                limit=limit,
+                offset=offset,
+                facets=facets,
+                total=total,
+                deadline=deadline,
+            ),
+        )
 
     async def get_by_building_location_radius(
         self,
@@ -31,13 +145,25 @@ class OrganizationService:
         *,
         limit: int = 10,
         offset: int = 10,
-    ) -> schemas.ListOrganizations:
-        return await self._repo.get_by_building_location_radius(
-            longitude=longitude,
-            latitude=latitude,
-            radius_m=radius_m,
-            limit=limit,
-            offset=offset,
+        facets: schemas.CountMode | None = None,
+        total: schemas.CountMode | None = None,
+        mode: schemas.SpatialMode = schemas.SpatialMode.EXACT,
+        deadline: Deadline | None = None,
+    ) -> OrganizationPage:
+        return await self._cached_page(
+            _key('radius', mode, longitude, latitude, radius_m, limit, offset, facets, total),
+            functools.partial(
+                self._repo.get_by_building_location_radius,
+                longitude=longitude,
+                latitude=latitude,
+                radius_m=radius_m,
+                limit=limit,
+                offset=offset,
+                facets=facets,
+                total=total,
+                mode=mode,
+                deadline=deadline,
+            ),
         )
 
     async def get_by_building_location_box(
@@ -49,18 +175,44 @@ class OrganizationService:
         *,
         limit: int = 10,
         offset: int = 10,
-    ) -> schemas.ListOrganizations:
-        return await self._repo.get_by_building_location_box(
-            ll_longitude=ll_longitude,
-            ll_latitude=ll_latitude,
-            ur_longitude=ur_longitude,
-            ur_latitude=ur_latitude,
-            limit=limit,
-            offset=offset,
+        facets: schemas.CountMode | None = None,
+        total: schemas.CountMode | None = None,
+        mode: schemas.SpatialMode = schemas.SpatialMode.EXACT,
+        deadline: Deadline | None = None,
+    ) -> OrganizationPage:
+        area_km2 = _box_area_km2(ll_longitude, ll_latitude, ur_longitude, ur_latitude)
+        if area_km2 > settings.MAX_BOX_AREA_KM2:
+            raise fastapi.HTTPException(
+                status_code=fastapi.status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail=f'Box covers {area_km2:.0f} km², expected at most {settings.MAX_BOX_AREA_KM2:.0f} km²',
+            )
+        return await self._cached_page(
+            _key('box', mode, ll_longitude, ll_latitude, ur_longitude, ur_latitude, limit, offset, facets, total),
+            functools.partial(
+                self._repo.get_by_building_location_box,
+                ll_longitude=ll_longitude,
+                ll_latitude=ll_latitude,
+                ur_longitude=ur_longitude,
+                ur_latitude=ur_latitude,
+                limit=limit,
+                offset=offset,
+                facets=facets,
+                total=total,
+                mode=mode,
+                deadline=deadline,
+            ),
         )
 
-    async def get_by_id(self, organization_id: int) -> schemas.Organization:
-        res = await self._repo.get_by_id(organization_id=organization_id)
+    async def get_by_id(self, organization_id: int, *, deadline: Deadline | None = None) -> OrganizationRecord:
+        if self._snapshot is not None and (res := self._snapshot.organization(organization_id)) is not None:
+            return res
+        load = functools.partial(self._repo.get_by_id, organization_id=organization_id, deadline=deadline)
+        if self._cache is None:
+            res = await load()
+        else:
+            res = await self._cache.get_or_load(
+                _key('id', organization_id), load, encode=pack_organization, decode=unpack_organization
+            )
         if res is None:
             raise fastapi.HTTPException(
                 status_code=fastapi.status.HTTP_404_NOT_FOUND,
@@ -68,8 +220,28 @@ class OrganizationService:
             )
         return res
 
-    async def get_by_name(self, name: str, *, limit: int = 10, offset: int = 0) -> schemas.ListOrganizations:
-        return await self._repo.get_by_name(name=name, limit=limit, offset=offset)
+    async def get_by_name(
+        self,
+        name: str,
+        *,
+        limit: int = 10,
+        offset: int = 0,
+        facets: schemas.CountMode | None = None,
+        total: schemas.CountMode | None = None,
+        deadline: Deadline | None = None,
+    ) -> OrganizationPage:
+        return await self._cached_page(
+            _key('name', limit, offset, facets, total, name),
+            functools.partial(
+                self._repo.get_by_name,
+                name=name,
+                limit=limit,
+                offset=offset,
+                facets=facets,
+                total=total,
+                deadline=deadline,
+            ),
+        )
 
 
 OrganizationServiceDep = typing.Annotated[OrganizationService, fastapi.Depends(OrganizationService)]
@@ -0,0 +1,77 @@
+import collections
+import typing
+
+import fastapi
+from sqlalchemy import exc
+
+from src import schemas
+from src.cache import CacheDep
+from src.repositories import OrganizationWriterDep
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Sequence
+
+_UNIQUE_VIOLATION = '23505'
+_FOREIGN_KEY_VIOLATION = '23503'
+
+
+class OrganizationWriteService:
+    """Batch writes of organizations, after which every worker's cached responses are dropped.
+
+    Each worker drops the cells of the written organizations from its cell cache once Postgres notifies it of their
+    read models' changes (see `CellCacheInvalidator`), and serves them from the catalogue snapshot as long as
+    `SnapshotReader` tells.
+    """
+
+    def __init__(self, writer: OrganizationWriterDep, cache: CacheDep = None) -> None:
+        self._writer = writer
+        self._cache = cache
+
+    async def create(self, organizations: 'Sequence[schemas.OrganizationWrite]') -> schemas.OrganizationsWritten:
+        return await self._write(self._writer.create, organizations)
+
+    async def upsert(self, organizations: 'Sequence[schemas.OrganizationWrite]') -> schemas.OrganizationsWritten:
+        return await self._write(self._writer.upsert, organizations)
+
+    async def update(self, organizations: 'Sequence[schemas.OrganizationWrite]') -> schemas.OrganizationsWritten:
+        async def update(organizations: 'Sequence[schemas.OrganizationWrite]') -> None:
+            missing = await self._writer.update(organizations)
+            if missing:
+                raise fastapi.HTTPException(
+                    status_code=fastapi.status.HTTP_404_NOT_FOUND,
+                    detail=f'Organizations not found: {", ".join(map(str, missing))}',
+                )
+
+        return await self._write(update, organizations)
+
+    async def _write(
+        self,
+        write: 'Callable[[Sequence[schemas.OrganizationWrite]], Awaitable[object]]',
+        organizations: 'Sequence[schemas.OrganizationWrite]',
+    ) -> schemas.OrganizationsWritten:
+        repeated = [id_ for id_, count in collections.Counter(item.id for item in organizations).items() if count > 1]
+        if repeated:
+            raise fastapi.HTTPException(
+                status_code=fastapi.status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail=f'Organizations given more than once: {", ".join(map(str, repeated))}',
+            )
+        try:
+            await write(organizations)
+        except exc.IntegrityError as error:
+            sqlstate = getattr(error.orig, 'sqlstate', None)
+            if sqlstate == _UNIQUE_VIOLATION:
+                raise fastapi.HTTPException(
+                    status_code=fastapi.status.HTTP_409_CONFLICT, detail='Some of the organizations already exist'
+                ) from error
+            if sqlstate == _FOREIGN_KEY_VIOLATION:
+                raise fastapi.HTTPException(
+                    status_code=fastapi.status.HTTP_422_UNPROCESSABLE_CONTENT,
+                    detail='Some of the buildings or specializations do not exist',
+                ) from error
+            raise
+        if self._cache is not None:
+            await self._cache.invalidate()
+        return schemas.OrganizationsWritten(ids=[organization.id for organization in organizations])
+
+
+OrganizationWriteServiceDep = typing.Annotated[OrganizationWriteService, fastapi.Depends(OrganizationWriteService)]
@@ -0,0 +1,17 @@
+import typing
+
+import fastapi
+
+from src import schemas
+from src.repositories import SpecializationRepositoryDep
+
+
+class SpecializationService:
+    def __init__(self, repo: SpecializationRepositoryDep) -> None:
+        self._repo = repo
+
+    async def get_tree(self) -> schemas.Taxonomy:
+        return (await self._repo.get_taxonomy()).tree
+
+
+SpecializationServiceDep = typing.Annotated[SpecializationService, fastapi.Depends(SpecializationService)]
@@ -1,3 +1,6 @@
+import pathlib
+import typing
+
 import pydantic as pd
 import pydantic_settings as pds
 
@@ -7,5 +10,130 @@ class AppSettings(pds.BaseSettings):
 
     POSTGRES_DSN: pd.PostgresDsn
 
+    # Connections Postgres accepts (its `max_connections`) and how many of them to leave to migrations, psql and
+    # other clients; the rest is split evenly between the `DB_POOL_PROCESSES` processes, whose pools get their share
+    # less the connections they open outside them. Startup fails if that leaves a pool empty
+    DB_MAX_CONNECTIONS: int = 100
+    DB_RESERVED_CONNECTIONS: int = 10
+    # `src/server.py` sets it to its worker count; the development server, the tests and scripts run a single process
+    # and keep all the connections
+    DB_POOL_PROCESSES: int = 1
+
+    # Production server (`src/server.py`): worker processes, one per CPU available to the server if unset
+    WEB_WORKERS: int | None = None
+    WEB_BIND: str = '0.0.0.0:8000'
+    # Connections the kernel queues for the listening socket while all workers are busy
+    WEB_BACKLOG: int = 2048
+    # Seconds an idle keep-alive connection stays open; keep it above the load balancer's idle timeout so the
+    # balancer never reuses a connection the worker is closing
+    WEB_KEEPALIVE_S: int = 75
+    # Seconds in-flight requests get to finish once a worker is told to stop
+    WEB_GRACEFUL_TIMEOUT_S: int = 30
+
+    # Admission control of `/organizations`: requests past the concurrency limit, which adapts to latency up to the
+    # requests the worker's pool has connections for, wait in per-client queues and get a 503 once the queues are
+    # full or they waited too long
+    ADMISSION_CONTROL: bool = True
+    ADMISSION_MAX_QUEUE: int = 100
+    ADMISSION_MAX_QUEUE_PER_CLIENT: int = 20
+    # Below SQLAlchemy's 30 s pool timeout, so requests are turned away rather than time out waiting for a connection
+    ADMISSION_QUEUE_TIMEOUT_S: float = 2
+    # Serve a client's newest queued requests first while the queue is over half full
+    ADMISSION_LIFO: bool = True
+    ADMISSION_RETRY_AFTER_S: int = 1
+
+    # Time budgets of `/organizations` requests, applied as the statement timeout of their queries: lookups by id, and
+    # text, specialization and location searches
+    DEADLINE_LOOKUP_S: float = 1
+    DEADLINE_SEARCH_S: float = 3
+    DEADLINE_GEO_S: float = 3
+
+    # Caps on `/organizations` parameters that would make a query scan far more than a page needs
+    MAX_PAGE_SIZE: int = 100
+    MAX_RADIUS_M: int = 50_000
+    MAX_BOX_AREA_KM2: float = 2_500
+
+    # Organizations one request to `/organizations/batch` writes, in one transaction. Also keeps its multi-row inserts
+    # within the bound parameters a Postgres statement takes
+    WRITE_MAX_BATCH_SIZE: int = 1_000
+    MAX_SPECIALIZATIONS: int = 50
+
+    # Default `mode` of radius and box searches. In `cells` mode, the area is covered with geohash cells of the finest
+    # of `SPATIAL_CELL_PRECISIONS` needing at most `SPATIAL_MAX_CELLS` of them; organizations of each cell are cached
+    # for `SPATIAL_CELL_CACHE_TTL_S`, up to `SPATIAL_CELL_CACHE_SIZE` organizations in all, and filtered in the app by
+    # their distance on a sphere, within 0.5% of `exact`'s on the spheroid. Each worker drops the cells of changed
+    # organizations as Postgres notifies it of them, for which it holds one more connection, outside its pool; a size of
+    # 0 turns the cache and its listener off. Larger areas, areas with a cell of more than `SPATIAL_MAX_CELL_ROWS`
+    # organizations and facet requests use `exact`. In `index` mode, searches are answered from the in-memory index
+    # `SPATIAL_INDEX` loads, with the results of `exact`; facet requests and workers without the index use `exact`
+    SPATIAL_MODE: typing.Literal['exact', 'cells', 'index'] = 'exact'
+    SPATIAL_CELL_PRECISIONS: tuple[int, ...] = (5, 6, 7)
+    SPATIAL_MAX_CELLS: int = 16
+    SPATIAL_MAX_CELL_ROWS: int = 1_000
+    SPATIAL_CELL_CACHE_SIZE: int = 100_000
+    SPATIAL_CELL_CACHE_TTL_S: float = 30
+
+    # Load every organization's location into each worker's memory at startup and follow changes to it through
+    # LISTEN/NOTIFY; its STRtree is rebuilt once more than `SPATIAL_INDEX_REBUILD_AFTER` buildings changed
+    SPATIAL_INDEX: bool = False
+    SPATIAL_INDEX_REBUILD_AFTER: int = 1_000
+
+    # Columnar snapshot of the catalogue, built by the gunicorn master before forking and memory-mapped by every
+    # worker, which answer lookups by id and by building from it; workers look for a rebuilt file (`python -m
+    # src.snapshot`) and read the change log every `SNAPSHOT_CHECK_INTERVAL_S`. Lookups of what changed since the build
+    # go to the database, but only once the worker read the change: up to `SNAPSHOT_CHECK_INTERVAL_S` after it's
+    # published, the snapshot still serves the data it was built with
+    SNAPSHOT_PATH: pathlib.Path | None = None
+    SNAPSHOT_CHECK_INTERVAL_S: float = 5
+
+    # Seconds each worker keeps the specialization taxonomy, which organizations are hydrated from and
+    # `/specializations` serves. Renamed or moved specializations show up after at most this long, or as soon as the
+    # worker hears of their organizations' changes when the cell cache's listener runs (`SPATIAL_CELL_CACHE_SIZE` > 0)
+    TAXONOMY_CACHE_TTL_S: float = 60
+
+    # Cache of `OrganizationService` results: `memory` keeps them in each worker, `redis` shares them between workers
+    # and pods through the server at `CACHE_REDIS_URL`. Results are served for up to `CACHE_TTL_S` after they were
+    # read, hot ones reloaded a bit before expiry the more eagerly the larger `CACHE_XFETCH_BETA`
+    CACHE_BACKEND: typing.Literal['none', 'memory', 'redis'] = 'none'
+    CACHE_REDIS_URL: str = 'redis://localhost:6379/0'
+    # Seconds to wait on Redis before doing without the cache: requests are then served, uncached, from the database
+    CACHE_REDIS_TIMEOUT_S: float = 0.25
+    CACHE_PREFIX: str = 'secunda'
+    CACHE_TTL_S: float = 30
+    CACHE_MEMORY_SIZE: int = 10_000
+    CACHE_XFETCH_BETA: float = 1
+
+    # Responses of at least `COMPRESSION_MIN_SIZE` bytes are compressed with zstd, brotli or gzip, whichever the client
+    # prefers; smaller ones gain too little for the CPU. With `CACHE_BACKEND` set, compressed organization responses
+    # are cached as they were sent, so a hit skips the compression too
+    COMPRESSION: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+
+    # Long polls of `/changes` wait up to `CHANGES_MAX_WAIT_S` for new changes, looking for them every
+    # `CHANGES_POLL_INTERVAL_S` and, with `CHANGES_LISTEN`, as soon as Postgres notifies one, for which each worker
+    # holds one more connection, outside its pool
+    CHANGES_LISTEN: bool = False
+    CHANGES_POLL_INTERVAL_S: float = 1
+    CHANGES_MAX_WAIT_S: float = 30
+    CHANGES_MAX_PAGE_SIZE: int = 1_000
+
+    # Max number of matched organizations facets are computed over in `estimate` mode
+    FACETS_SAMPLE_SIZE: int = 10_000
+
+    # Statements slower than this are logged and kept for `/admin/slow-queries`; unset disables the recorder
+    SLOW_QUERY_THRESHOLD_MS: float | None = None
+    SLOW_QUERY_LOG_SIZE: int = 100
+    # Min seconds between two `EXPLAIN ANALYZE` captures of the same statement. A capture runs the statement again, for
+    # up to ten times the threshold, on one more connection of each worker's, outside its pool; failed statements,
+    # such as those cancelled by a request's deadline, aren't run again
+    SLOW_QUERY_EXPLAIN_INTERVAL_S: float = 60
+
+    # Development aid: answer requests running more statements or fetching more rows than this with a 500 saying so
+    DEV_MAX_QUERIES_PER_REQUEST: int | None = None
+    DEV_MAX_ROWS_PER_REQUEST: int | None = None
+
+    # Required in the `X-Admin-Token` header of `/admin` endpoints; unset disables them
+    ADMIN_TOKEN: pd.SecretStr | None = None
+
 
 settings = AppSettings()  # pyright: ignore[reportCallIssue]
@@ -0,0 +1,432 @@
+"""Columnar snapshot of the organization catalogue in one file, memory-mapped read-only by every worker.
+
+Ids, coordinates and references are numpy arrays laid out in the file, so attaching maps the file and copies nothing:
+the workers of a server share its pages through the page cache instead of each holding a copy of the catalogue.
+Strings are interned into one UTF-8 heap, and the specializations of an organization and the organizations of a
+building are CSR lists: a values array, and offsets where each row's values start.
+
+    python -m src.snapshot /dev/shm/catalogue.snapshot
+
+A rebuilt file replaces the old one atomically; workers holding the old mapping keep it until they notice.
+
+The file records the last change of the change log it includes. Workers follow the log from there and answer lookups
+of organizations and buildings changed since from the database instead, each change from the moment they read it:
+up to `SNAPSHOT_CHECK_INTERVAL_S` after it is published, which waits for the transactions older than it to end.
+Until then, the snapshot serves what it was built with.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import mmap
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import typing
+
+import numpy as np
+import sqlalchemy as sa
+import sqlalchemy.ext.asyncio as sa_async
+from sqlalchemy import exc, pool
+
+from src.db import models
+from src.repositories.change_repository import ChangeRepository
+from src.repositories.records import OrganizationRecord, SpecializationRecord
+from src.settings import settings
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from numpy.typing import NDArray
+
+    from src import schemas
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'ORGSNAP1'
+VERSION = 2
+# Arrays start on cache line boundaries
+_ALIGNMENT = 64
+_LENGTH = np.dtype('<u8')
+
+# Array name and dtype, in file order
+_ARRAYS: dict[str, str] = {
+    'specialization_ids': '<i4',
+    # Index of the parent specialization, -1 for roots
+    'specialization_parents': '<i4',
+    'specialization_names': '<i4',
+    'building_ids': '<i4',
+    'building_lon': '<f8',
+    'building_lat': '<f8',
+    'building_addresses': '<i4',
+    'organization_ids': '<i4',
+    'organization_buildings': '<i4',
+    'organization_names': '<i4',
+    'organization_phones': '<i4',
+    'organization_specialization_offsets': '<i8',
+    'organization_specializations': '<i4',
+    'building_organization_offsets': '<i8',
+    'building_organizations': '<i4',
+    'string_offsets': '<i8',
+    'string_data': '|u1',
+}
+
+type SpecializationRow = tuple[int, str, int | None]
+# Organization id, name, phone, building id, address, longitude, latitude and ids of its specializations
+type OrganizationRow = tuple[int, str, str, int, str, float, float, 'Sequence[int]']
+
+
+class _Strings:
+    """Heap of distinct strings, each stored once however many rows use it."""
+
+    def __init__(self) -> None:
+        self._ids: dict[str, int] = {}
+        self._data = bytearray()
+        self._offsets = [0]
+
+    def intern(self, value: str) -> int:
+        id_ = self._ids.get(value)
+        if id_ is None:
+            id_ = self._ids[value] = len(self._offsets) - 1
+            self._data += value.encode()
+            self._offsets.append(len(self._data))
+        return id_
+
+    def arrays(self) -> tuple['NDArray[np.int64]', 'NDArray[np.uint8]']:
+        return np.array(self._offsets, np.int64), np.frombuffer(bytes(self._data), np.uint8)
+
+
+def _csr(rows: 'Sequence[Sequence[int]]') -> tuple['NDArray[np.int64]', 'NDArray[np.int32]']:
+    offsets = np.zeros(len(rows) + 1, np.int64)
+    offsets[1:] = np.cumsum([len(row) for row in rows])
+    values = np.fromiter((value for row in rows for value in row), np.int32, int(offsets[-1]))
+    return offsets, values
+
+
+def encode(
+    specializations: 'Sequence[SpecializationRow]', organizations: 'Sequence[OrganizationRow]'
+) -> dict[str, 'NDArray[typing.Any]']:
+    """Arrays of a snapshot of `specializations` and `organizations`."""
+    strings = _Strings()
+    specializations = sorted(specializations)
+    specialization_index = {id_: index for index, (id_, _, _) in enumerate(specializations)}
+    organizations = sorted(organizations)
+
+    buildings: dict[int, tuple[float, float, int]] = {}
+    for _, _, _, building_id, address, lon, lat, _ in organizations:
+        buildings.setdefault(building_id, (lon, lat, strings.intern(address)))
+    building_ids = sorted(buildings)
+    building_index = {id_: index for index, id_ in enumerate(building_ids)}
+    building_organizations: list[list[int]] = [[] for _ in building_ids]
+    for index, (_, _, _, building_id, *_) in enumerate(organizations):
+        building_organizations[building_index[building_id]].append(index)
+
+    organization_specialization_offsets, organization_specializations = _csr(
+        [[specialization_index[id_] for id_ in sorted(row[7])] for row in organizations]
+    )
+    building_organization_offsets, building_organizations_ = _csr(building_organizations)
+    arrays: dict[str, typing.Any] = {
+        'specialization_ids': [id_ for id_, _, _ in specializations],
+        'specialization_parents': [
+            specialization_index[parent_id] if parent_id is not None else -1 for _, _, parent_id in specializations
+        ],
+        'specialization_names': [strings.intern(name) for _, name, _ in specializations],
+        'building_ids': building_ids,
+        'building_lon': [buildings[id_][0] for id_ in building_ids],
+        'building_lat': [buildings[id_][1] for id_ in building_ids],
+        'building_addresses': [buildings[id_][2] for id_ in building_ids],
+        'organization_ids': [row[0] for row in organizations],
+        'organization_buildings': [building_index[row[3]] for row in organizations],
+        'organization_names': [strings.intern(row[1]) for row in organizations],
+        'organization_phones': [strings.intern(row[2]) for row in organizations],
+        'organization_specialization_offsets': organization_specialization_offsets,
+        'organization_specializations': organization_specializations,
+        'building_organization_offsets': building_organization_offsets,
+        'building_organizations': building_organizations_,
+    }
+    # The heap is complete only once every column has interned its strings
+    arrays['string_offsets'], arrays['string_data'] = strings.arrays()
+    return {name: np.asarray(arrays[name], dtype) for name, dtype in _ARRAYS.items()}
+
+
+def write(path: pathlib.Path, arrays: dict[str, 'NDArray[typing.Any]'], *, seq: int = 0) -> None:
+    """Write a snapshot file including the changes up to `seq`, replacing any previous one at once."""
+    layout: dict[str, tuple[int, int]] = {}
+    offset = 0
+    for name in _ARRAYS:
+        layout[name] = (offset, len(arrays[name]))
+        offset += -(-arrays[name].nbytes // _ALIGNMENT) * _ALIGNMENT
+    header = json.dumps({'version': VERSION, 'created_at': time.time(), 'seq': seq, 'arrays': layout}).encode()
+    # Arrays are laid out after the magic, the header's length and the header itself
+    start = -(-(len(MAGIC) + _LENGTH.itemsize + len(header)) // _ALIGNMENT) * _ALIGNMENT
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f'.{path.name}.', delete=False) as file:
+        try:
+            file.write(MAGIC)
+            file.write(np.array(len(header), _LENGTH).tobytes())
+            file.write(header)
+            for name, (array_offset, _) in layout.items():
+                file.seek(start + array_offset)
+                file.write(arrays[name].tobytes())
+            file.truncate(start + offset)
+            file.flush()
+            os.fsync(file.fileno())
+        except BaseException:
+            pathlib.Path(file.name).unlink()
+            raise
+    # Workers that attached the old file keep reading it: its pages live on until they unmap it
+    pathlib.Path(file.name).replace(path)
+
+
+class Snapshot:
+    """Catalogue snapshot attached from its file, answering lookups by organization and building id."""
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        with path.open('rb') as file:
+            self.inode = os.fstat(file.fileno()).st_ino
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            msg = f'{path} is not an organization snapshot'
+            raise ValueError(msg)
+        header_length = int(np.frombuffer(self._mmap, _LENGTH, 1, len(MAGIC))[0])
+        header_start = len(MAGIC) + _LENGTH.itemsize
+        header = json.loads(self._mmap[header_start : header_start + header_length])
+        if header['version'] != VERSION:
+            msg = f'{path} is a version {header["version"]} snapshot, expected version {VERSION}'
+            raise ValueError(msg)
+        self.created_at: float = header['created_at']
+        # Last change of the change log included; later ones aren't
+        self.seq: int = header['seq']
+        start = -(-(header_start + header_length) // _ALIGNMENT) * _ALIGNMENT
+        # Views into the mapping, read-only like it
+        self._arrays = {
+            name: np.frombuffer(self._mmap, dtype, count, start + offset)
+            for name, dtype in _ARRAYS.items()
+            for offset, count in [header['arrays'][name]]
+        }
+        self._specializations = self._read_specializations()
+
+    def __len__(self) -> int:
+        """Count the organizations in the snapshot."""
+        return len(self._arrays['organization_ids'])
+
+    def organization(self, organization_id: int) -> OrganizationRecord | None:
+        index = _find(self._arrays['organization_ids'], organization_id)
+        return self._organization(index) if index is not None else None
+
+    def building_of(self, organization_id: int) -> int | None:
+        index = _find(self._arrays['organization_ids'], organization_id)
+        if index is None:
+            return None
+        return int(self._arrays['building_ids'][self._arrays['organization_buildings'][index]])
+
+    def by_building(self, building_id: int, *, limit: int, offset: int) -> tuple[list[OrganizationRecord], int] | None:
+        """Page of a building's organizations by id and their total; `None` for a building the snapshot lacks."""
+        index = _find(self._arrays['building_ids'], building_id)
+        if index is None:
+            return None
+        offsets = self._arrays['building_organization_offsets']
+        members = self._arrays['building_organizations'][offsets[index] : offsets[index + 1]]
+        return [self._organization(int(member)) for member in members[offset : offset + limit]], len(members)
+
+    def _string(self, id_: int) -> str:
+        offsets = self._arrays['string_offsets']
+        return self._arrays['string_data'][offsets[id_] : offsets[id_ + 1]].tobytes().decode()
+
+    def _read_specializations(self) -> list[SpecializationRecord]:
+        """Every specialization, built once: organizations share them."""
+        ids = self._arrays['specialization_ids']
+        return [
+            SpecializationRecord(
+                id=int(id_), name=self._string(int(name)), parent_id=int(ids[parent]) if parent >= 0 else None
+            )
+            for id_, name, parent in zip(
+                ids, self._arrays['specialization_names'], self._arrays['specialization_parents'], strict=True
+            )
+        ]
+
+    def _organization(self, index: int) -> OrganizationRecord:
+        arrays = self._arrays
+        building = int(arrays['organization_buildings'][index])
+        offsets = arrays['organization_specialization_offsets']
+        return OrganizationRecord(
+            id=int(arrays['organization_ids'][index]),
+            name=self._string(int(arrays['organization_names'][index])),
+            phone=self._string(int(arrays['organization_phones'][index])),
+            building_id=int(arrays['building_ids'][building]),
+            building_address=self._string(int(arrays['building_addresses'][building])),
+            building_coordinates=(float(arrays['building_lon'][building]), float(arrays['building_lat'][building])),
+            specializations=[
+                self._specializations[int(specialization)]
+                for specialization in arrays['organization_specializations'][offsets[index] : offsets[index + 1]]
+            ],
+        )
+
+
+def _find(ids: 'NDArray[np.int32]', id_: int) -> int | None:
+    """Position of `id_` in the sorted `ids`."""
+    index = int(np.searchsorted(ids, id_))
+    return index if index < len(ids) and ids[index] == id_ else None
+
+
+class SnapshotReader:
+    """Snapshot at `path`, attached again once the file was replaced by a newer build.
+
+    Lookups are only answered for what didn't change since the build, as far as the changes read by `follow` tell. The
+    file is looked at no more than once per `check_interval` seconds, and the change log read as often.
+    """
+
+    def __init__(self, path: pathlib.Path, *, check_interval: float) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        # Last change read from the change log
+        self.seq = 0
+        self._snapshot: Snapshot | None = None
+        self._checked_at = -float('inf')
+        # `seq` of the last change read to each organization, to each building's row and to the list of organizations
+        # in it, and to any specialization, which organizations show the names of
+        self._organizations: dict[int, int] = {}
+        self._buildings: dict[int, int] = {}
+        self._building_lists: dict[int, int] = {}
+        self._specializations = 0
+
+    def current(self) -> Snapshot | None:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            try:
+                inode = self.path.stat().st_ino
+            except FileNotFoundError:
+                return self._snapshot
+            if self._snapshot is None or self._snapshot.inode != inode:
+                self._snapshot = Snapshot(self.path)
+                self._forget(self._snapshot.seq)
+        return self._snapshot
+
+    def organization(self, organization_id: int) -> OrganizationRecord | None:
+        """Organization as the snapshot has it; `None` if it lacks it or it changed since."""
+        snapshot = self.current()
+        if snapshot is None or self._specializations > snapshot.seq:
+            return None
+        building_id = snapshot.building_of(organization_id)
+        if (
+            building_id is None
+            or max(self._organizations.get(organization_id, 0), self._buildings.get(building_id, 0)) > snapshot.seq
+        ):
+            return None
+        return snapshot.organization(organization_id)
+
+    def by_building(self, building_id: int, *, limit: int, offset: int) -> tuple[list[OrganizationRecord], int] | None:
+        """Page of a building's organizations as the snapshot has them; `None` if it lacks them or any changed since."""
+        snapshot = self.current()
+        if snapshot is None or self._specializations > snapshot.seq:
+            return None
+        if max(self._buildings.get(building_id, 0), self._building_lists.get(building_id, 0)) > snapshot.seq:
+            return None
+        return snapshot.by_building(building_id, limit=limit, offset=offset)
+
+    def apply(self, changes: 'Sequence[schemas.Change]') -> None:
+        """Take note of changes read from the change log, in order."""
+        snapshot = self.current()
+        for change in changes:
+            self.seq = change.seq
+            if change.table_name == 'specializations':
+                self._specializations = change.seq
+            elif change.table_name == 'buildings':
+                self._buildings[change.key['id']] = change.seq
+            else:
+                organization_id = change.key.get('organization_id', change.key.get('id'))
+                if organization_id is None:
+                    continue
+                self._organizations[organization_id] = change.seq
+                # The building the organization was listed in, and the one it moves to
+                for building_id in (
+                    snapshot.building_of(organization_id) if snapshot is not None else None,
+                    change.key.get('building_id'),
+                ):
+                    if building_id is not None:
+                        self._building_lists[building_id] = change.seq
+
+    async def catch_up(self, sessionmaker: 'sa_async.async_sessionmaker[sa_async.AsyncSession]') -> None:
+        """Read the changes published since the last one read."""
+        snapshot = self.current()
+        if snapshot is None:
+            return
+        self.seq = max(self.seq, snapshot.seq)
+        batch_size = 1_000
+        while True:
+            async with sessionmaker() as session:
+                changes = await ChangeRepository(session).get_since(self.seq, batch_size)
+            self.apply(changes)
+            if len(changes) < batch_size:
+                return
+
+    async def follow(self, sessionmaker: 'sa_async.async_sessionmaker[sa_async.AsyncSession]') -> None:
+        """Catch up with the change log every `check_interval` seconds, until cancelled."""
+        while True:
+            try:
+                await self.catch_up(sessionmaker)
+            except (OSError, exc.SQLAlchemyError):
+                logger.exception('Failed to read changes since the snapshot, retrying in %s s', self.check_interval)
+            await asyncio.sleep(self.check_interval)
+
+    def _forget(self, seq: int) -> None:
+        """Drop the changes up to `seq`, which a newly attached snapshot includes."""
+        self._organizations = {id_: last for id_, last in self._organizations.items() if last > seq}
+        self._buildings = {id_: last for id_, last in self._buildings.items() if last > seq}
+        self._building_lists = {id_: last for id_, last in self._building_lists.items() if last > seq}
+
+
+_SPECIALIZATIONS = sa.select(models.Specialization.id, models.Specialization.name, models.Specialization.parent_id)
+_ORGANIZATIONS = sa.select(
+    models.OrganizationReadModel.organization_id,
+    models.OrganizationReadModel.name,
+    models.OrganizationReadModel.phone,
+    models.OrganizationReadModel.building_id,
+    models.OrganizationReadModel.address,
+    models.OrganizationReadModel.lon,
+    models.OrganizationReadModel.lat,
+    models.OrganizationReadModel.specialization_ids,
+)
+
+
+async def build(session: sa_async.AsyncSession, path: pathlib.Path) -> None:
+    """Write a snapshot of the catalogue as the session's transaction sees it."""
+    # Changes get their `seq` once their transaction is over, so those numbered by now are all seen by the transaction
+    seq = await session.scalar(sa.select(sa.func.coalesce(sa.func.max(models.ChangeLog.seq), 0)))
+    specializations = typing.cast('list[SpecializationRow]', (await session.execute(_SPECIALIZATIONS)).tuples().all())
+    organizations = typing.cast('list[OrganizationRow]', (await session.execute(_ORGANIZATIONS)).tuples().all())
+    write(path, encode(specializations, organizations), seq=seq or 0)
+
+
+async def build_from(dsn: str, path: pathlib.Path) -> None:
+    # Its own connection, so nothing is left in the app's pool to be inherited by forked workers
+    engine = sa_async.create_async_engine(dsn, poolclass=pool.NullPool)
+    try:
+        # One consistent view of both tables
+        async with sa_async.AsyncSession(engine) as session, session.begin():
+            await session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+            await build(session, path)
+    finally:
+        await engine.dispose()
+
+
+def main(argv: 'Sequence[str] | None' = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', type=pathlib.Path, nargs='?', default=settings.SNAPSHOT_PATH)
+    args = parser.parse_args(argv)
+    if args.path is None:
+        parser.error('path is required when SNAPSHOT_PATH is unset')
+    asyncio.run(build_from(str(settings.POSTGRES_DSN), args.path))
+    snapshot = Snapshot(args.path)
+    sys.stdout.write(f'{args.path}: {len(snapshot)} organizations, {args.path.stat().st_size} bytes\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,43 @@
+from benchmarks import datagen
+
+CONFIG = datagen.DatasetConfig(organizations=1_000, buildings=200)
+
+
+def test_deterministic():
+    assert list(datagen.organizations(CONFIG)) == list(datagen.organizations(CONFIG))
+    assert list(datagen.buildings(CONFIG)) == list(datagen.buildings(CONFIG))
+    assert list(datagen.buildings(CONFIG)) != list(datagen.buildings(datagen.DatasetConfig(seed=1, buildings=200)))
+
+
+def test_taxonomy_has_three_levels():
+    specs = datagen.specializations(CONFIG)
+    parents = {spec_id: parent_id for spec_id, _, parent_id in specs}
+
+    def depth(spec_id: int | None) -> int:
+        return 0 if spec_id is None else 1 + depth(parents[spec_id])
+
+    assert len(specs) == CONFIG.specializations
+    assert {depth(spec_id) for spec_id in parents} == {1, 2, 3}
+
+
+def test_specializations_follow_popularity():
+    counts = dict.fromkeys(datagen.specialization_popularity(CONFIG), 0)
+    for *_, spec_ids in datagen.organizations(CONFIG):
+        for spec_id in spec_ids:
+            counts[spec_id] += 1
+
+    ranked = list(counts.values())
+    top, bottom = ranked[: len(ranked) // 10], ranked[-len(ranked) // 10 :]
+    assert sum(top) > 5 * sum(bottom)
+
+
+def test_buildings_are_clustered():
+    busiest = datagen.cluster_centers(CONFIG)[0]
+    near = [
+        building
+        for building in datagen.buildings(CONFIG)
+        if abs(building[2] - busiest[0]) < 0.02 and abs(building[3] - busiest[1]) < 0.02  # noqa: PLR2004
+    ]
+
+    # The busiest of 40 neighbourhoods gets far more than an even share of the buildings
+    assert len(near) > CONFIG.buildings / CONFIG.clusters * 3
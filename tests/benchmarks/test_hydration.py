@@ -0,0 +1,23 @@
+import json
+
+import pytest
+
+from benchmarks import hydration
+
+
+@pytest.mark.parametrize('count', [0, 50])
+def test_paths_render_the_same_json(count: int):
+    taxonomy = hydration.taxonomy()
+    rows = hydration.rows(count, taxonomy)
+
+    rendered = {name: json.loads(path(rows, taxonomy)) for name, path in hydration.PATHS.items()}
+
+    assert rendered['records'] == rendered['models']
+    assert len(rendered['records']['organizations']) == count
+
+
+def test_taxonomy():
+    taxonomy = hydration.taxonomy(60)
+
+    assert len(taxonomy.nodes) == 60  # noqa: PLR2004
+    assert taxonomy.nodes[42].ancestors == (4,)
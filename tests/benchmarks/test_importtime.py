@@ -0,0 +1,20 @@
+from benchmarks import importtime
+
+REPORT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:      1500 |       1500 |   fastapi.types
+import time:       300 |       1920 | src.app
+"""
+
+
+def test_parse():
+    assert importtime.parse(REPORT) == [
+        importtime.ImportTime(module='_io', self_us=120, cumulative_us=120),
+        importtime.ImportTime(module='fastapi.types', self_us=1500, cumulative_us=1500),
+        importtime.ImportTime(module='src.app', self_us=300, cumulative_us=1920),
+    ]
+
+
+def test_total_s():
+    assert importtime.total_s(importtime.parse(REPORT)) == 0.00192  # noqa: PLR2004
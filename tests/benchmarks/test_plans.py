@@ -0,0 +1,56 @@
+from benchmarks import plans
+
+INDEX_PLAN = {
+    'Node Type': 'Limit',
+    'Total Cost': 10.5,
+    'Plans': [
+        {
+            'Node Type': 'Index Scan',
+            'Parent Relationship': 'Outer',
+            'Index Name': 'ix_organization_read_models_point',
+            'Relation Name': 'organization_read_models',
+            'Total Cost': 10.0,
+            'Plan Rows': 10,
+        }
+    ],
+}
+SEQ_PLAN = {
+    'Node Type': 'Limit',
+    'Plans': [{'Node Type': 'Seq Scan', 'Parent Relationship': 'Outer', 'Relation Name': 'organization_read_models'}],
+}
+
+
+def snapshot(plan: plans.Plan, cost: float) -> dict[str, object]:
+    return {'statement': 'SELECT', 'cost': cost, 'rows': 10, 'plan': plans.normalize(plan)}
+
+
+def test_normalize_drops_estimates():
+    assert plans.normalize(INDEX_PLAN) == {
+        'Node Type': 'Limit',
+        'Plans': [
+            {
+                'Node Type': 'Index Scan',
+                'Parent Relationship': 'Outer',
+                'Index Name': 'ix_organization_read_models_point',
+                'Relation Name': 'organization_read_models',
+            }
+        ],
+    }
+    assert plans.render(plans.normalize(INDEX_PLAN)) == 'Limit(Index Scan[ix_organization_read_models_point])'
+
+
+def test_compare():
+    base = {'radius': [snapshot(INDEX_PLAN, 10)], 'box': [snapshot(INDEX_PLAN, 10)], 'id': [snapshot(INDEX_PLAN, 1)]}
+    new = {
+        'radius': [snapshot(SEQ_PLAN, 10)],
+        'box': [snapshot(INDEX_PLAN, 11.5)],
+        'id': [snapshot(INDEX_PLAN, 1), snapshot(INDEX_PLAN, 1)],
+    }
+
+    assert plans.compare(base, new, threshold=0.2) == [
+        'id: runs 2 statements instead of 1',
+        'radius[0]: plan changed\n'
+        '    - Limit(Index Scan[ix_organization_read_models_point])\n'
+        '    + Limit(Seq Scan[organization_read_models])',
+    ]
+    assert plans.compare(base, new, threshold=0.1)[0] == 'box[0]: estimated cost 10.0 -> 11.5'
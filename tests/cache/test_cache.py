@@ -0,0 +1,113 @@
+import typing
+
+import fakeredis
+import prometheus_client
+import pytest
+
+from src.cache import Cache, CacheBackend, MemoryBackend
+from src.cache.redis_backend import RedisBackend
+
+if typing.TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+
+@pytest.fixture(params=['memory', 'redis'])
+async def backend(request: pytest.FixtureRequest) -> 'AsyncIterator[CacheBackend]':
+    backend = MemoryBackend(size=100) if request.param == 'memory' else RedisBackend(fakeredis.FakeAsyncRedis())
+    try:
+        yield backend
+    finally:
+        await backend.close()
+
+
+class Loader:
+    def __init__(self, value: str | None) -> None:
+        self.value = value
+        self.calls = 0
+
+    async def __call__(self) -> str | None:
+        self.calls += 1
+        return self.value
+
+
+def cache(backend: CacheBackend, *, beta: float = 1, random_: float = 0.5) -> Cache:
+    return Cache(backend, prefix='test', ttl=60, beta=beta, generation_check=0, random_=lambda: random_)
+
+
+async def get(cache: Cache, load: Loader, key: str = 'key') -> str | None:
+    return await cache.get_or_load(key, load, encode=str, decode=str)
+
+
+async def test_loads_once(backend: CacheBackend):
+    load = Loader('value')
+
+    assert await get(cache(backend), load) == 'value'
+    assert await get(cache(backend), load) == 'value'
+    assert load.calls == 1
+
+
+async def test_none_is_not_cached(backend: CacheBackend):
+    load = Loader(None)
+
+    assert await get(cache(backend), load) is None
+    assert await get(cache(backend), load) is None
+    assert load.calls == 2  # noqa: PLR2004
+
+
+async def test_invalidate_reaches_every_worker(backend: CacheBackend):
+    load = Loader('old')
+    worker, other_worker = cache(backend), cache(backend)
+    await get(worker, load)
+
+    await worker.invalidate()
+    load.value = 'new'
+
+    assert await get(other_worker, load) == 'new'
+    assert await get(worker, load) == 'new'
+    assert load.calls == 2  # noqa: PLR2004
+
+
+async def test_early_expiry(backend: CacheBackend):
+    load = Loader('value')
+    await get(cache(backend), load)
+
+    # However fast the load was, a large enough beta pulls expiry before now
+    assert await get(cache(backend, beta=1e12), load) == 'value'
+    assert load.calls == 2  # noqa: PLR2004
+    # With a draw of 0 the log is 0, so a value is never recomputed early
+    assert await get(cache(backend, beta=1e12, random_=0), load) == 'value'
+    assert load.calls == 2  # noqa: PLR2004
+
+
+async def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(size=2)
+    await backend.set('a', b'1', 60)
+    await backend.set('b', b'2', 60)
+    await backend.get('a')
+
+    await backend.set('c', b'3', 60)
+
+    assert await backend.get('a') == b'1'
+    assert await backend.get('b') is None
+    assert await backend.get('c') == b'3'
+
+
+async def test_loads_through_backend_outage():
+    server = fakeredis.FakeServer()
+    server.connected = False
+    backend = RedisBackend(fakeredis.FakeAsyncRedis(server=server))
+    load = Loader('value')
+    errors_before = prometheus_client.REGISTRY.get_sample_value('cache_requests_total', {'result': 'error'}) or 0
+
+    assert await get(cache(backend), load) == 'value'
+    await cache(backend).invalidate()
+    assert await get(cache(backend), load) == 'value'
+
+    assert load.calls == 2  # noqa: PLR2004
+    errors_after = prometheus_client.REGISTRY.get_sample_value('cache_requests_total', {'result': 'error'})
+    assert errors_after == errors_before + 3
+    # Once the server is back, values are cached again
+    server.connected = True
+    await get(cache(backend), load)
+    assert await get(cache(backend), load) == 'value'
+    assert load.calls == 3  # noqa: PLR2004
@@ -0,0 +1,39 @@
+import msgpack
+
+from src import schemas
+from src.cache import codec
+from src.repositories.records import OrganizationPage, OrganizationRecord, SpecializationRecord
+
+SHOPS = SpecializationRecord(id=1, name='Shops', parent_id=None)
+PAGE = OrganizationPage(
+    organizations=[
+        OrganizationRecord(
+            id=id_,
+            name=f'Org {id_}',
+            phone='8-800',
+            building_id=1,
+            building_address='Main st. 1',
+            building_coordinates=(37.6, 55.7),
+            specializations=[SHOPS],
+        )
+        for id_ in (1, 2)
+    ],
+    facets=schemas.Facets(total=2, estimated=False, specializations=[schemas.FacetCount(id=1, count=2)], buildings=[]),
+    total=2,
+)
+
+
+def test_page_round_trip():
+    page = codec.unpack_page(msgpack.unpackb(msgpack.packb(codec.pack_page(PAGE))))
+
+    assert page == PAGE
+    # Organizations of a page share their specializations again
+    assert page.organizations[0].specializations[0] is page.organizations[1].specializations[0]
+
+
+def test_organization_round_trip():
+    organization = PAGE.organizations[0]
+
+    assert (
+        codec.unpack_organization(msgpack.unpackb(msgpack.packb(codec.pack_organization(organization)))) == organization
+    )
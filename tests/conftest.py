@@ -1,9 +1,14 @@
+import contextlib
+import typing
+
 import pytest
 import sqlalchemy as sa
 from sqlalchemy import engine as sa_engine
 from sqlalchemy.ext import asyncio as async_sa
 
-from src.db import models
+from src.db import QueryStats, models, query_budget
+from src.db.entities import ENTITIES
+from src.db.metrics import install_query_tracking
 from src.settings import settings
 
 TEST_DB_NAME = 'test'
@@ -62,6 +67,8 @@ async def db():
             lambda conn: conn.execute(sa.text('CREATE EXTENSION IF NOT EXISTS postgis')),
         )
         await conn.run_sync(models.Base.metadata.create_all)
+        for entity in ENTITIES:
+            await conn.execute(entity.to_sql_statement_create())
     await engine.dispose()
 
     try:
@@ -73,12 +80,44 @@ async def db():
 @pytest.fixture
 async def engine(db: str):
     engine = async_sa.create_async_engine(db)
+    install_query_tracking(engine.sync_engine)
     try:
         yield engine
     finally:
         await engine.dispose()
 
 
+@pytest.fixture
+async def committed(engine: async_sa.AsyncEngine) -> typing.AsyncIterator[async_sa.AsyncEngine]:
+    """Engine whose writes are committed, since changes are only published once their transaction is over."""
+    try:
+        yield engine
+    finally:
+        async with engine.begin() as connection:
+            for table in (
+                'organization_read_models',
+                'organization_specializations',
+                'organization_buildings',
+                'organizations',
+                'buildings',
+                'specializations',
+                'change_log',
+            ):
+                await connection.execute(sa.text(f'DELETE FROM {table}'))  # noqa: S608
+
+
+class QueryBudget(typing.Protocol):
+    def __call__(
+        self, *, max_queries: int | None = None, max_rows: int | None = None
+    ) -> contextlib.AbstractContextManager[QueryStats]: ...
+
+
+@pytest.fixture(name='query_budget')
+def get_query_budget(engine: async_sa.AsyncEngine) -> QueryBudget:  # noqa: ARG001
+    """Context manager failing the test when the block runs too many statements or fetches too many rows."""
+    return query_budget
+
+
 @pytest.fixture(name='connection')
 async def get_connection(engine: async_sa.AsyncEngine) -> async_sa.AsyncConnection:
     return await engine.connect()
@@ -0,0 +1,91 @@
+import prometheus_client
+import pytest
+import sqlalchemy as sa
+from sqlalchemy import exc
+
+from src.db import Explain, QueryBudgetExceededError, StatementCacheStats, models, query_budget, track_queries
+from src.db.metrics import install_query_tracking
+
+
+def test_statement_cache_stats():
+    engine = sa.create_engine('sqlite://')
+    stats = StatementCacheStats()
+    stats.install(engine)
+    query = sa.select(sa.literal(1) + sa.bindparam('value', type_=sa.Integer))
+
+    with engine.connect() as conn:
+        for value in range(3):
+            conn.execute(query, {'value': value})
+
+    assert (stats.compiled_hits, stats.compiled_misses) == (2, 1)
+    assert stats.compiled_hit_rate == 2 / 3
+    # sqlite's driver has no prepared statement cache to report on
+    assert stats.prepared_hit_rate is None
+
+
+def test_explain_is_cacheable():
+    def explain(name: str) -> Explain:
+        return Explain(
+            sa.select(models.OrganizationReadModel.organization_id).where(models.OrganizationReadModel.name == name)
+        )
+
+    first, second = explain('first')._generate_cache_key(), explain('second')._generate_cache_key()  # noqa: SLF001
+    assert first is not None
+    assert first == second
+    assert Explain(explain('first').statement, analyze=True)._generate_cache_key() != first  # noqa: SLF001
+
+
+def test_track_queries():
+    engine = sa.create_engine('sqlite://')
+    install_query_tracking(engine)
+
+    tracked = [sa.select(1), sa.text('CREATE TABLE t (id INTEGER)')]
+
+    with engine.connect() as conn:
+        conn.execute(sa.select(1))
+        with track_queries() as stats:
+            for statement in tracked:
+                conn.execute(statement)
+        conn.execute(sa.select(1))
+
+    assert stats.queries == len(tracked)
+    assert stats.duration > 0
+
+
+def test_query_budget():
+    engine = sa.create_engine('sqlite://')
+    install_query_tracking(engine)
+
+    with engine.connect() as conn:
+        with track_queries() as outer, query_budget(max_queries=1):
+            conn.execute(sa.select(1))
+        with (  # noqa: PT012
+            pytest.raises(QueryBudgetExceededError, match='2 rows fetched, expected at most 1'),
+            query_budget(max_rows=1),
+        ):
+            conn.execute(sa.text('CREATE TABLE t (id INTEGER)'))
+            conn.execute(sa.text('INSERT INTO t VALUES (1), (2)'))
+
+    # Outer tracking still sees statements run inside a budget
+    assert outer.queries == 1
+
+
+def test_track_failed_queries():
+    engine = sa.create_engine('sqlite://')
+    install_query_tracking(engine)
+    failed_before = prometheus_client.REGISTRY.get_sample_value(
+        'db_statement_duration_seconds_count', {'outcome': 'error'}
+    )
+
+    with engine.connect() as conn, track_queries() as stats:
+        with pytest.raises(exc.OperationalError):
+            conn.execute(sa.text('SELECT * FROM missing'))
+        conn.execute(sa.select(1))
+        # The failed statement's start time doesn't linger on the connection
+        assert conn.info['query_start_time'] == []
+
+    assert (stats.queries, stats.errors) == (2, 1)
+    failed_after = prometheus_client.REGISTRY.get_sample_value(
+        'db_statement_duration_seconds_count', {'outcome': 'error'}
+    )
+    assert failed_after == (failed_before or 0) + 1
@@ -0,0 +1,90 @@
+import pytest
+import sqlalchemy as sa
+from sqlalchemy import exc
+from sqlalchemy.ext import asyncio as async_sa
+
+from src.db import SlowQueryRecorder
+
+
+async def test_slow_query_recorder(engine: async_sa.AsyncEngine):
+    async with engine.connect() as conn:
+        # Let the dialect run its first-connect queries before recording
+        await conn.execute(sa.select(1))
+
+    recorder = SlowQueryRecorder(threshold_ms=5)
+    recorder.install(engine)
+    async with engine.connect() as conn:
+        await conn.execute(sa.select(1))
+        for _ in range(2):
+            await conn.execute(sa.select(sa.func.pg_sleep(0.01)))
+    assert recorder._explaining is not None  # noqa: SLF001
+    await recorder._explaining  # noqa: SLF001
+
+    first, second = recorder.queries
+    assert 'pg_sleep' in first.statement
+    assert first.duration_ms >= 5  # noqa: PLR2004
+    assert first.plan is not None
+    assert first.plan[0]['Plan']['Actual Loops'] == 1
+    # The same statement isn't explained again within the interval
+    assert second.plan is None
+
+
+async def test_slow_query_recorder_failed(engine: async_sa.AsyncEngine):
+    async with engine.connect() as conn:
+        await conn.execute(sa.select(1))
+
+    recorder = SlowQueryRecorder(threshold_ms=5)
+    recorder.install(engine)
+    async with engine.connect() as conn:
+        await conn.execute(sa.text("SET statement_timeout = '10ms'"))
+        with pytest.raises(exc.DBAPIError):
+            await conn.execute(sa.select(sa.func.pg_sleep(1)))
+        await conn.rollback()
+        # The start time of the failed statement doesn't leak into the next one
+        await conn.execute(sa.select(1))
+
+    (query,) = recorder.queries
+    assert 'pg_sleep' in query.statement
+    assert query.duration_ms >= 10  # noqa: PLR2004
+    assert query.error is not None
+    assert query.plan is None
+    assert recorder._explaining is None  # noqa: SLF001
+
+
+async def test_slow_query_explain_timeout(engine: async_sa.AsyncEngine):
+    async with engine.connect() as conn:
+        await conn.execute(sa.select(1))
+
+    recorder = SlowQueryRecorder(threshold_ms=5, explain_timeout_ms=20)
+    recorder.install(engine)
+    async with engine.connect() as conn:
+        await conn.execute(sa.select(sa.func.pg_sleep(0.1)))
+    assert recorder._explaining is not None  # noqa: SLF001
+    await recorder._explaining  # noqa: SLF001
+
+    # Running the statement again for its plan was cancelled
+    (query,) = recorder.queries
+    assert query.error is None
+    assert query.plan is None
+
+
+@pytest.mark.parametrize(
+    'statement',
+    [
+        'WITH deleted AS (DELETE FROM organizations WHERE false RETURNING 1) SELECT 1',
+        'SELECT 1 FROM organizations FOR UPDATE',
+    ],
+)
+async def test_slow_query_recorder_no_writes(engine: async_sa.AsyncEngine, statement: str):
+    async with engine.connect() as conn:
+        await conn.execute(sa.select(1))
+
+    recorder = SlowQueryRecorder(threshold_ms=0)
+    recorder.install(engine)
+    async with engine.connect() as conn:
+        await conn.execute(sa.text(statement))
+        await conn.rollback()
+
+    assert [query.statement for query in recorder.queries] == [statement]
+    # EXPLAIN ANALYZE would run the write or take the locks again
+    assert recorder._explaining is None  # noqa: SLF001
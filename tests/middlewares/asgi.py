@@ -0,0 +1,33 @@
+import typing
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from starlette.types import ASGIApp, Message
+
+
+async def request(app: 'ASGIApp', path: str, *, headers: 'Sequence[tuple[bytes, bytes]]' = ()) -> list['Message']:
+    sent: list[Message] = []
+
+    async def receive() -> 'Message':
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message: 'Message') -> None:
+        sent.append(message)
+
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': list(headers),
+        'server': ('test', 80),
+        'client': ('test', 1234),
+    }
+    await app(scope, receive, send)
+    return sent
@@ -0,0 +1,130 @@
+import gzip
+import http
+import json
+import typing
+
+import brotli
+import fakeredis
+import fastapi
+import pytest
+import zstandard
+from fastapi import responses
+
+from src.cache import Cache, MemoryBackend
+from src.cache.redis_backend import RedisBackend
+from src.middlewares import CompressionMiddleware
+from src.middlewares.compression import negotiate
+from tests.middlewares.asgi import request
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Callable
+
+ITEMS = [{'id': id_, 'address': 'Main st. 1', 'specialization': 'Food'} for id_ in range(100)]
+
+
+@pytest.fixture
+def calls() -> list[str]:
+    return []
+
+
+@pytest.fixture
+def app(calls: list[str]) -> fastapi.FastAPI:
+    app = fastapi.FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, cache_prefix='/items')
+
+    @app.get('/items')
+    async def get_items() -> list[dict[str, int | str]]:  # pyright: ignore[reportUnusedFunction]
+        calls.append('items')
+        return ITEMS
+
+    @app.get('/items/small')
+    async def get_small() -> int:  # pyright: ignore[reportUnusedFunction]
+        calls.append('small')
+        return 1
+
+    @app.get('/events')
+    async def get_events() -> responses.Response:  # pyright: ignore[reportUnusedFunction]
+        return responses.Response('data: x\n\n' * 100, media_type='text/event-stream')
+
+    return app
+
+
+@pytest.mark.parametrize(
+    ('accept_encoding', 'expected'),
+    [
+        ('', None),
+        ('gzip', 'gzip'),
+        ('gzip, deflate, br, zstd', 'zstd'),
+        ('gzip;q=1, br;q=0.5', 'gzip'),
+        ('br;q=0.5, gzip;q=0.5', 'br'),
+        ('zstd;q=0, *', 'br'),
+        ('deflate, identity', None),
+        ('*;q=0', None),
+        ('GZIP;q=bogus, br', 'br'),
+    ],
+)
+def test_negotiate(accept_encoding: str, expected: str | None):
+    assert negotiate(accept_encoding) == expected
+
+
+@pytest.mark.parametrize(
+    ('encoding', 'decompress'),
+    [('gzip', gzip.decompress), ('br', brotli.decompress), ('zstd', zstandard.ZstdDecompressor().decompress)],
+)
+async def test_compresses(app: fastapi.FastAPI, encoding: str, decompress: 'Callable[[bytes], bytes]'):
+    start, body = await request(app, '/items', headers=[(b'accept-encoding', encoding.encode())])
+
+    headers = dict(start['headers'])
+    assert headers[b'content-encoding'] == encoding.encode()
+    assert headers[b'content-length'] == str(len(body['body'])).encode()
+    assert headers[b'vary'] == b'Accept-Encoding'
+    assert json.loads(decompress(body['body'])) == ITEMS
+
+
+async def test_small_response_not_compressed(app: fastapi.FastAPI):
+    start, body = await request(app, '/items/small', headers=[(b'accept-encoding', b'gzip')])
+
+    assert b'content-encoding' not in dict(start['headers'])
+    assert body['body'] == b'1'
+
+
+async def test_not_accepted(app: fastapi.FastAPI):
+    start, body = await request(app, '/items')
+
+    assert b'content-encoding' not in dict(start['headers'])
+    assert body['body'].startswith(b'[{"id":0')
+
+
+async def test_event_stream_not_compressed(app: fastapi.FastAPI):
+    start, body = await request(app, '/events', headers=[(b'accept-encoding', b'gzip')])
+
+    assert b'content-encoding' not in dict(start['headers'])
+    assert body['body'].startswith(b'data: x')
+
+
+async def test_cached_compressed(app: fastapi.FastAPI, calls: list[str]):
+    app.state.cache = Cache(MemoryBackend(size=100), prefix='test', ttl=60, random_=lambda: 0)
+
+    first = await request(app, '/items', headers=[(b'accept-encoding', b'gzip')])
+    second = await request(app, '/items', headers=[(b'accept-encoding', b'gzip')])
+    await request(app, '/items', headers=[(b'accept-encoding', b'br')])
+    await request(app, '/items/small', headers=[(b'accept-encoding', b'gzip')])
+    await request(app, '/items/small', headers=[(b'accept-encoding', b'gzip')])
+
+    assert second == first
+    assert dict(second[0]['headers'])[b'content-encoding'] == b'gzip'
+    # One load per coding; responses too small to compress are left to the service's cache
+    assert calls == ['items', 'items', 'small', 'small']
+
+
+async def test_cache_outage_compresses_uncached(app: fastapi.FastAPI, calls: list[str]):
+    server = fakeredis.FakeServer()
+    server.connected = False
+    app.state.cache = Cache(RedisBackend(fakeredis.FakeAsyncRedis(server=server)), prefix='test', ttl=60)
+
+    first = await request(app, '/items', headers=[(b'accept-encoding', b'gzip')])
+    second = await request(app, '/items', headers=[(b'accept-encoding', b'gzip')])
+
+    assert second == first
+    assert first[0]['status'] == http.HTTPStatus.OK
+    assert calls == ['items', 'items']
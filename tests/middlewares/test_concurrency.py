@@ -0,0 +1,146 @@
+import asyncio
+import http
+
+import fastapi
+import pytest
+
+from src.middlewares import ConcurrencyLimitMiddleware
+from src.middlewares.concurrency import AdaptiveLimit, ConcurrencyLimiter
+from tests.middlewares.asgi import request
+
+
+def limiter(*, max_queue: int = 10, max_queue_per_client: int = 10, lifo: bool = False) -> ConcurrencyLimiter:
+    return ConcurrencyLimiter(
+        AdaptiveLimit(initial=1, max_limit=1),
+        max_queue=max_queue,
+        max_queue_per_client=max_queue_per_client,
+        queue_timeout=1,
+        lifo=lifo,
+    )
+
+
+async def admitted_order(limiter: ConcurrencyLimiter, clients: list[str]) -> list[int]:
+    """Queue `clients` behind a held slot and return their indices in the order they get it."""
+    order: list[int] = []
+
+    async def wait(index: int, client: str) -> None:
+        assert await limiter.acquire(client) is None
+        order.append(index)
+        limiter.release()
+
+    assert await limiter.acquire('holder') is None
+    tasks = [asyncio.create_task(wait(index, client)) for index, client in enumerate(clients)]
+    await asyncio.sleep(0)
+    limiter.release()
+    await asyncio.gather(*tasks)
+    return order
+
+
+async def test_queues_past_limit():
+    assert await admitted_order(limiter(), ['a', 'a', 'a']) == [0, 1, 2]
+
+
+async def test_clients_served_in_turn():
+    assert await admitted_order(limiter(), ['a', 'a', 'a', 'b']) == [0, 3, 1, 2]
+
+
+async def test_lifo_when_queue_over_half_full():
+    assert await admitted_order(limiter(max_queue=4, lifo=True), ['a', 'a', 'a', 'a']) == [3, 2, 0, 1]
+
+
+async def test_rejects_when_queue_full():
+    limiter_ = limiter(max_queue=2, max_queue_per_client=1)
+    await limiter_.acquire('holder')
+    waiting = asyncio.create_task(limiter_.acquire('a'))
+    await asyncio.sleep(0)
+
+    assert await limiter_.acquire('a') == 'queue_full'
+    other = asyncio.create_task(limiter_.acquire('b'))
+    await asyncio.sleep(0)
+    assert await limiter_.acquire('c') == 'queue_full'
+
+    limiter_.release()
+    limiter_.release()
+    assert await asyncio.gather(waiting, other) == [None, None]
+
+
+async def test_queue_timeout():
+    limiter_ = limiter()
+    limiter_.queue_timeout = 0.01
+    await limiter_.acquire('holder')
+
+    assert await limiter_.acquire('a') == 'queue_timeout'
+    assert limiter_.queued == 0
+
+
+async def test_cancelled_waiter_gives_up_its_turn():
+    limiter_ = limiter()
+    await limiter_.acquire('holder')
+    cancelled = asyncio.create_task(limiter_.acquire('a'))
+    waiting = asyncio.create_task(limiter_.acquire('b'))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    limiter_.release()
+
+    assert await waiting is None
+    assert limiter_.in_flight == 1
+    assert limiter_.queued == 0
+
+
+def test_limit_shrinks_when_latency_rises():
+    limit = AdaptiveLimit(initial=20, max_limit=20)
+    for _ in range(100):
+        limit.update(0.01, in_flight=20)
+    assert limit.limit == 20  # noqa: PLR2004
+
+    for _ in range(20):
+        limit.update(0.1, in_flight=20)
+    assert limit.limit < 20  # noqa: PLR2004
+
+
+def test_limit_recovers():
+    limit = AdaptiveLimit(initial=2, max_limit=20)
+    for _ in range(200):
+        limit.update(0.01, in_flight=limit.limit)
+    assert limit.limit == 20  # noqa: PLR2004
+
+
+@pytest.fixture
+def app() -> fastapi.FastAPI:
+    app = fastapi.FastAPI()
+    app.state.release = asyncio.Event()
+    app.add_middleware(
+        ConcurrencyLimitMiddleware,
+        max_concurrency=1,
+        max_queue=0,
+        max_queue_per_client=0,
+        queue_timeout=1,
+        retry_after=3,
+        prefix='/limited',
+    )
+
+    @app.get('/limited')
+    async def limited() -> None:  # pyright: ignore[reportUnusedFunction]
+        await app.state.release.wait()
+
+    @app.get('/free')
+    async def free() -> None:  # pyright: ignore[reportUnusedFunction]
+        pass
+
+    return app
+
+
+async def test_saturated(app: fastapi.FastAPI):
+    running = asyncio.create_task(request(app, '/limited'))
+    await asyncio.sleep(0.01)
+
+    rejected, *_ = await request(app, '/limited')
+    free, *_ = await request(app, '/free')
+    app.state.release.set()
+    admitted, *_ = await running
+
+    assert rejected['status'] == http.HTTPStatus.SERVICE_UNAVAILABLE
+    assert (b'retry-after', b'3') in rejected['headers']
+    assert free['status'] == http.HTTPStatus.OK
+    assert admitted['status'] == http.HTTPStatus.OK
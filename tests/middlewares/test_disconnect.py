@@ -0,0 +1,83 @@
+import asyncio
+import typing
+
+import fastapi
+
+from src.middlewares import CancelOnDisconnectMiddleware
+
+if typing.TYPE_CHECKING:
+    from starlette.types import Message
+
+
+async def request(app: fastapi.FastAPI, path: str, *, disconnect: asyncio.Event) -> list['Message']:
+    sent: list[Message] = []
+    messages = iter([{'type': 'http.request', 'body': b'', 'more_body': False}])
+
+    async def receive() -> 'Message':
+        if (message := next(messages, None)) is not None:
+            return message
+        await disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message: 'Message') -> None:
+        sent.append(message)
+
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [],
+        'server': ('test', 80),
+        'client': ('test', 1234),
+    }
+    await app(scope, receive, send)
+    return sent
+
+
+def make_app(started: asyncio.Event, cancelled: asyncio.Event) -> fastapi.FastAPI:
+    app = fastapi.FastAPI()
+    app.add_middleware(CancelOnDisconnectMiddleware)
+
+    @app.get('/slow')
+    async def slow() -> None:  # pyright: ignore[reportUnusedFunction]
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    @app.get('/fast')
+    async def fast() -> dict[str, bool]:  # pyright: ignore[reportUnusedFunction]
+        return {'ok': True}
+
+    return app
+
+
+async def test_cancels_on_disconnect():
+    started, cancelled, disconnect = asyncio.Event(), asyncio.Event(), asyncio.Event()
+    app = make_app(started, cancelled)
+
+    pending = asyncio.create_task(request(app, '/slow', disconnect=disconnect))
+    await started.wait()
+    disconnect.set()
+    sent = await asyncio.wait_for(pending, 1)
+
+    assert cancelled.is_set()
+    assert sent == []
+    assert asyncio.current_task().cancelling() == 0  # pyright: ignore[reportOptionalMemberAccess]
+
+
+async def test_completed_request():
+    app = make_app(asyncio.Event(), asyncio.Event())
+
+    start, body = await request(app, '/fast', disconnect=asyncio.Event())
+
+    assert start['status'] == 200  # noqa: PLR2004
+    assert body['body'] == b'{"ok":true}'
@@ -0,0 +1,39 @@
+import http
+import json
+
+import fastapi
+import pytest
+import sqlalchemy as sa
+
+from src.db.metrics import install_query_tracking
+from src.middlewares import QueryBudgetMiddleware
+from tests.middlewares.asgi import request
+
+
+@pytest.fixture
+def app() -> fastapi.FastAPI:
+    engine = sa.create_engine('sqlite://')
+    install_query_tracking(engine)
+    app = fastapi.FastAPI()
+    app.add_middleware(QueryBudgetMiddleware, max_queries=1)
+
+    @app.get('/queries/{count}')
+    async def run_queries(count: int) -> None:  # pyright: ignore[reportUnusedFunction]
+        with engine.connect() as conn:
+            for _ in range(count):
+                conn.execute(sa.select(1))
+
+    return app
+
+
+async def test_within_budget(app: fastapi.FastAPI):
+    start, *_ = await request(app, '/queries/1')
+
+    assert start['status'] == http.HTTPStatus.OK
+
+
+async def test_over_budget(app: fastapi.FastAPI):
+    start, body = await request(app, '/queries/2')
+
+    assert start['status'] == http.HTTPStatus.INTERNAL_SERVER_ERROR
+    assert json.loads(body['body']) == {'detail': '2 statements executed, expected at most 1'}
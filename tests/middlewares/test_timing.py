@@ -0,0 +1,41 @@
+import http
+
+import fastapi
+import pytest
+
+from src.middlewares import TimingMiddleware
+from src.middlewares.timing import REQUEST_DURATION
+from tests.middlewares.asgi import request
+
+
+@pytest.fixture
+def app() -> fastapi.FastAPI:
+    app = fastapi.FastAPI()
+    app.add_middleware(TimingMiddleware)
+
+    @app.get('/items/{item_id}')
+    async def get_item(item_id: int) -> int:  # pyright: ignore[reportUnusedFunction]
+        return item_id
+
+    return app
+
+
+async def test_server_timing_header(app: fastapi.FastAPI):
+    start, *_ = await request(app, '/items/1')
+
+    headers = dict(start['headers'])
+    assert start['status'] == http.HTTPStatus.OK
+    assert headers[b'server-timing'].startswith(b'db;dur=0.0;desc="0 queries, 0 rows", app;dur=')
+
+
+async def test_latency_labelled_by_route(app: fastapi.FastAPI):
+    def observed(route: str, status: http.HTTPStatus) -> float:
+        return REQUEST_DURATION.labels('GET', route, status)._sum.get()  # noqa: SLF001
+
+    before = observed('/items/{item_id}', http.HTTPStatus.OK), observed('unmatched', http.HTTPStatus.NOT_FOUND)
+    await request(app, '/items/1')
+    await request(app, '/items/2')
+    await request(app, '/missing')
+
+    assert observed('/items/{item_id}', http.HTTPStatus.OK) > before[0]
+    assert observed('unmatched', http.HTTPStatus.NOT_FOUND) > before[1]
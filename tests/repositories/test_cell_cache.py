@@ -0,0 +1,148 @@
+import sqlalchemy as sa
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point
+from sqlalchemy.ext import asyncio as async_sa
+
+from src.db import models
+from src.repositories.cell_cache import CellCache, CellCacheInvalidator, CellEntry
+from src.repositories.records import OrganizationRecord
+from src.repositories.taxonomy import TaxonomyCache
+
+
+def entry(id_: int) -> CellEntry:
+    return CellEntry(
+        OrganizationRecord(
+            id=id_,
+            name='Org',
+            phone='111',
+            building_id=1,
+            building_address='A',
+            building_coordinates=(0, 0),
+            specializations=[],
+        ),
+        longitude=0,
+        latitude=0,
+    )
+
+
+ENTRY = entry(1)
+
+
+def test_get_many():
+    cache = CellCache(size=10, ttl=60)
+    cache.put('s0', (ENTRY,))
+    cache.put('s1', ())
+
+    assert cache.get_many(['s0', 's1', 's2']) == ({'s0': (ENTRY,), 's1': ()}, ['s2'])
+
+
+def test_expired():
+    cache = CellCache(size=10, ttl=0)
+    cache.put('s0', (ENTRY,))
+
+    assert cache.get_many(['s0']) == ({}, ['s0'])
+
+
+def test_evicts_least_recently_used():
+    cache = CellCache(size=2, ttl=60)
+    cache.put('s0', ())
+    cache.put('s1', ())
+    cache.get_many(['s0'])
+    cache.put('s2', ())
+
+    assert cache.get_many(['s0', 's1', 's2']) == ({'s0': (), 's2': ()}, ['s1'])
+
+
+def test_size_counts_rows():
+    cache = CellCache(size=3, ttl=60)
+    cache.put('s0', (ENTRY, ENTRY))
+    cache.put('s1', (ENTRY,))
+    # Dense cells are kept without their organizations
+    cache.put('s2', None)
+
+    assert cache.rows == 2  # noqa: PLR2004
+    assert cache.get_many(['s0', 's1', 's2']) == ({'s1': (ENTRY,), 's2': None}, ['s0'])
+
+
+def test_invalidate():
+    cache = CellCache(size=10, ttl=60)
+    cache.put('s0', (ENTRY,))
+    cache.put('s1', (entry(2),))
+    cache.put('s00', ())
+    cache.put('s01', ())
+
+    # Organization 1 moved from `s0` to `s00`, within it
+    cache.invalidate({1}, ['s00bc'])
+
+    assert cache.get_many(['s0', 's1', 's00', 's01']) == ({'s1': (entry(2),), 's01': ()}, ['s0', 's00'])
+    assert cache.rows == 2  # noqa: PLR2004
+
+
+def test_put_after_invalidation_dropped():
+    cache = CellCache(size=10, ttl=60)
+    generation = cache.generation
+    cache.invalidate({1}, [])
+    cache.put('s0', (ENTRY,), generation=generation)
+
+    assert cache.get_many(['s0']) == ({}, ['s0'])
+
+
+async def test_invalidator_drops_cells_of_changed_organizations(
+    session: async_sa.AsyncSession, sessionmaker: async_sa.async_sessionmaker[async_sa.AsyncSession]
+):
+    session.add(models.Building(id=1, address='Main st. 1', point=from_shape(Point(0, 0), srid=4326)))
+    await session.flush()
+    session.add(models.Organization(id=1, name='Org', phone='1'))
+    await session.flush()
+    session.add(models.OrganizationBuilding(organization_id=1, building_id=1))
+    await session.flush()
+    geohash = await session.scalar(sa.select(models.OrganizationReadModel.geohash))
+    assert geohash is not None
+    cache = CellCache(size=10, ttl=60)
+    # Where the organization is now, where it was, and a cell it has nothing to do with
+    cache.put(geohash[:5], ())
+    cache.put('u0000', (ENTRY,))
+    cache.put('u0001', (entry(2),))
+    invalidator = CellCacheInvalidator(cache, 'postgresql+asyncpg://localhost/test', sessionmaker)
+
+    invalidator._on_notification(None, 0, 'organization_read_models', '1')  # noqa: SLF001
+    await invalidator._apply()  # noqa: SLF001
+
+    assert cache.get_many([geohash[:5], 'u0000', 'u0001']) == ({'u0001': (entry(2),)}, [geohash[:5], 'u0000'])
+
+
+async def test_invalidator_drops_renamed_specializations(
+    session: async_sa.AsyncSession, sessionmaker: async_sa.async_sessionmaker[async_sa.AsyncSession]
+):
+    session.add_all(
+        [
+            models.Building(id=1, address='Main st. 1', point=from_shape(Point(0, 0), srid=4326)),
+            models.Specialization(id=1, name='Food'),
+        ]
+    )
+    await session.flush()
+    session.add(models.Organization(id=1, name='Org', phone='1'))
+    await session.flush()
+    session.add_all(
+        [
+            models.OrganizationBuilding(organization_id=1, building_id=1),
+            models.OrganizationSpecializations(organization_id=1, specialization_id=1),
+        ]
+    )
+    await session.flush()
+    taxonomy_cache = TaxonomyCache(ttl=60)
+    await taxonomy_cache.get(session)
+    invalidator = CellCacheInvalidator(
+        CellCache(size=10, ttl=60), 'postgresql+asyncpg://localhost/test', sessionmaker, taxonomy_cache=taxonomy_cache
+    )
+
+    # The organization's own changes leave the taxonomy cached
+    invalidator._on_notification(None, 0, 'organization_read_models', '1')  # noqa: SLF001
+    await invalidator._apply()  # noqa: SLF001
+    assert taxonomy_cache._taxonomy is not None  # noqa: SLF001
+
+    await session.execute(sa.update(models.Specialization).values(name='Meals'))
+    invalidator._on_notification(None, 0, 'organization_read_models', '1')  # noqa: SLF001
+    await invalidator._apply()  # noqa: SLF001
+
+    assert taxonomy_cache._taxonomy is None  # noqa: SLF001
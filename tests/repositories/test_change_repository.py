@@ -0,0 +1,53 @@
+import sqlalchemy as sa
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point
+from sqlalchemy.ext import asyncio as async_sa
+
+from src.db import models
+from src.repositories import ChangeRepository
+
+
+async def test_logs_and_publishes_in_commit_order(committed: async_sa.AsyncEngine):
+    sessionmaker = async_sa.async_sessionmaker(committed, expire_on_commit=False)
+    async with sessionmaker() as session, session.begin():
+        session.add(models.Building(id=1, address='Main st. 1', point=from_shape(Point(0, 0), srid=4326)))
+        await session.flush()
+        session.add(models.Organization(id=1, name='Org', phone='1'))
+        await session.flush()
+        session.add(models.OrganizationBuilding(organization_id=1, building_id=1))
+    async with sessionmaker() as session, session.begin():
+        await session.execute(sa.update(models.Organization).where(models.Organization.id == 1).values(name='Renamed'))
+
+    async with sessionmaker() as session:
+        changes = await ChangeRepository(session).get_since(0, limit=10)
+        again = await ChangeRepository(session).get_since(changes[1].seq, limit=10)
+
+    assert [(change.table_name, change.operation, change.key) for change in changes] == [
+        ('buildings', 'insert', {'id': 1}),
+        ('organizations', 'insert', {'id': 1}),
+        ('organization_buildings', 'insert', {'organization_id': 1, 'building_id': 1}),
+        ('organizations', 'update', {'id': 1}),
+    ]
+    assert [change.seq for change in changes] == sorted({change.seq for change in changes})
+    assert again == changes[2:]
+
+
+async def test_open_transaction_holds_back_later_changes(committed: async_sa.AsyncEngine):
+    sessionmaker = async_sa.async_sessionmaker(committed, expire_on_commit=False)
+    async with sessionmaker() as open_session:
+        await open_session.execute(sa.insert(models.Specialization).values(id=1, name='Food'))
+        async with sessionmaker() as session, session.begin():
+            await session.execute(sa.insert(models.Specialization).values(id=2, name='Cars'))
+
+        async with sessionmaker() as session:
+            held = await ChangeRepository(session).get_since(0, limit=10)
+        await open_session.commit()
+
+    async with sessionmaker() as session:
+        changes = await ChangeRepository(session).get_since(0, limit=10)
+        await session.execute(sa.delete(models.Specialization))
+        await session.commit()
+
+    # The change committed second is only numbered once the first transaction is over, and after it
+    assert held == []
+    assert [change.key for change in changes] == [{'id': 1}, {'id': 2}]
@@ -1,4 +1,6 @@
+import asyncio
 import dataclasses
+import random
 import typing
 from collections.abc import Mapping
 from unittest import mock
@@ -7,11 +9,23 @@ import pytest
 import sqlalchemy as sa
 from geoalchemy2.shape import from_shape
 from shapely.geometry import Point
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from src import schemas
+from src import geohash, schemas
 from src.db import models
+from src.db.deps import request_concurrency
+from src.deadline import Deadline, DeadlineExceededError
+from src.middlewares.concurrency import AdaptiveLimit, ConcurrencyLimiter
 from src.repositories import OrganizationRepository
+from src.repositories.cell_cache import CellCache
+from src.repositories.records import OrganizationPage, OrganizationRecord, SpecializationRecord
+from src.repositories.spatial_index import SpatialIndex, read_rows
+from src.repositories.taxonomy import TaxonomyCache
+from src.settings import settings
+from tests.conftest import QueryBudget
+
+# Default page size, which bounds the rows a listing may fetch
+PAGE_ROWS = 10
 
 
 async def fill_db(session: AsyncSession, instances: list[models.Base]):
@@ -21,6 +35,41 @@ async def fill_db(session: AsyncSession, instances: list[models.Base]):
     await session.flush()
 
 
+async def repository(session: AsyncSession, **kwargs: typing.Any) -> OrganizationRepository:
+    """Repository with the taxonomy already cached, as it is past a worker's first request."""
+    taxonomy_cache = TaxonomyCache(ttl=60)
+    await taxonomy_cache.get(session)
+    return OrganizationRepository(session=session, taxonomy_cache=taxonomy_cache, **kwargs)
+
+
+def scattered_organizations(count: int = 100) -> list[models.Base]:
+    """Organizations in their own buildings, scattered around (0, 0) with none close to the areas searched below."""
+    rng = random.Random(0)  # noqa: S311
+    fixtures: list[models.Base] = []
+    for id_ in range(1, count + 1):
+        point = Point(rng.uniform(-0.03, 0.05), rng.uniform(-0.03, 0.05))
+        fixtures += [
+            models.Building(id=id_, address=f'Building {id_}', point=from_shape(point, srid=4326)),
+            models.Organization(id=id_, name=f'Org {id_}', phone=str(id_)),
+            models.OrganizationBuilding(organization_id=id_, building_id=id_),
+        ]
+    return fixtures
+
+
+# Radius and box searches over `scattered_organizations`
+SPATIAL_SEARCHES = pytest.mark.parametrize(
+    ('method', 'kwargs'),
+    [
+        ('get_by_building_location_radius', {'longitude': 0.01, 'latitude': 0.01, 'radius_m': 1_000}),
+        ('get_by_building_location_radius', {'longitude': 0, 'latitude': 0, 'radius_m': 4_000}),
+        (
+            'get_by_building_location_box',
+            {'ll_longitude': 0, 'll_latitude': 0, 'ur_longitude': 0.02, 'ur_latitude': 0.015},
+        ),
+    ],
+)
+
+
 class ArgsKwargsProtocol(typing.Protocol):
     @property
     def args(self) -> tuple[typing.Any, ...]: ...
@@ -34,6 +83,7 @@ class TestCase:
     call: ArgsKwargsProtocol = dataclasses.field(default_factory=mock.call())
 
     expected_value: typing.Any = dataclasses.field(default_factory=mock.ANY)
+    max_queries: int = 1
 
 
 class TestOrganizationRepository:
@@ -52,7 +102,7 @@ class TestOrganizationRepository:
                     models.OrganizationBuilding(organization_id=1, building_id=1),
                 ],
                 call=mock.call(organization_id=1),
-                expected_value=schemas.Organization(
+                expected_value=OrganizationRecord(
                     id=1,
                     building_id=1,
                     name='Simple Org',
@@ -73,7 +123,7 @@ class TestOrganizationRepository:
                     models.OrganizationSpecializations(organization_id=1, specialization_id=2),
                 ],
                 call=mock.call(organization_id=1),
-                expected_value=schemas.Organization(
+                expected_value=OrganizationRecord(
                     id=1,
                     building_id=1,
                     name='Complex Org',
@@ -81,8 +131,8 @@ class TestOrganizationRepository:
                     building_address='456 High St',
                     building_coordinates=(40.7128, -74.0060),
                     specializations=[
-                        schemas.Specialization(id=1, name='Main Spec', parent_id=None),
-                        schemas.Specialization(id=2, name='Sub Spec', parent_id=1),
+                        SpecializationRecord(id=1, name='Main Spec', parent_id=None),
+                        SpecializationRecord(id=2, name='Sub Spec', parent_id=1),
                     ],
                 ),
             ),
@@ -95,7 +145,7 @@ class TestOrganizationRepository:
                     models.OrganizationBuilding(organization_id=50, building_id=100),
                 ],
                 call=mock.call(organization_id=50),
-                expected_value=schemas.Organization(
+                expected_value=OrganizationRecord(
                     id=50,
                     building_id=100,
                     name='High ID Org',
@@ -116,11 +166,12 @@ class TestOrganizationRepository:
             ),
         ],
     )
-    async def test_get_by_id(self, session: AsyncSession, case: TestCase):
+    async def test_get_by_id(self, session: AsyncSession, query_budget: QueryBudget, case: TestCase):
         await fill_db(session, case.db_fixtures)
-        repo = OrganizationRepository(session=session)
+        repo = await repository(session)
 
-        res = await repo.get_by_id(*case.call.args, **case.call.kwargs)
+        with query_budget(max_queries=case.max_queries, max_rows=PAGE_ROWS):
+            res = await repo.get_by_id(*case.call.args, **case.call.kwargs)
 
         assert res == case.expected_value
 
@@ -139,7 +190,7 @@ class TestOrganizationRepository:
                     models.OrganizationBuilding(organization_id=1, building_id=1),
                 ],
                 call=mock.call(address='456 Missing St'),
-                expected_value=schemas.ListOrganizations(organizations=[]),
+                expected_value=OrganizationPage(organizations=[]),
             ),
             TestCase(
                 db_fixtures=[
@@ -153,9 +204,9 @@ class TestOrganizationRepository:
                     models.OrganizationBuilding(organization_id=1, building_id=1),
                 ],
                 call=mock.call(address='123 Main St'),
-                expected_value=schemas.ListOrganizations(
+                expected_value=OrganizationPage(
                     organizations=[
-                        schemas.Organization(
+                        OrganizationRecord(
                             id=1,
                             name='Single Org',
                             phone='+1234567890',
@@ -184,9 +235,9 @@ class TestOrganizationRepository:
                     models.OrganizationSpecializations(organization_id=2, specialization_id=1),
                 ],
                 call=mock.call(address='456', limit=5),
-                expected_value=schemas.ListOrganizations(
+                expected_value=OrganizationPage(
                     organizations=[
-                        schemas.Organization(
+                        OrganizationRecord(
                             id=1,
                             building_id=1,
                             name='First Org',
@@ -194,10 +245,10 @@ class TestOrganizationRepository:
                             building_address='456 High St',
                             building_coordinates=(40.7128, -74.0060),
                             specializations=[
-                                schemas.Specialization(id=1, name='Shared Spec', parent_id=None),
+                                SpecializationRecord(id=1, name='Shared Spec', parent_id=None),
                             ],
                         ),
-                        schemas.Organization(
+                        OrganizationRecord(
                             id=2,
                             building_id=1,
                             name='Second Org',
@@ -205,7 +256,7 @@ class TestOrganizationRepository:
                             building_address='456 High St',
                             building_coordinates=(40.7128, -74.0060),
                             specializations=[
-                                schemas.Specialization(id=1, name='Shared Spec', parent_id=None),
+                                SpecializationRecord(id=1, name='Shared Spec', parent_id=None),
                             ],
                         ),
                     ]
@@ -223,9 +274,9 @@ class TestOrganizationRepository:
                     models.OrganizationBuilding(organization_id=1, building_id=1),
                 ],
                 call=mock.call(address="O'Brien"),
-                expected_value=schemas.ListOrganizations(
+                expected_value=OrganizationPage(
                     organizations=[
-                        schemas.Organization(
+                        OrganizationRecord(
                             id=1,
                             building_id=1,
                             name='Special Chars Org',
@@ -253,9 +304,9 @@ class TestOrganizationRepository:
                     models.OrganizationBuilding(organization_id=3, building_id=1),
                 ],
                 call=mock.call(address='shared', limit=2, offset=1),
-                expected_value=schemas.ListOrganizations(
+                expected_value=OrganizationPage(
                     organizations=[
-                        schemas.Organization(
+                        OrganizationRecord(
                             id=2,
                             building_id=1,
                             name='Org 2',
@@ -264,7 +315,7 @@ class TestOrganizationRepository:
                             building_coordinates=(0, 0),
                             specializations=[],
                         ),
-                        schemas.Organization(
+                        OrganizationRecord(
                             id=3,
                             building_id=1,
                             name='Org 3',
@@ -278,11 +329,12 @@ class TestOrganizationRepository:
             ),
         ],
     )
-    async def test_get_by_building_address(self, session: AsyncSession, case: TestCase):
+    async def test_get_by_building_address(self, session: AsyncSession, query_budget: QueryBudget, case: TestCase):
         await fill_db(session, case.db_fixtures)
-        repo = OrganizationRepository(session=session)
+        repo = await repository(session)
 
-        res = await repo.get_by_building_address(*case.call.args, **case.call.kwargs)
+        with query_budget(max_queries=case.max_queries, max_rows=PAGE_ROWS):
+            res = await repo.get_by_building_address(*case.call.args, **case.call.kwargs)
 
         assert res == case.expected_value
 
@@ -298,9 +350,9 @@ class TestOrganizationRepository:
                     models.OrganizationBuilding(organization_id=3, building_id=1),
                 ],
                 call=mock.call(longitude=0, latitude=0, radius_m=1),
-                expected_value=schemas.ListOrganizations(
+                expected_value=OrganizationPage(
                     organizations=[
-                        schemas.Organization(
+                        OrganizationRecord(
                             id=2,
                             building_id=1,
                             name='Org 2',
@@ -309,7 +361,7 @@ class TestOrganizationRepository:
                             building_coordinates=(0, 0),
                             specializations=[],
                         ),
-                        schemas.Organization(
+                        OrganizationRecord(
                             id=3,
                             building_id=1,
                             name='Org 3',
@@ -331,9 +383,9 @@ class TestOrganizationRepository:
                     models.OrganizationBuilding(organization_id=2, building_id=2),
                 ],
                 call=mock.call(longitude=0, latitude=0, radius_m=1),
-                expected_value=schemas.ListOrganizations(
+                expected_value=OrganizationPage(
                     organizations=[
-                        schemas.Organization(
+                        OrganizationRecord(
                             id=1,
                             building_id=1,
                             name='Org Near',
@@ -352,14 +404,14 @@ class TestOrganizationRepository:
                     models.OrganizationBuilding(organization_id=1, building_id=1),
                 ],
                 call=mock.call(longitude=0, latitude=0, radius_m=1),
-                expected_value=schemas.ListOrganizations(organizations=[]),
+                expected_value=OrganizationPage(organizations=[]),
             ),
             TestCase(
                 db_fixtures=[
                     models.Organization(id=1, name='No Building Org', phone='404'),
                 ],
                 call=mock.call(longitude=0, latitude=0, radius_m=1),
-                expected_value=schemas.ListOrganizations(organizations=[]),
+                expected_value=OrganizationPage(organizations=[]),
             ),
             TestCase(
                 db_fixtures=[
@@ -371,18 +423,9 @@ class TestOrganizationRepository:
                     models.OrganizationBuilding(organization_id=2, building_id=2),
                 ],
                 call=mock.call(longitude=0, latitude=0, radius_m=1_000 * 100),
-                expected_value=schemas.ListOrganizations(
+                expected_value=OrganizationPage(
                     organizations=[
-                        schemas.Organization(
-                            id=2,
-                            building_id=2,
-                            name='Org B',
-                            phone='222',
-                            building_address='B',
-                            building_coordinates=(0.5, 0.5),
-                            specializations=[],
-                        ),
-                        schemas.Organization(
+                        OrganizationRecord(
                             id=1,
                             building_id=1,
                             name='Org A',
@@ -391,6 +434,15 @@ class TestOrganizationRepository:
                             building_coordinates=(0.0, 0.0),
                             specializations=[],
                         ),
+                        OrganizationRecord(
+                            id=2,
+                            building_id=2,
+                            name='Org B',
+                            phone='222',
+                            building_address='B',
+                            building_coordinates=(0.5, 0.5),
+                            specializations=[],
+                        ),
                     ]
                 ),
             ),
@@ -402,9 +454,9 @@ class TestOrganizationRepository:
                     models.OrganizationBuilding(organization_id=1, building_id=1),
                 ],
                 call=mock.call(longitude=0, latitude=0, radius_m=1),
-                expected_value=schemas.ListOrganizations(
+                expected_value=OrganizationPage(
                     organizations=[
-                        schemas.Organization(
+                        OrganizationRecord(
                             id=1,
                             building_id=1,
                             name='Multi Org',
@@ -418,11 +470,12 @@ class TestOrganizationRepository:
             ),
         ],
     )
-    async def test_get_by_radius(self, session: AsyncSession, case: TestCase):
+    async def test_get_by_radius(self, session: AsyncSession, query_budget: QueryBudget, case: TestCase):
         await fill_db(session, case.db_fixtures)
-        repo = OrganizationRepository(session=session)
+        repo = await repository(session)
 
-        res = await repo.get_by_building_location_radius(*case.call.args, **case.call.kwargs)
+        with query_budget(max_queries=case.max_queries, max_rows=PAGE_ROWS):
+            res = await repo.get_by_building_location_radius(*case.call.args, **case.call.kwargs)
 
         assert res == case.expected_value
 
@@ -438,9 +491,9 @@ class TestOrganizationRepository:
                     models.OrganizationBuilding(organization_id=3, building_id=1),
                 ],
                 call=mock.call(ll_longitude=0, ll_latitude=0, ur_longitude=0.01, ur_latitude=0.01),
-                expected_value=schemas.ListOrganizations(
+                expected_value=OrganizationPage(
                     organizations=[
-                        schemas.Organization(
+                        OrganizationRecord(
                             id=2,
                             building_id=1,
                             name='Org 2',
@@ -449,7 +502,7 @@ class TestOrganizationRepository:
                             building_coordinates=(0, 0),
                             specializations=[],
                         ),
-                        schemas.Organization(
+                        OrganizationRecord(
                             id=3,
                             building_id=1,
                             name='Org 3',
@@ -471,9 +524,9 @@ class TestOrganizationRepository:
                     models.OrganizationBuilding(organization_id=2, building_id=2),
                 ],
                 call=mock.call(ll_longitude=0, ll_latitude=0, ur_longitude=0.01, ur_latitude=0.01),
-                expected_value=schemas.ListOrganizations(
+                expected_value=OrganizationPage(
                     organizations=[
-                        schemas.Organization(
+                        OrganizationRecord(
                             id=1,
                             building_id=1,
                             name='Org Near',
@@ -492,7 +545,7 @@ class TestOrganizationRepository:
                     models.OrganizationBuilding(organization_id=1, building_id=1),
                 ],
                 call=mock.call(ll_longitude=0, ll_latitude=0, ur_longitude=0.01, ur_latitude=0.01),
-                expected_value=schemas.ListOrganizations(organizations=[]),
+                expected_value=OrganizationPage(organizations=[]),
             ),
             TestCase(
                 db_fixtures=[
@@ -504,18 +557,9 @@ class TestOrganizationRepository:
                     models.OrganizationBuilding(organization_id=2, building_id=2),
                 ],
                 call=mock.call(ll_longitude=0, ll_latitude=0, ur_longitude=0.01, ur_latitude=0.01),
-                expected_value=schemas.ListOrganizations(
+                expected_value=OrganizationPage(
                     organizations=[
-                        schemas.Organization(
-                            id=2,
-                            building_id=2,
-                            name='Org B',
-                            phone='222',
-                            building_address='B',
-                            building_coordinates=(0, 0.005),
-                            specializations=[],
-                        ),
-                        schemas.Organization(
+                        OrganizationRecord(
                             id=1,
                             building_id=1,
                             name='Org A',
@@ -524,15 +568,402 @@ class TestOrganizationRepository:
                             building_coordinates=(0.0, 0.0),
                             specializations=[],
                         ),
+                        OrganizationRecord(
+                            id=2,
+                            building_id=2,
+                            name='Org B',
+                            phone='222',
+                            building_address='B',
+                            building_coordinates=(0, 0.005),
+                            specializations=[],
+                        ),
                     ]
                 ),
             ),
         ],
     )
-    async def test_get_by_box(self, session: AsyncSession, case: TestCase):
+    async def test_get_by_box(self, session: AsyncSession, query_budget: QueryBudget, case: TestCase):
         await fill_db(session, case.db_fixtures)
-        repo = OrganizationRepository(session=session)
+        repo = await repository(session)
 
-        res = await repo.get_by_building_location_box(*case.call.args, **case.call.kwargs)
+        with query_budget(max_queries=case.max_queries, max_rows=PAGE_ROWS):
+            res = await repo.get_by_building_location_box(*case.call.args, **case.call.kwargs)
 
         assert res == case.expected_value
+
+    @pytest.mark.parametrize(
+        'case',
+        [
+            TestCase(
+                db_fixtures=[
+                    models.Building(id=1, address='A', point=from_shape(Point(0.0, 0.0), srid=4326)),
+                    models.Building(id=2, address='B', point=from_shape(Point(0.0, 0.001), srid=4326)),
+                    models.Organization(id=1, name='Org A', phone='111'),
+                    models.Organization(id=2, name='Org B', phone='222'),
+                    models.Organization(id=3, name='Org C', phone='333'),
+                    models.OrganizationBuilding(organization_id=1, building_id=1),
+                    models.OrganizationBuilding(organization_id=2, building_id=1),
+                    models.OrganizationBuilding(organization_id=3, building_id=2),
+                    models.Specialization(id=1, name='Root'),
+                    models.Specialization(id=2, name='Child', parent_id=1),
+                    models.Specialization(id=3, name='Grandchild', parent_id=2),
+                    models.Specialization(id=4, name='Other Root'),
+                    models.OrganizationSpecializations(organization_id=1, specialization_id=1),
+                    models.OrganizationSpecializations(organization_id=1, specialization_id=3),
+                    models.OrganizationSpecializations(organization_id=2, specialization_id=2),
+                    models.OrganizationSpecializations(organization_id=2, specialization_id=4),
+                ],
+                call=mock.call(longitude=0, latitude=0, radius_m=1_000, limit=1, facets=schemas.CountMode.EXACT),
+                max_queries=2,
+                expected_value=schemas.Facets(
+                    total=3,
+                    estimated=False,
+                    specializations=[
+                        schemas.FacetCount(id=1, count=2),
+                        schemas.FacetCount(id=4, count=1),
+                    ],
+                    buildings=[
+                        schemas.FacetCount(id=1, count=2),
+                        schemas.FacetCount(id=2, count=1),
+                    ],
+                ),
+            ),
+            TestCase(
+                db_fixtures=[
+                    models.Building(id=1, address='Far', point=from_shape(Point(50.0, 50.0), srid=4326)),
+                    models.Organization(id=1, name='Org', phone='111'),
+                    models.OrganizationBuilding(organization_id=1, building_id=1),
+                ],
+                call=mock.call(longitude=0, latitude=0, radius_m=1, facets=schemas.CountMode.ESTIMATE),
+                expected_value=schemas.Facets(total=0, estimated=False, specializations=[], buildings=[]),
+                max_queries=3,
+            ),
+            TestCase(
+                db_fixtures=[
+                    models.Building(id=1, address='Far', point=from_shape(Point(50.0, 50.0), srid=4326)),
+                    models.Organization(id=1, name='Org', phone='111'),
+                    models.OrganizationBuilding(organization_id=1, building_id=1),
+                ],
+                call=mock.call(
+                    longitude=0,
+                    latitude=0,
+                    radius_m=1,
+                    facets=schemas.CountMode.ESTIMATE,
+                    total=schemas.CountMode.ESTIMATE,
+                ),
+                expected_value=schemas.Facets(total=0, estimated=False, specializations=[], buildings=[]),
+                # The sampled facets' estimate serves as the total, rather than being planned again
+                max_queries=3,
+            ),
+        ],
+    )
+    async def test_facets(self, session: AsyncSession, query_budget: QueryBudget, case: TestCase):
+        await fill_db(session, case.db_fixtures)
+        repo = await repository(session)
+
+        with query_budget(max_queries=case.max_queries, max_rows=PAGE_ROWS):
+            res = await repo.get_by_building_location_radius(*case.call.args, **case.call.kwargs)
+
+        assert res.facets == case.expected_value
+
+    @pytest.mark.parametrize(
+        'case',
+        [
+            TestCase(
+                db_fixtures=[
+                    models.Organization(id=1, name='Org 1', phone='111'),
+                    models.Organization(id=2, name='Org 2', phone='222'),
+                    models.Organization(id=3, name='Org 3', phone='333'),
+                    models.Building(id=1, address='Shared Address', point=from_shape(Point(0, 0), srid=4326)),
+                    models.OrganizationBuilding(organization_id=1, building_id=1),
+                    models.OrganizationBuilding(organization_id=2, building_id=1),
+                    models.OrganizationBuilding(organization_id=3, building_id=1),
+                ],
+                call=mock.call(building_id=1, limit=1, total=schemas.CountMode.EXACT),
+                expected_value=3,
+            ),
+            TestCase(
+                db_fixtures=[
+                    models.Organization(id=1, name='Org 1', phone='111'),
+                    models.Organization(id=2, name='Org 2', phone='222'),
+                    models.Building(id=1, address='Shared Address', point=from_shape(Point(0, 0), srid=4326)),
+                    models.OrganizationBuilding(organization_id=1, building_id=1),
+                    models.OrganizationBuilding(organization_id=2, building_id=1),
+                ],
+                call=mock.call(building_id=1, offset=5, total=schemas.CountMode.EXACT),
+                expected_value=2,
+                max_queries=2,
+            ),
+            TestCase(
+                db_fixtures=[],
+                call=mock.call(building_id=1, total=schemas.CountMode.EXACT),
+                expected_value=0,
+            ),
+            TestCase(
+                db_fixtures=[],
+                call=mock.call(building_id=1),
+                expected_value=None,
+            ),
+        ],
+    )
+    async def test_total(self, session: AsyncSession, query_budget: QueryBudget, case: TestCase):
+        await fill_db(session, case.db_fixtures)
+        repo = await repository(session)
+
+        with query_budget(max_queries=case.max_queries, max_rows=PAGE_ROWS):
+            res = await repo.get_by_building_id(*case.call.args, **case.call.kwargs)
+
+        assert res.total == case.expected_value
+
+    async def test_read_model_follows_source_tables(self, session: AsyncSession, query_budget: QueryBudget):
+        await fill_db(
+            session,
+            [
+                models.Building(id=1, address='Old St', point=from_shape(Point(0, 0), srid=4326)),
+                models.Organization(id=1, name='Org', phone='111'),
+                models.OrganizationBuilding(organization_id=1, building_id=1),
+                models.Specialization(id=1, name='Spec'),
+                models.OrganizationSpecializations(organization_id=1, specialization_id=1),
+            ],
+        )
+        repo = await repository(session)
+
+        await session.execute(sa.update(models.Building).where(models.Building.id == 1).values(address='New St'))
+        await session.execute(sa.update(models.Specialization).values(name='Renamed Spec'))
+
+        with query_budget(max_queries=1, max_rows=1):
+            res = await repo.get_by_id(organization_id=1)
+
+        assert res == OrganizationRecord(
+            id=1,
+            name='Org',
+            phone='111',
+            building_id=1,
+            building_address='New St',
+            building_coordinates=(0, 0),
+            specializations=[SpecializationRecord(id=1, name='Renamed Spec', parent_id=None)],
+        )
+
+        await session.execute(
+            sa.delete(models.OrganizationBuilding).where(models.OrganizationBuilding.organization_id == 1)
+        )
+
+        assert await repo.get_by_id(organization_id=1) is None
+
+    @pytest.mark.parametrize(
+        ('match', 'expected_ids'),
+        [
+            (schemas.SpecializationsMatch.ALL, [1]),
+            (schemas.SpecializationsMatch.ANY, [1, 2]),
+        ],
+    )
+    async def test_get_by_specializations(
+        self,
+        session: AsyncSession,
+        query_budget: QueryBudget,
+        match: schemas.SpecializationsMatch,
+        expected_ids: list[int],
+    ):
+        await fill_db(
+            session,
+            [
+                models.Building(id=1, address='A', point=from_shape(Point(0, 0), srid=4326)),
+                models.Organization(id=1, name='Both', phone='111'),
+                models.Organization(id=2, name='First Only', phone='222'),
+                models.Organization(id=3, name='Neither', phone='333'),
+                models.OrganizationBuilding(organization_id=1, building_id=1),
+                models.OrganizationBuilding(organization_id=2, building_id=1),
+                models.OrganizationBuilding(organization_id=3, building_id=1),
+                models.Specialization(id=1, name='First'),
+                models.Specialization(id=2, name='Second'),
+                models.Specialization(id=3, name='Third'),
+                models.OrganizationSpecializations(organization_id=1, specialization_id=1),
+                models.OrganizationSpecializations(organization_id=1, specialization_id=2),
+                models.OrganizationSpecializations(organization_id=2, specialization_id=1),
+                models.OrganizationSpecializations(organization_id=3, specialization_id=3),
+            ],
+        )
+        repo = await repository(session)
+
+        with query_budget(max_queries=1, max_rows=len(expected_ids)):
+            res = await repo.get_by_specializations(specs=[1, 2], match=match)
+
+        assert [org.id for org in res.organizations] == expected_ids
+
+    async def test_deadline_sets_statement_timeout(self, session: AsyncSession, query_budget: QueryBudget):
+        repo = await repository(session)
+
+        # One extra statement applies the timeout to the transaction
+        with query_budget(max_queries=2, max_rows=1):
+            res = await repo.get_by_name(name='Anything', deadline=Deadline.after(10))
+
+        assert res.organizations == []
+        timeout = await session.scalar(sa.text('SHOW statement_timeout'))
+        assert timeout is not None
+        assert timeout.endswith('s')
+
+    async def test_deadline_exceeded(self, session: AsyncSession):
+        repo = await repository(session)
+
+        with pytest.raises(DeadlineExceededError):
+            await repo.get_by_id(organization_id=1, deadline=Deadline.after(0))
+
+    async def test_geohash_follows_point(self, session: AsyncSession):
+        await fill_db(
+            session,
+            [
+                models.Building(id=1, address='A', point=from_shape(Point(0, 0), srid=4326)),
+                models.Organization(id=1, name='Org', phone='111'),
+                models.OrganizationBuilding(organization_id=1, building_id=1),
+            ],
+        )
+
+        await session.execute(sa.update(models.Building).values(point=from_shape(Point(10.40744, 57.64911), srid=4326)))
+
+        expected = geohash.encode(10.40744, 57.64911)
+        assert await session.scalar(sa.select(models.Building.geohash)) == expected
+        assert await session.scalar(sa.select(models.OrganizationReadModel.geohash)) == expected
+
+    @SPATIAL_SEARCHES
+    async def test_cells_mode_matches_exact_mode(
+        self, session: AsyncSession, query_budget: QueryBudget, method: str, kwargs: dict[str, float]
+    ):
+        await fill_db(session, scattered_organizations())
+        cache = CellCache(size=100, ttl=60)
+        repo = await repository(session, cell_cache=cache)
+        params = {**kwargs, 'limit': 100, 'total': schemas.CountMode.EXACT}
+
+        exact = await getattr(repo, method)(**params)
+        with query_budget(max_queries=1, max_rows=100):
+            cells = await getattr(repo, method)(**params, mode=schemas.SpatialMode.CELLS)
+        # Every cell is cached by now
+        with query_budget(max_queries=0, max_rows=0):
+            cached = await getattr(repo, method)(**params, mode=schemas.SpatialMode.CELLS)
+
+        assert exact.organizations
+        assert cells == exact
+        assert cached == exact
+
+    @SPATIAL_SEARCHES
+    async def test_cells_mode_leaves_dense_cells_to_postgis(
+        self,
+        session: AsyncSession,
+        query_budget: QueryBudget,
+        monkeypatch: pytest.MonkeyPatch,
+        method: str,
+        kwargs: dict[str, float],
+    ):
+        monkeypatch.setattr(settings, 'SPATIAL_MAX_CELL_ROWS', 1)
+        await fill_db(session, scattered_organizations())
+        cache = CellCache(size=100, ttl=60)
+        repo = await repository(session, cell_cache=cache)
+        params = {**kwargs, 'limit': 100, 'total': schemas.CountMode.EXACT}
+
+        exact = await getattr(repo, method)(**params)
+        with query_budget(max_queries=2):
+            cells = await getattr(repo, method)(**params, mode=schemas.SpatialMode.CELLS)
+        # The dense cells are remembered, so the next request goes straight to PostGIS
+        with query_budget(max_queries=1, max_rows=100):
+            cached = await getattr(repo, method)(**params, mode=schemas.SpatialMode.CELLS)
+
+        assert cells == exact
+        assert cached == exact
+
+    @SPATIAL_SEARCHES
+    async def test_index_mode_matches_exact_mode(
+        self, session: AsyncSession, query_budget: QueryBudget, method: str, kwargs: dict[str, float]
+    ):
+        await fill_db(session, scattered_organizations())
+        index = SpatialIndex()
+        index.load(await read_rows(session))
+        repo = await repository(session, spatial_index=index)
+        params = {**kwargs, 'limit': 100, 'total': schemas.CountMode.EXACT}
+
+        exact = await getattr(repo, method)(**params)
+        with query_budget(max_queries=0, max_rows=0):
+            indexed = await getattr(repo, method)(**params, mode=schemas.SpatialMode.INDEX)
+            page = await getattr(repo, method)(**{**params, 'limit': 3, 'offset': 2}, mode=schemas.SpatialMode.INDEX)
+
+        assert exact.organizations
+        assert indexed == exact
+        assert page.organizations == exact.organizations[2:5]
+
+    async def test_index_follows_read_model(self, session: AsyncSession):
+        await fill_db(session, scattered_organizations(3))
+        index = SpatialIndex()
+        index.load(await read_rows(session))
+        repo = await repository(session, spatial_index=index)
+
+        await session.execute(
+            sa.update(models.Building).where(models.Building.id == 1).values(point=from_shape(Point(1, 1), srid=4326))
+        )
+        await session.execute(
+            sa.delete(models.OrganizationBuilding).where(models.OrganizationBuilding.building_id != 1)
+        )
+        # What the refresher does with the ids it is notified of
+        changed = [1, 2, 3]
+        rows = await read_rows(session, changed)
+        index.upsert(rows)
+        index.remove(set(changed) - {row[0] for row in rows})
+
+        res = await repo.get_by_building_location_radius(
+            longitude=1, latitude=1, radius_m=1_000, mode=schemas.SpatialMode.INDEX
+        )
+        exact = await repo.get_by_building_location_radius(longitude=1, latitude=1, radius_m=1_000)
+
+        assert [org.id for org in res.organizations] == [1]
+        assert res == exact
+        assert len(index) == 1
+
+    async def test_hydration_reads_new_specializations(self, session: AsyncSession, query_budget: QueryBudget):
+        await fill_db(session, scattered_organizations(1))
+        repo = await repository(session)
+        await fill_db(
+            session,
+            [
+                models.Specialization(id=1, name='New Spec'),
+                models.OrganizationSpecializations(organization_id=1, specialization_id=1),
+            ],
+        )
+
+        # The page, then the taxonomy it didn't know of yet
+        with query_budget(max_queries=2):
+            res = await repo.get_by_id(organization_id=1)
+
+        assert res is not None
+        assert res.specializations == [SpecializationRecord(id=1, name='New Spec', parent_id=None)]
+
+
+async def test_side_sessions_fit_pool(db: sa.URL):
+    """A pool's worth of requests holding three sessions each, admitted as the app does, don't wait out the pool."""
+    pool_size = 6
+    engine = create_async_engine(db, pool_size=pool_size, max_overflow=0, pool_timeout=2)
+    sessionmaker = async_sessionmaker(engine)
+    concurrency = request_concurrency(pool_size)
+    limiter = ConcurrencyLimiter(
+        AdaptiveLimit(initial=concurrency, max_limit=concurrency),
+        max_queue=pool_size,
+        max_queue_per_client=pool_size,
+        queue_timeout=10,
+    )
+
+    async def request() -> OrganizationPage:
+        assert await limiter.acquire('client') is None
+        try:
+            async with sessionmaker() as session:
+                # Every admitted request holds its own connection before its side sessions ask for theirs
+                await session.connection()
+                await asyncio.sleep(0.1)
+                repo = await repository(session, sessionmaker=sessionmaker)
+                return await repo.get_by_building_address(
+                    'Nowhere', facets=schemas.CountMode.EXACT, total=schemas.CountMode.ESTIMATE
+                )
+        finally:
+            limiter.release()
+
+    try:
+        pages = await asyncio.gather(*(request() for _ in range(pool_size)))
+    finally:
+        await engine.dispose()
+
+    assert [page.organizations for page in pages] == [[]] * pool_size
@@ -0,0 +1,90 @@
+import pytest
+import sqlalchemy as sa
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import schemas
+from src.db import models
+from src.repositories import OrganizationWriter
+
+
+@pytest.fixture
+async def writer(session: AsyncSession) -> OrganizationWriter:
+    for id_ in (1, 2):
+        session.add(models.Building(id=id_, address=f'Main st. {id_}', point=from_shape(Point(0, id_), srid=4326)))
+    session.add_all([models.Specialization(id=id_, name=f'Specialization {id_}') for id_ in (1, 2, 3)])
+    await session.flush()
+    return OrganizationWriter(session)
+
+
+def organization(
+    id_: int, building_id: int = 1, specialization_ids: list[int] | None = None, name: str = 'Org'
+) -> schemas.OrganizationWrite:
+    return schemas.OrganizationWrite(
+        id=id_,
+        name=f'{name} {id_}',
+        phone=str(id_),
+        building_id=building_id,
+        specialization_ids=specialization_ids or [],
+    )
+
+
+async def read_models(session: AsyncSession) -> list[tuple[int, str, int, list[int]]]:
+    rows = await session.execute(
+        sa.select(
+            models.OrganizationReadModel.organization_id,
+            models.OrganizationReadModel.name,
+            models.OrganizationReadModel.building_id,
+            models.OrganizationReadModel.specialization_ids,
+        ).order_by(models.OrganizationReadModel.organization_id)
+    )
+    return [(id_, name, building_id, list(specialization_ids)) for id_, name, building_id, specialization_ids in rows]
+
+
+async def test_upsert_creates_then_overwrites(writer: OrganizationWriter, session: AsyncSession):
+    await writer.upsert([organization(1, specialization_ids=[1, 2]), organization(2)])
+    await writer.upsert([organization(1, building_id=2, specialization_ids=[2, 3], name='Renamed'), organization(3)])
+
+    assert await read_models(session) == [
+        (1, 'Renamed 1', 2, [2, 3]),
+        (2, 'Org 2', 1, []),
+        (3, 'Org 3', 1, []),
+    ]
+
+
+async def test_create_existing_fails(writer: OrganizationWriter):
+    await writer.create([organization(1)])
+
+    with pytest.raises(exc.IntegrityError):
+        await writer.create([organization(1)])
+
+
+async def test_unknown_building_fails(writer: OrganizationWriter):
+    with pytest.raises(exc.IntegrityError):
+        await writer.upsert([organization(1, building_id=3)])
+
+
+async def test_update(writer: OrganizationWriter, session: AsyncSession):
+    await writer.create([organization(1, specialization_ids=[1])])
+
+    assert await writer.update([organization(1, specialization_ids=[3], name='Renamed')]) == []
+    assert await read_models(session) == [(1, 'Renamed 1', 1, [3])]
+
+
+async def test_triggers_only_skipped_for_batches(writer: OrganizationWriter, session: AsyncSession):
+    await writer.upsert([organization(1)])
+    # Batch writes were once marked by this setting, which any client can turn on
+    await session.execute(sa.text("SET catalogue.batch_write = 'on'"))
+    session.add(models.Organization(id=2, name='Org 2', phone='2'))
+    await session.flush()
+    session.add(models.OrganizationBuilding(organization_id=2, building_id=2))
+    await session.flush()
+
+    assert await session.scalar(sa.select(sa.func.to_regclass('pg_temp.batch_write'))) is None
+    assert await read_models(session) == [(1, 'Org 1', 1, []), (2, 'Org 2', 2, [])]
+    session.add(models.Organization(id=3, name='Org 3', phone='3'))
+    await session.flush()
+    with pytest.raises(exc.DBAPIError, match='must have at least one building'):
+        await session.execute(sa.text('SET CONSTRAINTS ALL IMMEDIATE'))
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from src.repositories.records import OrganizationRecord
+from src.repositories.spatial_index import IndexedOrganization, Row, SpatialIndex, _spheroid_distance_m
+
+
+def row(organization_id: int, building_id: int, longitude: float, latitude: float) -> Row:
+    record = OrganizationRecord(organization_id, '', '', building_id, '', (longitude, latitude), [])
+    return organization_id, building_id, longitude, latitude, IndexedOrganization(record, ())
+
+
+def ids(page: list[IndexedOrganization]) -> list[int]:
+    return [organization.record.id for organization in page]
+
+
+@pytest.fixture
+def index() -> SpatialIndex:
+    index = SpatialIndex(rebuild_after=3)
+    index.load([row(1, 1, 0, 0), row(2, 1, 0, 0), row(3, 2, 0.001, 0), row(4, 3, 0.002, 0), row(5, 4, 1, 1)])
+    return index
+
+
+def test_radius_nearest_first(index: SpatialIndex):
+    page, total = index.radius(0.0015, 0, 1_000, limit=10, offset=0)
+
+    # Buildings 2 and 3 are as near as each other, so their organizations sort by id
+    assert ids(page) == [3, 4, 1, 2]
+    assert total == 4  # noqa: PLR2004
+
+
+def test_radius_page(index: SpatialIndex):
+    page, total = index.radius(0, 0, 1_000, limit=2, offset=1)
+
+    assert ids(page) == [2, 3]
+    assert total == 4  # noqa: PLR2004
+
+
+def test_box(index: SpatialIndex):
+    page, total = index.box(0.0005, -1, 2, 2, limit=10, offset=0)
+
+    assert ids(page) == [3, 4, 5]
+    assert total == 3  # noqa: PLR2004
+
+
+def test_follows_changes_before_and_after_rebuild(index: SpatialIndex):
+    # Moves building 4 next to the others, adds building 5 and empties building 2: three changes, not yet rebuilt
+    index.upsert([row(5, 4, 0.0005, 0), row(6, 5, 0.0001, 0)])
+    index.remove([3])
+
+    expected = [1, 2, 6, 5, 4]
+    assert ids(index.radius(0, 0, 1_000, limit=10, offset=0)[0]) == expected
+    assert len(index) == 5  # noqa: PLR2004
+
+    index.upsert([row(7, 6, 50, 50)])
+
+    # Past `rebuild_after`, the changes are in the tree
+    assert ids(index.radius(0, 0, 1_000, limit=10, offset=0)[0]) == expected
+
+
+def test_organization_changes_building(index: SpatialIndex):
+    index.upsert([row(1, 4, 1, 1)])
+
+    assert ids(index.box(0.5, 0.5, 2, 2, limit=10, offset=0)[0]) == [1, 5]
+    assert ids(index.radius(0, 0, 1, limit=10, offset=0)[0]) == [2]
+
+
+def test_load_replaces_everything(index: SpatialIndex):
+    index.load([row(9, 9, 0, 0)])
+
+    assert ids(index.box(-180, -90, 180, 90, limit=10, offset=0)[0]) == [9]
+
+
+def test_radius_measured_on_spheroid():
+    index = SpatialIndex()
+    index.load([row(1, 1, 0, 0.01), row(2, 2, 0.01, 0)])
+
+    # A hundredth of a degree is 1105.7 m along the meridian and 1113.2 m along the equator on the spheroid, but
+    # 1112.0 m both ways on a sphere
+    assert ids(index.radius(0, 0, 1_108, limit=10, offset=0)[0]) == [1]
+    assert ids(index.radius(0, 0, 1_113, limit=10, offset=0)[0]) == [1]
+    assert ids(index.radius(0, 0, 1_114, limit=10, offset=0)[0]) == [1, 2]
+
+
+def test_spheroid_distance():
+    # Vincenty's own example, Flinders Peak to Buninyong, and a point to itself
+    distances = _spheroid_distance_m(
+        144.42486789, -37.95103342, np.array([143.92649554, 144.42486789]), np.array([-37.65282114, -37.95103342])
+    )
+
+    assert distances == pytest.approx([54_972.271, 0], abs=0.01)
@@ -0,0 +1,65 @@
+import sqlalchemy as sa
+from sqlalchemy.ext import asyncio as async_sa
+
+from src import schemas
+from src.db import models
+from src.repositories.records import SpecializationRecord
+from src.repositories.taxonomy import Taxonomy, TaxonomyCache
+
+ROWS = [(3, 'Parts', 2), (1, 'Food', None), (2, 'Cars', None), (4, 'Tyres', 3), (5, 'Oil', 2)]
+
+
+def test_nodes():
+    taxonomy = Taxonomy(ROWS)
+
+    assert taxonomy.nodes[4].ancestors == (3, 2)
+    assert taxonomy.nodes[2].descendants == (3, 4, 5)
+    assert taxonomy.nodes[1].ancestors == taxonomy.nodes[1].descendants == ()
+    assert taxonomy.nodes[3].specialization == SpecializationRecord(id=3, name='Parts', parent_id=2)
+
+
+def test_specializations_skip_unknown_ids():
+    taxonomy = Taxonomy(ROWS)
+
+    assert [specialization.id for specialization in taxonomy.specializations([1, 6, 4])] == [1, 4]
+
+
+def test_tree():
+    tree = Taxonomy(ROWS).tree
+
+    assert tree.specializations == [
+        schemas.SpecializationTree(id=1, name='Food', children=[]),
+        schemas.SpecializationTree(
+            id=2,
+            name='Cars',
+            children=[
+                schemas.SpecializationTree(
+                    id=3, name='Parts', children=[schemas.SpecializationTree(id=4, name='Tyres', children=[])]
+                ),
+                schemas.SpecializationTree(id=5, name='Oil', children=[]),
+            ],
+        ),
+    ]
+
+
+def test_version():
+    assert Taxonomy(ROWS).version == Taxonomy(reversed(ROWS)).version == Taxonomy(ROWS).tree.version
+    assert Taxonomy(ROWS).version != Taxonomy([*ROWS[:-1], (5, 'Oils', 2)]).version
+
+
+async def test_cache_discards_stale_taxonomy(session: async_sa.AsyncSession):
+    session.add(models.Specialization(id=1, name='Food'))
+    await session.flush()
+    cache = TaxonomyCache(ttl=60)
+    taxonomy = await cache.get(session)
+
+    # Unknown ids are read again by `get` anyway
+    cache.discard_stale(
+        [SpecializationRecord(id=1, name='Food', parent_id=None), SpecializationRecord(2, 'Cars', None)]
+    )
+    assert await cache.get(session) is taxonomy
+
+    await session.execute(sa.update(models.Specialization).values(name='Meals'))
+    cache.discard_stale([SpecializationRecord(id=1, name='Meals', parent_id=None)])
+
+    assert (await cache.get(session)).specializations([1]) == [SpecializationRecord(id=1, name='Meals', parent_id=None)]
@@ -0,0 +1,80 @@
+import msgpack
+import pyarrow as pa
+import pytest
+
+from src import schemas
+from src.repositories.records import RECORDS, OrganizationPage, OrganizationRecord, SpecializationRecord
+from src.routers import formats
+
+FOOD = SpecializationRecord(id=1, name='Food', parent_id=None)
+PAGE = OrganizationPage(
+    organizations=[
+        OrganizationRecord(
+            id=10,
+            name='Cafe',
+            phone='8-800',
+            building_id=7,
+            building_address='Main st. 1',
+            building_coordinates=(37.6, 55.7),
+            specializations=[FOOD, SpecializationRecord(id=3, name='Coffee', parent_id=1)],
+        ),
+        OrganizationRecord(
+            id=20,
+            name='Bakery',
+            phone='8-900',
+            building_id=5,
+            building_address='Side st. 2',
+            building_coordinates=(37.5, 55.8),
+            specializations=[],
+        ),
+    ],
+    total=2,
+)
+
+
+@pytest.mark.parametrize(
+    ('accept', 'expected'),
+    [
+        ('', formats.RecordResponse),
+        ('*/*', formats.RecordResponse),
+        ('application/msgpack', formats.MsgpackResponse),
+        ('application/x-msgpack', formats.MsgpackResponse),
+        ('application/json, application/msgpack', formats.RecordResponse),
+        ('application/json;q=0.5, application/vnd.apache.arrow.stream', formats.ArrowResponse),
+        ('text/html', formats.RecordResponse),
+    ],
+)
+def test_negotiate(accept: str, expected: type):
+    assert formats.negotiate(accept) is expected
+
+
+def test_msgpack_shaped_like_json():
+    response = formats.MsgpackResponse(PAGE)
+
+    assert response.media_type == formats.MSGPACK
+    assert msgpack.unpackb(response.body) == RECORDS.dump_python(PAGE, mode='json')
+
+
+def test_arrow_columns():
+    facets = schemas.Facets(total=2, estimated=False, specializations=[], buildings=[])
+    response = formats.ArrowResponse(OrganizationPage(PAGE.organizations, facets=facets, total=2))
+
+    table = pa.ipc.open_stream(response.body).read_all()
+    assert table.to_pydict() == {
+        'id': [10, 20],
+        'name': ['Cafe', 'Bakery'],
+        'lon': [37.6, 37.5],
+        'lat': [55.7, 55.8],
+        'building_id': [7, 5],
+        'specialization_ids': [[1, 3], []],
+    }
+    assert table.schema.metadata[b'total'] == b'2'
+    assert schemas.Facets.model_validate_json(table.schema.metadata[b'facets']).total == 2  # noqa: PLR2004
+
+
+def test_arrow_empty_page():
+    response = formats.ArrowResponse(OrganizationPage([]))
+
+    table = pa.ipc.open_stream(response.body).read_all()
+    assert table.num_rows == 0
+    assert not table.schema.metadata
@@ -0,0 +1,34 @@
+import http
+import typing
+
+import httpx
+import pytest
+
+from src.app import app
+from src.settings import settings
+
+if typing.TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+
+@pytest.fixture
+async def client() -> 'AsyncIterator[httpx.AsyncClient]':
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+        yield client
+
+
+@pytest.mark.parametrize(
+    ('path', 'params'),
+    [
+        ('', {'name': 'Alpha', 'limit': settings.MAX_PAGE_SIZE + 1}),
+        ('', {'name': 'Alpha', 'offset': -1}),
+        ('/radius', {'lon': 0, 'lat': 0, 'radius_m': settings.MAX_RADIUS_M + 1}),
+        ('/radius', {'lon': 0, 'lat': 0, 'radius_m': 0}),
+        ('/box', {'ll_lon': 0, 'll_lat': 0, 'ur_lon': 1, 'ur_lat': 1}),
+        ('/specs', {'specs': list(range(settings.MAX_SPECIALIZATIONS + 1))}),
+    ],
+)
+async def test_guards(client: httpx.AsyncClient, path: str, params: dict[str, object]):
+    response = await client.get(f'/api/v1/organizations{path}', params=params)
+
+    assert response.status_code == http.HTTPStatus.UNPROCESSABLE_CONTENT
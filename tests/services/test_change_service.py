@@ -0,0 +1,64 @@
+import asyncio
+import datetime
+import typing
+from unittest import mock
+
+import pytest
+
+from src import schemas
+from src.repositories.change_notifier import ChangeNotifier
+from src.services import ChangeService
+from src.settings import settings
+
+CHANGE = schemas.Change(
+    seq=7, table_name='organizations', operation='update', key={'id': 1}, changed_at=datetime.datetime.now(datetime.UTC)
+)
+
+
+@pytest.fixture(autouse=True)
+def poll_interval(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, 'CHANGES_POLL_INTERVAL_S', 0.01)
+
+
+def repository(*results: list[schemas.Change]) -> mock.AsyncMock:
+    repo = mock.AsyncMock()
+    repo.get_since.side_effect = [*results]
+    return repo
+
+
+async def test_returns_at_once_without_wait():
+    service = ChangeService(repository([]))
+
+    assert await service.get_since(3, limit=10, wait=0) == schemas.Changes(changes=[], next=3)
+
+
+async def test_polls_until_changes():
+    repo = repository([], [], [CHANGE])
+
+    changes = await ChangeService(repo).get_since(3, limit=10, wait=1)
+
+    assert changes == schemas.Changes(changes=[CHANGE], next=7)
+    assert repo.get_since.await_count == 3  # noqa: PLR2004
+
+
+async def test_gives_up_after_wait():
+    repo = mock.AsyncMock()
+    repo.get_since.return_value = []
+
+    changes = await ChangeService(repo).get_since(3, limit=10, wait=0.05)
+
+    assert changes.changes == []
+    assert repo.get_since.await_count > 1
+
+
+async def test_notification_wakes_poll(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, 'CHANGES_POLL_INTERVAL_S', 60)
+    notifier = ChangeNotifier('postgresql+asyncpg://localhost/test')
+    service = ChangeService(repository([], [CHANGE]), typing.cast('typing.Any', notifier))
+
+    poll = asyncio.create_task(service.get_since(3, limit=10, wait=60))
+    await asyncio.sleep(0)
+    notifier._on_notification(None, 0, 'change_log', '')  # noqa: SLF001
+
+    changes = await asyncio.wait_for(poll, 1)
+    assert changes.changes == [CHANGE]
@@ -0,0 +1,44 @@
+import pathlib
+
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point
+from sqlalchemy.ext import asyncio as async_sa
+
+from src import schemas, snapshot
+from src.db import models
+from src.repositories import ChangeRepository, OrganizationRepository, OrganizationWriter
+from src.services import OrganizationService, OrganizationWriteService
+
+
+def organization(name: str) -> schemas.OrganizationWrite:
+    return schemas.OrganizationWrite(id=1, name=name, phone='1', building_id=1, specialization_ids=[1])
+
+
+async def test_write_then_read_through_snapshot(committed: async_sa.AsyncEngine, tmp_path: pathlib.Path):
+    sessionmaker = async_sa.async_sessionmaker(committed, expire_on_commit=False)
+    async with sessionmaker() as session, session.begin():
+        session.add(models.Building(id=1, address='Main st. 1', point=from_shape(Point(0, 0), srid=4326)))
+        session.add(models.Specialization(id=1, name='Food'))
+    async with sessionmaker() as session:
+        await OrganizationWriteService(OrganizationWriter(session)).create([organization('Old')])
+    path = tmp_path / 'catalogue.snapshot'
+    async with sessionmaker() as session:
+        # Publishes the changes so far, as a running app would have, for the build to include them
+        await ChangeRepository(session).get_since(0, limit=100)
+        async with session.begin():
+            await snapshot.build(session, path)
+    reader = snapshot.SnapshotReader(path, check_interval=0)
+    await reader.catch_up(sessionmaker)
+
+    async with sessionmaker() as session:
+        await OrganizationWriteService(OrganizationWriter(session)).update([organization('New')])
+    async with sessionmaker() as session:
+        service = OrganizationService(OrganizationRepository(session), snapshot=reader)
+        before = await service.get_by_id(1)
+        await reader.catch_up(sessionmaker)
+        after = await service.get_by_id(1)
+        page = await service.get_by_building(1)
+
+    assert before.name == 'Old'
+    assert after.name == 'New'
+    assert [organization.name for organization in page.organizations] == ['New']
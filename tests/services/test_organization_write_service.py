@@ -0,0 +1,72 @@
+from unittest import mock
+
+import fastapi
+import pytest
+from sqlalchemy import exc
+
+from src import schemas
+from src.cache import Cache, MemoryBackend
+from src.services import OrganizationWriteService
+
+ORGANIZATIONS = [
+    schemas.OrganizationWrite(id=id_, name=f'Org {id_}', phone=str(id_), building_id=1, specialization_ids=[1])
+    for id_ in (1, 2)
+]
+
+
+class ForeignKeyViolationError(Exception):
+    sqlstate = '23503'
+
+
+@pytest.fixture
+def cache() -> Cache:
+    return Cache(MemoryBackend(size=100), prefix='test', ttl=60)
+
+
+async def cached(cache: Cache) -> int | None:
+    async def load() -> int:
+        return 1
+
+    return await cache.get_or_load('key', load, encode=int, decode=int)
+
+
+async def test_write_invalidates_cache(cache: Cache):
+    writer = mock.AsyncMock()
+    await cached(cache)
+
+    written = await OrganizationWriteService(writer, cache).upsert(ORGANIZATIONS)
+
+    assert written == schemas.OrganizationsWritten(ids=[1, 2])
+    writer.upsert.assert_awaited_once_with(ORGANIZATIONS)
+    assert await cache.backend.get(f'{cache.prefix}:generation') == b'1'
+
+
+async def test_repeated_organization_rejected():
+    writer = mock.AsyncMock()
+
+    with pytest.raises(fastapi.HTTPException) as raised:
+        await OrganizationWriteService(writer).create([*ORGANIZATIONS, ORGANIZATIONS[0]])
+
+    assert raised.value.status_code == fastapi.status.HTTP_422_UNPROCESSABLE_CONTENT
+    writer.create.assert_not_awaited()
+
+
+async def test_update_missing(cache: Cache):
+    writer = mock.AsyncMock()
+    writer.update.return_value = [2]
+
+    with pytest.raises(fastapi.HTTPException) as raised:
+        await OrganizationWriteService(writer, cache).update(ORGANIZATIONS)
+
+    assert raised.value.status_code == fastapi.status.HTTP_404_NOT_FOUND
+    assert await cache.backend.get(f'{cache.prefix}:generation') is None
+
+
+async def test_unknown_reference():
+    writer = mock.AsyncMock()
+    writer.upsert.side_effect = exc.IntegrityError('INSERT', {}, ForeignKeyViolationError())
+
+    with pytest.raises(fastapi.HTTPException) as raised:
+        await OrganizationWriteService(writer).upsert(ORGANIZATIONS)
+
+    assert raised.value.status_code == fastapi.status.HTTP_422_UNPROCESSABLE_CONTENT
@@ -0,0 +1,19 @@
+import pytest
+
+from src.deadline import Deadline, DeadlineExceededError
+
+
+def test_statement_timeout():
+    timeout = Deadline.after(2).statement_timeout()
+
+    assert timeout.endswith('ms')
+    assert 1_900 < int(timeout.removesuffix('ms')) <= 2_000  # noqa: PLR2004
+
+
+def test_statement_timeout_once_expired():
+    with pytest.raises(DeadlineExceededError):
+        Deadline.after(-1).statement_timeout()
+
+
+def test_remaining_never_negative():
+    assert Deadline.after(-1).remaining == 0
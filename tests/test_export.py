@@ -0,0 +1,83 @@
+import pathlib
+import typing
+
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pytest
+
+from src import export
+
+if typing.TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Sequence
+
+ORGANIZATIONS = export.DATASETS[0]
+
+
+def row(id_: int, geohash: str) -> 'export.Row':
+    return (id_, f'Organization {id_}', '8-800', id_ // 2, 37.6, 55.7, geohash, [1, id_], geohash[:3])
+
+
+async def batches(
+    rows: 'Sequence[tuple[typing.Any, ...]]', size: int
+) -> 'AsyncIterator[Sequence[tuple[typing.Any, ...]]]':
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+@pytest.mark.parametrize(
+    ('previous', 'counts', 'changed', 'expected'),
+    [
+        (None, {'ucf': 2, 'ucg': 1}, [], ({'ucf', 'ucg'}, set())),
+        ({'ucf': 2, 'ucg': 1}, {'ucf': 2, 'ucg': 1}, [], (set(), set())),
+        ({'ucf': 2, 'ucg': 1}, {'ucf': 2, 'ucg': 1}, ['ucg'], ({'ucg'}, set())),
+        # A deletion shows as a smaller count, a move as a change in the new cell and one less in the old
+        ({'ucf': 2, 'ucg': 1}, {'ucf': 1, 'ucg': 1}, [], ({'ucf'}, set())),
+        ({'ucf': 2, 'ucg': 1}, {'ucf': 1, 'ucg': 2}, ['ucg'], ({'ucf', 'ucg'}, set())),
+        ({'ucf': 2, 'ucg': 1}, {'ucf': 2, 'uch': 1}, ['uch'], ({'uch'}, {'ucg'})),
+    ],
+)
+def test_plan(
+    previous: dict[str, int] | None,
+    counts: dict[str, int],
+    changed: list[str],
+    expected: tuple[set[str], set[str]],
+):
+    assert export.plan(previous, counts, changed) == expected
+
+
+async def test_write_partitions(tmp_path: pathlib.Path):
+    rows = [row(1, 'ucfv0'), row(2, 'ucfv1'), row(3, 'ucfv2'), row(4, 'ucgb0'), row(5, 'uch00')]
+
+    written = await export.write_partitions(batches(rows, 2), tmp_path, ORGANIZATIONS)
+
+    assert written == 3  # noqa: PLR2004
+    assert sorted(path.parent.name for path in tmp_path.glob('organizations/*/*')) == [
+        'cell=ucf',
+        'cell=ucg',
+        'cell=uch',
+    ]
+    table = pq.read_table(export.partition_path(tmp_path, 'organizations', 'ucf'))
+    assert table.schema == ORGANIZATIONS.schema
+    assert table.column('id').to_pylist() == [1, 2, 3]
+    assert table.column('specialization_ids').to_pylist() == [[1, 1], [1, 2], [1, 3]]
+    assert not list(tmp_path.rglob('*.tmp'))
+
+
+async def test_partitions_read_back_as_a_dataset(tmp_path: pathlib.Path):
+    rows = [row(1, 'ucfv0'), row(2, 'ucgb0')]
+    await export.write_partitions(batches(rows, 10), tmp_path, ORGANIZATIONS)
+
+    table = ds.dataset(tmp_path / 'organizations', format='parquet', partitioning='hive').to_table()
+
+    assert sorted(zip(table.column('id').to_pylist(), table.column('cell').to_pylist(), strict=True)) == [
+        (1, 'ucf'),
+        (2, 'ucg'),
+    ]
+
+
+def test_manifest(tmp_path: pathlib.Path):
+    manifest = export.Manifest(precision=3, watermark=1234, partitions={'organizations': {'ucf': 2}})
+
+    assert export.Manifest.load(tmp_path) is None
+    manifest.dump(tmp_path)
+    assert export.Manifest.load(tmp_path) == manifest
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from src import geohash
+
+
+@pytest.mark.parametrize(
+    ('longitude', 'latitude', 'precision', 'expected'),
+    [
+        (-5.6, 42.6, 5, 'ezs42'),
+        (0, 0, 9, 's00000000'),
+        (10.40744, 57.64911, 11, 'u4pruydqqvj'),
+        (-180, -90, 3, '000'),
+    ],
+)
+def test_encode(longitude: float, latitude: float, precision: int, expected: str):
+    assert geohash.encode(longitude, latitude, precision) == expected
+
+
+def test_cover_holds_every_point_of_the_box():
+    rng = random.Random(0)  # noqa: S311
+    west, south, east, north = 37.55, 55.70, 37.65, 55.78
+
+    for precision in (5, 6, 7):
+        cells = set(geohash.cover(west, south, east, north, precision))
+
+        assert len(cells) == geohash.cover_count(west, south, east, north, precision)
+        for _ in range(1_000):
+            point = rng.uniform(west, east), rng.uniform(south, north)
+            assert geohash.encode(*point, precision) in cells
+
+
+@pytest.mark.parametrize('box', [(179.9, 10, 180, 10.1), (-180, 89.9, -179.9, 90), (-180, -90, 180, 90)])
+def test_cover_count_at_grid_edges(box: tuple[float, float, float, float]):
+    # Boxes ending on the antimeridian or a pole have no cells past them
+    for precision in (1, 2, 3):
+        assert geohash.cover_count(*box, precision) == len(geohash.cover(*box, precision))
+
+
+def test_radius_box_holds_the_circle():
+    longitude, latitude, radius_m = 37.6, 55.75, 1_000
+    west, south, east, north = geohash.radius_box(longitude, latitude, radius_m)
+
+    assert geohash.distance_m(longitude, latitude, west, latitude) >= radius_m
+    assert geohash.distance_m(longitude, latitude, east, latitude) >= radius_m
+    assert geohash.distance_m(longitude, latitude, longitude, south) >= radius_m
+    assert geohash.distance_m(longitude, latitude, longitude, north) >= radius_m
+
+
+def test_distance():
+    # One degree of longitude at the equator
+    assert geohash.distance_m(0, 0, 1, 0) == pytest.approx(111_195, rel=1e-3)
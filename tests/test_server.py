@@ -0,0 +1,57 @@
+import importlib
+import types
+
+import pytest
+
+from src.db.deps import SESSIONS_PER_REQUEST, request_concurrency, worker_pool_size
+from src.settings import settings
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch) -> types.ModuleType:
+    # Loading the config hands its worker count to the app's connection pool, as gunicorn does before importing the app
+    monkeypatch.setattr(settings, 'DB_POOL_PROCESSES', settings.DB_POOL_PROCESSES)
+    return importlib.import_module('src.server')
+
+
+@pytest.mark.parametrize('workers', [1, 3, 8, 16, 30])
+@pytest.mark.parametrize('unpooled', [0, 2])
+def test_worker_pools_fit_max_connections(workers: int, unpooled: int):
+    max_connections, reserved = 100, 10
+    pool_size = worker_pool_size(max_connections, reserved, workers, unpooled)
+    assert pool_size >= 1
+    assert (pool_size + unpooled) * workers <= max_connections - reserved
+
+
+@pytest.mark.parametrize(('workers', 'unpooled'), [(91, 0), (46, 1), (30, 3)])
+def test_worker_pool_size_rejects_oversubscription(workers: int, unpooled: int):
+    with pytest.raises(ValueError, match='too few'):
+        worker_pool_size(100, 10, workers, unpooled)
+
+
+@pytest.mark.parametrize('pool_size', [1, 2, 3, 10, 30])
+def test_admitted_requests_fit_pool(pool_size: int):
+    concurrency = request_concurrency(pool_size)
+    assert concurrency >= 1
+    # Below `SESSIONS_PER_REQUEST`, requests get no side sessions
+    sessions = SESSIONS_PER_REQUEST if pool_size >= SESSIONS_PER_REQUEST else 1
+    assert concurrency * sessions <= pool_size
+
+
+def test_connections_split_between_workers_only(server: types.ModuleType, monkeypatch: pytest.MonkeyPatch):
+    assert settings.model_fields['DB_POOL_PROCESSES'].default == 1
+
+    monkeypatch.setattr(settings, 'WEB_WORKERS', 200)
+    importlib.reload(server)
+
+    assert server.workers == 200  # noqa: PLR2004
+    assert settings.DB_POOL_PROCESSES == 200  # noqa: PLR2004
+
+
+def test_worker_loop(server: types.ModuleType):
+    assert server.Worker.CONFIG_KWARGS['loop'] == 'uvloop'
+    assert server.Worker.CONFIG_KWARGS['http'] == 'httptools'
+
+
+def test_app_is_preloaded(server: types.ModuleType):
+    assert server.preload_app
@@ -0,0 +1,117 @@
+import datetime
+import pathlib
+
+import pytest
+
+from src import schemas, snapshot
+from src.repositories.records import OrganizationRecord, SpecializationRecord
+
+SPECIALIZATIONS: list[snapshot.SpecializationRow] = [(2, 'Cars', None), (1, 'Food', None), (3, 'Parts', 2)]
+ORGANIZATIONS: list[snapshot.OrganizationRow] = [
+    (30, 'Garage', '8-800', 7, 'Main st. 1', 37.6, 55.7, [3, 2]),
+    (10, 'Cafe', '8-800', 7, 'Main st. 1', 37.6, 55.7, [1]),
+    (20, 'Bakery', '8-900', 5, 'Side st. 2', 37.5, 55.8, []),
+]
+
+
+@pytest.fixture
+def path(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / 'catalogue.snapshot'
+    snapshot.write(path, snapshot.encode(SPECIALIZATIONS, ORGANIZATIONS))
+    return path
+
+
+def test_organization(path: pathlib.Path):
+    attached = snapshot.Snapshot(path)
+
+    assert attached.organization(30) == OrganizationRecord(
+        id=30,
+        name='Garage',
+        phone='8-800',
+        building_id=7,
+        building_address='Main st. 1',
+        building_coordinates=(37.6, 55.7),
+        specializations=[
+            SpecializationRecord(id=2, name='Cars', parent_id=None),
+            SpecializationRecord(id=3, name='Parts', parent_id=2),
+        ],
+    )
+    assert attached.organization(15) is None
+    assert attached.organization(99) is None
+
+
+def test_by_building(path: pathlib.Path):
+    attached = snapshot.Snapshot(path)
+
+    page, total = attached.by_building(7, limit=1, offset=1) or ([], None)
+
+    assert [organization.id for organization in page] == [30]
+    assert total == 2  # noqa: PLR2004
+    assert attached.by_building(6, limit=10, offset=0) is None
+
+
+def test_strings_are_interned():
+    arrays = snapshot.encode(SPECIALIZATIONS, ORGANIZATIONS)
+
+    # Three names, two phones, two addresses and three specialization names, each stored once
+    assert len(arrays['string_offsets']) - 1 == 3 + 2 + 2 + 3
+
+
+def test_arrays_are_zero_copy(path: pathlib.Path):
+    attached = snapshot.Snapshot(path)
+
+    assert len(attached) == len(ORGANIZATIONS)
+    for array in attached._arrays.values():  # noqa: SLF001
+        assert not array.flags.owndata
+        assert not array.flags.writeable
+
+
+def test_reader_follows_rebuilds(path: pathlib.Path):
+    reader = snapshot.SnapshotReader(path, check_interval=0)
+    first = reader.current()
+
+    assert reader.current() is first
+    snapshot.write(path, snapshot.encode(SPECIALIZATIONS, ORGANIZATIONS[1:]))
+    current = reader.current()
+    assert current is not first
+    assert current is not None
+    assert current.organization(30) is None
+
+
+def test_not_a_snapshot(tmp_path: pathlib.Path):
+    path = tmp_path / 'other'
+    path.write_bytes(b'x' * 100)
+
+    with pytest.raises(ValueError, match='not an organization snapshot'):
+        snapshot.Snapshot(path)
+
+
+def change(seq: int, table_name: str, **key: int) -> schemas.Change:
+    return schemas.Change(
+        seq=seq, table_name=table_name, operation='update', key=key, changed_at=datetime.datetime.now(datetime.UTC)
+    )
+
+
+def test_reader_skips_changes_since_build(tmp_path: pathlib.Path):
+    path = tmp_path / 'catalogue.snapshot'
+    snapshot.write(path, snapshot.encode(SPECIALIZATIONS, ORGANIZATIONS), seq=5)
+    reader = snapshot.SnapshotReader(path, check_interval=0)
+
+    # The build includes the first change
+    reader.apply([change(4, 'organizations', id=20), change(6, 'organizations', id=30)])
+
+    assert reader.organization(20) is not None
+    assert reader.organization(30) is None
+    assert reader.organization(10) is not None
+    assert reader.by_building(7, limit=10, offset=0) is None
+    assert reader.by_building(5, limit=10, offset=0) is not None
+
+    reader.apply([change(7, 'organization_buildings', organization_id=10, building_id=5)])
+    assert reader.by_building(5, limit=10, offset=0) is None
+
+    reader.apply([change(8, 'specializations', id=1)])
+    assert reader.organization(20) is None
+
+    snapshot.write(path, snapshot.encode(SPECIALIZATIONS, ORGANIZATIONS), seq=8)
+    assert reader.organization(30) is not None
+    assert reader.by_building(5, limit=10, offset=0) is not None
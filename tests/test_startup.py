@@ -0,0 +1,43 @@
+import fastapi
+import pytest
+
+from benchmarks import importtime
+from src.app import spatial_index
+from src.repositories.spatial_index import SpatialIndexRefresher
+
+# Generous enough for a cold CI runner; a regression worth catching is an extra heavy dependency, not milliseconds
+IMPORT_BUDGET_S = 3.0
+
+# Needed by migrations and tests only
+MIGRATION_ONLY = ('alembic', 'alembic_utils', 'geoalchemy2', 'shapely', 'numpy')
+# Imported by the first request needing them
+ON_DEMAND = ('pyarrow',)
+
+
+@pytest.fixture(scope='module')
+def startup() -> tuple[list[importtime.ImportTime], set[str]]:
+    # The first import compiles the bytecode cache
+    importtime.measure()
+    return importtime.measure()
+
+
+@pytest.mark.parametrize('module', MIGRATION_ONLY + ON_DEMAND)
+def test_app_does_not_import(startup: tuple[list[importtime.ImportTime], set[str]], module: str):
+    _, modules = startup
+    assert module not in modules
+
+
+def test_app_import_time(startup: tuple[list[importtime.ImportTime], set[str]]):
+    times, _ = startup
+    assert importtime.total_s(times) < IMPORT_BUDGET_S
+
+
+async def test_spatial_index_crash_fails_startup(monkeypatch: pytest.MonkeyPatch):
+    async def crash(_self: SpatialIndexRefresher) -> None:
+        raise RuntimeError
+
+    monkeypatch.setattr(SpatialIndexRefresher, 'run', crash)
+
+    with pytest.raises(RuntimeError):
+        async with spatial_index(fastapi.FastAPI()):
+            pass